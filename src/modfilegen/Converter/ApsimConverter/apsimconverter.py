@@ -11,13 +11,17 @@ Author: ModFileGen Team
 Date: 2024-2026
 """
 
-from modfilegen import GlobalVariables
+from modfilegen import GlobalVariables, climatestore, filestore, queries
 from modfilegen.converter import Converter
+from modfilegen.indexadvisor import advise_indexes
+from modfilegen.masterinput import normalize_keys
+from modfilegen.simulations import SimulationSource
 from . import apsimweatherconverter, apsimsoilconverter, apsimmanagementconverter, apsiminitconverter
 import sys
 import subprocess
 import shutil
 import concurrent.futures
+from itertools import islice
 import numpy as np
 import os
 import datetime
@@ -130,6 +134,7 @@ def write_file(directory, filename, content):
     """Write content to file."""
     try:
         os.makedirs(directory, exist_ok=True)
+        filestore.unshare(os.path.join(directory, filename))
         with open(os.path.join(directory, filename), "w") as f:
             f.write(content)
     except Exception as e:
@@ -141,7 +146,7 @@ def process_chunk(*args):
     Process a chunk of simulations in parallel.
     
     Args:
-        chunk: DataFrame chunk with simulation rows
+        chunk: SimUnitList rows, or the SimulationSource partition to read them from
         mi: Path to MasterInput database
         md: Path to ModelDictionary database
         directoryPath: Base output directory
@@ -153,6 +158,7 @@ def process_chunk(*args):
         DataFrame with simulation results
     """
     chunk, mi, md, directoryPath, apsim_path, dt, template_apsimx = args
+    chunk = list(chunk)
     dataframes = []
     
     # Cache for weather and soil data to avoid regeneration
@@ -162,8 +168,11 @@ def process_chunk(*args):
     # Clear caches periodically to prevent memory buildup
     CACHE_CLEAR_INTERVAL = 50
     
-    ModelDictionary_Connection = sqlite3.connect(md)
-    MasterInput_Connection = sqlite3.connect(mi)
+    ModelDictionary_Connection = queries.copy_to_memory(md)
+    MasterInput_Connection = queries.connect_readonly(mi)
+    climate = climatestore.open_store(climatestore.store_directory(directoryPath))
+    # weather.met contents are written once and hard-linked into each simulation directory
+    files = filestore.open_store(filestore.store_directory(directoryPath))
     
     for i, row in enumerate(chunk):
         # Periodically clear caches to free memory
@@ -198,7 +207,8 @@ def process_chunk(*args):
                     simPath,
                     ModelDictionary_Connection,
                     MasterInput_Connection,
-                    usmdir
+                    usmdir,
+                    climate=climate,
                 )
                 weathertable[climid] = weather_content
                 del weatherconverter
@@ -209,8 +219,7 @@ def process_chunk(*args):
             # Write weather file from content
             weather_file = os.path.join(usmdir, "weather.met")
             if weather_content:
-                with open(weather_file, 'w') as f:
-                    f.write(weather_content)
+                files.place(usmdir, "weather.met", weather_content)
                 print(f"Successfully created weather file: {weather_file}")
             else:
                 weather_file = None
@@ -740,7 +749,9 @@ def export(MasterInput, ModelDictionary):
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_idsoil ON Soil (IdSoil);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_cultivars ON ListCultivars (idCultivar);")
         MasterInput_Connection.commit()
+        normalize_keys(MasterInput_Connection)
         print("Indexes created successfully!")
+        advise_indexes(MasterInput_Connection, models=["apsim"])
         
     except sqlite3.Error as e:
         print(f"Error creating indexes: {e}")
@@ -751,18 +762,7 @@ def export(MasterInput, ModelDictionary):
 
 def fetch_data_from_sqlite(masterInput):
     """Fetch simulation data from MasterInput database."""
-    conn = sqlite3.connect(masterInput)
-    df = pd.read_sql_query("SELECT * FROM SimUnitList", conn)
-    rows = df.to_dict(orient='records')
-    conn.close()
-    return rows
-
-
-def chunk_data(data, parts, chunk_size):
-    """Split data into chunks for parallel processing."""
-    k, m = divmod(len(data), parts * chunk_size)
-    sublists = [data[i * k + min(i, m):(i + 1) * k + min(i + 1, m)] for i in range(parts * chunk_size)]
-    return sublists
+    return list(SimulationSource.from_globals(masterInput))
 
 
 def main():
@@ -798,19 +798,18 @@ def main():
     
     # Create indexes
     export(mi, md)
+    climatestore.prepare(mi, directoryPath)
     
-    # Fetch simulation data
-    data = fetch_data_from_sqlite(mi)
-    
-    # Split data into chunks
-    chunks = chunk_data(data, parts, chunk_size=nthreads)
-    print(f"📊 Total simulations to process: {len(data)}", flush=True)
-    del data  # Free original data list after chunking
+    # Stream simulation chunks from SimUnitList
+    source = SimulationSource.from_globals(mi)
+    n_simulations = source.count()
+    n_chunks = min(n_simulations, parts * nthreads)
+    print(f"📊 Total simulations to process: {n_simulations}", flush=True)
     
-    # Create args list for parallel processing
+    # Create args for parallel processing: rowid ranges the workers read from SimUnitList
     import uuid
-    args_list = [(chunk, mi, md, directoryPath, apsim_path, dt, template_apsimx) for chunk in chunks]
-    del chunks  # Free chunks list after creating args_list
+    args_list = ((chunk, mi, md, directoryPath, apsim_path, dt, template_apsimx)
+                 for chunk in source.partitions(parts * nthreads, n_simulations))
     
     # Create unique result file name
     result_name = str(uuid.uuid4()) + "_apsim"
@@ -821,7 +820,7 @@ def main():
     
     try:
         start = time()
-        print(f"Processing {len(args_list)} chunks...", flush=True)
+        print(f"Processing {n_chunks} chunks...", flush=True)
         
         write_header = True
         total_chunks_written = 0
@@ -832,8 +831,8 @@ def main():
                 # Process in small batches to avoid holding all results in memory
                 batch_size = max(1, nthreads)  # Process nthreads chunks at a time
                 
-                for batch_idx in range(0, len(args_list), batch_size):
-                    batch_args = args_list[batch_idx:batch_idx + batch_size]
+                for batch_idx in range(0, n_chunks, batch_size):
+                    batch_args = list(islice(args_list, batch_size))
                     
                     # Process this batch
                     batch_results = Parallel()(
@@ -847,7 +846,7 @@ def main():
                             chunk_df.to_csv(result_path, mode='a', header=write_header, index=False)
                             write_header = False  # Only write header for first chunk
                             total_chunks_written += 1
-                            print(f"✅ Chunk {batch_idx + i + 1}/{len(args_list)}: {len(chunk_df)} rows written", flush=True)
+                            print(f"✅ Chunk {batch_idx + i + 1}/{n_chunks}: {len(chunk_df)} rows written", flush=True)
                         
                         # Free memory immediately
                         if chunk_df is not None:
@@ -862,8 +861,8 @@ def main():
                 # Process in batches
                 batch_size = max(1, nthreads)
                 
-                for batch_idx in range(0, len(args_list), batch_size):
-                    batch_args = args_list[batch_idx:batch_idx + batch_size]
+                for batch_idx in range(0, n_chunks, batch_size):
+                    batch_args = list(islice(args_list, batch_size))
                     
                     # Process this batch
                     batch_results = pool.starmap(process_chunk, batch_args)
@@ -874,7 +873,7 @@ def main():
                             chunk_df.to_csv(result_path, mode='a', header=write_header, index=False)
                             write_header = False
                             total_chunks_written += 1
-                            print(f"✅ Chunk {batch_idx + i + 1}/{len(args_list)}: {len(chunk_df)} rows written", flush=True)
+                            print(f"✅ Chunk {batch_idx + i + 1}/{n_chunks}: {len(chunk_df)} rows written", flush=True)
                         
                         if chunk_df is not None:
                             del chunk_df
@@ -14,8 +14,9 @@ Date: 2024-2026
 """
 
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import fetch_all, fetch_one
 import os
-import pandas as pd
 import json
 import traceback
 
@@ -56,41 +57,20 @@ class ApsimInitConverter(Converter):
         id_point = ST[-2] if len(ST) >= 2 else None
         
         try:
-            # Fetch default values from ModelDictionary
-            default_query = """
-            SELECT Champ, Default_Value_Datamill, defaultValueOtherSource, 
-                   IFNULL(defaultValueOtherSource, Default_Value_Datamill) As dv 
-            FROM Variables 
-            WHERE model = 'apsim' AND [Table] = 'initialization';
-            """
-            
-            # Try to get defaults, if table doesn't exist, use hardcoded defaults
+            # Fetch default values from ModelDictionary, if table doesn't exist, use hardcoded defaults
             try:
-                DT = pd.read_sql_query(default_query, ModelDictionary_Connection)
-                defaults = DT.set_index("Champ")["dv"].to_dict() if not DT.empty else {}
+                defaults = model_defaults(ModelDictionary_Connection).table('apsim', 'initialization')
             except:
                 defaults = {}
             
             # Fetch initialization data from MasterInput
-            init_query = f"""
-            SELECT SimUnitList.idIni, SimUnitList.idsoil, SimUnitList.idPoint,
-                   Soil.IdSoil, Soil.SoilOption, Soil.Wwp, Soil.Wfc, Soil.bd,
-                   InitialConditions.WStockinit, InitialConditions.Ninit,
-                   InitialConditions.NH4init, InitialConditions.residue_mass,
-                   InitialConditions.residue_type, InitialConditions.residue_cnr
-            FROM InitialConditions 
-            INNER JOIN (Soil INNER JOIN SimUnitList ON LOWER(Soil.IdSoil) = LOWER(SimUnitList.idsoil)) 
-                ON InitialConditions.idIni = SimUnitList.idIni
-            WHERE SimUnitList.idSim = '{id_sim}';
-            """
-            
             try:
-                DA = pd.read_sql_query(init_query, master_input_connection)
-                if DA.empty:
+                row = fetch_one(master_input_connection, "apsim.init", id_sim)
+                if row is None:
                     print(f"Warning: No initialization data found for simulation {id_sim}")
                     return self._generate_default_init(**kwargs)
                 
-                row = DA.to_dict(orient='records')[0]
+                row = dict(row)
             except Exception as e:
                 print(f"Warning: Could not fetch initialization data: {e}")
                 print("Using provided parameters or defaults")
@@ -99,14 +79,9 @@ class ApsimInitConverter(Converter):
             # Fetch soil layers for layer-by-layer initialization
             soil_layers = []
             if row and row.get('IdSoil'):
-                layer_query = f"""
-                SELECT * FROM soillayers 
-                WHERE LOWER(idsoil) = '{row['IdSoil'].lower()}' 
-                ORDER BY NumLayer;
-                """
                 try:
-                    soil_df = pd.read_sql_query(layer_query, master_input_connection)
-                    soil_layers = soil_df.to_dict(orient='records')
+                    soil_layers = [dict(layer) for layer in
+                                   fetch_all(master_input_connection, "soil.layers", row['IdSoil'].lower())]
                 except:
                     pass
             
@@ -22,6 +22,7 @@ from typing import Dict, List, Any, Optional, Union
 # Handle imports for both package and standalone execution
 try:
     from modfilegen.converter import Converter
+    from modfilegen.queries import statement
 except ModuleNotFoundError:
     # Add parent directories to path for standalone execution
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -30,6 +31,7 @@ except ModuleNotFoundError:
         sys.path.insert(0, package_dir)
     try:
         from modfilegen.converter import Converter
+        from modfilegen.queries import statement
     except ModuleNotFoundError:
         print("Warning: Could not import Converter base class. Using fallback.")
         # Fallback base class
@@ -825,23 +827,7 @@ namespace Models
         sim_id = ST[-3] if len(ST) >= 3 else ST[-1]
         
         # Query basic crop management data
-        base_query = """
-        SELECT 
-            SimUnitList.idsim, 
-            SimUnitList.idMangt, 
-            ListCultivars.idcultivarStics as cultivar,
-            ListCultivars.SpeciesName as crop,
-            CropManagement.sdens as population,
-            CropManagement.sowingdate,
-            CropManagement.SoilTillPolicyCode,
-            CropManagement.OFertiPolicyCode,
-            CropManagement.InoFertiPolicyCode
-        FROM ListCultivars 
-        INNER JOIN (CropManagement 
-        INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt)
-        ON ListCultivars.IdCultivar = CropManagement.Idcultivar
-        WHERE idSim = ?
-        """
+        base_query = statement("apsim.management")
         
         base_data = pd.read_sql_query(base_query, connection, params=[sim_id])
         
@@ -868,23 +854,7 @@ namespace Models
         # Skip if OFertiPolicyCode is 0 or '0' (no organic fertilization policy)
         ofert_code = base_data.iloc[0]['OFertiPolicyCode']
         if not base_data.empty and pd.notna(ofert_code) and str(ofert_code) != '0':
-            organic_query = """
-            SELECT 
-                CropManagement.sowingdate, 
-                OrganicFOperations.Dferti, 
-                OrganicFOperations.OFNumber, 
-                OrganicFOperations.CNferti, 
-                OrganicFOperations.NFerti, 
-                OrganicFOperations.Qmanure, 
-                OrganicFOperations.TypeResidues
-            FROM OrganicFertilizationPolicy 
-            INNER JOIN (CropManagement 
-            INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt) 
-            ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode
-            INNER JOIN OrganicFOperations ON OrganicFertilizationPolicy.OFertiPolicyCode = OrganicFOperations.OFertiPolicyCode
-            WHERE idSim = ?
-            ORDER BY OFNumber
-            """
+            organic_query = statement("apsim.management.organic")
             
             try:
                 organic_data = pd.read_sql_query(organic_query, connection, params=[sim_id])
@@ -905,20 +875,7 @@ namespace Models
         # Skip if InoFertiPolicyCode is 0 or '0' (no inorganic fertilization policy)
         inofert_code = base_data.iloc[0]['InoFertiPolicyCode']
         if not base_data.empty and pd.notna(inofert_code) and str(inofert_code) != '0':
-            inorganic_query = """
-            SELECT 
-                SimUnitList.idsim, 
-                InorganicFOperations.N, 
-                CropManagement.sowingdate, 
-                InorganicFOperations.Dferti, 
-                InorganicFertilizationPolicy.NumInorganicFerti
-            FROM (InorganicFertilizationPolicy 
-            INNER JOIN InorganicFOperations ON InorganicFertilizationPolicy.InorgFertiPolicyCode = InorganicFOperations.InorgFertiPolicyCode)
-            INNER JOIN (CropManagement 
-            INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt) 
-            ON InorganicFertilizationPolicy.InorgFertiPolicyCode = CropManagement.InoFertiPolicyCode
-            WHERE idSim = ?
-            """
+            inorganic_query = statement("apsim.management.inorganic")
             
             try:
                 inorganic_data = pd.read_sql_query(inorganic_query, connection, params=[sim_id])
@@ -935,18 +892,7 @@ namespace Models
         
         # Query tillage operations
         if not base_data.empty and pd.notna(base_data.iloc[0]['SoilTillPolicyCode']):
-            tillage_query = """
-            SELECT 
-                SoilTillPolicy.SoilTillPolicyCode, 
-                SoilTillageOperations.STNumber, 
-                SoilTillPolicy.NumTillOperations, 
-                SoilTillageOperations.DepthResUp, 
-                SoilTillageOperations.DepthResLow, 
-                SoilTillageOperations.DSTill
-            FROM SoilTillPolicy 
-            INNER JOIN SoilTillageOperations ON SoilTillPolicy.SoilTillPolicyCode = SoilTillageOperations.SoilTillPolicyCode
-            WHERE SoilTillPolicy.SoilTillPolicyCode = ?
-            """
+            tillage_query = statement("apsim.management.tillage")
             
             try:
                 tillage_data = pd.read_sql_query(tillage_query, connection, 
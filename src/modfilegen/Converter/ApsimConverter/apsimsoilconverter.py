@@ -13,6 +13,7 @@ The soil structure in APSIM includes:
 """
 
 from modfilegen.converter import Converter
+from modfilegen.queries import statement
 import os
 import pandas as pd
 import json
@@ -45,10 +46,8 @@ class ApsimSoilConverter(Converter):
         Site = ST[-2] if len(ST) >= 2 else ST[-1]
         
         # Fetch soil data from database
-        fetchSoilQuery = f"SELECT * FROM RaSoilProfile WHERE idPoint='{Site}' ORDER BY layer_number;"
-        
         try:
-            soil_data = pd.read_sql_query(fetchSoilQuery, master_input_connection)
+            soil_data = pd.read_sql_query(statement("apsim.soil.profile"), master_input_connection, params=(Site,))
         except Exception as e:
             print(f"Error fetching soil data: {e}")
             traceback.print_exc()
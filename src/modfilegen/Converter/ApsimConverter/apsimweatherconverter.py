@@ -26,7 +26,10 @@ Metadata:
 - amp: Annual amplitude in mean monthly temperature (°C)
 """
 
+from modfilegen import filestore
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import statement
 import os
 import pandas as pd
 import traceback
@@ -41,7 +44,7 @@ class ApsimWeatherConverter(Converter):
         super().__init__()
         self.file_extension = ".met"
     
-    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir):
+    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir, climate=None):
         """
         Generate weather data content in APSIM .met format (without writing to file).
         
@@ -55,6 +58,7 @@ class ApsimWeatherConverter(Converter):
             ModelDictionary_Connection: Connection to model dictionary database
             master_input_connection: Connection to master input database
             usmdir (str): Output directory (not used, kept for compatibility)
+            climate (ClimateStore): Optional climate store to slice instead of querying RaClimateD
             
         Returns:
             str: The generated weather file content (or empty string if error)
@@ -68,26 +72,20 @@ class ApsimWeatherConverter(Converter):
         Year = ST[-1]
         
         # Get default values from model dictionary
-        T = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, " \
-            "IFNULL([defaultValueOtherSource], [Default_Value_Datamill]) As dv " \
-            "From Variables Where ((model = 'apsim') And ([Table]= 'weather'));"
-        
         try:
-            DT = pd.read_sql_query(T, ModelDictionary_Connection)
+            DT = model_defaults(ModelDictionary_Connection).table('apsim', 'weather')
         except Exception as e:
             print(f"Warning: Could not load default values from model dictionary: {e}")
             # Create default values if table doesn't exist
-            DT = pd.DataFrame({
-                'Champ': ['pan', 'vp', 'code'],
-                'dv': [2.0, 20.0, '222222']
-            })
+            DT = {'pan': 2.0, 'vp': 20.0, 'code': '222222'}
         
         # Fetch weather data from master input database
-        fetchAllQuery = f"SELECT * FROM RaClimateD WHERE idPoint='{Site}' " \
-                       f"AND (Year={Year} OR Year={int(Year) + 1}) ORDER BY w_date;"
-        
         try:
-            DA = pd.read_sql_query(fetchAllQuery, master_input_connection)
+            if climate is not None:
+                DA = climate.frame(Site, int(Year), int(Year) + 1)
+            else:
+                DA = pd.read_sql_query(statement("apsim.weather.days"), master_input_connection,
+                                       params=(Site, int(Year), int(Year) + 1))
         except Exception as e:
             print(f"Error fetching weather data: {e}")
             traceback.print_exc()
@@ -173,7 +171,8 @@ class ApsimWeatherConverter(Converter):
             if output_dir:
                 os.makedirs(output_dir, exist_ok=True)
             
-            # Write content to file
+            # Write content to file (a weather.met linked from the file store is replaced, not truncated)
+            filestore.unshare(output_file)
             with open(output_file, 'w') as f:
                 f.write(content)
             
@@ -185,25 +184,19 @@ class ApsimWeatherConverter(Converter):
             traceback.print_exc()
             return None
     
-    def _get_default_value(self, df, field_name, default):
+    def _get_default_value(self, defaults, field_name, default):
         """
-        Get default value from dataframe or return fallback default.
+        Get default value from the model dictionary defaults or return fallback default.
         
         Args:
-            df (DataFrame): DataFrame containing default values
+            defaults (Mapping): Champ -> default value mapping of the weather table
             field_name (str): Name of the field
             default: Fallback default value
             
         Returns:
             The default value for the field
         """
-        try:
-            row = df[df["Champ"] == field_name]
-            if not row.empty:
-                return row["dv"].values[0]
-        except:
-            pass
-        return default
+        return defaults.get(field_name, default)
     
     def _build_header(self, site, year, optional_cols, latitude=None, longitude=None, tav=None, amp=None):
         """
@@ -18,8 +18,10 @@ import shutil
 from pathlib import Path
 from time import time
 import subprocess
-from modfilegen import GlobalVariables
+from modfilegen import GlobalVariables, climatestore, scratch
+from modfilegen.bulkload import BulkLoader
 from modfilegen.converter import Converter
+from modfilegen.simulations import SimulationSource
 import uuid
 import sys
 import traceback
@@ -34,6 +36,7 @@ def create_idJourClim(df):
 def process_chunk(*args):
     
     chunk, masterInput, DB_MD, DB_Celsius, directoryPath, dt, ori_mi = args
+    chunk = list(chunk)  # rows of a SimulationSource partition
     
     try:
 
@@ -41,7 +44,15 @@ def process_chunk(*args):
         idsims = f"({quoted})"
         print(f"Number of idsims", len(idsims), flush=True)
         print(f"creating new directory for process", flush=True)
-        tmp_base = directoryPath #"/dev/shm" if os.path.isdir("/dev/shm") else directoryPath
+        # in RAM with a tmpfs scratch, when the copies of both databases fit in its budget
+        tmp_base = directoryPath
+        space = scratch.open_scratch(directoryPath) if dt == 1 else None
+        if space is not None:
+            estimate = os.path.getsize(DB_Celsius) + os.path.getsize(ori_mi)
+            if space.charge(scratch.worker_key(), estimate):
+                tmp_base = space.root
+            else:
+                space = None
         new_dir = os.path.join(tmp_base, f"proc_{str(uuid.uuid4())}")
         while os.path.exists(new_dir):
             new_dir = os.path.join(tmp_base, f"proc_{str(uuid.uuid4())}")
@@ -76,8 +87,14 @@ def process_chunk(*args):
                     FROM RAclimateD 
                     WHERE idPoint IN ({placeholders})
                 """
+            climate = climatestore.open_store(climatestore.store_directory(directoryPath))
+            if climate is not None:
+                columns = ["idPoint", "year", "DOY", "Nmonth", "NdayM", "srad", "tmax", "tmin", "tmoy", "rain", "Etppm"]
+                batches = climate.batches(idPoints, columns=columns)
+            else:
+                batches = pd.read_sql(query, conn, params=idPoints, chunksize=100_000)
             first = True
-            for dfc in pd.read_sql(query, conn, params=idPoints, chunksize=100_000):  
+            for dfc in batches:  
                 #df_clim_MI = pd.read_sql(query, conn)
                 dfc = dfc.rename(columns={"idPoint":"IdDClim", "year":"annee", "DOY":"jda", "Nmonth":"mois", "NdayM":"jour", "srad":"rg", "rain":"plu", "Etppm":"Etp"})
                 dfc['idjourclim'] = create_idJourClim(dfc)
@@ -132,11 +149,12 @@ def process_chunk(*args):
             new_conn_cel = sqlite3.connect(new_db_cel)
             df = pd.read_sql_query("SELECT * FROM OutputSynt", new_conn_cel)
             new_conn_cel.close()
+            if dt == 1: shutil.rmtree(new_dir)
+            if space is not None:
+                space.charge(scratch.worker_key(), 0, force=True)
             # if df is empty return empty dataframe
             if df.empty:
-                if dt == 1: shutil.rmtree(new_dir)
                 return pd.DataFrame()
-            if dt == 1: shutil.rmtree(new_dir)
             return df
         except subprocess.CalledProcessError as e:
             print("❌ Error during Celsius run:", flush=True)
@@ -156,18 +174,7 @@ def process_chunk(*args):
         raise RuntimeError(f"process_chunk failed:\n{traceback.format_exc()}") from e
 
 def fetch_data_from_sqlite(masterInput):
-    conn = sqlite3.connect(masterInput)
-    df = pd.read_sql_query(f"SELECT * FROM SimUnitList", conn)
-    rows = df.to_dict(orient='records')
-    conn.close()
-    return rows
-    
-    
-def chunk_data(data, split, chunk_size):    # values, num_sublists
-    n = split * chunk_size
-    k, m = divmod(len(data), n)
-    sublists = [data[i * k + min(i, m):(i + 1) * k + min(i + 1, m)] for i in range(n)]
-    return [s for s in sublists if s]  # drop empty chunks
+    return list(SimulationSource.from_globals(masterInput))
 
 def main():
     mi= GlobalVariables["dbMasterInput"]
@@ -179,20 +186,21 @@ def main():
     ori_mi = GlobalVariables["ori_MI"]
     split = GlobalVariables["parts"]
     
-    data = fetch_data_from_sqlite(mi)
-    print(f"📊 Total simulations to process: {len(data)}", flush=True)
-    
-    # Split data into chunks
-    chunks = chunk_data(data, split, chunk_size=nthreads)
-    del data  # Free original data list after chunking
+    source = SimulationSource.from_globals(mi)
+    n_simulations = source.count()
+    print(f"📊 Total simulations to process: {n_simulations}", flush=True)
+    climatestore.prepare(mi, directoryPath)
+    space = scratch.prepare(directoryPath, GlobalVariables.get("scratch", "disk"), GlobalVariables.get("scratchBudget", 0))
     
-    args_list = [(chunk, mi, md, celsius, directoryPath, dt, ori_mi) for chunk in chunks]
-    del chunks  # Free chunks list after creating args_list
+    # Tasks carry rowid ranges; workers read their rows from SimUnitList
+    n_chunks = min(n_simulations, split * nthreads)
+    args_list = ((chunk, mi, md, celsius, directoryPath, dt, ori_mi)
+                 for chunk in source.partitions(split * nthreads, n_simulations))
     
     # Use joblib Parallel with loky backend, write results directly to database
     try:
         start = time()
-        print(f"Processing {len(args_list)} chunks...", flush=True)
+        print(f"Processing {n_chunks} chunks...", flush=True)
         
         # Clear OutputSynt table once at the beginning
         with sqlite3.connect(celsius) as conn:
@@ -205,7 +213,7 @@ def main():
             conn.commit()
         
         total_rows = 0
-        total_chunks = len(args_list)
+        total_chunks = n_chunks
 
         # Stream results as they complete — workers stay busy the whole time
         results = Parallel(n_jobs=nthreads, backend="loky", return_as="generator_unordered")(
@@ -214,9 +222,8 @@ def main():
 
         for chunk_idx, chunk_df in enumerate(results):
             if chunk_df is not None and not chunk_df.empty:
-                with sqlite3.connect(celsius) as conn:
-                    chunk_df.to_sql("OutputSynt", conn, if_exists='append', index=False)
-                    conn.commit()
+                with BulkLoader(celsius, "OutputSynt", rows=len(chunk_df)) as loader:
+                    loader.append(chunk_df)
                 
                 if dt == 0:
                     # Map OutputSynt columns to SummaryOutput columns
@@ -253,9 +260,8 @@ def main():
                     
                     summary_df = summary_df[summary_cols]
                     
-                    with sqlite3.connect(mi) as conn:
-                        summary_df.to_sql("SummaryOutput", conn, if_exists='append', index=False)
-                        conn.commit()
+                    with BulkLoader(mi, "SummaryOutput", rows=len(summary_df)) as loader:
+                        loader.append(summary_df)
                 
                 total_rows += len(chunk_df)
                 print(f"✅ Chunk {chunk_idx + 1}/{total_chunks}: {len(chunk_df)} rows written to database", flush=True)
@@ -273,6 +279,9 @@ def main():
         print(f"Exception message: {str(ex)}", flush=True)
         traceback.print_exc()
         sys.exit(1) 
+    finally:
+        if space is not None:
+            space.finish()
 
 if __name__ == "__main__":
     main()
@@ -12,8 +12,12 @@ CONFIGURATION (in GlobalVariables):
 - parts: Number of chunks per thread (total chunks = nthreads * parts)
 """
 
-from modfilegen import GlobalVariables
+from modfilegen import GlobalVariables, climatestore, filestore, queries, resultsink, scratch, workspaces
+from modfilegen.bulkload import BulkLoader
 from modfilegen.converter import Converter
+from modfilegen.indexadvisor import advise_indexes
+from modfilegen.masterinput import normalize_keys
+from modfilegen.simulations import SimulationSource
 from . import dssatweatherconverter, dssatcultivarconverter, dssatsoilconverter, dssatxconverter
 import sys, subprocess, shutil
 import concurrent.futures
@@ -41,6 +45,8 @@ DSSAT_DAILY_FILES = {
     "SoilWat": "SoilWat.OUT",
     "Weather": "Weather.OUT",
 }
+# Inputs every simulation writes again: a reused workspace slot keeps them between simulations
+USM_INPUT_FILES = ("XX.SOL", "DSSBatch.v47", "DSSBatch.v48")
 
 
 class _Stop99Error(RuntimeError):
@@ -174,26 +180,12 @@ def append_dataframe_csv(dataframe, csv_path):
     )
 
 
-def align_sqlite_table(connection, table_name, dataframe):
-    """Add newly encountered DSSAT columns and align a frame to the table."""
-    table_info = connection.execute(f'PRAGMA table_info("{table_name}")').fetchall()
-    existing_columns = [row[1] for row in table_info]
-
-    for column in dataframe.columns:
-        if column in existing_columns:
-            continue
-        sql_type = "REAL" if pd.api.types.is_numeric_dtype(dataframe[column]) else "TEXT"
-        escaped_column = column.replace('"', '""')
-        connection.execute(
-            f'ALTER TABLE "{table_name}" ADD COLUMN "{escaped_column}" {sql_type}'
-        )
-        existing_columns.append(column)
-
-    return dataframe.reindex(columns=existing_columns)
-    
-
-def write_file(directory, filename, content):
+def write_file(directory, filename, content, store=None):
     try:
+        if store is not None:
+            store.place(directory, filename, content)
+            return
+        filestore.unshare(os.path.join(directory, filename))
         with open(os.path.join(directory, filename), "w") as f:
             f.write(content)
     except Exception as e:
@@ -205,12 +197,12 @@ def process_chunk(*args):
     proc = psutil.Process(os.getpid())
     mem_before = proc.memory_info().rss / 1024**2  # MB
     chunk, mi, md, directoryPath,pltfolder, dt, thirdyear, tempDir, idx, dailyoutput, dssat_version = args
-    tmp_csv = os.path.join(directoryPath, f"chunk_{idx}.csv")
+    chunk = list(chunk)  # rows of a SimulationSource partition
     tmp_daily_csv = os.path.join(directoryPath, f"chunk_{idx}_dssat_daily.csv")
-    for stale_file in (tmp_csv, tmp_daily_csv):
-        if os.path.exists(stale_file):
-            os.remove(stale_file)
-    #dataframes = []
+    if os.path.exists(tmp_daily_csv):
+        os.remove(tmp_daily_csv)
+    # summary rows of the chunk, returned to main and streamed into the result sinks
+    dataframes = []
     # Apply series of functions to each row in the chunk
     weathertable = {}
     soiltable = {}
@@ -218,11 +210,15 @@ def process_chunk(*args):
     # Clear caches periodically to prevent memory buildup
     CACHE_CLEAR_INTERVAL = 50000
 
-    ModelDictionary_Connection = sqlite3.connect(md)
-    MasterInput_Connection = sqlite3.connect(mi)
+    ModelDictionary_Connection = queries.copy_to_memory(md)
+    MasterInput_Connection = queries.connect_readonly(mi)
+    climate = climatestore.open_store(climatestore.store_directory(tempDir))
+    # cached .WTH and XX.SOL contents are written once and hard-linked into the USM directories: reusable
+    # slots of this worker, in RAM with a tmpfs scratch; dt=0 keeps one directory per simulation
+    usms = workspaces.worker_workspaces(tempDir, keep=int(dt) != 1, refreshed=USM_INPUT_FILES,
+                                        scratch=scratch.open_scratch(tempDir))
         
     for i, row in enumerate(chunk):
-        write_header = not os.path.exists(tmp_csv)
         # Periodically clear caches to free memory
         if i > 0 and i % CACHE_CLEAR_INTERVAL == 0:
             print(f" Clearing caches at row {i} to free memory", flush=True)
@@ -235,7 +231,8 @@ def process_chunk(*args):
         # Création du chemin du fichier
         try:
             simPath = os.path.join(tempDir, str(row["idsim"]), str(row["idPoint"]), str(row["StartYear"]),str(row["idMangt"]))
-            usmdir = os.path.join(tempDir, str(row["idsim"])) 
+            usmdir = usms.acquire(str(row["idsim"]))
+            files = usms.store()  # on the file system of usmdir
              
             # cultivar 
             cultivarconverter = dssatcultivarconverter.DssatCultivarConverter()
@@ -246,7 +243,7 @@ def process_chunk(*args):
             climid =  ".".join([str(row["idPoint"]), str(row["StartYear"])])
             if climid not in weathertable:
                 weatherconverter = dssatweatherconverter.DssatweatherConverter()
-                r = weatherconverter.export(simPath,  ModelDictionary_Connection,MasterInput_Connection, usmdir, thirdyear)
+                r = weatherconverter.export(simPath,  ModelDictionary_Connection,MasterInput_Connection, usmdir, thirdyear, climate=climate)
                 weathertable[climid] = r
                 del weatherconverter  # Free converter
             else:
@@ -257,10 +254,10 @@ def process_chunk(*args):
                 r = weathertable[climid]
                 keys = list(r.keys())
                 values = list(r.values())
-                write_file(usmdir, Mngt.upper() + Year[2:4] + "01" + ".WTH", values[0])
-                write_file(usmdir, Mngt.upper() + str(int(Year)+1)[2:4] + "01" + ".WTH", values[1])
+                write_file(usmdir, Mngt.upper() + Year[2:4] + "01" + ".WTH", values[0], files)
+                write_file(usmdir, Mngt.upper() + str(int(Year)+1)[2:4] + "01" + ".WTH", values[1], files)
                 if thirdyear == 1:
-                    write_file(usmdir, Mngt.upper() + str(int(Year)+2)[2:4] + "01" + ".WTH", values[2])
+                    write_file(usmdir, Mngt.upper() + str(int(Year)+2)[2:4] + "01" + ".WTH", values[2], files)
                 #write_file(usmdir, keys[1], values[1])
             
             # soil
@@ -272,7 +269,7 @@ def process_chunk(*args):
                 soiltable[soilid] = r
                 del soilconverter  # Free converter
             else:
-                write_file(usmdir, "XX.SOL", soiltable[soilid])
+                write_file(usmdir, "XX.SOL", soiltable[soilid], files)
             
             # xfile
             simPath = os.path.join(tempDir, str(row["idsim"]),str(row["idMangt"])) 
@@ -291,7 +288,8 @@ def process_chunk(*args):
             # run dssat
             bs = os.path.join(Path(__file__).parent, "dssatrun.sh")
             try:
-                result = subprocess.run(["bash", bs, usmdir, tempDir, str(dt), str(dailyoutput), dssat_version],
+                result = subprocess.run(["bash", bs, usmdir, tempDir, "0", str(dailyoutput), dssat_version,
+                                         str(row["idsim"])],  # usms cleans usmdir
                                         stdout=subprocess.DEVNULL,
                                         stderr=subprocess.PIPE,   # capture to detect STOP99
                                         check=False,              # manual check below
@@ -327,7 +325,7 @@ def process_chunk(*args):
                 print(f"Summary file {summary} not found.")
                 continue
             df = transform(summary, dt)
-            df.to_csv(tmp_csv, mode='a', header=write_header, index=False)
+            dataframes.append(df)
             if dailyoutput == 1:
                 expected_output_files = {
                     source: os.path.join(tempDir, f"{source}_{row['idsim']}.out")
@@ -354,9 +352,8 @@ def process_chunk(*args):
                     del daily_df
                     for output_file in output_files.values():
                         os.remove(output_file)
-            #dataframes.append(df)
             os.remove(summary)
-            del df  # Free df after appending
+            del df
             gc.collect()  # Force garbage collection after each iteration
         except _Stop99Error:
             raise  # Stop chunk processing — let it propagate up
@@ -365,7 +362,7 @@ def process_chunk(*args):
                   file=sys.stderr, flush=True)
             traceback.print_exc()
             continue
-    if not os.path.exists(tmp_csv):
+    if not dataframes:
         print("No dataframes to concatenate.")
         ModelDictionary_Connection.close()
         MasterInput_Connection.close()
@@ -400,7 +397,9 @@ def process_chunk(*args):
     del dataframes  # Free the list'''
     mem_after = proc.memory_info().rss / 1024**2
     print(f"Worker {os.getpid()} - mémoire: {mem_before:.0f}MB → {mem_after:.0f}MB (delta: {mem_after-mem_before:.0f}MB)", flush=True)
-    return tmp_csv, (tmp_daily_csv if os.path.exists(tmp_daily_csv) else None)
+    result = pd.concat(dataframes, ignore_index=True)
+    del dataframes
+    return result, (tmp_daily_csv if os.path.exists(tmp_daily_csv) else None)
             
 def export(MasterInput, ModelDictionary):
     MasterInput_Connection = sqlite3.connect(MasterInput)
@@ -429,8 +428,6 @@ def export(MasterInput, ModelDictionary):
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_idCoord ON Coordinates (idPoint);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_idMangt ON CropManagement (idMangt);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_idsoil ON Soil (IdSoil);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_idsoill ON Soil (Lower(IdSoil));")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_idsoiltl ON SoilTypes (Lower(SoilTextureType));")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_idoption ON SimulationOptions (idOptions);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_cultivars ON ListCultivars (idCultivar);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_cultopt ON ListCultivars (CodePSpecies);")
@@ -441,7 +438,9 @@ def export(MasterInput, ModelDictionary):
         cursor2.execute("CREATE INDEX IF NOT EXISTS idx_model_table ON Variables (model, [Table]);")
         MasterInput_Connection.commit()
         ModelDictionary_Connection.commit()
+        normalize_keys(MasterInput_Connection)
         print("Indexes created successfully!")
+        advise_indexes(MasterInput_Connection, models=["dssat"])
 
     except sqlite3.Error as e:
         print(f"Error creating indexes: {e}")
@@ -450,17 +449,8 @@ def export(MasterInput, ModelDictionary):
     
     # convert this code from vb to python:
 def fetch_data_from_sqlite(masterInput):
-    conn = sqlite3.connect(masterInput)
-    df = pd.read_sql_query(f"SELECT * FROM SimUnitList", conn)
-    rows = df.to_dict(orient='records')
-    conn.close()
-    return rows
+    return list(SimulationSource.from_globals(masterInput))
 
-    
-def chunk_data(data, parts, chunk_size):    
-    k, m = divmod(len(data), parts * chunk_size)
-    sublists = [data[i * k + min(i, m):(i + 1) * k + min(i + 1, m)] for i in range(chunk_size * parts)]
-    return sublists
 
 def process_chunk_safe(idx, args):
     try:
@@ -469,6 +459,24 @@ def process_chunk_safe(idx, args):
     except Exception:
         return idx, None, traceback.format_exc()
 
+def summary_output_rows(df_result):
+    """SummaryOutput rows of a chunk of DSSAT results: days of year, t/ha, no negative values."""
+    summary_cols = ["Model", "Idsim", "Texte", "Planting", "Emergence", "Ant", "Mat",
+                    "Biom_ma", "Yield", "GNumber", "MaxLai", "Nleac", "SoilN",
+                    "CroN_ma", "CumE", "Transp"]
+    df_result = df_result.reindex(columns=summary_cols)
+    df_result["ys"] = (df_result["Planting"].astype(str).str[:4]).astype(int)
+    df_result = df_result.replace(-99, np.nan)
+    for col in ["Planting", "Emergence", "Ant", "Mat"]:
+        df_result[col] = extract_corrected_doy(df_result[col], df_result["ys"])
+    for col in ["Yield", "Biom_ma"]:
+        df_result[col] = df_result[col] / 1000
+    cols_to_clean = ["Planting", "Emergence", "Ant", "Mat", "Biom_ma", "Yield", "GNumber",
+                     "MaxLai", "Nleac", "SoilN", "CroN_ma", "CumE", "Transp"]
+    df_result[cols_to_clean] = df_result[cols_to_clean].mask(df_result[cols_to_clean] < 0, np.nan)
+    return df_result[summary_cols]
+
+
 def main():
     mi= GlobalVariables["dbMasterInput"]
     md = GlobalVariables["dbModelsDictionary"]
@@ -490,6 +498,8 @@ def main():
     import uuid
     os.makedirs(directoryPath, exist_ok=True)
     os.makedirs(tempDir, exist_ok=True)
+    climatestore.prepare(mi, tempDir)
+    space = scratch.prepare(tempDir, GlobalVariables.get("scratch", "disk"), GlobalVariables.get("scratchBudget", 0))
     # create a random name
     result_name = str(uuid.uuid4()) + "_dssat"
     result_path = os.path.join(directoryPath, f"{result_name}.csv")
@@ -497,25 +507,28 @@ def main():
         result_name = str(uuid.uuid4()) + "_dssat"
         result_path = os.path.join(directoryPath, f"{result_name}.csv")
 
-    data = fetch_data_from_sqlite(mi)
-    n_simulations = len(data)
+    source = SimulationSource.from_globals(mi)
+    n_simulations = source.count()
     print(f"📊 Total simulations to process: {n_simulations}", flush=True)
     
-    # Split data into chunks
-    chunks = chunk_data(data, parts, chunk_size=nthreads)
-    del data  # Free original data list after chunking
-    
-    args_list = [(chunk, mi, md, directoryPath, pltfolder, dt, thirdyear, tempDir, idx, dailyoutput,dssat_version) for idx, chunk in enumerate(chunks)]
-    del chunks  # Free chunks list after creating args_list
-    
+    # Tasks carry rowid ranges; workers read their rows from SimUnitList
+    n_chunks = min(n_simulations, parts * nthreads)
+    args_list = ((chunk, mi, md, directoryPath, pltfolder, dt, thirdyear, tempDir, idx, dailyoutput,dssat_version)
+                 for idx, chunk in enumerate(source.partitions(parts * nthreads, n_simulations)))
+
+    sinks = None
     try:
         start = time()
         print("dssat version: ", dssat_version)
-        print(f"Processing {len(args_list)} chunks...", flush=True)
+        print(f"Processing {n_chunks} chunks...", flush=True)
         
-        write_header = True
+        # chunk results go to the CSV (and SummaryOutput with dt 0) as they arrive
+        sinks = resultsink.ResultSinks(
+            result_path, resultsink.configured_sinks(GlobalVariables.get("resultSinks", "csv"), dt),
+            database=mi, model="Dssat", summarize=summary_output_rows, staging=tempDir,
+        )
         total_chunks_written = 0
-        daily_table_initialized = False
+        daily_paths = []  # loaded in one transaction once every chunk is done
         print(f"Using chunked processing for {n_simulations} simulations", flush=True)
         results = Parallel(
                 n_jobs=nthreads,
@@ -527,111 +540,60 @@ def main():
                 for i, args in enumerate(args_list)
             )
 
-        for idx, chunk_paths, error in results:
+        for idx, chunk_result, error in results:
             if error is not None:
-                print(f"❌ Chunk {idx + 1}/{len(args_list)} failed:\n{error}", flush=True)
-                continue
-
-            if chunk_paths is None:
-                print(f"❌ Chunk {idx + 1}/{len(args_list)} failed:\n{error}", flush=True)
+                print(f"❌ Chunk {idx + 1}/{n_chunks} failed:\n{error}", flush=True)
                 continue
 
-            tmp_path, tmp_daily_path = chunk_paths
-            if not os.path.exists(tmp_path):
+            if chunk_result is None:
                 print(f"❌ Summary output is missing for chunk {idx + 1}", flush=True)
                 continue
-                
-            if os.path.exists(tmp_path):
-                df = pd.read_csv(tmp_path)
-                df.to_csv(result_path, mode="a", header=write_header, index=False)
-                write_header = False
-                total_chunks_written += 1
-
-                print(
-                        f"✅ Chunk {idx + 1}/{len(args_list)}: "
-                        f"{len(df)} rows written",
-                        flush=True
-                )
 
-                del df
-                gc.collect()
+            df, tmp_daily_path = chunk_result
+            sinks.write(df)
+            total_chunks_written += 1
+            print(
+                    f"✅ Chunk {idx + 1}/{n_chunks}: "
+                    f"{len(df)} rows written",
+                    flush=True
+            )
+            del df
+            gc.collect()
 
             if dailyoutput == 1 and tmp_daily_path and os.path.exists(tmp_daily_path):
-                with sqlite3.connect(mi) as daily_conn:
-                    for daily_chunk in pd.read_csv(tmp_daily_path, chunksize=50000):
-                        if daily_table_initialized:
-                            daily_chunk = align_sqlite_table(
-                                daily_conn,
-                                DSSAT_DAILY_OUTPUT_TABLE,
-                                daily_chunk,
-                            )
-                            daily_chunk.to_sql(
-                                DSSAT_DAILY_OUTPUT_TABLE,
-                                daily_conn,
-                                if_exists="append",
-                                index=False,
-                            )
-                        else:
-                            daily_chunk.to_sql(
-                                DSSAT_DAILY_OUTPUT_TABLE,
-                                daily_conn,
-                                if_exists="replace",
-                                index=False,
-                            )
-                            daily_table_initialized = True
-                os.remove(tmp_daily_path)
-            
-            if total_chunks_written == 0:
-                print("No data to process.")
-                return
+                daily_paths.append(tmp_daily_path)
 
+        sinks.close()
+        if total_chunks_written == 0:
+            print("No data to process.")
+            return
         print(f"✅ Results saved to {result_path}", flush=True)
         if dailyoutput == 1:
-            if daily_table_initialized:
-                with sqlite3.connect(mi) as daily_conn:
-                    daily_conn.execute(
-                        f'CREATE INDEX IF NOT EXISTS "idx_{DSSAT_DAILY_OUTPUT_TABLE}_idsim_date" '
-                        f'ON "{DSSAT_DAILY_OUTPUT_TABLE}" ("Idsim", "YEAR", "DOY")'
-                    )
-                print(
-                    f"✅ Daily results inserted into {DSSAT_DAILY_OUTPUT_TABLE}.",
-                    flush=True,
-                )
+            if daily_paths:
+                # the workers are done reading MasterInput: one write transaction for every chunk
+                with BulkLoader(mi, DSSAT_DAILY_OUTPUT_TABLE, replace=True,
+                                indexes=[(f"idx_{DSSAT_DAILY_OUTPUT_TABLE}_idsim_date", ("Idsim", "YEAR", "DOY"))]
+                                ) as loader:
+                    for daily_path in daily_paths:
+                        for daily_chunk in pd.read_csv(daily_path, chunksize=50000):
+                            loader.append(daily_chunk)
+                for daily_path in daily_paths:
+                    os.remove(daily_path)
             else:
                 print("Warning: no DSSAT daily results were imported.", flush=True)
         print(f"DSSAT total time: {time()-start:.2f}s", flush=True)
 
-        if dt == 0:
-            summary_cols = ["Model", "Idsim", "Texte", "Planting", "Emergence", "Ant", "Mat",
-                            "Biom_ma", "Yield", "GNumber", "MaxLai", "Nleac", "SoilN",
-                            "CroN_ma", "CumE", "Transp"]
-            df_result = pd.read_csv(result_path, usecols=lambda c: c in summary_cols + ["ys"] or c == "Idsim")
-            for col in summary_cols:
-                if col not in df_result.columns:
-                    df_result[col] = None
-            df_result["ys"] = (df_result["Planting"].astype(str).str[:4]).astype(int)
-            df_result = df_result.replace(-99, np.nan)
-            for col in ["Planting", "Emergence", "Ant", "Mat"]:
-                df_result[col] = extract_corrected_doy(df_result[col], df_result["ys"])
-            for col in ["Yield", "Biom_ma"]:
-                df_result[col] = df_result[col] / 1000
-            cols_to_clean = ["Planting", "Emergence", "Ant", "Mat", "Biom_ma", "Yield", "GNumber",
-                             "MaxLai", "Nleac", "SoilN", "CroN_ma", "CumE", "Transp"]
-            df_result[cols_to_clean] = df_result[cols_to_clean].mask(df_result[cols_to_clean] < 0, np.nan)
-            df_result = df_result[summary_cols]
-            _conn = sqlite3.connect(mi)
-            _conn.execute("DELETE FROM SummaryOutput WHERE Model = 'Dssat'")
-            _conn.commit()
-            df_result.to_sql("SummaryOutput", _conn, if_exists="append", index=False)
-            _conn.commit()
-            _conn.close()
-            print(f"✅ {len(df_result)} rows inserted into SummaryOutput.", flush=True)
-            del df_result
-
     except Exception as ex:      
         print("Export not completed successfully!")
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if sinks is not None:
+            sinks.discard()  # a failed run keeps the previous SummaryOutput rows
+        if int(dt) == 1:
+            workspaces.remove_workspaces(tempDir)
+        if space is not None:
+            space.finish()
 
 if __name__ == "__main__":
     main()
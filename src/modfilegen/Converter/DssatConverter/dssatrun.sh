@@ -8,6 +8,8 @@ input_dir="$2"
 dt=$(echo $3 | awk '{print int($1)}')
 dailyoutput=$(echo "${4:-0}" | awk '{print int($1)}')
 dssat_version="${5:-v47}"
+# name of the copied outputs; a reused workspace slot is not named after its simulation
+base="${6:-$(basename "$USM_DIR")}"
 
 case "$dssat_version" in
     v47)
@@ -29,7 +31,6 @@ cd "$USM_DIR"
 
 "$dssat_command" B "$batch_file"  #> /dev/null
 
-base=$(basename "$USM_DIR")
 if [ -f "Summary.OUT" ]; then
     cp -- Summary.OUT "$input_dir/Summary_$base.OUT"
 fi
@@ -1,4 +1,6 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import fetch_all, statement
 from sqlite3 import Connection
 import os
 import pandas as pd
@@ -13,73 +15,46 @@ class DssatSoilConverter(Converter):
         ST = directory_path.split(os.sep) 
         idSoil = ST[-4]       
         Mngt = ST[-1][:4]
-        T = "Select  Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] like 'dssat_soil_%'));"
-        DT = pd.read_sql_query(T,ModelDictionary_Connection) 
+        DT = model_defaults(ModelDictionary_Connection).tables_like("dssat", "dssat_soil_")
 
-        fetchAllQuery = """SELECT DISTINCT Coordinates.*, RunoffTypes.CurveNumber, Soil.albedo
-        From Coordinates INNER Join ((RunoffTypes INNER Join Soil On RunoffTypes.RunoffType = Soil.RunoffType)
-        INNER Join SimUnitList On Soil.IdSoil = SimUnitList.idsoil) ON Coordinates.idPoint = SimUnitList.idPoint 
-        where SimUnitList.IdSim='%s';"""%(ST[-5])
-
-        DA = pd.read_sql_query(fetchAllQuery, master_input_connection)
-        rows = DA.to_dict(orient='records')
+        rows = fetch_all(master_input_connection, "dssat.soil.site", ST[-5])
         
         for row in rows:
-            rw = DT[DT["Champ"] == "filename"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["filename"]
             fileName = "XX.SOL"
             fileContent += f"*SOILS: DSSAT Soil Input File\n"
             fileContent += f"*XX{Mngt}0101\n"
             fileContent += f"@SITE        COUNTRY          LAT     LONG SCS FAMILY\n"
             fileContent += v_fmt["SITE"].format(f"XX{Mngt}0101")
-            rw = DT[DT["Champ"] == "country"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["country"]
             fileContent += v_fmt["COUNTRY"].format(Dv)
             fileContent += v_fmt["LAT"].format(row['latitudeDD'])
             fileContent += v_fmt["LONG"].format(row['longitudeDD'])
-            rw = DT[DT["Champ"] == "scs family"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["scs family"]
             fileContent += v_fmt["SCS FAMILY"].format(Dv)+ "\n"
             fileContent += "@ SCOM  SALB  SLU1  SLDR  SLRO  SLNF  SLPF  SMHB  SMPX  SMKE\n"
-            rw = DT[DT["Champ"] == "scom"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["scom"]
             fileContent += v_fmt["SCOM"].format(Dv)
             fileContent += v_fmt["SALB"].format(row["albedo"])
-            rw = DT[DT["Champ"] == "slu1"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["slu1"]
             fileContent += v_fmt["SLU1"].format(float(Dv))
-            rw = DT[DT["Champ"] == "sldr"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["sldr"]
             fileContent += v_fmt["SLDR"].format(float(Dv))
             fileContent += v_fmt["SLRO"].format(row["CurveNumber"])
-            rw = DT[DT["Champ"] == "slnf"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["slnf"]
             fileContent += v_fmt["SLNF"].format(float(Dv))
-            rw = DT[DT["Champ"] == "slpf"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["slpf"]
             fileContent += v_fmt["SLPF"].format(float(Dv))
-            rw = DT[DT["Champ"] == "smhb"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["smhb"]
             fileContent += v_fmt["SMHB"].format(Dv)
-            rw = DT[DT["Champ"] == "smpx"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["smpx"]
             fileContent += v_fmt["SMPX"].format(Dv)
-            rw = DT[DT["Champ"] == "smke"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["smke"]
             fileContent += v_fmt["SMKE"].format(Dv)+ "\n"
             fileContent += "@  SLB  SLMH  SLLL  SDUL  SSAT  SRGF  SSKS  SBDM  SLOC  SLCL  SLSI  SLCF  SLNI  SLHW  SLHB  SCEC  SADC" +"\n"
             
-            fetchAllQuery1 = """Select Soil.Wwp AS 'Soil.Wwp', Soil.Wfc AS 'Soil.Wfc', Soil.bd AS 'Soil.bd', Soil.OrganicC AS 'Soil.OrganicC', 
-                                        Soil.Cf AS 'Soil.Cf', Soil.pH AS 'Soil.pH', Soil.extp AS 'Soil.extp', Soil.totp AS 'Soil.totp', 
-                                        Soil.sand AS 'Soil.sand', Soil.clay AS 'Soil.clay', Soil.silt AS 'Soil.silt',
-                                        Soil.SoilOption AS 'SoilOption', Soil.OrganicNStock AS 'OrganicNStock', 
-                                        Soil.SoilTotalDepth AS 'SoilTotalDepth', 
-                                        SoilLayers.Wwp AS 'SoilLayers.Wwp', SoilLayers.Wfc AS 'SoilLayers.Wfc', 
-                                        SoilLayers.bd AS 'SoilLayers.bd', SoilLayers.OrganicC AS 'SoilLayers.OrganicC', 
-                                        SoilLayers.Clay AS 'SoilLayers.Clay', SoilLayers.Silt AS 'SoilLayers.Silt', 
-                                        SoilLayers.Cf AS 'SoilLayers.Cf', SoilLayers.pH AS 'SoilLayers.pH', 
-                                        SoilLayers.Ldown AS 'Ldown', SoilLayers.TotalN AS 'TotalN' FROM SOIL LEFT JOIN SoilLayers On Lower(Soil.IdSoil) = lower(SoilLayers.idsoil) where Lower(Soil.idSoil) = '%s' ;"""%(idSoil.lower())
-            DA1 = pd.read_sql_query(fetchAllQuery1, master_input_connection)
+            fetchAllQuery1 = statement("dssat.soil.profile")
+            DA1 = pd.read_sql_query(fetchAllQuery1, master_input_connection, params=(idSoil.lower(),))
             rows1 = DA1.to_dict(orient='records')
             if rows1[0]["SoilOption"] == "simple":
                 for i in range(0, 2):
@@ -87,20 +62,16 @@ class DssatSoilConverter(Converter):
                         fileContent += v_fmt["SLB"].format(30)
                     else:
                         fileContent += v_fmt["SLB"].format(rows1[0]["SoilTotalDepth"])
-                    rw = DT[DT["Champ"] == "slmh"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["slmh"]
                     fileContent += v_fmt["SLMH"].format(Dv)
                     fileContent += v_fmt["SLLL"].format(rows1[0]["Soil.Wwp"] / 100)
                     fileContent += v_fmt["SDUL"].format(rows1[0]["Soil.Wfc"] / 100)
-                    rw = DT[DT["Champ"] == "ssat"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["ssat"]
                     #fileContent += v_fmt["SSAT"].format(float(Dv))
                     fileContent += v_fmt["SSAT"].format(rows1[0]["Soil.Wfc"] * 1.01 / 100)
-                    rw = DT[DT["Champ"] == "srgf"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["srgf"]
                     fileContent += v_fmt["SRGF"].format(float(Dv))
-                    rw = DT[DT["Champ"] == "ssks"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["ssks"]
                     fileContent += v_fmt["SSKS"].format(float(Dv))
                     fileContent += v_fmt["SBDM"].format(rows1[0]["Soil.bd"])
                     if i == 0:
@@ -115,38 +86,31 @@ class DssatSoilConverter(Converter):
                     else:
                         fileContent += v_fmt["SLNI"].format(0)
                     fileContent += v_fmt["SLHW"].format(rows1[0]["Soil.pH"])
-                    rw = DT[DT["Champ"] == "slhb"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["slhb"]
                     if int(Dv) == -99:
                         fileContent += format(-99, "6.0f")
                     else: fileContent += v_fmt["SLHB"].format(float(Dv))
-                    rw = DT[DT["Champ"] == "scec"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["scec"]
                     if int(Dv) == -99:
                         fileContent += format(-99, "6.0f")
                     else: fileContent += v_fmt["SCEC"].format(float(Dv))
-                    rw = DT[DT["Champ"] == "sadc"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["sadc"]
                     if int(Dv) == -99:
                         fileContent += format(-99, "6.0f")+ "\n"
                     else: fileContent += v_fmt["SADC"].format(float(Dv))+ "\n"
             else:
                 for row1 in rows1:
                     fileContent += v_fmt["SLB"].format(row1["Ldown"])
-                    rw = DT[DT["Champ"] == "slmh"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["slmh"]
                     fileContent += v_fmt["SLMH"].format(Dv)
                     fileContent += v_fmt["SLLL"].format(row1["SoilLayers.Wwp"] / 100)
                     fileContent += v_fmt["SDUL"].format(row1["SoilLayers.Wfc"] / 100)
-                    rw = DT[DT["Champ"] == "ssat"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["ssat"]
                     #fileContent += v_fmt["SSAT"].format(float(Dv))
                     fileContent += v_fmt["SSAT"].format(row1["SoilLayers.Wfc"] * 1.01 / 100)
-                    rw = DT[DT["Champ"] == "srgf"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["srgf"]
                     fileContent += v_fmt["SRGF"].format(float(Dv))
-                    rw = DT[DT["Champ"] == "ssks"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["ssks"]
                     fileContent += v_fmt["SSKS"].format(float(Dv))
                     fileContent += v_fmt["SBDM"].format(row1["SoilLayers.bd"])
                     fileContent += v_fmt["SLOC"].format(row1["SoilLayers.OrganicC"])
@@ -155,18 +119,15 @@ class DssatSoilConverter(Converter):
                     fileContent += v_fmt["SLCF"].format(row1["SoilLayers.Cf"])
                     fileContent += v_fmt["SLNI"].format(row1["TotalN"])
                     fileContent += v_fmt["SLHW"].format(row1["SoilLayers.pH"])
-                    rw = DT[DT["Champ"] == "slhb"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["slhb"]
                     if int(Dv) == -99:
                         fileContent += format(-99, "6.0f")
                     else: fileContent += v_fmt["SLHB"].format(float(Dv))
-                    rw = DT[DT["Champ"] == "scec"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["scec"]
                     if int(Dv) == -99:
                         fileContent += format(-99, "6.0f")
                     else: fileContent += v_fmt["SCEC"].format(float(Dv))
-                    rw = DT[DT["Champ"] == "sadc"]
-                    Dv = rw["dv"].values[0]
+                    Dv = DT["sadc"]
                     if int(Dv) == -99:
                         fileContent += format(-99, "6.0f") + '\n'
                     else: fileContent += v_fmt["SADC"].format(float(Dv))+ "\n"
@@ -16,7 +16,6 @@ from time import time
 import os
 import re
 import shutil
-import sqlite3
 import subprocess
 import sys
 import traceback
@@ -25,7 +24,8 @@ import uuid
 import pandas as pd
 from joblib import Parallel, delayed, parallel_backend
 
-from modfilegen import GlobalVariables
+from modfilegen import GlobalVariables, queries
+from modfilegen.modeldefaults import model_defaults
 from . import dssatcultivarconverter, dssatweatherconverter, dssatsoilconverter, dssatxconverter
 from .dssatconverter import export as prepare_sqlite_indexes
 from .dssatconverter import fetch_data_from_sqlite, transform
@@ -292,35 +292,22 @@ def section_has_data(sections, section):
     return section in sections and bool(data_lines(sections[section]))
 
 
-def query_one(connection, sql):
-    dataframe = pd.read_sql_query(sql, connection)
+def query_one(connection, sql, params=()):
+    dataframe = pd.read_sql_query(sql, connection, params=params)
     if dataframe.empty:
         raise ValueError(f"Query returned no rows: {sql}")
     return dataframe.iloc[0]
 
 
 def default_value(model_dictionary_connection, table, champ):
-    query = (
-        "Select IFNULL([defaultValueOtherSource], [Default_Value_Datamill]) As dv "
-        f"From Variables Where model = 'dssat' And [Table] = '{table}' And Champ = '{champ}';"
-    )
-    row = query_one(model_dictionary_connection, query)
-    return row["dv"]
+    defaults = model_defaults(model_dictionary_connection)
+    if ("dssat", table, champ) not in defaults:
+        raise ValueError(f"No dssat default value for {table}.{champ}")
+    return defaults.value("dssat", table, champ)
 
 
 def management_flags(id_sim, master_input_connection):
-    query = f"""
-        Select SimUnitList.idsim, SoilTillPolicy.NumTillOperations,
-               OrganicFertilizationPolicy.NumOrganicFerti,
-               CropManagement.IrrigationPolicyCode, CropManagement.InoFertiPolicyCode
-        From OrganicFertilizationPolicy
-        Inner Join (SoilTillPolicy Inner Join (CropManagement Inner Join SimUnitList
-        On CropManagement.idMangt = SimUnitList.idMangt)
-        On SoilTillPolicy.SoilTillPolicyCode = CropManagement.SoilTillPolicyCode)
-        On OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode
-        Where IdSim = '{id_sim}'
-    """
-    return query_one(master_input_connection, query)
+    return query_one(master_input_connection, queries.statement("dssat.successive.flags"), (str(id_sim),))
 
 
 def treatment_line(rotation, model_dictionary_connection, master_input_connection, sections):
@@ -603,8 +590,8 @@ def create_context(mi, md, directory_path, pltfolder, dt, dssat_version="v47"):
         "pltfolder": pltfolder,
         "dt": dt,
         "dssat_version": dssat_version,
-        "master_input_connection": sqlite3.connect(mi),
-        "model_dictionary_connection": sqlite3.connect(md),
+        "master_input_connection": queries.connect_readonly(mi),
+        "model_dictionary_connection": queries.copy_to_memory(md),
     }
 
 
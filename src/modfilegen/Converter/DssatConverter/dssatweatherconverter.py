@@ -1,4 +1,6 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import fetch_all, statement
 from sqlite3 import Connection
 import os
 import pandas as pd
@@ -8,7 +10,7 @@ class DssatweatherConverter(Converter):
     def __init__(self):
         super().__init__()
 
-    def export(self, directory_path, ModelDictionary_Connection, master_input_connection,usmdir, thirdyear):
+    def export(self, directory_path, ModelDictionary_Connection, master_input_connection,usmdir, thirdyear, climate=None):
         res = {}
         try:
             #print("Exporting Dssat Weather")
@@ -19,20 +21,13 @@ class DssatweatherConverter(Converter):
             # get the four first elements of ST[-1] to get the IdMngt
             Mngt = ST[-1][:4]
             # Create the output path from ST without the two last elements
-            T = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table]= 'dssat_weather_site'));"
-            DT = pd.read_sql_query(T, ModelDictionary_Connection)
-            rw = DT[DT["Champ"] == "tav"]
-            tav = rw["dv"].values[0]
-            rw = DT[DT["Champ"] == "amp"]
-            amp = rw["dv"].values[0]
-            rw = DT[DT["Champ"] == "refht"]
-            refht = rw["dv"].values[0] 
-            rw = DT[DT["Champ"] == "wndht"]
-            wndht = rw["dv"].values[0] 
+            DT = model_defaults(ModelDictionary_Connection).table("dssat", "dssat_weather_site")
+            tav = DT["tav"]
+            amp = DT["amp"]
+            refht = DT["refht"]
+            wndht = DT["wndht"]
     
-            fetchAllQuery1 = "select * from Coordinates where idPoint='" + Site + "';"
-            DA1 = pd.read_sql_query(fetchAllQuery1, master_input_connection)
-            rows1 = DA1.to_dict(orient='records')
+            rows1 = fetch_all(master_input_connection, "dssat.weather.coordinates", Site)
     
             fileNameArray = [None]*4
             fileNameArray[0] = ""
@@ -89,8 +84,10 @@ class DssatweatherConverter(Converter):
                     fileContent += v_fmt_general["WNDHT"].format(float(wndht)) + "\n"
                                             
                     #Year = str(Year)
-                    fetchAllQuery = "select * from RaClimateD where idPoint='" + Site + "' and year='" + str(Year_i) + "' ORDER BY w_date ;"  
-                    DA = pd.read_sql_query(fetchAllQuery, master_input_connection)
+                    if climate is not None:
+                        DA = climate.frame(Site, Year_i, Year_i)
+                    else:
+                        DA = pd.read_sql_query(statement("dssat.weather.days"), master_input_connection, params=(Site, str(Year_i)))
                     rows = DA.to_dict(orient='records')
                     fileNameArray[2] = "01" 
                                         
@@ -1,4 +1,5 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
 from sqlite3 import Connection
 import os
 import pandas as pd
@@ -142,16 +143,11 @@ class DssatweatherConverter(Converter):
         res = {}
         try:
             site, start_year, management = parse_weather_directory(directory_path)
-            query = (
-                "Select Champ, Default_Value_Datamill, defaultValueOtherSource, "
-                "IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv "
-                "From Variables Where ((model = 'dssat') And ([Table]= 'dssat_weather_site'));"
-            )
-            dt = pd.read_sql_query(query, ModelDictionary_Connection)
-            tav = dt[dt["Champ"] == "tav"]["dv"].values[0]
-            amp = dt[dt["Champ"] == "amp"]["dv"].values[0]
-            refht = dt[dt["Champ"] == "refht"]["dv"].values[0]
-            wndht = dt[dt["Champ"] == "wndht"]["dv"].values[0]
+            dt = model_defaults(ModelDictionary_Connection).table("dssat", "dssat_weather_site")
+            tav = dt["tav"]
+            amp = dt["amp"]
+            refht = dt["refht"]
+            wndht = dt["wndht"]
 
             coordinates_query = "select * from Coordinates where idPoint='" + site + "';"
             coordinates = pd.read_sql_query(coordinates_query, master_input_connection).to_dict(orient='records')
@@ -1,4 +1,6 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import statement
 from sqlite3 import Connection
 import os
 import pandas as pd
@@ -164,58 +166,42 @@ def format_dssat_yyddd(start_year, day):
 def writeBlockTreatment(dssat_tableName, idSim, modelDictionary_Connection, master_input_connection):
     fileContent = ""
     
-    fetchAllQuery  = """Select SimUnitList.idsim, SoilTillPolicy.SoilTillPolicyCode, OrganicFertilizationPolicy.OFertiPolicyCode, CropManagement.IrrigationPolicyCode, CropManagement.InoFertiPolicyCode 
-        From OrganicFertilizationPolicy INNER Join (SoilTillPolicy INNER Join (CropManagement INNER Join SimUnitList 
-        On CropManagement.idMangt = SimUnitList.idMangt) ON SoilTillPolicy.SoilTillPolicyCode = CropManagement.SoilTillPolicyCode) 
-        ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode Where IdSim='%s'""" % (idSim)
+    fetchAllQuery = statement("dssat.x.treatment")
     
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     siteColumnsHeader = ["@N", "R", "O", "C", "TNAME....................", "CU", "FL", "SA", "IC", "MP", "MI", "MF", "MR", "MC", "MT", "ME", "MH", "SM"]
     fileContent += "\n"
     fileContent += "*TREATMENTS                        -------------FACTOR LEVELS------------\n"
     fileContent += " ".join(siteColumnsHeader) + "\n"
     storeNumMaxSimu = 0
-    rw = DT[DT["Champ"] == "TRTNO"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TRTNO"]
     fileContent += v_fmt_treat["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ROTNO"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ROTNO"]
     fileContent += v_fmt_treat["R"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ROTOPT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ROTOPT"]
     fileContent += v_fmt_treat["O"].format(float(Dv))
-    rw = DT[DT["Champ"] == "CRPNO"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CRPNO"]
     fileContent += v_fmt_treat["C"].format(float(Dv)) + " "
-    rw = DT[DT["Champ"] == "TITLET"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITLET"]
     fileContent += v_fmt_treat["TNAME"].format(Dv)
-    rw = DT[DT["Champ"] == "LNCU"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNCU"]
     fileContent += v_fmt_treat["CU"].format(float(Dv))
-    rw = DT[DT["Champ"] == "LNFLD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNFLD"]
     fileContent += v_fmt_treat["FL"].format(float(Dv))
-    rw = DT[DT["Champ"] == "LNSA"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSA"]
     fileContent += v_fmt_treat["SA"].format(float(Dv))
-    rw = DT[DT["Champ"] == "LNIC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNIC"]
     fileContent += v_fmt_treat["IC"].format(float(Dv))
-    rw = DT[DT["Champ"] == "LNPLT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNPLT"]
     fileContent += v_fmt_treat["MP"].format(float(Dv))
-    #rw = DT[DT["Champ"] == "LNIR"]  ######################### It depends on the context
-    #Dv = rw["dv"].values[0]
+    #Dv = DT["LNIR"]  ######################### It depends on the context
     #fileContent += v_fmt_treat["MI"].format(float(Dv))
     if dataTable["IrrigationPolicyCode"].values[0] == "0":
         fileContent += v_fmt_treat["MI"].format(0)
     else:
         fileContent += v_fmt_treat["MI"].format(1)
-    #rw = DT[DT["Champ"] == "LNFER"] ######################### It depends on the context
-    #Dv = rw["dv"].values[0]
+    #Dv = DT["LNFER"] ######################### It depends on the context
     #fileContent += v_fmt_treat["MF"].format(float(Dv))
     if dataTable["InoFertiPolicyCode"].values[0] == "0":
         fileContent += v_fmt_treat["MF"].format(0)
@@ -225,23 +211,19 @@ def writeBlockTreatment(dssat_tableName, idSim, modelDictionary_Connection, mast
         fileContent += v_fmt_treat["MR"].format(0)
     else:
         fileContent += v_fmt_treat["MR"].format(1)
-    #rw = DT[DT["Champ"] == "LNCHE"]                #### No chemical application
-    #Dv = rw["dv"].values[0]
+    #Dv = DT["LNCHE"]                #### No chemical application
     #fileContent += v_fmt_treat["MC"].format(float(Dv))
     fileContent += v_fmt_treat["MC"].format(0)
     if dataTable["SoilTillPolicyCode"].values[0] == "0":
         fileContent += v_fmt_treat["MT"].format(0)
     else:
         fileContent += v_fmt_treat["MT"].format(1)
-    #rw = DT[DT["Champ"] == "LNENV"]
-    #Dv = rw["dv"].values[0]
+    #Dv = DT["LNENV"]
     #fileContent += v_fmt_treat["ME"].format(float(Dv))  #### No environmental modification
     fileContent += v_fmt_treat["ME"].format(0)
-    rw = DT[DT["Champ"] == "LNHAR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNHAR"]
     fileContent += v_fmt_treat["MH"].format(float(Dv))
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_treat["SM"].format(float(Dv))
     fileContent += "\n"
     return fileContent
@@ -249,16 +231,14 @@ def writeBlockTreatment(dssat_tableName, idSim, modelDictionary_Connection, mast
 
 def writeBlockCultivar(dssat_tableName, idMangt, modelDictionary_Connection, master_input_connection):
     fileContent = ""
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
-    fetchAllQuery  = "SELECT CropManagement.idMangt, ListCultivars.CodCultivar, ListCultivars.IdcultivarDssat, ListCultOption.CG From ListCultOption INNER JOIN (ListCultivars INNER Join CropManagement On ListCultivars.IdCultivar = CropManagement.Idcultivar) On ListCultOption.CodePSpecies = ListCultivars.CodePSpecies Where Idmangt ='%s';"%(idMangt)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
+    fetchAllQuery = statement("dssat.x.cultivar")
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idMangt,))
     siteColumnsHeader = ["@C", "CR", "INGENO", "CNAME"]
     fileContent += "\n"
     fileContent += "*CULTIVARS\n"
     fileContent += " ".join(siteColumnsHeader) + "\n"
-    rw = DT[DT["Champ"] == "LNCU"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNCU"]
     fileContent += v_fmt_cultivars["C"].format(float(Dv))
     fileContent += v_fmt_cultivars["CR"].format(dataTable["CG"].values[0])
     fileContent += v_fmt_cultivars["INGENO"].format(dataTable["IdcultivarDssat"].values[0])
@@ -270,107 +250,78 @@ def writeBlockCultivar(dssat_tableName, idMangt, modelDictionary_Connection, mas
 
 def writeBlockField(dssat_tableName, dssat_tableId, idMangt, modelDictionary_Connection):
     fileContent = ""
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource], [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     siteColumnsHeader = ["@L", "ID_FIELD", "WSTA....", " FLSA", " FLOB", " FLDT", " FLDD", " FLDS", " FLST", "SLTX ", "SLDP ", "ID_SOIL   ", "FLNAME"]
     siteColumnsHeader2 = ["@L", "...........XCRD", "...........YCRD", ".....ELEV", ".............AREA", ".SLEN", ".FLWR", ".SLAS", "FLHST", "FHDUR"]
     fileContent += "\n"
     fileContent += "*FIELDS\n"
     fileContent += " ".join(siteColumnsHeader) + "\n"
-    rw = DT[DT["Champ"] == "FL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FL"]
     fileContent += v_fmt_fields["L"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ID_FIELD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ID_FIELD"]
     fileContent += v_fmt_fields["ID_FIELD"].format(Dv)
     fileContent += v_fmt_fields["WSTA"].format(idMangt[0:4].upper())
-    rw = DT[DT["Champ"] == "FLSA"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FLSA"]
     fileContent += v_fmt_fields["FLSA"].format(Dv)
-    rw = DT[DT["Champ"] == "FLOB"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FLOB"]
     fileContent += v_fmt_fields["FLOB"].format(float(Dv))
-    rw = DT[DT["Champ"] == "FLDT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FLDT"]
     fileContent += v_fmt_fields["FLDT"].format(Dv)
-    rw = DT[DT["Champ"] == "FLDD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FLDD"]
     fileContent += v_fmt_fields["FLDD"].format(float(Dv))
-    rw = DT[DT["Champ"] == "FLDS"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FLDS"]
     fileContent += v_fmt_fields["FLDS"].format(float(Dv))
-    rw = DT[DT["Champ"] == "FLST"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FLST"]
     fileContent += v_fmt_fields["FLST"].format(Dv)
-    rw = DT[DT["Champ"] == "SLTX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SLTX"]
     fileContent += v_fmt_fields["SLTX"].format(Dv)
-    rw = DT[DT["Champ"] == "SLDP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SLDP"]
     fileContent += v_fmt_fields["SLDP"].format(float(Dv))
     fileContent += v_fmt_fields["ID_SOIL"].format("XX" + idMangt[0:4] + "0101")
-    rw = DT[DT["Champ"] == "FLNAME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FLNAME"]
     fileContent += v_fmt_fields["FLNAME"].format(Dv) + "\n"
     fileContent += " ".join(siteColumnsHeader2) + "\n"
-    rw = DT[DT["Champ"] == "FL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FL"]
     fileContent += v_fmt_fields["L"].format(float(Dv))
-    rw = DT[DT["Champ"] == "XCRD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["XCRD"]
     fileContent += v_fmt_fields["XCRD"].format(float(Dv))
-    rw = DT[DT["Champ"] == "YCRD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["YCRD"]
     fileContent += v_fmt_fields["YCRD"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ELEV"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ELEV"]
     fileContent += v_fmt_fields["ELEV"].format(float(Dv))
-    rw = DT[DT["Champ"] == "AREA"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["AREA"]
     fileContent += v_fmt_fields["AREA"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SLEN"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SLEN"]
     fileContent += v_fmt_fields["SLEN"].format(float(Dv))
-    rw = DT[DT["Champ"] == "FLWR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FLWR"]
     fileContent += v_fmt_fields["FLWR"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SLAS"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SLAS"]
     fileContent += v_fmt_fields["SLAS"].format(float(Dv))
-    rw = DT[DT["Champ"] == "FLHST"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FLHST"]
     fileContent += v_fmt_fields["FLHST"].format(Dv)
-    rw = DT[DT["Champ"] == "FHDUR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FHDUR"]
     fileContent += v_fmt_fields["FHDUR"].format(float(Dv)) + "\n"
     return fileContent
     
     
 def writeBlockSoilAnalysis(dssat_tableName, dssat_tableId, modelDictionary_Connection):
     fileContent = ""
-    dssat_queryRead  = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     siteColumnsHeader = ["@A", "SADAT", " SMHB", " SMPX", " SMKE", " SANAME"]
     fileContent += "\n"
     fileContent += "*SOIL ANALYSIS\n"
     fileContent += " ".join(siteColumnsHeader) + "\n"
-    rw = DT[DT["Champ"] == "LNSA"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSA"]
     fileContent += v_fmt_soil["A"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SADAT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SADAT"]
     fileContent += v_fmt_soil["SADAT"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "SMHB"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SMHB"]
     fileContent += v_fmt_soil["SMHB"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "SMPX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SMPX"]
     fileContent += v_fmt_soil["SMPX"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "SMKE"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SMKE"]
     fileContent += v_fmt_soil["SMKE"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "SANAME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SANAME"]
     fileContent += v_fmt_soil["SANAME"].format(Dv.strip()) + "\n"
     dssat_tableName = "dssat_x_soil_analysis_data"
     fileContent += writeBlockSoilAnalysisData(dssat_tableName, modelDictionary_Connection)
@@ -379,49 +330,38 @@ def writeBlockSoilAnalysis(dssat_tableName, dssat_tableId, modelDictionary_Conne
     
 
 def writeBlockSoilAnalysisData(dssat_tableName, Connection):
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, Connection)
+    DT = model_defaults(Connection).table("dssat", dssat_tableName)
     siteColumnsHeader = "@A  SABL  SADM  SAOC  SANI SAPHW SAPHB  SAPX  SAKE  SASC"
     fileContent = ""
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNSA"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSA"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_soil["A"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SABL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SABL"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_soil["SABL"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SADM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SADM"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_soil["SADM"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SAOC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SAOC"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_soil["SAOC"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SANI"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SANI"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_soil["SANI"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SAPHW"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SAPHW"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_soil["SAPHW"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SAPHB"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SAPHB"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_soil["SAPHB"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SAPX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SAPX"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_soil["SAPX"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SAKE"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SAKE"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_soil["SAKE"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SASC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SASC"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f") + '\n'
     else: fileContent += v_fmt_soil["SASC"].format(float(Dv)) + "\n"
     return fileContent
@@ -429,54 +369,41 @@ def writeBlockSoilAnalysisData(dssat_tableName, Connection):
 
 def writeBlockInitialCondition(dssat_tableName, idSim, modelDictionary_Connection, master_input_connection):
     fileContent = ""
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
-    fetchAllQuery = "Select SimUnitList.idsim, SimUnitList.StartYear, SimUnitList.StartDay,CropManagement.SowingDate, ListCultOption.PRCROP FROM (ListCultOption INNER JOIN (ListCultivars INNER JOIN CropManagement ON ListCultivars.IdCultivar = CropManagement.Idcultivar) ON ListCultOption.CodePSpecies = ListCultivars.CodePSpecies) INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt Where IdSim ='%s';"%(idSim)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
+    fetchAllQuery = statement("dssat.x.initial")
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
     siteColumnsHeader = "@C   PCR ICDAT  ICRT  ICND  ICRN  ICRE  ICWD ICRES ICREN ICREP ICRIP ICRID ICNAME"
     fileContent += "\n"
     fileContent += "*INITIAL CONDITIONS\n"
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNIC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNIC"]
     fileContent += v_fmt_init["C"].format(float(Dv))
     fileContent += v_fmt_init["PCR"].format(dataTable["PRCROP"].values[0])
     s = str(dataTable["StartYear"].values[0])[2:4] + format(dataTable["StartDay"].values[0], "03.0f")
     fileContent += v_fmt_init["ICDAT"].format(s)
-    rw = DT[DT["Champ"] == "WRESR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["WRESR"]
     fileContent += v_fmt_init["ICRT"].format(float(Dv))
-    rw = DT[DT["Champ"] == "WRESND"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["WRESND"]
     fileContent += v_fmt_init["ICND"].format(float(Dv))
-    rw = DT[DT["Champ"] == "EFINOC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["EFINOC"]
     fileContent += v_fmt_init["ICRN"].format(float(Dv))
-    rw = DT[DT["Champ"] == "EFNFIX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["EFNFIX"]
     fileContent += v_fmt_init["ICRE"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ICWD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ICWD"]
     fileContent += v_fmt_init["ICWD"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ICRES"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ICRES"]
     fileContent += v_fmt_init["ICRES"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ICREN"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ICREN"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_init["ICREN"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ICREP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ICREP"]
     if float(Dv) == -99: fileContent += format(-99, "6.0f")
     else: fileContent += v_fmt_init["ICREP"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ICRIP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ICRIP"]
     fileContent += v_fmt_init["ICRIP"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ICRID"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ICRID"]
     fileContent += v_fmt_init["ICRID"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ICNAME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ICNAME"]
     fileContent += v_fmt_init["ICNAME"].format(Dv) + "\n"
     dssat_tableName = "dssat_x_initial_condition_data"
     fileContent += writeBlockInitialConditionData(dssat_tableName, idSim, modelDictionary_Connection, master_input_connection)
@@ -485,30 +412,23 @@ def writeBlockInitialCondition(dssat_tableName, idSim, modelDictionary_Connectio
  
 
 def writeBlockInitialConditionData(dssat_tableName, idsim, Connection, MI_Connection):
-    dssat_queryRead  = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, Connection)
+    DT = model_defaults(Connection).table("dssat", dssat_tableName)
     siteColumnsHeader = "@C  ICBL  SH2O  SNH4  SNO3"
-    fetchAllQuery  = """SELECT DISTINCT Soil.Wwp AS 'Soil.Wwp', Soil.Wfc AS 'Soil.Wfc', Soil.bd as 'soil.bd', Soil.*,
-                SoilLayers.Wwp AS 'SoilLayers.Wwp', SoilLayers.Wfc AS 'SoilLayers.Wfc', SoilLayers.*, 
-                InitialConditions.* FROM InitialConditions INNER JOIN 
-                ((Soil INNER JOIN SimUnitList ON Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil)) LEFT JOIN SoilLayers ON Lower(Soil.IdSoil) = Lower(SoilLayers.idsoil))
-                ON InitialConditions.idIni = SimUnitList.idIni Where IdSim ='%s' Order by NumLayer;"""%(idsim)
-    dataTable = pd.read_sql_query(fetchAllQuery, MI_Connection)
+    fetchAllQuery = statement("dssat.x.initial_layers")
+    dataTable = pd.read_sql_query(fetchAllQuery, MI_Connection, params=(idsim,))
     fileContent = ""
     fileContent += siteColumnsHeader + "\n"
     has_nh4initf = "NH4initf" in dataTable.columns
     if dataTable["SoilOption"].values[0].lower() == "simple":
         for i in range(2):
-            rw = DT[DT["Champ"] == "LNIC"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["LNIC"]
             fileContent += v_fmt_init["C"].format(float(Dv))
             if i == 0:
                 fileContent += v_fmt_init["ICBL"].format(30.0)
             else:
                 fileContent += v_fmt_init["ICBL"].format(dataTable["SoilTotalDepth"].values[0])
             fileContent += v_fmt_init["SH2O"].format((dataTable["Soil.Wwp"].values[0] / 100) + dataTable["WStockinit"].values[0] * (dataTable["Soil.Wfc"].values[0] - dataTable["Soil.Wwp"].values[0]) / 10000)
-            rw = DT[DT["Champ"] == "INH4"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["INH4"]
             # fileContent.Append(FormatNumber(10 * dataTable.Rows(0).Item("NH4init") / (dataTable.Rows(0).Item("soil.bd") * dataTable.Rows(0).Item("SoilTotalDepth")), 2).ToString.PadLeft(5))
             if has_nh4initf and pd.notna(dataTable["NH4initf"].values[0]):
                 fileContent += v_fmt_init["SNH4"].format(10 * dataTable["NH4initf"].values[0] / (dataTable["soil.bd"].values[0] * dataTable["SoilTotalDepth"].values[0]))
@@ -518,13 +438,11 @@ def writeBlockInitialConditionData(dssat_tableName, idsim, Connection, MI_Connec
             fileContent += "\n"
     else:
         for i in range(dataTable.shape[0]):
-            rw = DT[DT["Champ"] == "LNIC"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["LNIC"]
             fileContent += v_fmt_init["C"].format(float(Dv))
             fileContent += v_fmt_init["ICBL"].format(dataTable["Ldown"].values[i])
             fileContent += v_fmt_init["SH2O"].format((dataTable["SoilLayers.Wwp"].values[i] / 100 + dataTable["WStockinit"].values[i] * (dataTable["SoilLayers.Wfc"].values[i] - dataTable["SoilLayers.Wwp"].values[i]) / 10000))
-            rw = DT[DT["Champ"] == "INH4"]
-            Dv = rw["dv"].values[0]
+            Dv = DT["INH4"]
             if has_nh4initf and pd.notna(dataTable["NH4initf"].values[i]):
                 fileContent += v_fmt_init["SNH4"].format(10 * dataTable["NH4initf"].values[i] / (dataTable["soil.bd"].values[i] * dataTable["SoilTotalDepth"].values[i]))
             else:
@@ -537,16 +455,14 @@ def writeBlockInitialConditionData(dssat_tableName, idsim, Connection, MI_Connec
 
 def writeBlockPlantingDetail(dssat_tableName, idSim, modelDictionary_Connection, master_input_connection):
     fileContent = ""
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
-    fetchAllQuery = "SELECT SimUnitList.idsim,  SimUnitList.StartYear, CropManagement.sdens, CropManagement.sowingdate FROM CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt Where IdSim ='%s';"%(idSim)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
+    fetchAllQuery = statement("dssat.x.planting")
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
     siteColumnsHeader = "@P PDATE EDATE  PPOP  PPOE  PLME  PLDS  PLRS  PLRD  PLDP  PLWT  PAGE  PENV  PLPH  SPRL                        PLNAME"
     fileContent += "\n"
     fileContent += "*PLANTING DETAILS\n"
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNPLT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNPLT"]
     fileContent += v_fmt_plant["P"].format(float(Dv))
     if dataTable["StartYear"].values[0] % 4 == 0:
         Bissext = 1
@@ -557,81 +473,59 @@ def writeBlockPlantingDetail(dssat_tableName, idSim, modelDictionary_Connection,
         fileContent += v_fmt_plant["PDATE"].format(str(dataTable["StartYear"].values[0] + 1)[2:4] + str(dataTable["sowingdate"].values[0] - 365 - Bissext).rjust(3, "0"))
     else:
         fileContent += v_fmt_plant["PDATE"].format(str(dataTable["StartYear"].values[0])[2:4] + str(dataTable["sowingdate"].values[0]).rjust(3, "0"))
-    rw = DT[DT["Champ"] == "IEMRG"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IEMRG"]
     fileContent += v_fmt_plant["EDATE"].format(Dv)
     fileContent += v_fmt_plant["PPOP"].format(dataTable["sdens"].values[0])
     fileContent += v_fmt_plant["PPOE"].format(dataTable["sdens"].values[0])
-    rw = DT[DT["Champ"] == "PLME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["PLME"]
     fileContent += v_fmt_plant["PLME"].format(Dv)
-    rw = DT[DT["Champ"] == "PLDS"]  
-    Dv = rw["dv"].values[0]
+    Dv = DT["PLDS"]
     fileContent += v_fmt_plant["PLDS"].format(Dv)
-    rw = DT[DT["Champ"] == "ROWSPC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ROWSPC"]
     fileContent += v_fmt_plant["PLRS"].format(float(Dv))
-    rw = DT[DT["Champ"] == "AZIR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["AZIR"]
     fileContent += v_fmt_plant["PLRD"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SDEPHT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SDEPHT"]
     fileContent += v_fmt_plant["PLDP"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SDWTPL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SDWTPL"]
     fileContent += v_fmt_plant["PLWT"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SDAGE"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SDAGE"]
     fileContent += v_fmt_plant["PAGE"].format(float(Dv))
-    rw = DT[DT["Champ"] == "ATEMP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ATEMP"]
     fileContent += v_fmt_plant["PENV"].format(float(Dv))
-    rw = DT[DT["Champ"] == "PLPH"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["PLPH"]
     fileContent += v_fmt_plant["PLPH"].format(float(Dv))
-    rw = DT[DT["Champ"] == "SPRLAP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SPRLAP"]
     fileContent += v_fmt_plant["SPRL"].format(float(Dv))
-    rw = DT[DT["Champ"] == "PLNAME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["PLNAME"]
     fileContent += v_fmt_plant["PLNAME"].format(Dv) + "\n"
     return fileContent
 
 
 def writeBlockIrrigationWater(dssat_tableName, dssat_tableId, modelDictionary_Connection):
     fileContent = ""
-    dssat_queryRead  = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     siteColumnsHeader = "@I  EFIR  IDEP  ITHR  IEPT  IOFF  IAME  IAMT IRNAME"
     fileContent += "\n"
     fileContent += "*IRRIGATION AND WATER MANAGEMENT\n"
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNIR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNIR"]
     fileContent += v_fmt_irrigation["I"].format(float(Dv))
-    rw = DT[DT["Champ"] == "EFFIRX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["EFFIRX"]
     fileContent += v_fmt_irrigation["EFIR"].format(float(Dv))
-    rw = DT[DT["Champ"] == "DSOILX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["DSOILX"]
     fileContent += v_fmt_irrigation["IDEP"].format(float(Dv))
-    rw = DT[DT["Champ"] == "THETCX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["THETCX"]
     fileContent += v_fmt_irrigation["ITHR"].format(float(Dv))
-    rw = DT[DT["Champ"] == "IEPTX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IEPTX"]
     fileContent += v_fmt_irrigation["IEPT"].format(float(Dv))
-    rw = DT[DT["Champ"] == "IOFFX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IOFFX"]
     fileContent += v_fmt_irrigation["IOFF"].format(Dv)
-    rw = DT[DT["Champ"] == "IAMEX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IAMEX"]
     fileContent += v_fmt_irrigation["IAME"].format(Dv)
-    rw = DT[DT["Champ"] == "AIRAMX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["AIRAMX"]
     fileContent += v_fmt_irrigation["IAMT"].format(float(Dv))
-    rw = DT[DT["Champ"] == "IRNAME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IRNAME"]
     fileContent += v_fmt_irrigation["IRNAME"].format(Dv) + "\n"
     dssat_tableName = "dssat_x_irrigation_water_data"
     fileContent += writeBlockIrrigationWaterData(dssat_tableName, modelDictionary_Connection)
@@ -639,21 +533,16 @@ def writeBlockIrrigationWater(dssat_tableName, dssat_tableId, modelDictionary_Co
 
 def writeBlockIrrigationWaterData(dssat_tableName, modelDictionary_Connection):
     fileContent = "" 
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     siteColumnsHeader = "@I IDATE  IROP IRVAL" 
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNIR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNIR"]
     fileContent += v_fmt_irrigation["I"].format(float(Dv))
-    rw = DT[DT["Champ"] == "IDLAPL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDLAPL"]
     fileContent += v_fmt_irrigation["IDATE"].format(Dv)
-    rw = DT[DT["Champ"] == "IRRCOD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IRRCOD"]
     fileContent += v_fmt_irrigation["IROP"].format(Dv)
-    rw = DT[DT["Champ"] == "IIRV"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IIRV"]
     fileContent += v_fmt_irrigation["IRVAL"].format(float(Dv))
     fileContent += "\n"
     return fileContent
@@ -661,21 +550,15 @@ def writeBlockIrrigationWaterData(dssat_tableName, modelDictionary_Connection):
 
 def writeBlockFertilizer(dssat_tableName, idSim, modelDictionary_Connection, master_input_connection, Dv_ferti):
     fileContent = ""
-    dssat_queryRead  = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
-    fetchAllQuery  = """SELECT SimUnitList.idsim, SimUnitList.StartYear, CropManagement.Sowingdate, InorganicFOperations.IFNumber,
-                InorganicFOperations.N, InorganicFOperations.P, InorganicFOperations.Dferti FROM (InorganicFertilizationPolicy INNER JOIN 
-                (CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt) ON InorganicFertilizationPolicy.InorgFertiPolicyCode 
-                = CropManagement.InoFertiPolicyCode) INNER JOIN InorganicFOperations ON InorganicFertilizationPolicy.InorgFertiPolicyCode =
-                InorganicFOperations.InorgFertiPolicyCode Where Idsim ='%s' Order by InorganicFOperations.IFNumber;"""%(idSim)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
+    fetchAllQuery = statement("dssat.x.fertilizer")
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
     siteColumnsHeader = "@F FDATE  FMCD  FACD  FDEP  FAMN  FAMP  FAMK  FAMC  FAMO  FOCD FERNAME"
     fileContent += "\n"
     fileContent += "*FERTILIZERS (INORGANIC)\n"
     fileContent += siteColumnsHeader + "\n"
     for i in range(dataTable.shape[0]):
-        rw = DT[DT["Champ"] == "LNFER"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["LNFER"]
         fileContent += v_fmt_fertilizers["F"].format(float(Dv))
         ifert = int(dataTable["sowingdate"].values[i] + dataTable["Dferti"].values[i])
         if dataTable["Dferti"].values[i] == 0: ifert += 1
@@ -684,55 +567,39 @@ def writeBlockFertilizer(dssat_tableName, idSim, modelDictionary_Connection, mas
         elif Dv_ferti == "D":
             fileContent += v_fmt_fertilizers["FDATE"].format(str(int(dataTable["Dferti"].values[i])))
         
-        rw = DT[DT["Champ"] == "IFTYPE"]
-        Dv = rw["dv"].values[0] 
+        Dv = DT["IFTYPE"] 
         fileContent += v_fmt_fertilizers["FMCD"].format(Dv)
-        rw = DT[DT["Champ"] == "FERCOD"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["FERCOD"]
         fileContent += v_fmt_fertilizers["FACD"].format(Dv)
-        rw = DT[DT["Champ"] == "DFERT"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["DFERT"]
         fileContent += v_fmt_fertilizers["FDEP"].format(float(Dv))
         fileContent += v_fmt_fertilizers["FAMN"].format(dataTable["N"].values[i])
         fileContent += v_fmt_fertilizers["FAMP"].format(dataTable["P"].values[i])
-        rw = DT[DT["Champ"] == "AKFER"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["AKFER"]
         fileContent += v_fmt_fertilizers["FAMK"].format(float(Dv))
-        rw = DT[DT["Champ"] == "ACFER"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["ACFER"]
         fileContent += v_fmt_fertilizers["FAMC"].format(float(Dv))
-        rw = DT[DT["Champ"] == "AOFER"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["AOFER"]
         fileContent += v_fmt_fertilizers["FAMO"].format(float(Dv))
-        rw = DT[DT["Champ"] == "FOCOD"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["FOCOD"]
         fileContent += v_fmt_fertilizers["FOCD"].format(Dv.strip())
 
-        rw = DT[DT["Champ"] == "FERNAM"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["FERNAM"]
         fileContent += v_fmt_fertilizers["FERNAME"].format(Dv) + "\n"
     return fileContent
 
 
 def writeBlockResidues(dssat_tableName, idSim, dssat_tableId, modelDictionary_Connection, master_input_connection):
     fileContent = ""
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
-    fetchAllQuery = """SELECT SimUnitList.idsim, SimUnitList.StartYear, CropManagement.sowingdate, ListResidues.idresidueDssat, 
-                OrganicFOperations.In_OnManure, OrganicFOperations.Qmanure, OrganicFOperations.Dferti, OrganicFOperations.NFerti, 
-                OrganicFOperations.PFerti, SoilTillageOperations.STNumber, SoilTillageOperations.DepthResLow, OrganicFOperations.OFNumber 
-                FROM ((SoilTillageOperations INNER JOIN CropManagement ON SoilTillageOperations.SoilTillPolicyCode = CropManagement.SoilTillPolicyCode)
-                INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt) INNER JOIN (ListResidues INNER JOIN OrganicFOperations ON 
-                ListResidues.TypeResidues = OrganicFOperations.TypeResidues) ON CropManagement.OFertiPolicyCode = OrganicFOperations.OFertiPolicyCode
-                Where Idsim ='%s' Order by Ofnumber;"""%(idSim)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
+    fetchAllQuery = statement("dssat.x.residues")
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
     siteColumnsHeader = "@R RDATE  RCOD  RAMT  RESN  RESP  RESK  RINP  RDEP  RMET RENAME"
     fileContent += "\n"
     fileContent += "*RESIDUES AND ORGANIC FERTILIZER\n"
     fileContent += siteColumnsHeader + "\n"
     for i in range(dataTable.shape[0]):
-        rw = DT[DT["Champ"] == "LNRES"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["LNRES"]
         fileContent += v_fmt_residues["R"].format(float(Dv))
         ifert = int(dataTable["sowingdate"].values[i] + dataTable["Dferti"].values[i])
         if dataTable["Dferti"].values[i] == 0: ifert += 1
@@ -742,74 +609,56 @@ def writeBlockResidues(dssat_tableName, idSim, dssat_tableId, modelDictionary_Co
         fileContent += v_fmt_residues["RAMT"].format(dataTable["Qmanure"].values[i])
         fileContent += v_fmt_residues["RESN"].format(round(100 * dataTable["NFerti"].values[i], 2))
         fileContent += v_fmt_residues["RESP"].format(round(100 * dataTable["PFerti"].values[i], 2))
-        rw = DT[DT["Champ"] == "RESK"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["RESK"]
         fileContent += v_fmt_residues["RESK"].format(float(Dv))
-        rw = DT[DT["Champ"] == "RINP"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["RINP"]
         fileContent += v_fmt_residues["RINP"].format(float(Dv))
         if dataTable["In_OnManure"].values[i] == 0:
             fileContent += v_fmt_residues["RDEP"].format(0.0)
         else: fileContent += v_fmt_residues["RDEP"].format(dataTable["DepthResLow"].values[i])
-        rw = DT[DT["Champ"] == "RMET"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["RMET"]
         fileContent += v_fmt_residues["RMET"].format(Dv.strip())
-        rw = DT[DT["Champ"] == "RENAME"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["RENAME"]
         fileContent += v_fmt_residues["RENAME"].format(Dv.strip()) + "\n"
     return fileContent
 
 
 def writeBlockChemicalApplication(dssat_tableName, dssat_tableId, modelDictionary_Connection):
     fileContent = ""
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     siteColumnsHeader = "@C CDATE CHCOD CHAMT  CHME CHDEP   CHT..CHNAME"
     fileContent += "\n"
     fileContent += "*CHEMICAL APPLICATIONS\n"
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNCHE"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNCHE"]
     fileContent += v_fmt_chemical["C"].format(float(Dv))
-    rw = DT[DT["Champ"] == "CDATE"]                                ###TODO: Check if the date should be extracted from the MasterInput database
-    Dv = rw["dv"].values[0]
+    Dv = DT["CDATE"]                                ###TODO: Check if the date should be extracted from the MasterInput database
     fileContent += v_fmt_chemical["CDATE"].format(format(int(Dv), "05"))
-    rw = DT[DT["Champ"] == "CHCOD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CHCOD"]
     fileContent += v_fmt_chemical["CHCOD"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "CHAMT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CHAMT"]
     fileContent += v_fmt_chemical["CHAMT"].format(float(Dv))
-    rw = DT[DT["Champ"] == "CHMET"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CHMET"]
     fileContent += v_fmt_chemical["CHME"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "CHDEP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CHDEP"]
     fileContent += v_fmt_chemical["CHDEP"].format(float(Dv))
-    rw = DT[DT["Champ"] == "CHT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CHT"]
     fileContent += v_fmt_chemical["CHT"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "CHNAME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CHNAME"]
     fileContent += v_fmt_chemical["CHNAME"].format(Dv.strip()) + "\n"
     return fileContent
  
 
 def writeBlockTillageRotation(dssat_tableName, idSim, modelDictionary_Connection, master_input_connection):
     fileContent = ""
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource], [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
-    fetchAllQuery = """SELECT SimUnitList.idsim, SimUnitList.StartYear, CropManagement.sowingdate, OrganicFOperations.Qmanure, OrganicFOperations.Dferti, OrganicFOperations.NFerti, OrganicFOperations.PFerti, SoilTillageOperations.STNumber, SoilTillageOperations.DStill, SoilTillageOperations.DepthResLow
-                FROM SoilTillageOperations INNER JOIN ((OrganicFertilizationPolicy INNER JOIN (CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt) 
-                ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode) INNER JOIN OrganicFOperations ON OrganicFertilizationPolicy.OFertiPolicyCode = 
-                OrganicFOperations.OFertiPolicyCode) ON SoilTillageOperations.SoilTillPolicyCode = CropManagement.SoilTillPolicyCode Where Idsim ='%s';"""%(idSim)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
+    fetchAllQuery = statement("dssat.x.tillage")
     fileContent += "\n"
     fileContent += "*TILLAGE AND ROTATIONS\n"
     fileContent += "@T TDATE TIMPL  TDEP TNAME\n"
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
     for i in range(dataTable.shape[0]):
-        rw = DT[DT["Champ"] == "LNTIL"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["LNTIL"]
         fileContent += v_fmt_tillage["T"].format(float(Dv))
         ifert = int(dataTable["sowingdate"].values[i] + dataTable["DSTill"].values[i])
         if dataTable["StartYear"].values[i] % 4 == 0:
@@ -820,82 +669,59 @@ def writeBlockTillageRotation(dssat_tableName, idSim, modelDictionary_Connection
             fileContent += v_fmt_tillage["TDATE"].format(str(dataTable["StartYear"].values[i] + 1)[2:4] + str(ifert - 365 - Bissext).rjust(3, "0"))
         else:
             fileContent += v_fmt_tillage["TDATE"].format(str(dataTable["StartYear"].values[i])[2:4] + str(ifert).rjust(3, "0"))
-        rw = DT[DT["Champ"] == "TIMPL"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["TIMPL"]
         fileContent += v_fmt_tillage["TIMPL"].format(Dv.strip())
-        rw = DT[DT["Champ"] == "TDEP"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["TDEP"]
         fileContent += v_fmt_tillage["TDEP"].format(float(Dv))
-        rw = DT[DT["Champ"] == "TNAME"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["TNAME"]
         fileContent += v_fmt_tillage["TNAME"].format(Dv.strip()) + "\n"
     return fileContent
 
 
 def writeBlockEnvironment(dssat_tableName, dssat_tableId, modelDictionary_Connection):
     fileContent = ""
-    dssat_queryRead  = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     siteColumnsHeader = "@E ODATE EDAY  ERAD  EMAX  EMIN  ERAIN ECO2  EDEW  EWIND ENVNAME"
     fileContent += "\n"
     fileContent += "*ENVIRONMENT MODIFICATIONS\n"
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNENV"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNENV"]
     fileContent += v_fmt_environment["E"].format(float(Dv))
-    rw = DT[DT["Champ"] == "WMDATE"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["WMDATE"]
     fileContent += v_fmt_environment["ODATE"].format(format(int(Dv), "05"))
-    rw = DT[DT["Champ"] == "DAYFAC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["DAYFAC"]
     fileContent += v_fmt_environment["EDAY"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "DAYADJ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["DAYADJ"]
     fileContent += v_fmt_environment["EDAY1"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "RADFAC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["RADFAC"]
     fileContent += v_fmt_environment["ERAD"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "RADADJ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["RADADJ"]
     fileContent += v_fmt_environment["ERAD1"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "TXFAC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TXFAC"]
     fileContent += v_fmt_environment["EMAX"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "TXADJ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TXADJ"]
     fileContent += v_fmt_environment["EMAX1"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "TMFAC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TMFAC"]
     fileContent += v_fmt_environment["EMIN"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "TMADJ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TMADJ"]
     fileContent += v_fmt_environment["EMIN1"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "PRCFAC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["PRCFAC"]
     fileContent += v_fmt_environment["ERAIN"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "PRCADJ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["PRCADJ"]
     fileContent += v_fmt_environment["ERAIN1"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "CO2FAC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CO2FAC"]
     fileContent += v_fmt_environment["ECO2"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "CO2ADJ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CO2ADJ"]
     fileContent += v_fmt_environment["ECO21"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "DPTFAC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["DPTFAC"]
     fileContent += v_fmt_environment["EDEW"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "DPTADJ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["DPTADJ"]
     fileContent += v_fmt_environment["EDEW1"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "WNDFAC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["WNDFAC"]
     fileContent += v_fmt_environment["EWIND"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "WNDADJ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["WNDADJ"]
     fileContent += v_fmt_environment["EWIND1"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "ENVNAME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ENVNAME"]
     fileContent += v_fmt_environment["ENVNAME"].format(Dv.strip()) + "\n"
 
     return fileContent
@@ -903,23 +729,19 @@ def writeBlockEnvironment(dssat_tableName, dssat_tableId, modelDictionary_Connec
 
 def writeBlockHarvest(dssat_tableName, idSim, dssat_tableId, modelDictionary_Connection, master_input_connection, Dv_hari):
     fileContent = ""
-    dssat_queryRead  = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s' or [Table] = 'dssat_x_simulation_management'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).tables("dssat", dssat_tableName, "dssat_x_simulation_management")
     siteColumnsHeader = "@H HDATE  HSTG  HCOM HSIZE   HPC  HBPC HNAME"
     fileContent += "\n"
     fileContent += "*HARVEST DETAILS\n"
     fileContent += siteColumnsHeader + "\n"
     
-    fetchAllQuery  = """SELECT SimUnitList.idsim,  SimUnitList.StartYear, SimUnitList.EndYear,SimUnitList.EndDay, CropManagement.Sowingdate, 
-                CropManagement.DHarvest FROM CropManagement JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt WHERE SimUnitList.idsim ='%s';"""%(idSim)
+    fetchAllQuery = statement("dssat.x.harvest")
 
     #fetchAllQuery  = "SELECT SimUnitList.idsim, SimUnitList.EndYear,SimUnitList.EndDay FROM SimUnitList  Where Idsim ='%s';"%(idSim)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
-    rw = DT[DT["Champ"] == "LNHAR"]
-    Dv = rw["dv"].values[0]
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
+    Dv = DT["LNHAR"]
     fileContent += v_fmt_harvest["H"].format(float(Dv))
-    rw = DT[DT["Champ"] == "IHARI"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IHARI"]
     
     iharv = int(dataTable["sowingdate"].values[0] + dataTable["DHarvest"].values[0])
     if dataTable["DHarvest"].values[0] == 0: iharv+= 1
@@ -932,23 +754,17 @@ def writeBlockHarvest(dssat_tableName, idSim, dssat_tableId, modelDictionary_Con
     '''if Dv_hari == "D":
         fileContent += v_fmt_harvest["HDATE"].format(format(int( str(dataTable["EndDay"].values[0]))))
     else: fileContent += v_fmt_harvest["HDATE"].format(str(dataTable["EndYear"].values[0])[2:4] + str(dataTable["EndDay"].values[0]).rjust(3, "0"))'''
-    rw = DT[DT["Champ"] == "HTSG"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HTSG"]
     fileContent += v_fmt_harvest["HSTG"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "HCOM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HCOM"]
     fileContent += v_fmt_harvest["HCOM"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "HSIZ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HSIZ"]
     fileContent += v_fmt_harvest["HSIZE"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "HPC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HPC"]
     fileContent += v_fmt_harvest["HPC"].format(int(Dv))
-    rw = DT[DT["Champ"] == "HBPC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HBPC"]
     fileContent += v_fmt_harvest["HBPC"].format(int(Dv))
-    rw = DT[DT["Champ"] == "HNAME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HNAME"]
     fileContent += v_fmt_harvest["HNAME"].format(Dv.strip()) + "\n"
     return fileContent
 
@@ -958,18 +774,12 @@ def writeBlockEndFile( idSim, modelDictionary_Connection, master_input_connectio
     fileContent = ""
     storeKeyDataN = 0
     storeNumMaxSimu = 1
-    dssat_queryRead  = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = 'dssat_x_simulation_management' ))";
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
-    rw = DT[DT["Champ"] == "IPLTI"]
-    Dv_planting = rw["dv"].values[0]
-    rw = DT[DT["Champ"] == "IIRRI"]
-    Dv_irri = rw["dv"].values[0]
-    rw = DT[DT["Champ"] == "IFERI"]
-    Dv_ferti = rw["dv"].values[0]
-    rw = DT[DT["Champ"] == "IHARI"]
-    Dv_hari = rw["dv"].values[0]
-    rw = DT[DT["Champ"] == "IRESI"]
-    Dv_resi = rw["dv"].values[0]
+    DT = model_defaults(modelDictionary_Connection).table("dssat", "dssat_x_simulation_management")
+    Dv_planting = DT["IPLTI"]
+    Dv_irri = DT["IIRRI"]
+    Dv_ferti = DT["IFERI"]
+    Dv_hari = DT["IHARI"]
+    Dv_resi = DT["IRESI"]
 
     while storeNumMaxSimu > storeKeyDataN:
         storeKeyDataN = storeKeyDataN + 1
@@ -1006,24 +816,18 @@ def writeBlockGeneral(dssat_tableName, dssat_tableId, idSim, modelDictionary_Con
     fileContent = ""
     siteColumnsHeader = "@N GENERAL     NYERS NREPS START SDATE RSEED SNAME.................... SMODEL"
     fileContent += siteColumnsHeader + "\n"
-    fetchAllQuery  = "SELECT SimUnitList.idsim, SimUnitList.StartYear,SimUnitList.StartDay, CropManagement.Sowingdate FROM CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt WHERE Idsim ='%s';"%(idSim)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    fetchAllQuery = statement("dssat.x.general")
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITCOM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITCOM"]
     fileContent += v_fmt_simulation["GENERAL"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "NYRS"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["NYRS"]
     fileContent += v_fmt_simulation["NYERS"].format(int(Dv.strip()))
-    rw = DT[DT["Champ"] == "NREPSQ"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["NREPSQ"]
     fileContent += v_fmt_simulation["NREPS"].format(int(Dv.strip()))
-    rw = DT[DT["Champ"] == "ISIMI"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ISIMI"]
     fileContent += v_fmt_simulation["START"].format(Dv.strip())
     
     if dataTable["StartYear"].values[0] % 4 == 0:
@@ -1034,14 +838,11 @@ def writeBlockGeneral(dssat_tableName, dssat_tableId, idSim, modelDictionary_Con
         fileContent += v_fmt_simulation["SDATE"].format(str(dataTable["StartYear"].values[0] + 1)[2:4] + str(dataTable["StartDay"].values[0] - 365 - Bissext).rjust(3, "0"))
     else:
         fileContent += v_fmt_simulation["SDATE"].format(str(dataTable["StartYear"].values[0])[2:4] + str(dataTable["StartDay"].values[0]).rjust(3, "0"))
-    rw = DT[DT["Champ"] == "RSEED"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["RSEED"]
     fileContent += v_fmt_simulation["RSEED"].format(int(Dv.strip()))
-    rw = DT[DT["Champ"] == "TITSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITSIM"]
     fileContent += v_fmt_simulation["SNAME"].format(Dv.strip()) + "\n"
-    #rw = DT[DT["Champ"] == "CROP_MODE"]
-    #Dv = rw["dv"].values[0]
+    #Dv = DT["CROP_MODE"]
     #fileContent += v_fmt_simulation["SMODEL"].format(Dv.strip()) + "\n"
     
     return fileContent
@@ -1049,42 +850,33 @@ def writeBlockGeneral(dssat_tableName, dssat_tableId, idSim, modelDictionary_Con
 def writeBlockOption(dssat_tableName, dssat_tableId, idSim, modelDictionary_Connection, master_input_connection):
     fileContent = ""
     siteColumnsHeader = "@N OPTIONS     WATER NITRO SYMBI PHOSP POTAS DISES  CHEM  TILL   CO2"
-    fetchAllQuery  = """SELECT SimUnitList.idsim, SimulationOptions.StressW_YN, SimulationOptions.StressN_YN, SimulationOptions.StressP_YN, SimulationOptions.StressK_YN
-        FROM SimUnitList INNER JOIN SimulationOptions ON SimUnitList.IdOption = SimulationOptions.IdOptions Where idsim ='%s';"""%(idSim)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
+    fetchAllQuery = statement("dssat.x.options")
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
     rows = dataTable.to_dict('records')
     row = rows[0]
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITOPT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITOPT"]
     fileContent += v_fmt_simulation["OPTIONS"].format(Dv.strip())
     if row["StressW_YN"]: fileContent += v_fmt_simulation["WATER"].format("Y")
     else: fileContent += v_fmt_simulation["WATER"].format("N")
     if row["StressN_YN"]: fileContent += v_fmt_simulation["NITRO"].format("Y")
     else: fileContent += v_fmt_simulation["NITRO"].format("N")
-    rw = DT[DT["Champ"] == "ISWSYM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ISWSYM"]
     fileContent += v_fmt_simulation["SYMBI"].format(Dv.strip())
     if row["StressP_YN"]: fileContent += v_fmt_simulation["PHOSP"].format("Y")
     else: fileContent += v_fmt_simulation["PHOSP"].format("N")
     if row["StressK_YN"]: fileContent += v_fmt_simulation["POTAS"].format("Y")
     else: fileContent += v_fmt_simulation["POTAS"].format("N")
-    rw = DT[DT["Champ"] == "ISWDIS"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ISWDIS"]
     fileContent += v_fmt_simulation["DISES"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "ISCHEM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ISCHEM"]
     fileContent += v_fmt_simulation["CHEM"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "ISTILL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ISTILL"]
     fileContent += v_fmt_simulation["TILL"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "ISCO2"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ISCO2"]
     fileContent += v_fmt_simulation["CO2"].format(Dv.strip()) + "\n"
     return fileContent
 
@@ -1093,47 +885,33 @@ def writeBlockOption(dssat_tableName, dssat_tableId, idSim, modelDictionary_Conn
 def writeBlockMethod(dssat_tableName, dssat_tableId, idSim, modelDictionary_Connection):
     fileContent = ""
     siteColumnsHeader = "@N METHODS     WTHER INCON LIGHT EVAPO INFIL PHOTO HYDRO NSWIT MESOM MESEV MESOL"
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITMET"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITMET"]
     fileContent += v_fmt_simulation["METHODS"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "MEWTH"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["MEWTH"]
     fileContent += v_fmt_simulation["WTHER"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "MESIC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["MESIC"]
     fileContent += v_fmt_simulation["INCON"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "MELI"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["MELI"]
     fileContent += v_fmt_simulation["LIGHT"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "MEEVP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["MEEVP"]
     fileContent += v_fmt_simulation["EVAPO"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "MEINF"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["MEINF"]
     fileContent += v_fmt_simulation["INFIL"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "MEPHO"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["MEPHO"]
     fileContent += v_fmt_simulation["PHOTO"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "HYDRO"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HYDRO"]
     fileContent += v_fmt_simulation["HYDRO"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "NSWIT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["NSWIT"]
     fileContent += v_fmt_simulation["NSWIT"].format(int(Dv))
-    rw = DT[DT["Champ"] == "MESOM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["MESOM"]
     fileContent += v_fmt_simulation["MESOM"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "MESEV"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["MESEV"]
     fileContent += v_fmt_simulation["MESEV"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "MESOL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["MESOL"]
     fileContent += v_fmt_simulation["MESOL"].format(int(Dv)) + "\n"
     return fileContent
 
@@ -1142,29 +920,21 @@ def writeBlockMethod(dssat_tableName, dssat_tableId, idSim, modelDictionary_Conn
 def writeBlockManagement(dssat_tableName, dssat_tableId, idSim, modelDictionary_Connection):
     fileContent = ""
     siteColumnsHeader = "@N MANAGEMENT  PLANT IRRIG FERTI RESID HARVS"
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITMAT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITMAT"]
     fileContent += v_fmt_simulation["MANAGEMENT"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "IPLTI"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IPLTI"]
     fileContent += v_fmt_simulation["PLANT"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "IIRRI"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IIRRI"]
     fileContent += v_fmt_simulation["IRRIG"].format(Dv.strip())  #TODO: Check if this management option should not be provided from the MasterInput database
-    rw = DT[DT["Champ"] == "IFERI"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IFERI"]
     fileContent += v_fmt_simulation["FERTI"].format(Dv.strip())  #TODO: Check if this management option should not be provided from the MasterInput database
-    rw = DT[DT["Champ"] == "IRESI"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IRESI"]
     fileContent += v_fmt_simulation["RESID"].format(Dv.strip())  
-    rw = DT[DT["Champ"] == "IHARI"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IHARI"]
     fileContent += v_fmt_simulation["HARVS"].format(Dv.strip()) + "\n"
     return fileContent
     
@@ -1174,53 +944,37 @@ def writeBlockoutputs(dssat_tableName, dssat_tableId, idSim, modelDictionary_Con
     fileContent = ""
     daily = "N" if dt ==1 else "Y"
     siteColumnsHeader = "@N OUTPUTS     FNAME OVVEW SUMRY FROPT GROUT CAOUT WAOUT NIOUT MIOUT DIOUT VBOSE CHOUT OPOUT"
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITOUT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITOUT"]
     fileContent += v_fmt_simulation["OUTPUTS"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "IOX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IOX"]
     fileContent += v_fmt_simulation["FNAME"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETO"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETO"]
     fileContent += v_fmt_simulation["OVVEW"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETS"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETS"]
     fileContent += v_fmt_simulation["SUMRY"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "FROP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["FROP"]
     fileContent += v_fmt_simulation["FROPT"].format(int(Dv))
-    rw = DT[DT["Champ"] == "IDETG"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETG"]
     fileContent += v_fmt_simulation["GROUT"].format(daily)#format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETC"]
     fileContent += v_fmt_simulation["CAOUT"].format(daily)#format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETG"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETG"]
     fileContent += v_fmt_simulation["WAOUT"].format(daily)#format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETN"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETN"]
     fileContent += v_fmt_simulation["NIOUT"].format(daily)#format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETP"]
     fileContent += v_fmt_simulation["MIOUT"].format(daily)#format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETD"]
     fileContent += v_fmt_simulation["DIOUT"].format(daily)#format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETG"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETG"]
     fileContent += v_fmt_simulation["VBOSE"].format("N")#format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETC"]
     fileContent += v_fmt_simulation["CHOUT"].format(daily)#format(Dv.strip())
-    rw = DT[DT["Champ"] == "IDETG"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IDETG"]
     fileContent += v_fmt_simulation["OPOUT"].format(Dv.strip()) + "\n"
     return fileContent
 
@@ -1228,44 +982,34 @@ def writeBlockoutputs(dssat_tableName, dssat_tableId, idSim, modelDictionary_Con
 def writeBlockAutomaticPlanting(dssat_tableName, dssat_tableId, idSim, modelDictionary_Connection, master_input_connection):
     fileContent = ""
     siteColumnsHeader = "@N PLANTING    PFRST PLAST PH2OL PH2OU PH2OD PSTMX PSTMN"
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
 
-    fetchAllQuery = "SELECT SimUnitList.idsim, SimUnitList.StartYear, SimUnitList.EndYear FROM SimUnitList  Where Idsim ='%s';"%(idSim)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
+    fetchAllQuery = statement("dssat.x.years")
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
     
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITPLA"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITPLA"]
     fileContent += v_fmt_simulation["PLANTING"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "PWDINF"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["PWDINF"]
     fileContent += v_fmt_simulation["PFRST"].format(str(dataTable["StartYear"].values[0])[2:4] + format(int(Dv), "03"))
     #fileContent += v_fmt_simulation["PFRST"].format(format(int(Dv), "05"))
-    rw = DT[DT["Champ"] == "PWDINL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["PWDINL"]
     if int(Dv) > 365: 
         fileContent += v_fmt_simulation["PLAST"].format(str(int(dataTable["StartYear"].values[0])+1)[2:4] + format(int(Dv) - 365, "03"))
     else:
         fileContent += v_fmt_simulation["PLAST"].format(str(dataTable["StartYear"].values[0])[2:4] + format(int(Dv), "03"))
     #fileContent += v_fmt_simulation["PLAST"].format(format(int(Dv), "05"))
-    rw = DT[DT["Champ"] == "SWPLTL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SWPLTL"]
     fileContent += v_fmt_simulation["PH2OL"].format(int(Dv))
-    rw = DT[DT["Champ"] == "SWPLTH"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SWPLTH"]
     fileContent += v_fmt_simulation["PH2OU"].format(int(Dv))
-    rw = DT[DT["Champ"] == "SWPLTD"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SWPLTD"]
     fileContent += v_fmt_simulation["PH2OD"].format(int(Dv))
-    rw = DT[DT["Champ"] == "PTX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["PTX"]
     fileContent += v_fmt_simulation["PSTMX"].format(int(Dv))
-    rw = DT[DT["Champ"] == "PTTN"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["PTTN"]
     fileContent += v_fmt_simulation["PSTMN"].format(int(Dv)) + "\n"
     return fileContent
 
@@ -1274,35 +1018,25 @@ def writeBlockAutomaticPlanting(dssat_tableName, dssat_tableId, idSim, modelDict
 def writeBlockAutomaticIrrigation(dssat_tableName, dssat_tableId, idSim, modelDictionary_Connection):
     fileContent = ""
     siteColumnsHeader = "@N IRRIGATION  IMDEP ITHRL ITHRU IROFF IMETH IRAMT IREFF"
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITIRR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITIRR"]
     fileContent += v_fmt_simulation["IRRIGATION"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "DSOIL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["DSOIL"]
     fileContent += v_fmt_simulation["IMDEP"].format(int(Dv))
-    rw = DT[DT["Champ"] == "THETAC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["THETAC"]
     fileContent += v_fmt_simulation["ITHRL"].format(int(Dv))
-    rw = DT[DT["Champ"] == "IEPT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IEPT"]
     fileContent += v_fmt_simulation["ITHRU"].format(int(Dv))
-    rw = DT[DT["Champ"] == "IOFF"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IOFF"]
     fileContent += v_fmt_simulation["IROFF"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "IAME"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["IAME"]
     fileContent += v_fmt_simulation["IMETH"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "AIRAMT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["AIRAMT"]
     fileContent += v_fmt_simulation["IRAMT"].format(int(Dv))
-    rw = DT[DT["Champ"] == "EFFIRR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["EFFIRR"]
     fileContent += v_fmt_simulation["IREFF"].format(int(Dv)) + "\n"
     return fileContent
 
@@ -1310,29 +1044,21 @@ def writeBlockAutomaticIrrigation(dssat_tableName, dssat_tableId, idSim, modelDi
 def writeBlockAutomaticNitrogen(dssat_tableName, dssat_tableId, idSim, modelDictionary_Connection):
     fileContent = ""
     siteColumnsHeader = "@N NITROGEN    NMDEP NMTHR NAMNT NCODE NAOFF"
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITNIT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITNIT"]
     fileContent += v_fmt_simulation["NITROGEN"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "DSOILN"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["DSOILN"]
     fileContent += v_fmt_simulation["NMDEP"].format(int(Dv))
-    rw = DT[DT["Champ"] == "SOILNC"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SOILNC"]
     fileContent += v_fmt_simulation["NMTHR"].format(int(Dv))
-    rw = DT[DT["Champ"] == "SOILNX"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["SOILNX"]
     fileContent += v_fmt_simulation["NAMNT"].format(int(Dv))
-    rw = DT[DT["Champ"] == "NCODE"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["NCODE"]
     fileContent += v_fmt_simulation["NCODE"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "NEND"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["NEND"]
     fileContent += v_fmt_simulation["NAOFF"].format(Dv.strip()) + "\n"
     return fileContent
     
@@ -1340,23 +1066,17 @@ def writeBlockAutomaticNitrogen(dssat_tableName, dssat_tableId, idSim, modelDict
 def writeBlockAutomaticResidue(dssat_tableName, dssat_tableId, idSim, modelDictionary_Connection):
     fileContent = ""
     siteColumnsHeader = "@N RESIDUES    RIPCN RTIME RIDEP"
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     fileContent += siteColumnsHeader + "\n"
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITRES"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITRES"]
     fileContent += v_fmt_simulation["RESIDUES"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "RIP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["RIP"]
     fileContent += v_fmt_simulation["RIPCN"].format(int(Dv))
-    rw = DT[DT["Champ"] == "NRESDL"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["NRESDL"]
     fileContent += v_fmt_simulation["RTIME"].format(int(Dv))
-    rw = DT[DT["Champ"] == "DRESMG"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["DRESMG"]
     fileContent += v_fmt_simulation["RIDEP"].format(int(Dv)) + "\n"
     return fileContent
 
@@ -1364,26 +1084,20 @@ def writeBlockAutomaticResidue(dssat_tableName, dssat_tableId, idSim, modelDicti
 def writeBlockAutomaticHarvest(dssat_tableName, dssat_tableId, idSim, modelDictionary_Connection, master_input_connection):
     fileContent = ""
     siteColumnsHeader = "@N HARVEST     HFRST HLAST HPCNP HPCNR"
-    dssat_queryRead = "Select Champ, Default_Value_Datamill, Variables.defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '%s'));"%(dssat_tableName)
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     fileContent += siteColumnsHeader + "\n"
-    fetchAllQuery = "SELECT SimUnitList.idsim, SimUnitList.EndYear,SimUnitList.EndDay FROM SimUnitList  Where Idsim ='%s';"%(idSim)
-    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
-    rw = DT[DT["Champ"] == "LNSIM"]
-    Dv = rw["dv"].values[0]
+    fetchAllQuery = statement("dssat.x.end")
+    dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
+    Dv = DT["LNSIM"]
     fileContent += v_fmt_simulation["N"].format(float(Dv))
-    rw = DT[DT["Champ"] == "TITHAR"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TITHAR"]
     fileContent += v_fmt_simulation["HARVEST"].format(Dv.strip())
-    rw = DT[DT["Champ"] == "HDLAY"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HDLAY"]
     fileContent += v_fmt_simulation["HFRST"].format(Dv.strip())
     fileContent += v_fmt_simulation["HLAST"].format(str(dataTable["EndYear"].values[0])[2:4] + str(dataTable["EndDay"].values[0]).rjust(3, "0"))
-    rw = DT[DT["Champ"] == "HPP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HPP"]
     fileContent += v_fmt_simulation["HPCNP"].format(int(Dv))
-    rw = DT[DT["Champ"] == "HRP"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["HRP"]
     fileContent += v_fmt_simulation["HPCNR"].format(int(Dv)) + "\n"
     return fileContent
 
@@ -1391,25 +1105,20 @@ def writeBlockAutomaticHarvest(dssat_tableName, dssat_tableId, idSim, modelDicti
 
 def writeBlockTreatment2(dssat_tableName, fileName, idSim, modelDictionary_Connection):
     fileContent = ""
-    dssat_queryRead = f"Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] = '{dssat_tableName}'));"
-    DT = pd.read_sql_query(dssat_queryRead, modelDictionary_Connection)
+    DT = model_defaults(modelDictionary_Connection).table("dssat", dssat_tableName)
     fileContent += "\n"
     fileContent += "$BATCH(EXPERIMENT)\n"
     siteColumnsHeader = '@FILEX                                                                                        TRTNO     RP     SQ     OP     CO'
     fileContent += siteColumnsHeader + "\n"
     fileContent += fileName.ljust(92)
-    rw = DT[DT["Champ"] == "TRTNO"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["TRTNO"]
     fileContent += str(Dv).rjust(7)
-    rw = DT[DT["Champ"] == "ROTNO"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ROTNO"]
     fileContent += str(Dv).rjust(7)
     fileContent += str(1).rjust(7)
-    rw = DT[DT["Champ"] == "ROTOPT"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["ROTOPT"]
     fileContent += str(Dv).rjust(7)
-    rw = DT[DT["Champ"] == "CRPNO"]
-    Dv = rw["dv"].values[0]
+    Dv = DT["CRPNO"]
     fileContent += str(Dv).rjust(7)
     fileContent += "\n"
     return fileContent
@@ -1425,83 +1134,57 @@ class DssatXConverter(Converter):
         ST = directory_path.split(os.sep)
         idSim = ST[-2]
         idMangt = ST[-1]
-        T = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],[Default_Value_Datamill]) As dv From Variables Where ((model = 'dssat') And ([Table] like 'dssat_x_%'));"
-        DT = pd.read_sql_query(T, modelDictionary_Connection)
+        DT = model_defaults(modelDictionary_Connection).tables_like("dssat", "dssat_x_")
         
-        fetchAllQuery  = """Select SimUnitList.idsim, SoilTillPolicy.SoilTillPolicyCode, OrganicFertilizationPolicy.OFertiPolicyCode, 
-        CropManagement.IrrigationPolicyCode, CropManagement.InoFertiPolicyCode 
-        From OrganicFertilizationPolicy INNER Join (SoilTillPolicy INNER Join (CropManagement INNER Join SimUnitList 
-        On CropManagement.idMangt = SimUnitList.idMangt) ON SoilTillPolicy.SoilTillPolicyCode = CropManagement.SoilTillPolicyCode) 
-        ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode Where IdSim='%s'""" % (idSim)
-        dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection)
-
-        rw = DT[DT["Champ"] == "IPLTI"]
-        Dv_planting = rw["dv"].values[0]
-        rw = DT[DT["Champ"] == "IIRRI"]
-        Dv_irri = rw["dv"].values[0]
-        rw = DT[DT["Champ"] == "IFERI"]
-        Dv_ferti = rw["dv"].values[0]
-        rw = DT[DT["Champ"] == "IHARI"]
-        Dv_hari = rw["dv"].values[0]
-        rw = DT[DT["Champ"] == "IRESI"]
-        Dv_resi = rw["dv"].values[0]
+        fetchAllQuery = statement("dssat.x.treatment")
+        dataTable = pd.read_sql_query(fetchAllQuery, master_input_connection, params=(idSim,))
+
+        Dv_planting = DT["IPLTI"]
+        Dv_irri = DT["IIRRI"]
+        Dv_ferti = DT["IFERI"]
+        Dv_hari = DT["IHARI"]
+        Dv_resi = DT["IRESI"]
         
         rows = dataTable.to_dict('records')
-        #rw = DT[DT["Champ"] == "filename"]
-        #Dv = rw["dv"].values[0]
+        #Dv = DT["filename"]
         fileName = f"ITSA1301.{crop}X"
-        #rw = DT[DT["Champ"] == "header"]
-        #Dv = rw["dv"].values[0]
+        #Dv = DT["header"]
         header = f"*EXP.DETAILS: {idSim} "
         fileContent = header + "\n\n"
         fileContent += "*GENERAL\n"
         fileContent += "@PEOPLE\n"
-        rw = DT[DT["Champ"] == "PEOPLE"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["PEOPLE"]
         fileContent += Dv + "\n"
         fileContent += "@ADDRESS\n"
-        rw = DT[DT["Champ"] == "ADDRESS"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["ADDRESS"]
         fileContent += Dv + "\n"
         fileContent += "@SITE\n"
-        rw = DT[DT["Champ"] == "SITE"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["SITE"]
         fileContent += Dv + "\n"
         site_columns_header = "@ PAREA  PRNO  PLEN  PLDR  PLSP  PLAY HAREA  HRNO  HLEN  HARM........."
         fileContent += site_columns_header + "\n"
-        rw = DT[DT["Champ"] == "PAREA"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["PAREA"]
         fileContent += v_fmt_general["PAREA"].format(float(Dv))
-        rw = DT[DT["Champ"] == "PRNO"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["PRNO"]
         fileContent += v_fmt_general["PRNO"].format(float(Dv))
-        rw = DT[DT["Champ"] == "PLEN"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["PLEN"]
         fileContent += v_fmt_general["PLEN"].format(float(Dv))
-        rw = DT[DT["Champ"] == "PLDR"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["PLDR"]
         fileContent += v_fmt_general["PLDR"].format(float(Dv))
-        rw = DT[DT["Champ"] == "PLSP"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["PLSP"]
         fileContent += v_fmt_general["PLSP"].format(float(Dv))
-        rw = DT[DT["Champ"] == "PLAY"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["PLAY"]
         fileContent += v_fmt_general["PLAY"].format(float(Dv))
-        rw = DT[DT["Champ"] == "HAREA"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["HAREA"]
         fileContent += v_fmt_general["HAREA"].format(float(Dv))
-        rw = DT[DT["Champ"] == "HRNO"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["HRNO"]
         fileContent += v_fmt_general["HRNO"].format(float(Dv))
-        rw = DT[DT["Champ"] == "HLEN"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["HLEN"]
         fileContent += v_fmt_general["HLEN"].format(float(Dv))
-        rw = DT[DT["Champ"] == "HARM"]
-        Dv = rw["dv"].values[0] 
+        Dv = DT["HARM"] 
         fileContent += v_fmt_general["HARM"].format(Dv) + "\n"
         fileContent += "@NOTES\n"
-        rw = DT[DT["Champ"] == "NOTES"]
-        Dv = rw["dv"].values[0]
+        Dv = DT["NOTES"]
         fileContent += Dv + "\n\n"
         
         # TREATMENTS
@@ -1,13 +1,212 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import statement
 from sqlite3 import Connection
 import os
+import numpy as np
 import pandas as pd
 import traceback
 
+fetchAllQuery = statement("stics.climat")
+
+# climat.txt columns after "idPoint year ": (name, width), integers as str(), decimals as format(x, ".1f")
+INTEGER_COLUMNS = [("Nmonth", 3), ("NdayM", 3), ("DOY", 4)]
+DECIMAL_COLUMNS = [("tmin", 8), ("tmax", 7), ("srad", 7), ("Etppm", 7), ("rain", 7), ("wind", 7),
+                   ("vapeurp", 7), ("co2", 7)]
+SPACE, DOT, MINUS, ZERO, NEWLINE = (ord(c) for c in " .-0\n")
+
+
+def _digits(magnitudes, negative, width, decimals=0):
+    """ASCII matrix of ``magnitudes`` (integers, scaled by 10**decimals) right-justified in ``width``.
+
+    Returns the matrix and the mask of the rows that fit the width.
+    """
+    out = np.full((len(magnitudes), width), SPACE, dtype=np.uint8)
+    q = magnitudes.copy()
+    position = width - 1
+    for _ in range(decimals):
+        out[:, position] = ZERO + q % 10
+        q //= 10
+        position -= 1
+    if decimals:
+        out[:, position] = DOT
+        position -= 1
+    size = np.ones(len(q), dtype=np.int64)
+    rest = q // 10
+    while rest.any():
+        size += rest > 0
+        rest //= 10
+    for k in range(position + 1):
+        column = position - k
+        out[:, column] = np.where(k < size, ZERO + (q // 10 ** k) % 10, np.where((k == size) & negative, MINUS, SPACE))
+    fits = size + negative + (decimals + 1 if decimals else 0) <= width
+    return out, fits
+
+
+def format_fixed(values, width):
+    """``format(x, ".1f").rjust(width)`` of every value as an ASCII matrix, computed with numpy.
+
+    ``10 * |x|`` is taken as the exact sum ``8|x| + 2|x|`` (TwoSum), so values on or next to a
+    .x5 tie round the way ``format`` rounds the exact binary value. Returns the matrix and the
+    mask of the rows it holds; nan/inf, huge values and values overflowing the width are left
+    for Python to format.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(invalid="ignore", over="ignore"):
+        magnitude = np.abs(values)
+        a, b = magnitude * 8, magnitude * 2
+        scaled = a + b
+        b_part = scaled - a
+        error = (a - (scaled - b_part)) + (b - b_part)
+        floor = np.floor(scaled)
+        half = scaled - floor == 0.5
+        rounded = np.where(half & (error > 0), floor + 1, np.where(half & (error < 0), floor, np.rint(scaled)))
+        exact = np.isfinite(scaled) & (scaled < 1e15)
+        rounded = np.where(exact, rounded, 0).astype(np.int64)
+    out, fits = _digits(rounded, np.signbit(values), width, decimals=1)
+    return out, exact & fits
+
+
+def climate_columns(DA, vapeurp_dv, co2_dv):
+    """climat.txt columns of a RaClimateD frame, with missing values replaced by their defaults."""
+    columns = {name: DA[name] for name in ("idPoint", "year", "Nmonth", "NdayM", "DOY", "tmin", "tmax", "rain")}
+    columns['srad'] = DA['srad'].fillna(-999.9)
+    columns['wind'] = DA['wind'].fillna(-999.9)
+    columns['Etppm'] = pd.to_numeric(DA['Etppm'], errors='coerce').fillna(-999.9)
+    if 'vapeurp' in DA.columns:
+        columns['vapeurp'] = pd.to_numeric(DA['vapeurp'], errors='coerce').fillna(vapeurp_dv)
+    else:
+        columns['vapeurp'] = pd.Series(vapeurp_dv, index=DA.index)
+    # same with co2, if it's not present in the DataFrame, create a Series with default value
+    if 'co2' in DA.columns:
+        columns['co2'] = pd.to_numeric(DA['co2'], errors='coerce').fillna(co2_dv)
+    else:
+        columns['co2'] = pd.Series(co2_dv, index=DA.index)
+    return columns
+
+
+def vectorizable(columns):
+    """True when numpy formats these columns exactly like ``format_legacy``."""
+    idPoint = columns['idPoint']
+    return (
+        pd.api.types.infer_dtype(idPoint, skipna=False) == "string"
+        and bool((idPoint == idPoint.iloc[0]).all())
+        and all(columns[name].dtype.kind in "iu" for name in ("year", "Nmonth", "NdayM", "DOY"))
+        and all(columns[name].dtype.kind in "fiu" for name, _ in DECIMAL_COLUMNS)
+    )
+
+
+def _line(idPoint, values):
+    """One climat.txt line formatted by Python; ``values`` are year and the INTEGER/DECIMAL columns."""
+    year, *values = values
+    integers = "".join(str(value).rjust(width) for value, (_, width) in zip(values, INTEGER_COLUMNS))
+    decimals = "".join(format(value, ".1f").rjust(width)
+                       for value, (_, width) in zip(values[len(INTEGER_COLUMNS):], DECIMAL_COLUMNS))
+    return f"{idPoint} {year} {integers}{decimals}\n"
+
+
+def format_lines(blocks):
+    """climat.txt contents of vectorizable column sets, formatted together.
+
+    ``blocks`` is a list of column dicts of one idPoint each; returns one content per block.
+    """
+    names = ["year"] + [name for name, _ in INTEGER_COLUMNS + DECIMAL_COLUMNS]
+    values = {name: np.concatenate([columns[name].to_numpy() for columns in blocks]) for name in names}
+    year = values["year"]
+    parts = [_digits(np.abs(year), year < 0, 4)]
+    parts[0] = (parts[0][0], parts[0][1] & (year >= 1000))  # str(year) has no padding
+    parts.append((np.full((len(year), 1), SPACE, dtype=np.uint8), True))
+    for name, width in INTEGER_COLUMNS:
+        digits, fits = _digits(np.abs(values[name]), values[name] < 0, width)
+        parts.append((digits, fits & (values[name] >= 0)))
+    parts.extend(format_fixed(values[name], width) for name, width in DECIMAL_COLUMNS)
+    parts.append((np.full((len(year), 1), NEWLINE, dtype=np.uint8), True))
+    body = np.hstack([digits for digits, _ in parts])
+    exact = np.logical_and.reduce([np.broadcast_to(fits, len(year)) for _, fits in parts])
+
+    contents, start = [], 0
+    for columns in blocks:
+        stop = start + len(columns["year"])
+        prefix = (str(columns["idPoint"].iloc[0]) + " ").encode()
+        lines = np.empty((stop - start, len(prefix) + body.shape[1]), dtype=np.uint8)
+        lines[:, :len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+        lines[:, len(prefix):] = body[start:stop]
+        if exact[start:stop].all():
+            contents.append(lines.tobytes().decode())
+        else:
+            contents.append("".join(
+                lines[row].tobytes().decode() if exact[start + row]
+                else _line(columns["idPoint"].iloc[0], [values[name][start + row].item() for name in names])
+                for row in range(stop - start)
+            ))
+        start = stop
+    return contents
+
+
+def format_legacy(columns):
+    """climat.txt content formatted value by value, for columns numpy cannot format exactly."""
+    lines = (
+        columns['idPoint'] + ' ' +
+        columns['year'].astype(str) + ' ' +
+        columns['Nmonth'].astype(str).str.rjust(3) +
+        columns['NdayM'].astype(str).str.rjust(3) +
+        columns['DOY'].astype(str).str.rjust(4) +
+        columns['tmin'].apply(lambda x: format(x, ".1f")).str.rjust(8) +
+        columns['tmax'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
+        columns['srad'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
+        columns['Etppm'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
+        columns['rain'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
+        columns['wind'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
+        columns['vapeurp'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
+        columns['co2'].apply(lambda x: format(x, ".1f")).str.rjust(7) + '\n'
+    )
+    return ''.join(lines.tolist())
+
+
 class SticsClimatConverter(Converter):
     def __init__(self):
         super().__init__()
 
+    @staticmethod
+    def climate_frame(master_input_connection, idPoint, start_year, end_year, climate=None):
+        """RaClimateD rows of one climat.txt, from the climate store when there is one."""
+        if climate is not None:
+            return climate.frame(idPoint, start_year, end_year)
+        return pd.read_sql_query(
+            fetchAllQuery,
+            master_input_connection,
+            params=(idPoint, start_year, end_year),
+        )
+
+    @staticmethod
+    def render_many(keys, ModelDictionary_Connection, master_input_connection, climate=None):
+        """climat.txt contents of several (idPoint, StartYear, EndYear) keys, formatted in one pass.
+
+        Keys without climate data are left out; ``export`` reports them.
+        """
+        defaults = model_defaults(ModelDictionary_Connection)
+        vapeurp_dv = defaults.number("sticsv11", "climat", "vapeurp")
+        co2_dv = defaults.number("sticsv11", "climat", "co2")
+        keys = list(dict.fromkeys(keys))
+        contents, batch = {}, []
+        for key in keys:
+            idPoint, start_year, end_year = key
+            if int(end_year) < int(start_year):
+                continue
+            DA = SticsClimatConverter.climate_frame(
+                master_input_connection, idPoint, int(start_year), int(end_year), climate)
+            if DA.empty:
+                continue
+            columns = climate_columns(DA, vapeurp_dv, co2_dv)
+            if vectorizable(columns):
+                batch.append((key, columns))
+            else:
+                contents[key] = format_legacy(columns)
+        if batch:
+            for (key, _), content in zip(batch, format_lines([columns for _, columns in batch])):
+                contents[key] = content
+        return {key: contents[key] for key in keys if key in contents}
+
     def export(
         self,
         directory_path,
@@ -16,6 +215,7 @@ class SticsClimatConverter(Converter):
         usmdir,
         start_year=None,
         end_year=None,
+        climate=None,
     ):
         file_name = "climat.txt"
         fileContent = ""
@@ -39,19 +239,8 @@ class SticsClimatConverter(Converter):
                 f"EndYear ({end_year}) must be greater than or equal to "
                 f"StartYear ({start_year}) for {idsim}"
             )
-        T = "Select   Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'sticsv11') And ([Table]= 'climat'));"
-        DT = pd.read_sql_query(T, ModelDictionary_Connection)
-        fetchAllQuery = """
-            SELECT *
-            FROM RaClimateD
-            WHERE idPoint = ? AND Year BETWEEN ? AND ?
-            ORDER BY w_date
-        """
-        DA = pd.read_sql_query(
-            fetchAllQuery,
-            master_input_connection,
-            params=(Site, start_year, end_year),
-        )
+        defaults = model_defaults(ModelDictionary_Connection)
+        DA = self.climate_frame(master_input_connection, Site, start_year, end_year, climate)
         if DA.empty:
             raise ValueError(
                 f"No climate data for idPoint={Site}, years "
@@ -59,42 +248,15 @@ class SticsClimatConverter(Converter):
             )
         
         # Pre-cache default values
-        vapeurp_dv = float(DT[DT["Champ"] == "vapeurp"]["dv"].values[0])
-        co2_dv = float(DT[DT["Champ"] == "co2"]["dv"].values[0])
-        
-        # Process data in bulk
-        DA['srad'] = DA['srad'].fillna(-999.9)
-        DA['wind'] = DA['wind'].fillna(-999.9)
-        DA['Etppm'] = pd.to_numeric(DA['Etppm'], errors='coerce').fillna(-999.9)
-        if 'vapeurp' in DA.columns:
-            vapeurp_values = pd.to_numeric(DA['vapeurp'], errors='coerce').fillna(vapeurp_dv)
-        else:
-            vapeurp_values = pd.Series(vapeurp_dv, index=DA.index)
-        
-        # same with co2, if it's not present in the DataFrame, create a Series with default value
-        if 'co2' in DA.columns:
-            co2_values = pd.to_numeric(DA['co2'], errors='coerce').fillna(co2_dv)
-        else:
-            co2_values = pd.Series(co2_dv, index=DA.index)
+        vapeurp_dv = defaults.number("sticsv11", "climat", "vapeurp")
+        co2_dv = defaults.number("sticsv11", "climat", "co2")
         
         # Format all lines at once
-        lines = (
-            DA['idPoint'] + ' ' + 
-            DA['year'].astype(str) + ' ' +
-            DA['Nmonth'].astype(str).str.rjust(3) +
-            DA['NdayM'].astype(str).str.rjust(3) +
-            DA['DOY'].astype(str).str.rjust(4) +
-            DA['tmin'].apply(lambda x: format(x, ".1f")).str.rjust(8) +
-            DA['tmax'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
-            DA['srad'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
-            DA['Etppm'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
-            DA['rain'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
-            DA['wind'].apply(lambda x: format(x, ".1f")).str.rjust(7) +
-            vapeurp_values.apply(lambda x: format(x, ".1f")).str.rjust(7) +
-            co2_values.apply(lambda x: format(x, ".1f")).str.rjust(7) + '\n'
-        )
-        
-        fileContent = ''.join(lines.tolist())        
+        columns = climate_columns(DA, vapeurp_dv, co2_dv)
+        if vectorizable(columns):
+            fileContent = format_lines([columns])[0]
+        else:
+            fileContent = format_legacy(columns)
         try:
             # Export file to specified directory    
             self.write_file(usmdir, file_name, fileContent)
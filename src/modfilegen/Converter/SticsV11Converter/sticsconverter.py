@@ -1,15 +1,21 @@
-from modfilegen import GlobalVariables
+from modfilegen import GlobalVariables, climatestore, filestore, outputsink, queries, resultsink, scratch, workspaces
 from modfilegen.converter import Converter
+from modfilegen.indexadvisor import advise_indexes
+from modfilegen.masterinput import normalize_keys
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.runartifacts import RunArtifacts
+from modfilegen.simulations import SimulationSource
 from . import sticstempoparv6converter, sticsficiniconverter, sticsnewtravailconverter, sticsparamsolconverter
 from . import sticstempoparconverter, sticsclimatconverter, sticsfictec1converter
-from . import sticsstationconverter, sticsficplt1converter
+from . import sticsstationconverter, sticsficplt1converter, sticssoilcatalogue, sticsrunner, sticsreports
+from .sticssnapshot import SticsInputSnapshot
 import subprocess
 import re
 import os
 import sqlite3
 from sqlite3 import Connection
-from pathlib import Path
 from multiprocessing import Pool
+import numpy as np
 import pandas as pd
 from time import time
 import traceback
@@ -18,12 +24,24 @@ import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor
 import sys
 import gc
+import heapq
+from itertools import islice
 
 
 
-SUMMARY_COLS = ["Model","Idsim","Texte","Planting","Emergence","Ant","Mat","Biom_ma","Yield","GNumber","MaxLai","Nleac","SoilN","CroN_ma","CumE","Transp"]
+SUMMARY_COLS = ["Model","Idsim","Texte","SeasonOrder","Planting","Emergence","Ant","Mat","Biom_ma","Yield","GNumber","MaxLai","Nleac","SoilN","CroN_ma","CumE","Transp"]
 DAILY_OUTPUT_TABLE = "SticsDailyOutput"
 PROFILE_OUTPUT_TABLE = "SticsProfile"
+CLIMAT_BATCH = 256  # climat.txt files formatted together by a worker
+FICTEC_CACHE_SIZE = 20000  # fictec files a worker keeps across the chunks of a run
+# Missing or malformed input data: a batched rendering that meets one leaves the simulations
+# to their export, which reports the error for each of them
+DATA_ERRORS = (KeyError, IndexError, ValueError, TypeError, sqlite3.Error)
+# Inputs every simulation writes again: a reused workspace slot keeps them between simulations
+USM_INPUT_FILES = (
+    "tempoparv6.sti", "tempopar.sti", "param.sol", "station.txt", "prof.mod", "rap.mod", "var.mod",
+    "new_travail.usm", "ficini.txt", "climat.txt", "fictec1.txt", "ficplt1.txt",
+)
 
 def get_coord(d):
     res = re.findall(r"([-]?\d+[.]?\d+)[_]", d)
@@ -32,38 +50,11 @@ def get_coord(d):
     year = int(float(res[2]))
     return {'lon': lon, 'lat': lat, 'year': year}
 
-def remove_comma(f):
-    try:
-        with open(f, "r") as fil:
-            cod =fil.readlines()
-        if cod[-1].endswith(";\n"):
-            cod[-1] = cod[-1].replace(";\n", "\n")
-        with open(f, "w") as fil:
-            fil.writelines(cod)
-    except Exception as e:
-        print(f"Error removing comma in file {f}: {e}")
-        raise
-
 def create_df_summary(f, dt, idsim, plant_role=""):
-    #d_name = os.path.dirname(f).split(os.path.sep)[-1]
-    #d_name = Path(f).stem[len("mod_rapport_"):]
-    remove_comma(f)
-    if dt == 1: c = get_coord(idsim)
-    df = pd.read_csv(f, sep=';', skipinitialspace=True)
-    # STICS may leave repeated report headers when a working directory is reused.
-    # Keep only actual result rows so rerunning the same idsim remains idempotent.
-    numeric_ansemis = pd.to_numeric(df["ansemis"], errors="coerce")
-    df = df.loc[numeric_ansemis.notna()].copy()
-    df["ansemis"] = numeric_ansemis.loc[numeric_ansemis.notna()]
-    df = df.reset_index().rename(columns={"iplts": "Planting","ilevs":"Emergence","iflos":"Ant","imats":"Mat","masec(n)":"Biom_ma","mafruit":"Yield","chargefruit":'GNumber',"laimax":"MaxLai","Qles":"Nleac","QNapp":"SoilN","QNplante":"CroN_ma","ces":"CumE","cep":"Transp", "cep2": "Transp"})
-    df.insert(0, "Model", "Stics")
-    df.insert(1, "Idsim", idsim)
-    df.insert(2, "Texte", plant_role)
-    df['time'] = df['ansemis'].astype(float).astype(int)
-    if dt == 1:
-        df['lon'] = c['lon']
-        df['lat'] = c['lat']
-    return df
+    """Summary rows of one report as a DataFrame (process_chunk gathers a chunk's reports at once)."""
+    summaries = sticsreports.SummaryAccumulator()
+    summaries.add(f, idsim, plant_role, coordinates=get_coord(idsim) if dt == 1 else None)
+    return summaries.frame()
 
 
 def create_df_daily(daily_file, idsim, season_order=1, plant_role=""):
@@ -79,15 +70,13 @@ def create_df_daily(daily_file, idsim, season_order=1, plant_role=""):
     return daily
 
 
-def collect_daily_outputs(directory_path, key, idsim, season_order, is_mixed_crop):
-    """Read and remove every copied mod_s file for one STICS execution."""
+def read_daily_outputs(usmdir, idsim, season_order, is_mixed_crop):
+    """Read every mod_s file the last STICS run wrote in ``usmdir``."""
     daily_frames = []
-    pattern = f"mod_s_{key}__mod_s*.sti"
-    for daily_path in sorted(Path(directory_path).glob(pattern)):
-        source_name = daily_path.stem.split("__", 1)[-1]
+    for daily_path in sticsrunner.daily_outputs(usmdir):
         plant_role = ""
         if is_mixed_crop:
-            suffix = source_name[len("mod_s"):].lower()
+            suffix = daily_path.stem[len("mod_s"):].lower()
             if suffix.startswith("a"):
                 plant_role = "A"
             elif suffix.startswith("p"):
@@ -95,48 +84,55 @@ def collect_daily_outputs(directory_path, key, idsim, season_order, is_mixed_cro
         daily_frames.append(
             create_df_daily(daily_path, idsim, season_order, plant_role)
         )
-        daily_path.unlink()
     return daily_frames
 
 
+def _constant(value, length):
+    """Categorical column holding ``value`` on every row: one code per row, one string."""
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[value])
+
+
 def create_df_profile(profile_file, idsim, season_order=1, plant_role=""):
-    """Convert one STICS v11 profile matrix to normalized long form."""
+    """Convert one STICS v11 profile matrix to normalized long form.
+
+    The file is read once into a numpy matrix; the repeated string columns are categorical.
+    """
     with open(profile_file, "r") as profile_stream:
         variable = profile_stream.readline().strip()
         header = profile_stream.readline().split()
-    if len(header) < 2 or header[0].lower() != "cm":
-        raise ValueError(f"Invalid STICS profile header in {profile_file}")
-
-    julian_days = [int(value) for value in header[1:]]
-    profile = pd.read_csv(
-        profile_file,
-        sep=r"\s+",
-        skiprows=2,
-        header=None,
-        names=["depth_cm", *julian_days],
-    )
-    profile = profile.melt(
-        id_vars="depth_cm", var_name="jul", value_name="value"
-    )
-    profile["depth_cm"] = pd.to_numeric(profile["depth_cm"], errors="raise")
-    profile["jul"] = pd.to_numeric(profile["jul"], errors="raise").astype(int)
-    profile.insert(0, "variable", variable)
-    profile.insert(0, "Texte", plant_role)
-    profile.insert(0, "SeasonOrder", int(season_order))
-    profile.insert(0, "Idsim", str(idsim))
-    profile.insert(0, "Model", "Stics")
-    return profile
-
-
-def collect_profile_outputs(directory_path, key, idsim, season_order, is_mixed_crop):
-    """Read and remove every copied profile file for one STICS execution."""
+        if len(header) < 2 or header[0].lower() != "cm":
+            raise ValueError(f"Invalid STICS profile header in {profile_file}")
+        julian_days = np.array([int(value) for value in header[1:]], dtype=np.int64)
+        try:
+            values = np.array(profile_stream.read().split(), dtype=np.float64)
+            matrix = values.reshape(-1, len(header))
+        except ValueError as e:
+            raise ValueError(f"Invalid STICS profile values in {profile_file}: {e}") from e
+
+    depths = matrix[:, 0]
+    if np.array_equal(depths, np.trunc(depths)):
+        depths = depths.astype(np.int64)
+    # long form, one day after the other (the order DataFrame.melt gave)
+    length = matrix.shape[0] * len(julian_days)
+    return pd.DataFrame({
+        "Model": _constant("Stics", length),
+        "Idsim": _constant(str(idsim), length),
+        "SeasonOrder": np.full(length, int(season_order), dtype=np.int64),
+        "Texte": _constant(plant_role, length),
+        "variable": _constant(variable, length),
+        "depth_cm": np.tile(depths, len(julian_days)),
+        "jul": np.repeat(julian_days, matrix.shape[0]),
+        "value": matrix[:, 1:].T.ravel(),
+    })
+
+
+def read_profile_outputs(usmdir, idsim, season_order, is_mixed_crop):
+    """Read every profile file the last STICS run wrote in ``usmdir``."""
     profile_frames = []
-    pattern = f"mod_profil_{key}__mod_profil*.sti"
-    for profile_path in sorted(Path(directory_path).glob(pattern)):
-        source_name = profile_path.stem.split("__", 1)[-1]
+    for profile_path in sticsrunner.profile_outputs(usmdir):
         plant_role = ""
         if is_mixed_crop:
-            suffix = source_name[len("mod_profil"):].lower()
+            suffix = profile_path.stem[len("mod_profil"):].lower()
             if suffix.startswith("a"):
                 plant_role = "A"
             elif suffix.startswith("p"):
@@ -144,10 +140,17 @@ def collect_profile_outputs(directory_path, key, idsim, season_order, is_mixed_c
         profile_frames.append(
             create_df_profile(profile_path, idsim, season_order, plant_role)
         )
-        profile_path.unlink()
     return profile_frames
 
 
+def write_outputs(sink, usmdir, idsim, season_order, is_mixed_crop):
+    """Append the daily and profile outputs of the last STICS run in ``usmdir`` to ``sink``."""
+    for frame in read_daily_outputs(usmdir, idsim, season_order, is_mixed_crop):
+        sink.append(DAILY_OUTPUT_TABLE, frame)
+    for frame in read_profile_outputs(usmdir, idsim, season_order, is_mixed_crop):
+        sink.append(PROFILE_OUTPUT_TABLE, frame)
+
+
 
 def common_rap():
     fileContent = ""
@@ -248,8 +251,7 @@ def common_tempoparv6(modelDictionary):
     ModelDictionary_Connection = sqlite3.connect(modelDictionary)
 
     # Tempopar query
-    T = "Select  Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model='sticsv11') AND ([Table]='st_tempoparv6'));"
-    DT = pd.read_sql_query(T,ModelDictionary_Connection)
+    DT = model_defaults(ModelDictionary_Connection).table("sticsv11", "st_tempoparv6")
 
     fileContent += format_stics_data_v6(DT, "codepluiepoquet")
     fileContent += format_stics_data_v6(DT, "nbjoursrrversirrig")
@@ -293,11 +295,10 @@ def format_stics_data_v6(row, champ, precision=5, field_it=0):
         # champ = champ + str(field_it)
 
     # Fetch data
-    rw = row[row['Champ'] == champ]
-    if len(rw) == 0:
+    if champ not in row:
         pass
     else:
-        data = rw["dv"].values[0]
+        data = row[champ]
         res = ""
 
         # If type is string or int
@@ -319,10 +320,21 @@ def format_stics_data_v6(row, champ, precision=5, field_it=0):
         file_content += res + "\n"
     return file_content
     
+def common_tempopar_variants(MasterInput, tppar):
+    """tempopar.sti of every SimulationOptions row, by option id; empty when it cannot be read."""
+    MasterInput_Connection = queries.connect_readonly(MasterInput)
+    try:
+        return sticstempoparconverter.tempopar_variants(MasterInput_Connection, tppar)
+    except Exception as e:
+        print(f"tempopar.sti variants not rendered, simulations will export their own: {e}")
+        traceback.print_exc()
+        return {}
+    finally:
+        MasterInput_Connection.close()
+
 def common_tempopar(ModelDictionary):
     ModelDictionary_Connection = sqlite3.connect(ModelDictionary)
-    T = "Select  Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model='sticsv11') AND ([Table]='st_tempopar')) OR ((model='sticsv11') AND ([Table]='st_tempopar_2')) OR ((model='sticsv11') AND ([Table]='st_tempopar_3'));"
-    DT = pd.read_sql_query(T,ModelDictionary_Connection)
+    DT = model_defaults(ModelDictionary_Connection).tables("sticsv11", "st_tempopar", "st_tempopar_2", "st_tempopar_3")
 
     # Ajouter les résultats à file_content
     fileContent = ""
@@ -886,8 +898,7 @@ def format_stics_data(row, champ, precision=5, field_it=0):
         champ = champ + str(field_it) 
 
     # Fetch data
-    rw = row[row['Champ'] == champ]
-    data = rw["dv"].values[0]
+    data = row[champ]
     res = ""
 
     # If type is string or int
@@ -909,29 +920,105 @@ def format_stics_data(row, champ, precision=5, field_it=0):
     file_content += res + "\n"
     return file_content
 
-def write_file(directory, filename, content):
+def write_file(directory, filename, content, store=None):
+    """Write ``content`` to ``directory/filename``, hard-linked from ``store`` when one is given."""
     try:
+        if store is not None:
+            store.place(directory, filename, content)
+            return
+        filestore.unshare(os.path.join(directory, filename))
         with open(os.path.join(directory, filename), "w") as f:
             f.write(content)
     except Exception as e:
         print(f"Error writing file {filename} in {directory}: {e}")
         
+# fictec1/fictec2 contents rendered in this process, by run (artifacts path) then tecid
+_fictec_cache = {}
+
+
+def fictec_cache(run):
+    """fictec contents this worker rendered for ``run``, by tecid; a new run starts empty."""
+    if run not in _fictec_cache:
+        _fictec_cache.clear()
+        _fictec_cache[run] = {}
+    return _fictec_cache[run]
+
+
+def report_unexpected(rendering):
+    """Print an error that is not a data error before falling back to the export of each simulation."""
+    print(f"Unexpected error in {rendering}, exporting each simulation instead:", flush=True)
+    traceback.print_exc()
+
+
 def process_chunk(*args):
-    chunk, mi, md, tpv6,tppar, directoryPath,pltfolder, rap, var, prof, dt, tempDir, *options = args
+    chunk, mi, md, artifacts, directoryPath,pltfolder, dt, tempDir, *options = args
     dailyoutput = int(options[0]) if options else 0
-    dataframes = []
+    # output shard the daily and profile rows are appended to after each run
+    outputs = options[1] if len(options) > 1 else None
+    # Static files come from the run artifacts, simulations from SimUnitList keys
+    tpv6, tppar = artifacts["tempoparv6"], artifacts["tempopar"]
+    rap, var, prof = artifacts["rap"], artifacts["var"], artifacts["prof"]
+    tempopar_variants = artifacts["tempopar_variants"]
+    chunk = list(chunk)
+    # report values of the whole chunk, turned into one DataFrame at the end
+    summaries = sticsreports.SummaryAccumulator()
     # Apply series of functions to each row in the chunk
     weathertable = {}
     soiltable = {}
     tempopar = {}
-    tectable = {}
+    tectable = fictec_cache(artifacts.path)
     initable = {}
     
     # Clear caches periodically to prevent memory buildup
     CACHE_CLEAR_INTERVAL = 50000
 
-    ModelDictionary_Connection = sqlite3.connect(md)
-    MasterInput_Connection = sqlite3.connect(mi)
+    ModelDictionary_Connection = queries.copy_to_memory(md)
+    MasterInput_Connection = queries.connect_readonly(mi)
+    # One set-based read of every MasterInput row the chunk needs.
+    snapshot = SticsInputSnapshot.load(MasterInput_Connection, chunk)
+    climate = climatestore.open_store(climatestore.store_directory(tempDir))
+    soils = sticssoilcatalogue.open_catalogue(sticssoilcatalogue.catalogue_directory(tempDir))
+    # shared contents are written once and hard-linked into the USM directories: reusable
+    # slots of this worker, in RAM with a tmpfs scratch; dt=0 keeps one directory per simulation
+    usms = workspaces.worker_workspaces(tempDir, keep=int(dt) != 1, refreshed=USM_INPUT_FILES,
+                                        scratch=scratch.open_scratch(tempDir))
+    # climat.txt files of the chunk, formatted CLIMAT_BATCH at a time in the order they are needed
+    pending_climats = {}
+    for row in chunk:
+        pending_climats.setdefault(".".join([str(row["idPoint"]), str(row["StartYear"])]),
+                                   (str(row["idPoint"]), row["StartYear"], row["EndYear"]))
+    rendered_climats = {}
+    try:
+        newtravail_template = sticsnewtravailconverter.NewTravailTemplate.from_connection(ModelDictionary_Connection)
+    except DATA_ERRORS:
+        newtravail_template = None  # export below raises the error for each simulation
+    except Exception:
+        report_unexpected("the new_travail template")
+        newtravail_template = None
+    # fictec files of the chunk's new management x soil pairs, rendered in one pass
+    if len(tectable) > FICTEC_CACHE_SIZE:
+        tectable.clear()
+    fictec1converter = sticsfictec1converter.SticsFictec1Converter()
+    try:
+        fictec_templates = sticsfictec1converter.FictecTemplates(ModelDictionary_Connection)
+    except DATA_ERRORS:
+        fictec_templates = None  # export below raises the error for each simulation
+    except Exception:
+        report_unexpected("the fictec templates")
+        fictec_templates = None
+    for row in (chunk if fictec_templates is not None else []):
+        tecid = ".".join([str(row["idMangt"]), str(row["idsoil"])])
+        if tecid in tectable:
+            continue
+        try:
+            r = fictec1converter.render(str(row["idsim"]), ModelDictionary_Connection, MasterInput_Connection,
+                                        snapshot=snapshot, templates=fictec_templates)
+        except DATA_ERRORS:
+            continue  # export below raises the error for this simulation
+        except Exception:
+            report_unexpected(f"the fictec files of {row['idsim']}")
+            continue
+        tectable[tecid] = r[0] if len(r) == 1 else r
         
     for i, row in enumerate(chunk):
         # Periodically clear caches to free memory
@@ -945,117 +1032,122 @@ def process_chunk(*args):
             # Also trigger garbage collection
             import gc
             gc.collect()
-        print(f"Iteration {i}", flush=True)
         # Création du chemin du fichier
         idsim = str(row["idsim"])
         simPath = os.path.join(directoryPath, idsim, str(row["idPoint"]), str(row["StartYear"]))
-        usmdir = os.path.join(tempDir, idsim)
             
         try:
             # Tempoparv6
-            Path(usmdir).mkdir(parents=True, exist_ok=True)
-            for report_name in (
-                "mod_rapport.sti", "mod_rapportA.sti", "mod_rapportP.sti"
-            ):
-                report_file = Path(usmdir) / report_name
-                if report_file.exists():
-                    report_file.unlink()
-            if dailyoutput == 1:
-                for daily_file in Path(usmdir).glob("mod_s*.sti"):
-                    daily_file.unlink()
-                for profile_file in Path(usmdir).glob("mod_profil*.sti"):
-                    profile_file.unlink()
-            write_file(usmdir, "tempoparv6.sti", tpv6)
-
-            # Tempopar
+            usmdir = usms.acquire(idsim)
+            files = usms.store()  # on the file system of usmdir
+            sticsrunner.clear_outputs(usmdir, dailyoutput)
+            write_file(usmdir, "tempoparv6.sti", tpv6, files)
+
+            # Tempopar: rendered once per run for every SimulationOptions row
             tempoparid =  row["idOption"]
-            if tempoparid not in tempopar:            
+            if tempoparid is not None and str(tempoparid) in tempopar_variants:
+                write_file(usmdir, "tempopar.sti", tempopar_variants[str(tempoparid)], files)
+            elif tempoparid not in tempopar:            
                 tempoparConverter = sticstempoparconverter.SticsTempoparConverter()
-                r = tempoparConverter.export(simPath, MasterInput_Connection, tppar, usmdir)
+                r = tempoparConverter.export(simPath, MasterInput_Connection, tppar, usmdir, snapshot=snapshot)
                 tempopar[tempoparid] = r
                 del tempoparConverter  # Free converter object
             else:
-                write_file(usmdir, "tempopar.sti", tempopar[tempoparid])
+                write_file(usmdir, "tempopar.sti", tempopar[tempoparid], files)
 
             # Soil Station
             is_mixed_crop = bool(row["is_mixed_crop"])
             soilid =  (row["idsoil"], is_mixed_crop)
             if soilid not in soiltable:
-                paramsolconverter = sticsparamsolconverter.SticsParamSolConverter()
-                r1 = paramsolconverter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, usmdir)
-                del paramsolconverter  # Free converter
+                r1 = soils.param_sol(row["idsoil"]) if soils is not None else None
+                if r1 is not None:
+                    write_file(usmdir, "param.sol", r1, files)
+                else:
+                    paramsolconverter = sticsparamsolconverter.SticsParamSolConverter()
+                    r1 = paramsolconverter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, usmdir, snapshot=snapshot)
+                    del paramsolconverter  # Free converter
                 stationconverter = sticsstationconverter.SticsStationConverter()
-                r2 = stationconverter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, rap, var, prof, usmdir)         
+                r2 = stationconverter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, rap, var, prof, usmdir, snapshot=snapshot)         
                 soiltable[soilid] = [r1, r2]
                 del stationconverter  # Free converter
             else:
-                write_file(usmdir, "param.sol", soiltable[soilid][0])
-                write_file(usmdir, "station.txt", soiltable[soilid][1])
-                write_file(usmdir, "prof.mod",  prof)
-                write_file(usmdir, "rap.mod",  rap)
-                write_file(usmdir, "var.mod",  var)
+                write_file(usmdir, "param.sol", soiltable[soilid][0], files)
+                write_file(usmdir, "station.txt", soiltable[soilid][1], files)
+                write_file(usmdir, "prof.mod",  prof, files)
+                write_file(usmdir, "rap.mod",  rap, files)
+                write_file(usmdir, "var.mod",  var, files)
             
             # NewTravail
             newtravailconverter = sticsnewtravailconverter.SticsNewTravailConverter()
-            newtravailconverter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, usmdir)
+            newtravailconverter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, usmdir, snapshot=snapshot,
+                                       template=newtravail_template)
             del newtravailconverter  # Free converter
             
             # Init  
             iniid =  ".".join([str(row["idsoil"]), str(row["idIni"])])    
             if iniid not in initable:            
                 ficiniconverter = sticsficiniconverter.SticsFicIniConverter()
-                r = ficiniconverter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, usmdir)
+                r = ficiniconverter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, usmdir, snapshot=snapshot)
                 initable[iniid] = r
                 del ficiniconverter  # Free converter
             else:
-                write_file(usmdir, "ficini.txt", initable[iniid])
+                write_file(usmdir, "ficini.txt", initable[iniid], files)
             
             # Climat
             climid =  ".".join([str(row["idPoint"]), str(row["StartYear"])])
             if climid not in weathertable:
-                climatconverter = sticsclimatconverter.SticsClimatConverter()
-                r = climatconverter.export(
-                    simPath,
-                    ModelDictionary_Connection,
-                    MasterInput_Connection,
-                    usmdir,
-                    start_year=row["StartYear"],
-                    end_year=row["EndYear"],
-                )
+                if climid not in rendered_climats and climid in pending_climats:
+                    batch = {key: pending_climats.pop(key) for key in list(islice(pending_climats, CLIMAT_BATCH))}
+                    try:
+                        contents = sticsclimatconverter.SticsClimatConverter.render_many(
+                            batch.values(), ModelDictionary_Connection, MasterInput_Connection, climate=climate)
+                    except DATA_ERRORS:
+                        contents = {}  # export below raises the error for each simulation
+                    except Exception:
+                        report_unexpected("the climat.txt batch")
+                        contents = {}
+                    rendered_climats.update((key, contents[years]) for key, years in batch.items() if years in contents)
+                r = rendered_climats.pop(climid, None)
+                if r is not None:
+                    write_file(usmdir, "climat.txt", r, files)
+                else:  # not rendered: export reports missing climate data
+                    climatconverter = sticsclimatconverter.SticsClimatConverter()
+                    r = climatconverter.export(
+                        simPath,
+                        ModelDictionary_Connection,
+                        MasterInput_Connection,
+                        usmdir,
+                        start_year=row["StartYear"],
+                        end_year=row["EndYear"],
+                        climate=climate,
+                    )
+                    del climatconverter  # Free converter
                 weathertable[climid] = r
-                del climatconverter  # Free converter
             else:
-                write_file(usmdir, "climat.txt", weathertable[climid])
+                write_file(usmdir, "climat.txt", weathertable[climid], files)
             
             # Fictec1
             tecid =  ".".join([str(row["idMangt"]), str(row["idsoil"])]) 
             if tecid not in tectable:  
-                fictec1converter = sticsfictec1converter.SticsFictec1Converter()
-                r = fictec1converter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, usmdir)
+                r = fictec1converter.export(simPath, ModelDictionary_Connection, MasterInput_Connection, usmdir, snapshot=snapshot,
+                                            templates=fictec_templates)
                 tectable[tecid] = r
-                del fictec1converter  # Free converter
             else:
                 if isinstance(tectable[tecid], list) and len(tectable[tecid]) == 2:
-                    write_file(usmdir, "fictec1.txt", tectable[tecid][0])
-                    write_file(usmdir, "fictec2.txt", tectable[tecid][1])
-                else: write_file(usmdir, "fictec1.txt", tectable[tecid])
+                    write_file(usmdir, "fictec1.txt", tectable[tecid][0], files)
+                    write_file(usmdir, "fictec2.txt", tectable[tecid][1], files)
+                else: write_file(usmdir, "fictec1.txt", tectable[tecid], files)
             
             # Ficplt1   
             ficplt1converter = sticsficplt1converter.SticsFicplt1Converter()
-            ficplt1converter.export(simPath, MasterInput_Connection, pltfolder, usmdir)
+            ficplt1converter.export(simPath, MasterInput_Connection, pltfolder, usmdir, snapshot=snapshot)
             del ficplt1converter  # Free converter
 
             # run stics
-            bs = os.path.join(Path(__file__).parent, "sticsrun.sh")
             try:
-                result = subprocess.run(
-                    ["bash", bs, usmdir, directoryPath, str(dt), str(dailyoutput)],
-                    capture_output=True, check=True, text=True, timeout=180,
-                )
+                result = sticsrunner.run(usmdir)
             except subprocess.TimeoutExpired as e:
-                print(f"⏰ STICS run timed out for {usmdir}. Killing...")
-                # Forcefully terminate the process if it hangs
-                #result.kill()  # Python 3.9+
+                print(f"⏰ STICS run timed out for {usmdir}. Killed.")
                 raise e
 
             except subprocess.CalledProcessError as e:
@@ -1075,75 +1167,44 @@ def process_chunk(*args):
             # get the file "mod_rapport.sti" in the usmdir directory
             if is_mixed_crop:
                 reports = [
-                    ("A", os.path.join(directoryPath, f"mod_rapportA_{idsim}.sti")),
-                    ("P", os.path.join(directoryPath, f"mod_rapportP_{idsim}.sti")),
+                    ("A", os.path.join(usmdir, "mod_rapportA.sti")),
+                    ("P", os.path.join(usmdir, "mod_rapportP.sti")),
                 ]
             else:
                 reports = [
-                    ("", os.path.join(directoryPath, f"mod_rapport_{idsim}.sti")),
+                    ("", os.path.join(usmdir, "mod_rapport.sti")),
                 ]
             for plant_role, report_path in reports:
                 if not os.path.exists(report_path):
                     print(f"Warning: {report_path} does not exist")
                     continue
-
-                plant_df = create_df_summary(
-                    report_path,
-                    dt,
-                    idsim,
-                    plant_role,
-                )
-                dataframes.append(plant_df)
-                os.remove(report_path)
-
-                del plant_df  # Free df after appending
+                # SeasonOrder 1: the same result columns as the rotations' seasons
+                summaries.add(report_path, idsim, plant_role,
+                              coordinates=get_coord(idsim) if dt == 1 else None, season_order=1)
+            if dailyoutput == 1 and outputs is not None:
+                write_outputs(outputs, usmdir, idsim, 1, is_mixed_crop)
 
         except Exception as ex:
             print("Error during Running STICS  :", ex)
             traceback.print_exc()
             raise
-    if not dataframes:
-        print("No dataframes to concatenate.")
-        ModelDictionary_Connection.close()
-        MasterInput_Connection.close()
-        # Clear all caches
-        weathertable.clear()
-        soiltable.clear()
-        tempopar.clear()
-        tectable.clear()
-        initable.clear()
-        return pd.DataFrame()
-
     # close connections
     ModelDictionary_Connection.close()
     MasterInput_Connection.close()
-    
-    # Clear all caches before concatenation
+
+    # Clear all caches (fictec files are kept for the next chunks of the run)
     weathertable.clear()
     soiltable.clear()
     tempopar.clear()
-    tectable.clear()
     initable.clear()
-    
-    # Concatenate in batches to reduce memory usage
-    batch_size = 60000
-    if len(dataframes) <= batch_size:
-        result = pd.concat(dataframes, ignore_index=True)
-        del dataframes  # Free the list
-        return result
-    
-    result = pd.DataFrame()
-    for i in range(0, len(dataframes), batch_size):
-        batch = dataframes[i:i+batch_size]
-        batch_concat = pd.concat(batch, ignore_index=True)
-        result = pd.concat([result, batch_concat], ignore_index=True)
-        # Clear the batch to free memory
-        del batch
-        del batch_concat
-    
-    del dataframes  # Free the list
+
+    if not summaries:
+        print("No reports to collect.")
+        return pd.DataFrame()
+    result = summaries.frame()
+    summaries.clear()
     return result
-            
+
 def export(MasterInput, ModelDictionary):
     MasterInput_Connection = sqlite3.connect(MasterInput)
     ModelDictionary_Connection = sqlite3.connect(ModelDictionary)
@@ -1172,8 +1233,6 @@ def export(MasterInput, ModelDictionary):
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_idCoord ON Coordinates (idPoint);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_idMangt ON CropManagement (idMangt);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_idsoil ON Soil (IdSoil);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_idsoill ON Soil (Lower(IdSoil));")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_idsoiltl ON SoilTypes (Lower(SoilTextureType));")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_idoption ON SimulationOptions (idOptions);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_cultivars ON ListCultivars (idCultivar);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_cultopt ON ListCultivars (CodePSpecies);")
@@ -1184,7 +1243,9 @@ def export(MasterInput, ModelDictionary):
         cursor2.execute("CREATE INDEX IF NOT EXISTS idx_model_table ON Variables (model, [Table]);")
         MasterInput_Connection.commit()
         ModelDictionary_Connection.commit()
+        normalize_keys(MasterInput_Connection)
         print("Indexes created successfully!")
+        advise_indexes(MasterInput_Connection, models=["stics"])
 
     except sqlite3.Error as e:
         print(f"Error creating indexes: {e}")
@@ -1192,9 +1253,7 @@ def export(MasterInput, ModelDictionary):
     ModelDictionary_Connection.close()
     
     # convert this code from vb to python:
-def fetch_data_from_sqlite(masterInput):
-    conn = sqlite3.connect(masterInput)
-    query = """
+SIMULATION_QUERY = """
         SELECT
             SimUnitList.*,
             CASE
@@ -1208,10 +1267,10 @@ def fetch_data_from_sqlite(masterInput):
             END AS is_mixed_crop
         FROM SimUnitList
     """
-    df = pd.read_sql_query(query, conn)
-    rows = df.to_dict(orient='records')
-    conn.close()
-    return rows
+
+
+def fetch_data_from_sqlite(masterInput):
+    return list(SimulationSource.from_globals(masterInput, SIMULATION_QUERY))
     
     
 def chunk_data(data, parts, chunk_size):    # values, num_sublists 
@@ -1262,20 +1321,29 @@ def _main_standard(simulations=None):
         with open(proffile, "r") as f:
             prof = f.read()
     export(mi, md)
+    climatestore.prepare(mi, tempDir)
+    sticssoilcatalogue.prepare(mi, md, tempDir)
+    space = scratch.prepare(tempDir, GlobalVariables.get("scratch", "disk"), GlobalVariables.get("scratchBudget", 0))
 
     tppar = common_tempopar(md)
     tpv6 = common_tempoparv6(md)
 
-    data = fetch_data_from_sqlite(mi) if simulations is None else simulations
-    # Split data into chunks
-    chunks = chunk_data(data, parts, chunk_size=nthreads)
-    n_simulations = len(data)
-    print(f"📊 Total simulations to process: {len(data)}", flush=True)
-    del data  # Free original data list after chunking
+    if simulations is None:
+        # Tasks carry rowid ranges; workers read their rows from SimUnitList
+        source = SimulationSource.from_globals(mi, SIMULATION_QUERY)
+        n_simulations = source.count()
+        chunks = source.partitions(parts * nthreads, n_simulations)
+        n_chunks = min(n_simulations, parts * nthreads)
+    else:
+        chunks = chunk_data(simulations, parts, chunk_size=nthreads)
+        n_simulations = len(simulations)
+        n_chunks = len(chunks)
+    print(f"📊 Total simulations to process: {n_simulations}", flush=True)
     # Create a Pool of worker processes
     import uuid
-    args_list = [(chunk,mi, md, tpv6,tppar,directoryPath,pltfolder, rap, var, prof, dt, tempDir) for chunk in chunks]
-    del chunks  # Free chunks list after creating args_list
+    artifacts = RunArtifacts.publish(tempDir, tempoparv6=tpv6, tempopar=tppar, rap=rap, var=var, prof=prof,
+                                     tempopar_variants=common_tempopar_variants(mi, tppar))
+    args_list = ((chunk,mi, md, artifacts,directoryPath,pltfolder, dt, tempDir) for chunk in chunks)
     # create a random name
     result_name = str(uuid.uuid4()) + "_stics"
     result_path = os.path.join(directoryPath, f"{result_name}.csv")
@@ -1286,7 +1354,7 @@ def _main_standard(simulations=None):
         start = time()
         
         # Use joblib Parallel with loky backend, write results directly to final file
-        print(f"Processing {len(args_list)} chunks...", flush=True)
+        print(f"Processing {n_chunks} chunks...", flush=True)
         
         write_header = True
         total_chunks_written = 0
@@ -1334,7 +1402,7 @@ def _main_standard(simulations=None):
 
             for idx, chunk_df, error in results:
                 if error is not None:
-                    print(f"❌ Chunk {idx + 1}/{len(args_list)} failed:\n{error}", flush=True)
+                    print(f"❌ Chunk {idx + 1}/{n_chunks} failed:\n{error}", flush=True)
                     continue
 
                 if chunk_df is not None and not chunk_df.empty:
@@ -1348,7 +1416,7 @@ def _main_standard(simulations=None):
                     total_chunks_written += 1
 
                     print(
-                        f"✅ Chunk {idx + 1}/{len(args_list)}: "
+                        f"✅ Chunk {idx + 1}/{n_chunks}: "
                         f"{len(chunk_df)} rows written",
                         flush=True
                     )
@@ -1369,275 +1437,166 @@ def _main_standard(simulations=None):
         print("Error during processing:", ex)
         traceback.print_exc() 
         raise
+    finally:
+        artifacts.remove()
+        if int(dt) == 1:
+            workspaces.remove_workspaces(tempDir)
+        if space is not None:
+            space.finish()
 
 
-def partition_simulations(master_input, simulations):
-    """Split SimUnitList rows into standard and successive managements."""
+# Seasons of a simulation: distinct SeasonOrder of its idMangt, counted by SQLite per SimUnitList row.
+SEASON_COUNT = """(SELECT COUNT(DISTINCT cm.SeasonOrder) FROM CropManagement AS cm
+    WHERE cm.idMangt = SimUnitList.idMangt)"""
+
+
+def has_seasons(master_input):
+    """Whether CropManagement has a SeasonOrder column, i.e. can hold successive rotations."""
     connection = sqlite3.connect(master_input)
     try:
-        crop_columns = {
-            row[1] for row in connection.execute("PRAGMA table_info(CropManagement)")
-        }
-        if "SeasonOrder" not in crop_columns:
-            return simulations, []
-        season_counts = {
-            str(id_mangt): int(count)
-            for id_mangt, count in connection.execute(
-                """
-                SELECT idMangt, COUNT(DISTINCT SeasonOrder)
-                FROM CropManagement
-                GROUP BY idMangt
-                """
-            )
-        }
+        return any(row[1] == "SeasonOrder" for row in connection.execute("PRAGMA table_info(CropManagement)"))
     finally:
         connection.close()
 
+
+def simulation_weights(source):
+    """
+    Yield (rowid, idsim, seasons) for the simulations of ``source``, most seasons first.
+
+    The season count is the scheduling weight; a simulation with more than one season is a
+    successive rotation. A MasterInput without CropManagement.SeasonOrder only has standard,
+    single-season simulations.
+    """
+    if not has_seasons(source.database):
+        yield from source.select("SimUnitList.rowid, SimUnitList.idsim, 1")
+        return
+    for key, idsim, id_mangt, seasons in source.select(
+        f"SimUnitList.rowid, SimUnitList.idsim, SimUnitList.idMangt, {SEASON_COUNT} AS seasons",
+        order_by="seasons DESC, SimUnitList.rowid",
+    ):
+        if seasons == 0:
+            raise ValueError(f"No CropManagement rows for idMangt={id_mangt}")
+        yield key, idsim, seasons
+
+
+def build_balanced_simulation_chunks(weights, number_of_chunks, total):
+    """
+    Distribute the (rowid, idsim, seasons) of ``simulation_weights`` over balanced chunks.
+
+    Each simulation goes to the least loaded chunk; as the weights arrive by decreasing
+    season count this is the longest-processing-time rule. Returns one dict per chunk with
+    the rowids to hand to ``SimulationSource.subset``, the idsims of its successive
+    rotations and its load in seasons.
+    """
+    chunk_count = min(max(1, int(number_of_chunks)), int(total))
+    chunks = [{"keys": [], "successive": set(), "load": 0} for _ in range(chunk_count)]
+    loads = [(0, index) for index in range(chunk_count)]
+    for key, idsim, seasons in weights:
+        load, index = heapq.heappop(loads)
+        chunk = chunks[index]
+        chunk["keys"].append(key)
+        if seasons > 1:
+            chunk["successive"].add(str(idsim))
+        chunk["load"] += seasons
+        heapq.heappush(loads, (load + seasons, index))
+    return [chunk for chunk in chunks if chunk["keys"]]
+
+
+def _season_counts(master_input):
+    """{idsim: seasons} of every SimUnitList row, as ``simulation_weights`` counts them."""
+    rows = SimulationSource(master_input).select(f"SimUnitList.idsim, {SEASON_COUNT}")
+    return {str(idsim): seasons for idsim, seasons in rows}
+
+
+def partition_simulations(master_input, simulations):
+    """Split SimUnitList rows into standard and successive managements.
+
+    Kept for callers holding the rows in a list; ``main`` routes with ``simulation_weights``.
+    """
+    if not has_seasons(master_input):
+        return simulations, []
+    counts = _season_counts(master_input)
     standard = []
     successive = []
     for simulation in simulations:
-        count = season_counts.get(str(simulation["idMangt"]), 0)
-        if count == 0:
-            raise ValueError(
-                f"No CropManagement rows for idMangt={simulation['idMangt']}"
-            )
-        (successive if count > 1 else standard).append(simulation)
+        if not counts.get(str(simulation["idsim"])):
+            raise ValueError(f"No CropManagement rows for idMangt={simulation['idMangt']}")
+        (successive if counts[str(simulation["idsim"])] > 1 else standard).append(simulation)
     return standard, successive
 
 
 def get_simulation_weights(master_input, simulations):
-    """Return the number of seasons used as scheduling weight for each idsim."""
-    connection = sqlite3.connect(master_input)
-    try:
-        season_counts = {
-            str(id_mangt): max(1, int(count))
-            for id_mangt, count in connection.execute(
-                """
-                SELECT idMangt, COUNT(DISTINCT SeasonOrder)
-                FROM CropManagement
-                GROUP BY idMangt
-                """
-            )
-        }
-    finally:
-        connection.close()
-    return {
-        str(simulation["idsim"]): season_counts.get(str(simulation["idMangt"]), 1)
-        for simulation in simulations
-    }
-
-
-def build_balanced_simulation_chunks(simulations, weights, number_of_chunks):
-    """Distribute simulations by decreasing season count over balanced chunks."""
-    if not simulations:
-        return []
-    chunk_count = min(max(1, int(number_of_chunks)), len(simulations))
-    chunks = [[] for _ in range(chunk_count)]
-    loads = [0] * chunk_count
-    ordered = sorted(
-        simulations,
-        key=lambda simulation: weights[str(simulation["idsim"])],
-        reverse=True,
-    )
-    for simulation in ordered:
-        index = min(range(chunk_count), key=lambda item: (loads[item], item))
-        chunks[index].append(simulation)
-        loads[index] += weights[str(simulation["idsim"])]
-    return chunks
+    """Return the number of seasons used as scheduling weight for each idsim.
+
+    Kept for callers holding the rows in a list; ``main`` weights with ``simulation_weights``.
+    """
+    counts = _season_counts(master_input) if has_seasons(master_input) else {}
+    return {str(simulation["idsim"]): max(1, counts.get(str(simulation["idsim"]), 1))
+            for simulation in simulations}
 
 
 def process_routed_chunk(
-    chunk_index, total_chunks, chunk, weights, successive_ids,
-    mi, md, tpv6, tppar, directory_path, pltfolder,
-    rap, var, prof, dt, temp_dir, package, dailyoutput,
+    chunk_index, total_chunks, chunk, successive_ids,
+    mi, md, artifacts, directory_path, pltfolder,
+    dt, temp_dir, package, dailyoutput,
 ):
-    """Process one balanced chunk containing standard and successive idsim rows."""
+    """Process one balanced chunk containing standard and successive idsim rows.
+
+    Daily and profile rows go to the worker's output shard; ``main`` merges the shards.
+    The rotations share the worker context of the run, torn down by ``main`` once the run is over.
+    """
     from . import sticssuccessiveconverter
 
+    chunk = list(chunk)
     standard_rows = [
         simulation for simulation in chunk
         if str(simulation["idsim"]) not in successive_ids
     ]
+    sink = outputsink.worker_shard(temp_dir) if int(dailyoutput) == 1 else None
     frames = []
-    daily_frames = []
-    profile_frames = []
     if standard_rows:
+        # daily and profile outputs are read from each workspace right after its run
         standard_frame = process_chunk(
-            standard_rows, mi, md, tpv6, tppar, directory_path, pltfolder,
-            rap, var, prof, dt, temp_dir, dailyoutput,
+            standard_rows, mi, md, artifacts, directory_path, pltfolder,
+            dt, temp_dir, dailyoutput, sink,
         )
         if standard_frame is not None and not standard_frame.empty:
             frames.append(standard_frame)
-        if int(dailyoutput) == 1:
-            for simulation in standard_rows:
-                daily_frames.extend(
-                    collect_daily_outputs(
-                        directory_path,
-                        str(simulation["idsim"]),
-                        simulation["idsim"],
-                        1,
-                        bool(simulation.get("is_mixed_crop", 0)),
-                    )
-                )
-                profile_frames.extend(
-                    collect_profile_outputs(
-                        directory_path,
-                        str(simulation["idsim"]),
-                        simulation["idsim"],
-                        1,
-                        bool(simulation.get("is_mixed_crop", 0)),
-                    )
-                )
     for simulation in chunk:
         if str(simulation["idsim"]) in successive_ids:
-            frame, daily, profile = sticssuccessiveconverter.process_simulation(
+            frame, _, _ = sticssuccessiveconverter.process_simulation(
                 simulation, mi, md, directory_path, temp_dir, pltfolder, package,
-                dt, dailyoutput,
+                dt, dailyoutput, sink=sink, run=artifacts.path,
             )
             if frame is not None and not frame.empty:
                 frames.append(frame)
-            if daily is not None and not daily.empty:
-                daily_frames.append(daily)
-            if profile is not None and not profile.empty:
-                profile_frames.append(profile)
-    summary = pd.concat(frames, ignore_index=True, sort=False) if frames else pd.DataFrame()
-    daily = (
-        pd.concat(daily_frames, ignore_index=True, sort=False)
-        if daily_frames else pd.DataFrame()
-    )
-    profile = (
-        pd.concat(profile_frames, ignore_index=True, sort=False)
-        if profile_frames else pd.DataFrame()
-    )
-    return summary, daily, profile
+    if sink is not None:
+        sink.commit()
+    return pd.concat(frames, ignore_index=True, sort=False) if frames else pd.DataFrame()
 
 
-def save_summary_output(result_path, master_input):
-    """Replace all STICS rows in SummaryOutput with the current result batch."""
-    summary_cols = [
-        "Model", "Idsim", "Texte", "SeasonOrder", "Planting", "Emergence", "Ant", "Mat",
-        "Biom_ma", "Yield", "GNumber", "MaxLai", "Nleac", "SoilN",
-        "CroN_ma", "CumE", "Transp",
-    ]
-    dataframe = pd.read_csv(result_path, usecols=lambda column: column in summary_cols)
-    for column in summary_cols:
-        if column not in dataframe.columns:
-            dataframe[column] = 1 if column == "SeasonOrder" else None
+def summary_output_rows(dataframe):
+    """SummaryOutput rows of a chunk of STICS results."""
+    dataframe = dataframe.reindex(columns=SUMMARY_COLS)
     dataframe["SeasonOrder"] = (
         pd.to_numeric(dataframe["SeasonOrder"], errors="coerce")
         .fillna(1)
         .astype(int)
     )
-    dataframe = dataframe[summary_cols]
-
-    connection = sqlite3.connect(master_input)
-    try:
-        summary_columns = {
-            row[1] for row in connection.execute("PRAGMA table_info(SummaryOutput)")
-        }
-        if "SeasonOrder" not in summary_columns:
-            connection.execute(
-                "ALTER TABLE SummaryOutput ADD COLUMN SeasonOrder INTEGER"
-            )
-        connection.execute("DELETE FROM SummaryOutput WHERE Model = 'Stics'")
-        dataframe.to_sql("SummaryOutput", connection, if_exists="append", index=False)
-        connection.commit()
-    finally:
-        connection.close()
-    print(f"✅ {len(dataframe)} rows inserted into SummaryOutput.", flush=True)
+    return dataframe
 
 
-def save_daily_output(dataframe, master_input):
-    """Replace all STICS daily rows with the current result batch."""
-    if dataframe is None or dataframe.empty:
-        print("Warning: no daily STICS results were produced.", flush=True)
-        return
-    connection = sqlite3.connect(master_input)
-    try:
-        table_exists = connection.execute(
-            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
-            (DAILY_OUTPUT_TABLE,),
-        ).fetchone() is not None
-        if table_exists:
-            existing_columns = {
-                row[1] for row in connection.execute(
-                    f'PRAGMA table_info("{DAILY_OUTPUT_TABLE}")'
-                )
-            }
-            for column, column_type in (("SeasonOrder", "INTEGER"), ("Texte", "TEXT")):
-                if column not in existing_columns:
-                    connection.execute(
-                        f'ALTER TABLE "{DAILY_OUTPUT_TABLE}" '
-                        f'ADD COLUMN "{column}" {column_type}'
-                    )
-            connection.execute(
-                f'DELETE FROM "{DAILY_OUTPUT_TABLE}" WHERE Model = \'Stics\''
-            )
-            dataframe.to_sql(
-                DAILY_OUTPUT_TABLE, connection, if_exists="append", index=False
-            )
-        else:
-            dataframe.to_sql(
-                DAILY_OUTPUT_TABLE, connection, if_exists="replace", index=False
-            )
-        connection.execute(
-            f'CREATE INDEX IF NOT EXISTS "idx_{DAILY_OUTPUT_TABLE}_idsim_season_jul" '
-            f'ON "{DAILY_OUTPUT_TABLE}" ("Idsim", "SeasonOrder", "jul")'
-        )
-        connection.commit()
-    finally:
-        connection.close()
-    print(
-        f"✅ {len(dataframe)} rows inserted into {DAILY_OUTPUT_TABLE}.",
-        flush=True,
-    )
-
-
-def save_profile_output(dataframe, master_input):
-    """Replace all STICS profile rows with the current result batch."""
-    if dataframe is None or dataframe.empty:
-        print("Warning: no STICS profile results were produced.", flush=True)
-        return
-    connection = sqlite3.connect(master_input)
-    try:
-        table_exists = connection.execute(
-            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
-            (PROFILE_OUTPUT_TABLE,),
-        ).fetchone() is not None
-        if table_exists:
-            existing_columns = {
-                row[1] for row in connection.execute(
-                    f'PRAGMA table_info("{PROFILE_OUTPUT_TABLE}")'
-                )
-            }
-            for column, column_type in (("SeasonOrder", "INTEGER"), ("Texte", "TEXT")):
-                if column not in existing_columns:
-                    connection.execute(
-                        f'ALTER TABLE "{PROFILE_OUTPUT_TABLE}" '
-                        f'ADD COLUMN "{column}" {column_type}'
-                    )
-            connection.execute(
-                f'DELETE FROM "{PROFILE_OUTPUT_TABLE}" WHERE Model = \'Stics\''
-            )
-            dataframe.to_sql(
-                PROFILE_OUTPUT_TABLE, connection, if_exists="append", index=False
-            )
-        else:
-            dataframe.to_sql(
-                PROFILE_OUTPUT_TABLE, connection, if_exists="replace", index=False
-            )
-        connection.execute(
-            f'CREATE INDEX IF NOT EXISTS "idx_{PROFILE_OUTPUT_TABLE}_lookup" '
-            f'ON "{PROFILE_OUTPUT_TABLE}" '
-            f'("Idsim", "SeasonOrder", "Texte", "jul", "depth_cm", "variable")'
-        )
-        connection.commit()
-    finally:
-        connection.close()
-    print(
-        f"✅ {len(dataframe)} rows inserted into {PROFILE_OUTPUT_TABLE}.",
-        flush=True,
-    )
+def save_output_shards(temp_dir, master_input):
+    """Replace all STICS daily and profile rows with the rows the workers wrote to their shards."""
+    for table, index, label in (
+        (DAILY_OUTPUT_TABLE, (f"idx_{DAILY_OUTPUT_TABLE}_idsim_season_jul", ("Idsim", "SeasonOrder", "jul")),
+         "daily"),
+        (PROFILE_OUTPUT_TABLE, (f"idx_{PROFILE_OUTPUT_TABLE}_lookup",
+                                ("Idsim", "SeasonOrder", "Texte", "jul", "depth_cm", "variable")), "profile"),
+    ):
+        rows = outputsink.merge(temp_dir, master_input, table, delete_where="Model = 'Stics'", index=index)
+        if rows == 0:
+            print(f"Warning: no {label} STICS results were produced.", flush=True)
 
 
 def main():
@@ -1646,22 +1605,13 @@ def main():
     if not mi:
         raise ValueError("dbMasterInput must be set in GlobalVariables")
 
-    simulations = fetch_data_from_sqlite(mi)
+    source = SimulationSource.from_globals(mi, SIMULATION_QUERY)
     target_idsim = GlobalVariables.get("sticsIdsim")
     if target_idsim is not None:
-        simulations = [
-            simulation for simulation in simulations
-            if str(simulation["idsim"]) == str(target_idsim)
-        ]
-        if not simulations:
-            raise ValueError(f"STICS simulation {target_idsim!r} was not found")
-
-    standard, successive = partition_simulations(mi, simulations)
-    print(
-        f"STICS routing: {len(standard)} standard, "
-        f"{len(successive)} successive simulation(s)",
-        flush=True,
-    )
+        source = source.filtered("SimUnitList.idsim = ?", (str(target_idsim),))
+    total = source.count()
+    if target_idsim is not None and total == 0:
+        raise ValueError(f"STICS simulation {target_idsim!r} was not found")
 
     md = GlobalVariables.get("dbModelsDictionary")
     directory_path = GlobalVariables.get("directorypath", os.getcwd())
@@ -1679,6 +1629,9 @@ def main():
     os.makedirs(directory_path, exist_ok=True)
     os.makedirs(temp_dir, exist_ok=True)
     export(mi, md)
+    climatestore.prepare(mi, temp_dir)
+    sticssoilcatalogue.prepare(mi, md, temp_dir)
+    space = scratch.prepare(temp_dir, GlobalVariables.get("scratch", "disk"), GlobalVariables.get("scratchBudget", 0))
 
     stics_params = os.path.join(package, "data", "stics_params")
     if os.path.exists(stics_params):
@@ -1693,26 +1646,25 @@ def main():
     tppar = common_tempopar(md)
     tpv6 = common_tempoparv6(md)
 
-    weights = get_simulation_weights(mi, simulations)
-    chunks = build_balanced_simulation_chunks(
-        simulations, weights, nthreads * parts
-    )
-    successive_ids = {str(simulation["idsim"]) for simulation in successive}
-    loads = [sum(weights[str(row["idsim"])] for row in chunk) for chunk in chunks]
-    standard_count = len(standard)
-    successive_season_count = sum(
-        weights[str(simulation["idsim"])] for simulation in successive
+    chunks = build_balanced_simulation_chunks(simulation_weights(source), nthreads * parts, total) if total else []
+    successive_count = sum(len(chunk["successive"]) for chunk in chunks)
+    loads = [chunk["load"] for chunk in chunks]
+    standard_count = total - successive_count
+    successive_season_count = sum(loads) - standard_count
+    print(
+        f"STICS routing: {standard_count} standard, "
+        f"{successive_count} successive simulation(s)",
+        flush=True,
     )
-    individual_simulation_count = standard_count + successive_season_count
     print(
         f"📊 Total individual STICS simulations to process: "
-        f"{individual_simulation_count} "
+        f"{standard_count + successive_season_count} "
         f"({standard_count} standard + {successive_season_count} successive seasons "
-        f"from {len(successive)} rotation(s))",
+        f"from {successive_count} rotation(s))",
         flush=True,
     )
     print(
-        f"SimUnitList rows selected: {len(simulations)}",
+        f"SimUnitList rows selected: {total}",
         flush=True,
     )
     print(
@@ -1720,50 +1672,55 @@ def main():
         f"(estimated season loads: {loads})",
         flush=True,
     )
-    processed_chunks = Parallel(n_jobs=nthreads, backend="loky")(
-        delayed(process_routed_chunk)(
-            chunk_index, len(chunks), chunk, weights, successive_ids,
-            mi, md, tpv6, tppar, directory_path,
-            pltfolder, rap, var, prof, dt, temp_dir, package, dailyoutput,
-        )
-        for chunk_index, chunk in enumerate(chunks)
-    )
-    frames = [
-        result[0] for result in processed_chunks
-        if result is not None and result[0] is not None and not result[0].empty
-    ]
-    daily_frames = [
-        result[1] for result in processed_chunks
-        if result is not None and result[1] is not None and not result[1].empty
-    ]
-    profile_frames = [
-        result[2] for result in processed_chunks
-        if result is not None and result[2] is not None and not result[2].empty
-    ]
-    if not frames:
-        print("No STICS reports produced.", flush=True)
-        return None
+    from . import sticssuccessiveconverter
 
+    # Tasks carry the rowids of their simulations and the handle of the published artifacts
+    artifacts = RunArtifacts.publish(
+        temp_dir, tempoparv6=tpv6, tempopar=tppar, rap=rap, var=var, prof=prof,
+        tempopar_variants=common_tempopar_variants(mi, tppar),
+    )
+    if dailyoutput == 1:
+        outputsink.prepare(temp_dir)
     import uuid
 
     result_path = os.path.join(directory_path, f"{uuid.uuid4()}_stics.csv")
-    pd.concat(frames, ignore_index=True, sort=False).to_csv(result_path, index=False)
-    print(f"✅ Results saved to {result_path}", flush=True)
-
-    if int(GlobalVariables.get("dt", 1)) == 0:
-        save_summary_output(result_path, mi)
-    if dailyoutput == 1:
-        daily_result = (
-            pd.concat(daily_frames, ignore_index=True, sort=False)
-            if daily_frames else pd.DataFrame()
-        )
-        save_daily_output(daily_result, mi)
-        profile_result = (
-            pd.concat(profile_frames, ignore_index=True, sort=False)
-            if profile_frames else pd.DataFrame()
-        )
-        save_profile_output(profile_result, mi)
-    return result_path
+    # chunk results go to the CSV (and SummaryOutput with dt 0) as they arrive
+    sinks = resultsink.ResultSinks(
+        result_path, resultsink.configured_sinks(GlobalVariables.get("resultSinks", "csv"), dt),
+        database=mi, model="Stics", summarize=summary_output_rows, staging=temp_dir,
+    )
+    try:
+        try:
+            processed_chunks = Parallel(n_jobs=nthreads, backend="loky", return_as="generator")(
+                delayed(process_routed_chunk)(
+                    chunk_index, len(chunks), source.subset(chunk["keys"]), chunk["successive"],
+                    mi, md, artifacts, directory_path,
+                    pltfolder, dt, temp_dir, package, dailyoutput,
+                )
+                for chunk_index, chunk in enumerate(chunks)
+            )
+            for frame in processed_chunks:
+                sinks.write(frame)
+            sinks.close()
+        finally:
+            sinks.discard()  # a failed run keeps the previous SummaryOutput rows
+            sticssuccessiveconverter.end_worker_contexts()
+            artifacts.remove()
+            if int(dt) == 1:
+                workspaces.remove_workspaces(temp_dir)
+            if space is not None:
+                space.finish()
+        if sinks.rows == 0:
+            print("No STICS reports produced.", flush=True)
+            return None
+        print(f"✅ Results saved to {result_path}", flush=True)
+
+        if dailyoutput == 1:
+            save_output_shards(temp_dir, mi)
+        return result_path
+    finally:
+        if dailyoutput == 1:
+            outputsink.remove_shards(temp_dir)
     
 if __name__ == "__main__":
     main()
@@ -1,4 +1,6 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import fetch_all, fetch_season
 from sqlite3 import Connection
 import os
 import pandas as pd
@@ -8,29 +10,25 @@ class SticsFicIniConverter(Converter):
     def __init__(self):
         super().__init__()
 
-    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir, season_order=None):
+    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir, season_order=None, snapshot=None):
         fileName = "ficini.txt"
         file_lines = []
         fileContent = ""
         ST = directory_path.split(os.path.sep)
         id_sim = ST[-3]
-        T = "Select  Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'sticsv11') And ([Table] = 'ficini'));"
-        fetchAllQuery = """SELECT SimUnitList.idIni, Soil.IdSoil, Soil.SoilOption, Soil.Wwp, Soil.Wfc, Soil.bd, InitialConditions.WStockinit, InitialConditions.Ninit 
-        FROM InitialConditions INNER JOIN (Soil INNER JOIN SimUnitList ON Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil)) ON InitialConditions.idIni = SimUnitList.idIni
-        where idSim = '%s';"""%(id_sim)
-        DT = pd.read_sql_query(T, ModelDictionary_Connection)
-        defaults = DT.set_index("Champ")["dv"].to_dict()
+        defaults = model_defaults(ModelDictionary_Connection).table("sticsv11", "ficini")
         
-        DA = pd.read_sql_query(fetchAllQuery, master_input_connection)
-        rows = DA.to_dict(orient='records')
+        if snapshot is None:
+            rows = fetch_all(master_input_connection, "stics.ficini", id_sim)
+        else:
+            rows = snapshot.ficini_rows(id_sim)
         for row in rows:
             file_lines.append(":nbplantes:")
 
-            sql = """SELECT Max(CropManagement.PlantOrder) AS MaxDePlantOrder FROM CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt WHERE SimUnitList.idsim = '%s'"""%(id_sim)
-            if season_order is not None:
-                sql += " AND CropManagement.SeasonOrder = %d" % int(season_order)
-            DA2 = pd.read_sql_query(sql, master_input_connection)
-            rows2 = DA2.to_dict(orient='records')
+            if snapshot is None:
+                rows2 = fetch_season(master_input_connection, "stics.max_plant_order", season_order, id_sim)
+            else:
+                rows2 = [{"MaxDePlantOrder": snapshot.max_plant_order(id_sim, season_order)}]
             
             if len(rows2) > 0:
                 nbplt = rows2[0]["MaxDePlantOrder"]
@@ -84,9 +82,10 @@ class SticsFicIniConverter(Converter):
                 file_lines.append(":densinitial:")
                 file_lines.append(f"{float(defaults['densinitial_2']):.1f} 0.0 0.0 0.0 0.0")
                 
-            sql = "Select * From soillayers where Lower(idsoil)= '" + row["IdSoil"].lower() + "' Order by NumLayer"
-            Adp = pd.read_sql_query(sql, master_input_connection)
-            jeu = Adp.to_dict(orient='records')
+            if snapshot is None:
+                jeu = fetch_all(master_input_connection, "soil.layers", row["IdSoil"].lower())
+            else:
+                jeu = snapshot.layers(row["IdSoil"])
 
             file_lines.append(":Hinitf:")
             if row["SoilOption"].lower() == "simple":
@@ -116,7 +115,7 @@ class SticsFicIniConverter(Converter):
                 file_lines.append(" ".join(no3_vals))
 
             file_lines.append(":NH4initf:")
-            has_row_nh4 = "NH4initf" in row and pd.notna(row["NH4initf"])
+            has_row_nh4 = "NH4initf" in row.keys() and pd.notna(row["NH4initf"])
             default_nh4 = float(defaults["NH4initf"])
             if row["SoilOption"].lower() == "simple":
                 nh4_value = float(row["NH4initf"]) if has_row_nh4 else default_nh4
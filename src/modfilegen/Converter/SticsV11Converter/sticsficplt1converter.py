@@ -1,7 +1,7 @@
 from modfilegen.converter import Converter
+from modfilegen.queries import fetch_season
 from sqlite3 import Connection
 import os
-import pandas as pd
 import traceback
 import shutil
 
@@ -9,17 +9,14 @@ class SticsFicplt1Converter(Converter):
     def __init__(self):
         super().__init__()
 
-    def export(self, directory_path, master_input_connection, pltfolder, usmdir, season_order=None):
+    def export(self, directory_path, master_input_connection, pltfolder, usmdir, season_order=None, snapshot=None):
         file_name = "ficplt1.txt"
         file_name2 = "ficplt2.txt"
         ST = directory_path.split(os.sep)
-        sq = """SELECT SimUnitList.idsim as idsim, ListCultOption.FicPlt as fic 
-        FROM (ListCultOption INNER JOIN (ListCultivars INNER JOIN CropManagement ON ListCultivars.IdCultivar = CropManagement.Idcultivar) ON ListCultOption.CodePSpecies = ListCultivars.CodePSpecies) INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt where idSim= '%s'"""%(ST[-3])
-        if season_order is not None:
-            sq += " AND CropManagement.SeasonOrder = %d" % int(season_order)
-        sq += " ORDER BY CropManagement.PlantOrder;"
-        df_sim = pd.read_sql(sq, master_input_connection)
-        rows = df_sim.to_dict('records')
+        if snapshot is not None:
+            rows = snapshot.ficplt_rows(ST[-3], season_order)
+        else:
+            rows = fetch_season(master_input_connection, "stics.ficplt", season_order, ST[-3])
         
         src_path = os.path.join(pltfolder, rows[0]["fic"])
         dest_path = os.path.join(usmdir, file_name)
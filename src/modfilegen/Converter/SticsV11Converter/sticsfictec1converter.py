@@ -1,495 +1,212 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import fetch_all, fetch_season
 from sqlite3 import Connection
 import os
-import pandas as pd
 import traceback
 
-class SticsFictec1Converter(Converter):
-    def __init__(self):
-        super().__init__()
-
-    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir, season_order=None, date_offset=0):
-        file_name = "fictec1.txt"
-        file_name2 = "fictec2.txt"
-        fileContent = ""
-        ST = directory_path.split(os.sep)
-             
-        fetchAllQuery = """SELECT SimUnitList.idsim, SimUnitList.idMangt, Soil.SoilTotalDepth, ListCultivars.idcultivarStics, CropManagement.sdens,
-        CropManagement.sowingdate, CropManagement.SoilTillPolicyCode FROM Soil INNER JOIN (ListCultivars INNER JOIN (CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt)
-        ON ListCultivars.IdCultivar = CropManagement.Idcultivar) ON Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil)  where idSim= '%s'"""%(ST[-3])
-        season_filter = "" if season_order is None else " AND CropManagement.SeasonOrder = %d" % int(season_order)
-        fetchAllQuery += season_filter + " ORDER BY CropManagement.PlantOrder;"
-        DA = pd.read_sql_query(fetchAllQuery, master_input_connection)
-        if date_offset:
-            DA["sowingdate"] = DA["sowingdate"] + int(date_offset)
-        rows = DA.to_dict(orient='records')
-        rw = rows[0]
-
-        Sql = """SELECT SoilTillPolicy.SoilTillPolicyCode, SoilTillageOperations.STNumber, SoilTillPolicy.NumTillOperations, SoilTillageOperations.DepthResUp, SoilTillageOperations.DepthResLow, SoilTillageOperations.DSTill
-            FROM SoilTillPolicy INNER JOIN SoilTillageOperations ON SoilTillPolicy.SoilTillPolicyCode = SoilTillageOperations.SoilTillPolicyCode
-            where SoilTillPolicy.SoilTillPolicyCode= '%s';"""%(rw["SoilTillPolicyCode"])
-        
-        
-
-        T = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model='sticsv11') AND ([Table]='fictec1'));"
-        DT = pd.read_sql_query(T, ModelDictionary_Connection)
-
-        fetchallquery2 = """SELECT SimUnitList.idsim, CropManagement.sowingdate, OrganicFOperations.Dferti, OrganicFOperations.OFNumber, OrganicFOperations.CNferti, 
-                OrganicFOperations.NFerti, OrganicFOperations.Qmanure, OrganicFOperations.TypeResidues, ListResidues.idresidueStics, CropManagement.SoilTillPolicyCode 
-                FROM ListResidues INNER JOIN ((OrganicFertilizationPolicy INNER JOIN (CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt) 
-                ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode) INNER JOIN OrganicFOperations ON OrganicFertilizationPolicy.OFertiPolicyCode
-                = OrganicFOperations.OFertiPolicyCode) ON ListResidues.TypeResidues = OrganicFOperations.TypeResidues where idSim='%s' and CropManagement.PlantOrder=1"""%(ST[-3])
-        fetchallquery2 += season_filter + " Order by OFNumber;"
-
-        DS2 = pd.read_sql_query(fetchallquery2, master_input_connection)   
-        if date_offset and not DS2.empty:
-            DS2["sowingdate"] = DS2["sowingdate"] + int(date_offset)
-        rows2 = DS2.to_dict(orient='records')
-        Adp = pd.read_sql_query(Sql, master_input_connection)
-        dataTill = Adp.to_dict(orient='records')
-            
-        fileContent += "nbinterventions\n"
-        if not rows2 or rows2[0]["idresidueStics"] is None:
-            fileContent += "0\n"
+# ModelDictionary items of fictec1.txt/fictec2.txt, in file order, between the simulation fields
+RESIDUE_ITEMS = ["code_auto_profres", "resk", "resz"]
+CROP_ITEMS = [
+    "codetradtec", "interrang", "orientrang", "code_strip", "nrow", "codedecisemis", "nbjmaxapressemis",
+    "nbjseuiltempref", "nbj_pr_apres_semis", "eau_mini_decisemis", "humirac_decisemis", "codestade",
+    "ilev", "iamf", "ilax", "isen", "ilan", "iflo", "idrp", "imat", "irec", "effirr", "codecalirrig",
+    "ratiol", "dosimx", "doseirrigmin", "codedate_irrigauto", "datedeb_irrigauto", "datefin_irrigauto",
+    "stage_start_irrigauto", "stage_end_irrigauto", "codedateappH2O",
+]
+IRRIGATION_ITEMS = ["codlocirrig", "locirrig"]
+NITROGEN_ITEMS = ["concirr", "codedateappN", "codefracappN", "Qtot_N"]
+HARVEST_ITEMS = [
+    "codceuille", "nbceuille", "cadencerec", "codrecolte", "codeaumin", "h2ograinmin", "h2ograinmax",
+    "sucrerec", "CNgrainrec", "huilerec", "coderecolteassoc", "codedecirecolte", "nbjmaxapresrecolte",
+    "codefauche",
+]
+MOWING_ITEMS = ["codemodfauche", "hautcoupedefaut", "stadecoupedf"]
+CANOPY_ITEMS = [
+    "codepaillage", "couvermulchplastique", "albedomulchplastique", "codrognage", "largrogne", "hautrogne",
+    "biorognem", "codcalrogne", "julrogne", "margerogne", "codeclaircie",
+]
+LEAF_ITEMS = [
+    "codeffeuil", "codhauteff", "codcaleffeuil", "laidebeff", "effeuil", "juleffeuil", "laieffeuil",
+    "codetaille", "jultaille", "codepalissage", "hautmaxtec", "largtec", "codabri", "transplastic",
+    "surfouvre1", "julouvre2", "surfouvre2", "julouvre3", "surfouvre3",
+]
+SOIL_STRUCTURE_ITEMS = [
+    "codeDST", "dachisel", "dalabour", "rugochisel", "rugolabour", "codeDSTtass", "profhumsemoir",
+    "dasemis", "profhumrecolteuse", "darecolte", "codeDSTnbcouche",
+]
+
+
+def format_item(row, champ, precision = 5, fieldIt = 0):
+    fieldName = champ
+    fileContent = ""
+    if (fieldIt != 0):
+        x = fieldName.split(".")
+        fieldName = ".".join(x[1:])
+    data = row[champ]
+    res = ""
+    if isinstance(data, str) or isinstance(data, int):
+        res = str(data)
+    if isinstance(data, float):
+        tmp = float(data)
+        if precision > 0 and precision < 7:
+            res = "{:.{}f}".format(tmp, precision)
         else:
-            fileContent += str(len(rows2)) + "\n"
-            if len(rows2) != 0:
-                for i in range(len(rows2)):
-                    fileContent += "julres coderes qres Crespc CsurNres Nminres eaures" + "\n"
-                    fileContent += str(int(rows2[i]["sowingdate"]) + int(rows2[i]["Dferti"])) + " "
-                    fileContent += str(rows2[i]["idresidueStics"]) + " "
-                    fileContent += str(int(rows2[i]["Qmanure"])/1000) + " "
-                    fileContent += str(rows2[i]["CNferti"] * rows2[i]["NFerti"]) + " "
-                    fileContent += str(rows2[i]["CNferti"]) + " "
-                    fileContent += str(rows2[i]["NFerti"]) + " "
-                    fileContent += self.FormatSticsRawData(DT, "supply of organic residus.eaures") + "\n"
-        fileContent += self.format_item(DT, "code_auto_profres")
-        fileContent += self.format_item(DT, "resk")
-        fileContent += self.format_item(DT, "resz")
-        fileContent += "nbinterventions\n"
-        fileContent += format(dataTill[0]["NumTillOperations"], ".0f") + "\n"
-        if dataTill[0]["NumTillOperations"] > 0:
-            for i in range(len(dataTill)):
-                fileContent += "jultrav profres proftrav \n"
-                fileContent += format(rw["sowingdate"] + dataTill[i]["DSTill"], ".0f") + " "
-                fileContent += format(dataTill[i]["DepthResUp"], ".0f") + " "
-                fileContent += format(dataTill[i]["DepthResLow"], ".0f") + "\n"
-
-        fileContent += "iplt0\n"
-        fileContent += format(rw["sowingdate"], ".0f") + "\n"
-        fileContent += self.format_item( DT, "profsem")
-        fileContent += "densitesem\n"
-        fileContent += str(format(rw["sdens"], ".2f"))+ "\n"
-        fileContent += "variete\n"
-        fileContent += rw["idcultivarStics"] + "\n"
-        fileContent += self.format_item(DT, "codetradtec")
-        fileContent += self.format_item(DT, "interrang")
-        fileContent += self.format_item(DT, "orientrang")
-        fileContent += self.format_item(DT, "code_strip")
-        fileContent += self.format_item(DT, "nrow")
-        fileContent += self.format_item(DT, "codedecisemis")
-        fileContent += self.format_item(DT, "nbjmaxapressemis")
-        fileContent += self.format_item(DT, "nbjseuiltempref")
-        fileContent += self.format_item(DT, "nbj_pr_apres_semis") # add
-        fileContent += self.format_item(DT, "eau_mini_decisemis") # add
-        fileContent += self.format_item(DT, "humirac_decisemis") # add
-        fileContent += self.format_item(DT, "codestade")
-        fileContent += self.format_item(DT, "ilev")
-        fileContent += self.format_item(DT, "iamf")
-        fileContent += self.format_item(DT, "ilax")
-        fileContent += self.format_item(DT, "isen")
-        fileContent += self.format_item(DT, "ilan")
-        fileContent += self.format_item(DT, "iflo")
-        fileContent += self.format_item(DT, "idrp")
-        fileContent += self.format_item(DT, "imat")
-        fileContent += self.format_item(DT, "irec")
-        fileContent += self.format_item(DT, "effirr")  # change positioon
-        fileContent += self.format_item(DT, "codecalirrig")
-        fileContent += self.format_item(DT, "ratiol")
-        fileContent += self.format_item(DT, "dosimx")
-        fileContent += self.format_item(DT, "doseirrigmin")
-        fileContent += self.format_item(DT, "codedate_irrigauto") # add
-        fileContent += self.format_item(DT, "datedeb_irrigauto") # add
-        fileContent += self.format_item(DT, "datefin_irrigauto") # add
-        fileContent += self.format_item(DT, "stage_start_irrigauto") # add
-        fileContent += self.format_item(DT, "stage_end_irrigauto") # add
-        fileContent += self.format_item(DT, "codedateappH2O")
-        
-        fileContent += "nbinterventions\n"
-        fileContent += "0\n"
-        fileContent += self.format_item(DT, "codlocirrig")
-        fileContent += self.format_item(DT, "locirrig")
-        fileContent += "profmes\n"
-        fileContent += format(rw["SoilTotalDepth"], ".0f") + "\n"      
-        #fileContent += self.format_item(DT, "engrais") # remove
-        fileContent += self.format_item(DT, "concirr")
-        fileContent += self.format_item(DT, "codedateappN")
-        fileContent += self.format_item(DT, "codefracappN")
-        fileContent += self.format_item(DT, "Qtot_N")
-
-        fetchallquery3 = """Select SimUnitList.idsim, InorganicFOperations.N, CropManagement.sowingdate, InorganicFOperations.Dferti, InorganicFertilizationPolicy.NumInorganicFerti
-            FROM(InorganicFertilizationPolicy INNER JOIN InorganicFOperations On InorganicFertilizationPolicy.InorgFertiPolicyCode = InorganicFOperations.InorgFertiPolicyCode)
-            INNER JOIN (CropManagement INNER JOIN SimUnitList On CropManagement.idMangt = SimUnitList.idMangt) On InorganicFertilizationPolicy.InorgFertiPolicyCode =
-            CropManagement.InoFertiPolicyCode where idSim='%s' and CropManagement.PlantOrder = 1"""%(ST[-3])
-        fetchallquery3 += season_filter + ";"
-
-        DS2 = pd.read_sql_query(fetchallquery3, master_input_connection)            
-        if date_offset and not DS2.empty:
-            DS2["sowingdate"] = DS2["sowingdate"] + int(date_offset)
-        fileContent += "nbinterventions\n"
-        fileContent += format(DS2.shape[0], ".0f") + "\n"
-        if DS2.shape[0] > 0:
-            for i in range(DS2.shape[0]):
-                fileContent += "julapN_or_sum_upvt absolute_value/% engrais \n"
-                fileContent += str(int(DS2.iloc[i]["sowingdate"] + DS2.iloc[i]["Dferti"])) + " "
-                fileContent += str(DS2.iloc[i]["N"]) + " "
-                rw_engrais = DT[DT["Champ"] == "engrais"]
-                data = rw_engrais["dv"].values[0]
-                fileContent += str(data) + "\n"
-        fileContent += self.format_item(DT, "codlocferti")
-        fileContent += self.format_item(DT, "locferti")
-        fileContent += "irecbutoir\n"   # to here
-        fileContent += format(rw["sowingdate"] + 250, ".0f") + "\n"
-        fileContent += self.format_item(DT, "ressuite")
-        fileContent += "code_autoressuite\n"   # do not see in the documentation
-        fileContent += "2\n"   # do not see in the documentation
-        fileContent += "Stubblevegratio\n"   # do not see in the documentation
-        fileContent += "0\n"   # do not see in the documentation            
-        fileContent += self.format_item(DT, "codceuille")
-        fileContent += self.format_item(DT, "nbceuille")
-        fileContent += self.format_item(DT, "cadencerec")
-        fileContent += self.format_item(DT, "codrecolte")
-        fileContent += self.format_item(DT, "codeaumin")
-        fileContent += self.format_item(DT, "h2ograinmin")
-        fileContent += self.format_item(DT, "h2ograinmax")
-        fileContent += self.format_item(DT, "sucrerec")
-        fileContent += self.format_item(DT, "CNgrainrec")
-        fileContent += self.format_item(DT, "huilerec")
-        fileContent += self.format_item(DT, "coderecolteassoc")
-        fileContent += self.format_item(DT, "codedecirecolte")
-        fileContent += self.format_item(DT, "nbjmaxapresrecolte")
-        fileContent += self.format_item(DT, "codefauche")
-        fileContent += "code_hautfauche_dyn\n"   # Need to be added in the database
-        fileContent += "2\n"   # Need to be added in the database   
-        fileContent += "codetempfauche\n"   # Need to be added in the database
-        fileContent += "1\n"   # Need to be added in the database 
-        fileContent += self.format_item(DT, "codemodfauche")
-        fileContent += self.format_item(DT, "hautcoupedefaut")
-        fileContent += self.format_item(DT, "stadecoupedf")
-        #fileContent += self.format_item(DT, "mscoupemini")
-
-        fileContent += "nbinterventions\n"
-        fileContent += "0\n"
-        fileContent += "nbinterventions\n"
-        fileContent += "0\n"
-
-        fileContent += self.format_item(DT, "codepaillage")
-        fileContent += self.format_item(DT, "couvermulchplastique")
-        fileContent += self.format_item(DT, "albedomulchplastique")
-        fileContent += self.format_item(DT, "codrognage")
-        fileContent += self.format_item(DT, "largrogne")
-        fileContent += self.format_item(DT, "hautrogne")
-        fileContent += self.format_item(DT, "biorognem")
-        fileContent += self.format_item(DT, "codcalrogne")
-        fileContent += self.format_item(DT, "julrogne")
-        fileContent += self.format_item(DT, "margerogne")
-   
-        fileContent += self.format_item(DT, "codeclaircie")
-        fileContent += "nbinterventions\n"    # added
-        fileContent += "0\n"
-        #fileContent += self.format_item(DT, "juleclair")
-        #fileContent += self.format_item(DT, "nbinfloecl")
-            
-        fileContent += self.format_item(DT, "codeffeuil")
-        fileContent += self.format_item(DT, "codhauteff")
-        fileContent += self.format_item(DT, "codcaleffeuil")
-        fileContent += self.format_item(DT, "laidebeff")
-        fileContent += self.format_item(DT, "effeuil")
-        fileContent += self.format_item(DT, "juleffeuil")
-        fileContent += self.format_item(DT, "laieffeuil")
-        fileContent += self.format_item(DT, "codetaille")
-        fileContent += self.format_item(DT, "jultaille")
-        fileContent += self.format_item(DT, "codepalissage")
-        fileContent += self.format_item(DT, "hautmaxtec")
-        fileContent += self.format_item(DT, "largtec")
-        fileContent += self.format_item(DT, "codabri")
-        fileContent += self.format_item(DT, "transplastic")
-        fileContent += self.format_item(DT, "surfouvre1")
-        fileContent += self.format_item(DT, "julouvre2")
-        fileContent += self.format_item(DT, "surfouvre2")
-        fileContent += self.format_item(DT, "julouvre3")
-        fileContent += self.format_item(DT, "surfouvre3")
-        fileContent += "codejourdes\n"
-        fileContent += "2\n"
-        fileContent += "juldes\n"
-        fileContent += "999\n"
-        fileContent += self.format_item(DT, "codeDST")
-        fileContent += self.format_item(DT, "dachisel")
-        fileContent += self.format_item(DT, "dalabour")
-        fileContent += self.format_item(DT, "rugochisel")
-        fileContent += self.format_item(DT, "rugolabour")
-        fileContent += self.format_item(DT, "codeDSTtass")
-        fileContent += self.format_item(DT, "profhumsemoir")
-        fileContent += self.format_item(DT, "dasemis")
-        fileContent += self.format_item(DT, "profhumrecolteuse")
-        fileContent += self.format_item(DT, "darecolte")
-        fileContent += self.format_item(DT, "codeDSTnbcouche")           
-        try:
-            # Export file to specified directory
-            self.write_file(usmdir, file_name, fileContent)
-        except Exception as e:
-            print("Error during writing file : " + str(e))
-            traceback.print_exc()
-        if len(rows) == 1: return fileContent
-
-        T = "Select Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model='sticsv11') AND ([Table]='fictec2'));"
-        DT = pd.read_sql_query(T, ModelDictionary_Connection)            
-        zz1 = fileContent
-        
-        fetchallquery2 = """SELECT SimUnitList.idsim, CropManagement.sowingdate, OrganicFOperations.Dferti, OrganicFOperations.OFNumber, OrganicFOperations.CNferti, 
-        OrganicFOperations.NFerti, OrganicFOperations.Qmanure, OrganicFOperations.TypeResidues, ListResidues.idresidueStics, CropManagement.SoilTillPolicyCode 
-        FROM ListResidues INNER JOIN ((OrganicFertilizationPolicy INNER JOIN (CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt) 
-        ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode) INNER JOIN OrganicFOperations ON OrganicFertilizationPolicy.OFertiPolicyCode
-        = OrganicFOperations.OFertiPolicyCode) ON ListResidues.TypeResidues = OrganicFOperations.TypeResidues where idSim='%s' and CropManagement.PlantOrder=2"""%(ST[-3])
-        fetchallquery2 += season_filter + " Order by OFNumber;"
-
-        fileContent = ""
-        rw = rows[1]
-        Sql = """SELECT SoilTillPolicy.SoilTillPolicyCode, SoilTillageOperations.STNumber, SoilTillPolicy.NumTillOperations, SoilTillageOperations.DepthResUp, SoilTillageOperations.DepthResLow, SoilTillageOperations.DSTill
-                FROM SoilTillPolicy INNER JOIN SoilTillageOperations ON SoilTillPolicy.SoilTillPolicyCode = SoilTillageOperations.SoilTillPolicyCode
-                where SoilTillPolicy.SoilTillPolicyCode= '%s';"""%(rw["SoilTillPolicyCode"])
-        DS2 = pd.read_sql_query(fetchallquery2, master_input_connection)   
-        if date_offset and not DS2.empty:
-            DS2["sowingdate"] = DS2["sowingdate"] + int(date_offset)
-        rows2 = DS2.to_dict(orient='records')
-        Adp = pd.read_sql_query(Sql, master_input_connection)
-        dataTill = Adp.to_dict(orient='records')
-                
-        fileContent += "nbinterventions\n"
-        if not rows2 or rows2[0]["idresidueStics"] is None:
-            fileContent += "0\n"
+            res = "{:0.3e}".format(tmp)
+    if data is None:
+        res = ""
+    fileContent += fieldName + "\n"
+    fileContent += res + "\n"
+    return fileContent
+
+
+class FictecTemplate:
+    """fictec file of one plant with its ModelDictionary items rendered once."""
+
+    def __init__(self, DT):
+        def items(champs):
+            return "".join(format_item(DT, champ) for champ in champs)
+
+        self.DT = DT  # eaures and engrais are only read when there are fertilizations
+        self.residues = items(RESIDUE_ITEMS) + "nbinterventions\n"
+        self.sowing = format_item(DT, "profsem") + "densitesem\n"
+        self.crop = items(CROP_ITEMS) + "nbinterventions\n" + "0\n" + items(IRRIGATION_ITEMS) + "profmes\n"
+        self.nitrogen = items(NITROGEN_ITEMS) + "nbinterventions\n"
+        self.fertilization = format_item(DT, "codlocferti") + format_item(DT, "locferti") + "irecbutoir\n"
+        self.harvest = (
+            format_item(DT, "ressuite")
+            + "code_autoressuite\n" + "2\n"   # do not see in the documentation
+            + "Stubblevegratio\n" + "0\n"   # do not see in the documentation
+            + items(HARVEST_ITEMS)
+            + "code_hautfauche_dyn\n" + "2\n"   # Need to be added in the database
+            + "codetempfauche\n" + "1\n"   # Need to be added in the database
+            + items(MOWING_ITEMS)
+            + "nbinterventions\n" + "0\n" + "nbinterventions\n" + "0\n"
+            + items(CANOPY_ITEMS)
+            + "nbinterventions\n" + "0\n"
+            + items(LEAF_ITEMS)
+            + "codejourdes\n" + "2\n" + "juldes\n" + "999\n"
+            + items(SOIL_STRUCTURE_ITEMS)
+        )
+
+    def render(self, rw, organic, tillage, mineral):
+        """File of one plant: its CropManagement row, organic inputs, tillage and mineral fertilizations."""
+        parts = ["nbinterventions\n"]
+        if not organic or organic[0]["idresidueStics"] is None:
+            parts.append("0\n")
         else:
-            fileContent += str(len(rows2)) + "\n"
-            if len(rows2) != 0:
-                for i in range(len(rows2)):
-                    fileContent += "julres coderes qres Crespc CsurNres Nminres eaures" + "\n"
-                    fileContent += str(int(rows2[i]["sowingdate"]) + int(rows2[i]["Dferti"])) + " "
-                    fileContent += str(rows2[i]["idresidueStics"]) + " "
-                    fileContent += str(int(rows2[i]["Qmanure"])/1000) + " "
-                    fileContent += str(rows2[i]["CNferti"] * rows2[i]["NFerti"]) + " "
-                    fileContent += str(rows2[i]["CNferti"]) + " "
-                    fileContent += str(rows2[i]["NFerti"]) + " "
-                    fileContent += self.FormatSticsRawData(DT, "supply of organic residus.eaures") + "\n"
-        fileContent += self.format_item(DT, "code_auto_profres")
-        fileContent += self.format_item(DT, "resk")
-        fileContent += self.format_item(DT, "resz")
-        fileContent += "nbinterventions\n"
-        fileContent += format(dataTill[0]["NumTillOperations"], ".0f") + "\n"
-        if dataTill[0]["NumTillOperations"] > 0:
-            for i in range(len(dataTill)):
-                fileContent += "jultrav profres proftrav \n"
-                fileContent += format(rw["sowingdate"] + dataTill[i]["DSTill"], ".0f") + " "
-                fileContent += format(dataTill[i]["DepthResUp"], ".0f") + " "
-                fileContent += format(dataTill[i]["DepthResLow"], ".0f") + "\n"
+            parts.append(str(len(organic)) + "\n")
+            for row in organic:
+                parts.append("julres coderes qres Crespc CsurNres Nminres eaures" + "\n")
+                parts.append(str(int(row["sowingdate"]) + int(row["Dferti"])) + " ")
+                parts.append(str(row["idresidueStics"]) + " ")
+                parts.append(str(int(row["Qmanure"])/1000) + " ")
+                parts.append(str(row["CNferti"] * row["NFerti"]) + " ")
+                parts.append(str(row["CNferti"]) + " ")
+                parts.append(str(row["NFerti"]) + " ")
+                parts.append(self.DT["supply of organic residus.eaures"] + "\n")
+        parts.append(self.residues)
+        parts.append(format(tillage[0]["NumTillOperations"], ".0f") + "\n")
+        if tillage[0]["NumTillOperations"] > 0:
+            for operation in tillage:
+                parts.append("jultrav profres proftrav \n")
+                parts.append(format(rw["sowingdate"] + operation["DSTill"], ".0f") + " ")
+                parts.append(format(operation["DepthResUp"], ".0f") + " ")
+                parts.append(format(operation["DepthResLow"], ".0f") + "\n")
+        parts.append("iplt0\n")
+        parts.append(format(rw["sowingdate"], ".0f") + "\n")
+        parts.append(self.sowing)
+        parts.append(str(format(rw["sdens"], ".2f")) + "\n")
+        parts.append("variete\n")
+        parts.append(rw["idcultivarStics"] + "\n")
+        parts.append(self.crop)
+        parts.append(format(rw["SoilTotalDepth"], ".0f") + "\n")
+        parts.append(self.nitrogen)
+        parts.append(format(len(mineral), ".0f") + "\n")
+        for row in mineral:
+            parts.append("julapN_or_sum_upvt absolute_value/% engrais \n")
+            parts.append(str(int(row["sowingdate"] + row["Dferti"])) + " ")
+            parts.append(str(row["N"]) + " ")
+            parts.append(str(self.DT["engrais"]) + "\n")
+        parts.append(self.fertilization)
+        parts.append(format(rw["sowingdate"] + 250, ".0f") + "\n")
+        parts.append(self.harvest)
+        return "".join(parts)
+
+
+class FictecTemplates:
+    """fictec1/fictec2 templates of a ModelDictionary, compiled on first use."""
+
+    def __init__(self, ModelDictionary_Connection):
+        self.defaults = model_defaults(ModelDictionary_Connection)
+        self._templates = {}
+
+    def __getitem__(self, plant):
+        if plant not in self._templates:
+            self._templates[plant] = FictecTemplate(self.defaults.table("sticsv11", f"fictec{plant}"))
+        return self._templates[plant]
 
-        fileContent += "iplt0\n"
-        fileContent += format(rw["sowingdate"], ".0f") + "\n"
-        fileContent += self.format_item( DT, "profsem")
-        fileContent += "densitesem\n"
-        fileContent += str(format(rw["sdens"], ".2f"))+ "\n"
-        fileContent += "variete\n"
-        fileContent += rw["idcultivarStics"] + "\n"
-        fileContent += self.format_item(DT, "codetradtec")
-        fileContent += self.format_item(DT, "interrang")
-        fileContent += self.format_item(DT, "orientrang")
-        fileContent += self.format_item(DT, "code_strip")
-        fileContent += self.format_item(DT, "nrow")
-        fileContent += self.format_item(DT, "codedecisemis")
-        fileContent += self.format_item(DT, "nbjmaxapressemis")
-        fileContent += self.format_item(DT, "nbjseuiltempref")
-        fileContent += self.format_item(DT, "nbj_pr_apres_semis") # add
-        fileContent += self.format_item(DT, "eau_mini_decisemis") # add
-        fileContent += self.format_item(DT, "humirac_decisemis") # add
-        fileContent += self.format_item(DT, "codestade")
-        fileContent += self.format_item(DT, "ilev")
-        fileContent += self.format_item(DT, "iamf")
-        fileContent += self.format_item(DT, "ilax")
-        fileContent += self.format_item(DT, "isen")
-        fileContent += self.format_item(DT, "ilan")
-        fileContent += self.format_item(DT, "iflo")
-        fileContent += self.format_item(DT, "idrp")
-        fileContent += self.format_item(DT, "imat")
-        fileContent += self.format_item(DT, "irec")
-        fileContent += self.format_item(DT, "effirr")  # change positioon
-        fileContent += self.format_item(DT, "codecalirrig")
-        fileContent += self.format_item(DT, "ratiol")
-        fileContent += self.format_item(DT, "dosimx")
-        fileContent += self.format_item(DT, "doseirrigmin")
-        fileContent += self.format_item(DT, "codedate_irrigauto") # add
-        fileContent += self.format_item(DT, "datedeb_irrigauto") # add
-        fileContent += self.format_item(DT, "datefin_irrigauto") # add
-        fileContent += self.format_item(DT, "stage_start_irrigauto") # add
-        fileContent += self.format_item(DT, "stage_end_irrigauto") # add
-        fileContent += self.format_item(DT, "codedateappH2O")
-                
-        fileContent += "nbinterventions\n"
-        fileContent += "0\n"
-        fileContent += self.format_item(DT, "codlocirrig")
-        fileContent += self.format_item(DT, "locirrig")
-        fileContent += "profmes\n"
-        fileContent += format(rw["SoilTotalDepth"], ".0f") + "\n"      
-        #fileContent += self.format_item(DT, "engrais") # remove
-        fileContent += self.format_item(DT, "concirr")
-        fileContent += self.format_item(DT, "codedateappN")
-        fileContent += self.format_item(DT, "codefracappN")
-        fileContent += self.format_item(DT, "Qtot_N")
 
+class SticsFictec1Converter(Converter):
+    def __init__(self):
+        super().__init__()
 
-        fetchallquery3 = """Select SimUnitList.idsim, InorganicFOperations.N, CropManagement.sowingdate, InorganicFOperations.Dferti, InorganicFertilizationPolicy.NumInorganicFerti
-                FROM(InorganicFertilizationPolicy INNER JOIN InorganicFOperations On InorganicFertilizationPolicy.InorgFertiPolicyCode = InorganicFOperations.InorgFertiPolicyCode)
-                INNER JOIN (CropManagement INNER JOIN SimUnitList On CropManagement.idMangt = SimUnitList.idMangt) On InorganicFertilizationPolicy.InorgFertiPolicyCode =
-                CropManagement.InoFertiPolicyCode where idSim='%s' and CropManagement.PlantOrder = 2"""%(ST[-3])
-        fetchallquery3 += season_filter + ";"
-
-        DS2 = pd.read_sql_query(fetchallquery3, master_input_connection)            
-        if date_offset and not DS2.empty:
-            DS2["sowingdate"] = DS2["sowingdate"] + int(date_offset)
-        fileContent += "nbinterventions\n"
-        fileContent += format(DS2.shape[0], ".0f") + "\n"
-        if DS2.shape[0] > 0:
-            for i in range(DS2.shape[0]):
-                fileContent += "julapN_or_sum_upvt absolute_value/% engrais \n"
-                fileContent += str(int(DS2.iloc[i]["sowingdate"] + DS2.iloc[i]["Dferti"])) + " "
-                fileContent += str(DS2.iloc[i]["N"]) + " "
-                rw_engrais = DT[DT["Champ"] == "engrais"]
-                data = rw_engrais["dv"].values[0]
-                fileContent += str(data) + "\n"
-        fileContent += self.format_item(DT, "codlocferti")
-        fileContent += self.format_item(DT, "locferti")
-        fileContent += "irecbutoir\n"   # to here
-        fileContent += format(rw["sowingdate"] + 250, ".0f") + "\n"
-        fileContent += self.format_item(DT, "ressuite")
-        fileContent += "code_autoressuite\n"   # do not see in the documentation
-        fileContent += "2\n"   # do not see in the documentation
-        fileContent += "Stubblevegratio\n"   # do not see in the documentation
-        fileContent += "0\n"   # do not see in the documentation            
-        fileContent += self.format_item(DT, "codceuille")
-        fileContent += self.format_item(DT, "nbceuille")
-        fileContent += self.format_item(DT, "cadencerec")
-        fileContent += self.format_item(DT, "codrecolte")
-        fileContent += self.format_item(DT, "codeaumin")
-        fileContent += self.format_item(DT, "h2ograinmin")
-        fileContent += self.format_item(DT, "h2ograinmax")
-        fileContent += self.format_item(DT, "sucrerec")
-        fileContent += self.format_item(DT, "CNgrainrec")
-        fileContent += self.format_item(DT, "huilerec")
-        fileContent += self.format_item(DT, "coderecolteassoc")
-        fileContent += self.format_item(DT, "codedecirecolte")
-        fileContent += self.format_item(DT, "nbjmaxapresrecolte")
-        fileContent += self.format_item(DT, "codefauche")
-        fileContent += "code_hautfauche_dyn\n"   # Need to be added in the database
-        fileContent += "2\n"   # Need to be added in the database   
-        fileContent += "codetempfauche\n"   # Need to be added in the database
-        fileContent += "1\n"   # Need to be added in the database 
-        fileContent += self.format_item(DT, "codemodfauche")
-        fileContent += self.format_item(DT, "hautcoupedefaut")
-        fileContent += self.format_item(DT, "stadecoupedf")
-        #fileContent += self.format_item(DT, "mscoupemini"
-        fileContent += "nbinterventions\n"
-        fileContent += "0\n"
-        fileContent += "nbinterventions\n"
-        fileContent += "0\n"
+    def render(self, idsim, ModelDictionary_Connection, master_input_connection, season_order=None, date_offset=0,
+               snapshot=None, templates=None):
+        """Contents of fictec1.txt, and of fictec2.txt for intercrops, without writing them."""
+        return list(self._render(idsim, ModelDictionary_Connection, master_input_connection, season_order,
+                                 date_offset, snapshot, templates))
 
-        fileContent += self.format_item(DT, "codepaillage")
-        fileContent += self.format_item(DT, "couvermulchplastique")
-        fileContent += self.format_item(DT, "albedomulchplastique")
-        fileContent += self.format_item(DT, "codrognage")
-        fileContent += self.format_item(DT, "largrogne")
-        fileContent += self.format_item(DT, "hautrogne")
-        fileContent += self.format_item(DT, "biorognem")
-        fileContent += self.format_item(DT, "codcalrogne")
-        fileContent += self.format_item(DT, "julrogne")
-        fileContent += self.format_item(DT, "margerogne")
-    
-        fileContent += self.format_item(DT, "codeclaircie")
-        fileContent += "nbinterventions\n"    # added
-        fileContent += "0\n"
-        #fileContent += self.format_item(DT, "juleclair")
-        #fileContent += self.format_item(DT, "nbinfloecl")
-                
-        fileContent += self.format_item(DT, "codeffeuil")
-        fileContent += self.format_item(DT, "codhauteff")
-        fileContent += self.format_item(DT, "codcaleffeuil")
-        fileContent += self.format_item(DT, "laidebeff")
-        fileContent += self.format_item(DT, "effeuil")
-        fileContent += self.format_item(DT, "juleffeuil")
-        fileContent += self.format_item(DT, "laieffeuil")
-        fileContent += self.format_item(DT, "codetaille")
-        fileContent += self.format_item(DT, "jultaille")
-        fileContent += self.format_item(DT, "codepalissage")
-        fileContent += self.format_item(DT, "hautmaxtec")
-        fileContent += self.format_item(DT, "largtec")
-        fileContent += self.format_item(DT, "codabri")
-        fileContent += self.format_item(DT, "transplastic")
-        fileContent += self.format_item(DT, "surfouvre1")
-        fileContent += self.format_item(DT, "julouvre2")
-        fileContent += self.format_item(DT, "surfouvre2")
-        fileContent += self.format_item(DT, "julouvre3")
-        fileContent += self.format_item(DT, "surfouvre3")
-        fileContent += "codejourdes\n"
-        fileContent += "2\n"
-        fileContent += "juldes\n"
-        fileContent += "999\n"
-        fileContent += self.format_item(DT, "codeDST")
-        fileContent += self.format_item(DT, "dachisel")
-        fileContent += self.format_item(DT, "dalabour")
-        fileContent += self.format_item(DT, "rugochisel")
-        fileContent += self.format_item(DT, "rugolabour")
-        fileContent += self.format_item(DT, "codeDSTtass")
-        fileContent += self.format_item(DT, "profhumsemoir")
-        fileContent += self.format_item(DT, "dasemis")
-        fileContent += self.format_item(DT, "profhumrecolteuse")
-        fileContent += self.format_item(DT, "darecolte")
-        fileContent += self.format_item(DT, "codeDSTnbcouche")           
-        try:
-            # Export file to specified directory
-            self.write_file(usmdir, file_name2, fileContent)
-        except Exception as e:
-            print("Error during writing file : " + str(e))
-            traceback.print_exc()  
-                
-        zz2 = fileContent              
-            
-        return [zz1, zz2]
+    def _render(self, idsim, ModelDictionary_Connection, master_input_connection, season_order, date_offset,
+                snapshot, templates):
+        if snapshot is None:
+            rows = fetch_season(master_input_connection, "stics.fictec", season_order, idsim)
+        else:
+            rows = snapshot.fictec_rows(idsim, season_order)
+        rows = self.shift_sowing(rows, date_offset)
+        if not rows:
+            raise IndexError(f"No CropManagement rows for {idsim}")
+        if templates is None:
+            templates = FictecTemplates(ModelDictionary_Connection)
+        for plant, rw in enumerate(rows[:2], 1):
+            if snapshot is None:
+                organic = fetch_season(master_input_connection, "stics.organic", season_order, idsim, plant)
+                tillage = fetch_all(master_input_connection, "stics.tillage", rw["SoilTillPolicyCode"])
+                mineral = fetch_season(master_input_connection, "stics.mineral", season_order, idsim, plant)
+            else:
+                organic = snapshot.organic_rows(idsim, plant, season_order)
+                tillage = snapshot.tillage_rows(rw["SoilTillPolicyCode"])
+                mineral = snapshot.mineral_rows(idsim, plant, season_order)
+            yield templates[plant].render(
+                rw, self.shift_sowing(organic, date_offset), tillage, self.shift_sowing(mineral, date_offset)
+            )
+
+    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir, season_order=None,
+               date_offset=0, snapshot=None, templates=None):
+        ST = directory_path.split(os.sep)
+        contents = []
+        for file_name, fileContent in zip(("fictec1.txt", "fictec2.txt"), self._render(
+                ST[-3], ModelDictionary_Connection, master_input_connection, season_order, date_offset,
+                snapshot, templates)):
+            try:
+                # Export file to specified directory
+                self.write_file(usmdir, file_name, fileContent)
+            except Exception as e:
+                print("Error during writing file : " + str(e))
+                traceback.print_exc()
+            contents.append(fileContent)
+        if len(contents) == 1: return contents[0]
+        return contents
 
     def format_item(self, row, champ, precision = 5, fieldIt = 0):
-        fieldName = champ
-        fileContent = ""
-        if (fieldIt != 0):
-            x = fieldName.split(".")
-            fieldName = ".".join(x[1:])
-        rw = row[row["Champ"] == champ]
-        data = rw["dv"].values[0]
-        res = ""
-        if isinstance(data, str) or isinstance(data, int):
-            res = str(data)
-        if isinstance(data, float):
-            tmp = float(data)
-            if precision > 0 and precision < 7:
-                res = "{:.{}f}".format(tmp, precision)
-            else:
-                res = "{:0.3e}".format(tmp)
-        if data is None:
-            res = ""
-        fileContent += fieldName + "\n"
-        fileContent += res + "\n"
-        return fileContent
-        
+        return format_item(row, champ, precision, fieldIt)
+
+    def shift_sowing(self, rows, date_offset):
+        """Apply a successive-season date offset to the sowing date of the records."""
+        if date_offset:
+            rows = [dict(row, sowingdate=row["sowingdate"] + int(date_offset)) for row in rows]
+        return rows
 
     def FormatSticsRawData(self, data, champ, precision  = 1):
-        rw2 = data[data["Champ"]==champ]
-        res = rw2["dv"].values[0]
+        res = data[champ]
         return res
-
-
-
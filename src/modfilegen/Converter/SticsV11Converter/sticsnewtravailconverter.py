@@ -1,107 +1,122 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import fetch_season
 from sqlite3 import Connection
 import os
-import pandas as pd
 import traceback
 
-class SticsNewTravailConverter(Converter):
-    def __init__(self):
-        super().__init__()
 
-    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir, season_order=None):
-        file_name = "new_travail.usm"
-        fileContent = ""
-        ST = directory_path.split(os.sep)
-        fetchAllQuery = """SELECT SimUnitList.idsim, SimUnitList.idPoint as idPoint, SimUnitList.StartYear,SimUnitList.StartDay,SimUnitList.EndDay,SimUnitList.Endyear, SimUnitList.idsoil, SimUnitList.idMangt, SimUnitList.idIni, Coordinates.LatitudeDD, CropManagement.sowingdate,
-        ListCultivars.SpeciesName FROM InitialConditions INNER JOIN ((ListCultivars INNER JOIN CropManagement ON ListCultivars.IdCultivar = CropManagement.Idcultivar) INNER JOIN (Coordinates INNER
-        Join SimUnitList ON Coordinates.idPoint = SimUnitList.idPoint) ON CropManagement.idMangt = SimUnitList.idMangt) ON InitialConditions.idIni = SimUnitList.idIni Where idsim = '%s'"""%(ST[-3])
-        if season_order is not None:
-            fetchAllQuery += " AND CropManagement.SeasonOrder = %d" % int(season_order)
-        fetchAllQuery += " ORDER BY CropManagement.PlantOrder;"
-        DA = pd.read_sql_query(fetchAllQuery, master_input_connection)
-        T = "Select  Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'sticsv11') And ([Table] = 'new_travail'));"
-        DT = pd.read_sql_query(T, ModelDictionary_Connection)
-        rows = DA.to_dict(orient='records')
+def calendar(row):
+    """Calendar fields of new_travail.usm for a simulation row (SimUnitList years and days)."""
+    if row["StartYear"] % 4 == 0:
+        Bissext = 1
+    else:
+        Bissext = 0
+    if row["StartYear"] != row["EndYear"]:
+        datefin = row["EndDay"] + 365 + Bissext
+        years = 2
+    else:
+        datefin = row["EndDay"]
+        years = 1
+    second_climate_year = (
+        row["StartYear"]
+        if row["StartYear"] == row["EndYear"]
+        else row["StartYear"] + 1
+    )
+    return {
+        "datedebut": row["StartDay"],
+        "datefin": datefin,
+        "fclim1": "cli" + row["idPoint"] + "j." + str(row["StartYear"]),
+        "fclim2": "cli" + row["idPoint"] + "j." + str(second_climate_year),
+        "nbans": years,
+        "culturean": years,
+    }
+
+
+class NewTravailTemplate:
+    """new_travail.usm with its ModelDictionary parts rendered once.
+
+    ``render`` only fills in the per-simulation fields: number of plants, species name,
+    calendar (see ``calendar``) and, when given, codesuite.
+    """
 
-        fileContent += ":codesimul" + "\n"
-        rw = DT[DT["Champ"] == "codesimul"]
-        Dv = rw["dv"].values[0]
-        fileContent += Dv + "\n"
-        fileContent += ":codoptim" + "\n"
-        rw = DT[DT["Champ"] == "codoptim"]
-        Dv = rw["dv"].values[0]
-        fileContent += Dv + "\n"
-        fileContent += ":codesuite" + "\n"
-        rw = DT[DT["Champ"] == "codesuite"]
-        Dv = rw["dv"].values[0]
-        fileContent += Dv + "\n"
+    def __init__(self, DT):
+        self.codesuite = DT["codesuite"]
+        self.head = (
+            ":codesimul" + "\n" + DT["codesimul"] + "\n"
+            + ":codoptim" + "\n" + DT["codoptim"] + "\n"
+            + ":codesuite" + "\n"
+        )
+        self.plant1 = (
+            ":fplt1" + "\n" + "ficplt1.txt" + "\n"
+            + ":ftec1" + "\n" + "fictec1.txt" + "\n"
+            + ":flai1" + "\n" + DT["flai1"] + "\n"
+        )
+        self.DT = DT  # flai2 is only read for intercrops, as export did
+
+    @classmethod
+    def from_connection(cls, ModelDictionary_Connection):
+        return cls(model_defaults(ModelDictionary_Connection).table("sticsv11", "new_travail"))
+
+    def render(self, nbplantes, species, fields, codesuite=None):
+        fileContent = self.head
+        fileContent += (self.codesuite if codesuite is None else str(codesuite)) + "\n"
         fileContent += ":nbplantes" + "\n"
-        #rw = DT[DT["Champ"] == "nbplantes"]
-        #Dv = rw["dv"].values[0]
-        fileContent += str(len(rows)) + "\n"
+        fileContent += str(nbplantes) + "\n"
         fileContent += ":nom" + "\n"
-        fileContent += rows[0]["SpeciesName"] + "\n"
+        fileContent += species + "\n"
         fileContent += ":datedebut" + "\n"
-        fileContent += str(rows[0]["StartDay"]) + "\n"
+        fileContent += str(fields["datedebut"]) + "\n"
         fileContent += ":datefin" + "\n"
-        if rows[0]["StartYear"] % 4 == 0:
-            Bissext = 1
-        else:
-            Bissext = 0
-        if rows[0]["StartYear"] != rows[0]["EndYear"]:
-            fileContent += str(rows[0]["EndDay"] + 365 + Bissext) + "\n"
-        else:
-            fileContent += str(rows[0]["EndDay"]) + "\n"
-
-        fileContent += ":finit" + "\n"
-        fileContent += "ficini.txt" + "\n"
-        fileContent += ":numsol" + "\n"
-        fileContent += "1" + "\n"
-        fileContent += ":nomsol" + "\n"
-        fileContent += "param.sol" + "\n"
-        fileContent += ":fstation" + "\n"
-        fileContent += "station.txt" + "\n"
+        fileContent += str(fields["datefin"]) + "\n"
+        fileContent += ":finit" + "\n" + "ficini.txt" + "\n"
+        fileContent += ":numsol" + "\n" + "1" + "\n"
+        fileContent += ":nomsol" + "\n" + "param.sol" + "\n"
+        fileContent += ":fstation" + "\n" + "station.txt" + "\n"
         fileContent += ":fclim1" + "\n"
-        fileContent += "cli" + rows[0]["idPoint"] + "j." + str(rows[0]["StartYear"]) + "\n"
+        fileContent += fields["fclim1"] + "\n"
         fileContent += ":fclim2" + "\n"
-        second_climate_year = (
-            rows[0]["StartYear"]
-            if rows[0]["StartYear"] == rows[0]["EndYear"]
-            else rows[0]["StartYear"] + 1
-        )
-        fileContent += "cli" + rows[0]["idPoint"] + "j." + str(second_climate_year) + "\n"
+        fileContent += fields["fclim2"] + "\n"
         fileContent += ":nbans" + "\n"
-        
-        if rows[0]["StartYear"] != rows[0]["EndYear"]:
-            fileContent += "2" + "\n"
-        else:
-            fileContent += "1" + "\n"
+        fileContent += str(fields["nbans"]) + "\n"
         fileContent += ":culturean" + "\n"
-        if rows[0]["StartYear"] != rows[0]["EndYear"]:
-            fileContent += "2" + "\n"
-        else:
-            fileContent += "1" + "\n"
-        fileContent += ":fplt1" + "\n"
-        fileContent += "ficplt1.txt" + "\n"
-        fileContent += ":ftec1" + "\n"
-        fileContent += "fictec1.txt" + "\n"
-        fileContent += ":flai1" + "\n"
-        rw = DT[DT["Champ"] == "flai1"]
-        Dv = rw["dv"].values[0]
-        fileContent += Dv + "\n"
-        
-        if len(rows) == 2:
+        fileContent += str(fields["culturean"]) + "\n"
+        fileContent += self.plant1
+        if nbplantes == 2:
             fileContent += ":fplt2" + "\n"
             fileContent += "ficplt2.txt" + "\n"
             fileContent += ":ftec2" + "\n"
-            fileContent += "fictec2.txt" + "\n"    
+            fileContent += "fictec2.txt" + "\n"
             fileContent += ":flai2" + "\n"
-            rw = DT[DT["Champ"] == "flai2"]
-            Dv = rw["dv"].values[0]
-            fileContent += Dv + "\n"        
+            fileContent += self.DT["flai2"] + "\n"
+        return fileContent
+
+
+class SticsNewTravailConverter(Converter):
+    def __init__(self):
+        super().__init__()
+
+    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir, season_order=None,
+               snapshot=None, template=None, fields=None, codesuite=None):
+        """Write new_travail.usm.
+
+        ``template`` is a ``NewTravailTemplate`` compiled once by the caller; ``fields`` replace
+        the calendar computed from SimUnitList (successive seasons) and ``codesuite`` the default.
+        """
+        file_name = "new_travail.usm"
+        ST = directory_path.split(os.sep)
+        if snapshot is None:
+            rows = fetch_season(master_input_connection, "stics.newtravail", season_order, ST[-3])
+        else:
+            rows = snapshot.newtravail_rows(ST[-3], season_order)
+        if template is None:
+            template = NewTravailTemplate.from_connection(ModelDictionary_Connection)
+        fileContent = template.render(
+            len(rows), rows[0]["SpeciesName"], calendar(rows[0]) if fields is None else fields, codesuite
+        )
         try:
             self.write_file(usmdir, file_name, fileContent)
         except Exception as e:
             traceback.print_exc()
             print(f"Error during writing file : {e}")
-
+        return fileContent
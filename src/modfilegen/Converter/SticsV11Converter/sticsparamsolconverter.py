@@ -1,105 +1,111 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import fetch_all
 from sqlite3 import Connection
 import os
-import pandas as pd
 import traceback
 
+
+def render(soil_rows, layers, defaults):
+    """param.sol of a soil: its Soil rows, ``layers(IdSoil)`` giving its SoilLayers by NumLayer."""
+    file_lines = []
+    for row in soil_rows:
+        line1 = [
+            "     1  ","Sol", f"{row['Clay']:.1f}", f"{row['OrganicNStock']:.4f}",
+            f"{float(defaults['profhum']):.4f}", f"{float(defaults['calc']):.4f}",
+            f"{row['pH']:.4f}", f"{float(defaults['concseuil']):.4f}",
+            f"{row['albedo']:.4f}", f"{float(defaults['q0']):.4f}",
+            f"{row['RunoffCoefBSoil']:.4f}", f"{row['SoilRDepth']:.4f}",
+            f"{float(defaults['pluiebat']):.4f}", f"{float(defaults['mulchbat']):.4f}",
+            f"{float(defaults['zesx']):.4f}", f"{float(defaults['cfes']):.4f}",
+            f"{float(defaults['z0solnu']):.4f}", f"{row['OrganicC']/row['OrganicNStock']:.4f}",
+            f"{float(defaults['finert']):.5f}", f"{float(defaults['penterui']):.4f}"
+        ]
+        file_lines.append(" ".join(line1))
+
+        codes = ["codecailloux", "codemacropor", "codefente", "codrainage", "coderemontcap", "codenitrif", "codedenit"]
+        line2 = ["     1  "] + [f"{int(float(defaults[c])):.0f}" for c in codes]
+        file_lines.append(" ".join(line2))             
+
+        line3 = [
+            "     1  ",
+            f"{float(defaults['profimper']):.4f}", f"{float(defaults['ecartdrain']):.4f}",
+            f"{float(defaults['ksol']):.4f}", f"{float(defaults['profdrain']):.4f}",
+            f"{float(defaults['capiljour']):.4f}", f"{float(defaults['humcapil']):.4f}",
+            f"{int(float(defaults['profdenit'])):.0f}", f"{float(defaults['vpotdenit']):.4f}"
+        ]
+        file_lines.append(" ".join(line3))            
+        rows = layers(row['IdSoil'])
+        for i in range(5):
+            if row["SoilOption"] == "simple":
+                #fileContent += "     1   "
+                file_lines.append("     1  ")
+                if i == 0:
+                    #fileContent += format(row["SoilTotalDepth"], ".2f") + " "
+                    depth = f"{row['SoilTotalDepth']:.2f} "
+                else:
+                    #fileContent += "0.00 "  
+                    depth = "0.00" 
+                values = [
+                    depth,
+                    f"{row['Wfc']/row['bd']:.2f}",
+                    f"{row['Wwp']/row['bd']:.2f}",
+                    f"{row['bd']:.2f}",
+                    f"{row['cf']:.2f}",
+                    f"{int(defaults['typecailloux'])}",
+                    f"{int(float(defaults['infil']))}",
+                    f"{int(defaults['epd'])}"
+                ]
+                file_lines[-1] += " " + " ".join(values)
+            else:
+                if i < len(rows):
+                    values = ["     1  ",
+                        f"{rows[i]['Ldown'] - rows[i]['Lup']:.2f}",
+                        f"{rows[i]['Wfc']/rows[i]['bd']:.2f}",
+                        f"{rows[i]['Wwp']/rows[i]['bd']:.2f}",
+                        f"{rows[i]['bd']:.2f}",
+                        f"{row['cf']:.2f}",
+                        f"{int(defaults['typecailloux'])}",
+                        f"{int(float(defaults['infil']))}",
+                        f"{int(defaults['epd'])}"
+                    ]
+
+                else:
+                    values = ["     1  ","0.00","0.00","0.00","0.00",f"{row['cf']:.2f}",
+                        f"{int(defaults['typecailloux'])}",
+                        f"{int(float(defaults['infil']))}",
+                        f"{int(defaults['epd'])}"
+                    ]
+                file_lines.append(" ".join(values))
+    return "\n".join(file_lines)
+
+
 class SticsParamSolConverter(Converter):
     def __init__(self):
         super().__init__()
 
-    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir):
+    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, usmdir, snapshot=None):
         file_name = "param.sol"
         fileContent = ""
         ST = directory_path.split(os.sep)
         id_sim = ST[-3]
-        T = "Select  Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'sticsv11') And ([Table] = 'paramsol'));"
-        DT = pd.read_sql_query(T,ModelDictionary_Connection)
-        defaults = DT.set_index("Champ")["dv"].to_dict() 
+        defaults = model_defaults(ModelDictionary_Connection).table("sticsv11", "paramsol")
         
-        fetchAllQuery = """SELECT Soil.IdSoil,Soil.SoilOption, Soil.OrganicC,Soil.OrganicNStock as "OrganicNStock", Soil.SoilRDepth, Soil.SoilTotalDepth, Soil.SoilTextureType, Soil.Wwp, Soil.Wfc, Soil.bd, Soil.albedo, Soil.Ph as "pH", Soil.cf, RunoffTypes.RunoffCoefBSoil as "RunoffCoefBSoil", Soil.Clay as "Clay"
-        FROM RunoffTypes INNER JOIN (Soil INNER JOIN SimUnitList ON Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil)) ON RunoffTypes.RunoffType = Soil.RunoffType
-        where idSim='%s';"""%(id_sim)
-        DA = pd.read_sql_query(fetchAllQuery, master_input_connection)
-        rows = DA.to_dict(orient='records')
+        if snapshot is None:
+            rows = fetch_all(master_input_connection, "stics.paramsol", id_sim)
+        else:
+            rows = snapshot.param_sol_rows(id_sim)
         
-        file_lines = []
-        for row in rows:
-            line1 = [
-                "     1  ","Sol", f"{row['Clay']:.1f}", f"{row['OrganicNStock']:.4f}",
-                f"{float(defaults['profhum']):.4f}", f"{float(defaults['calc']):.4f}",
-                f"{row['pH']:.4f}", f"{float(defaults['concseuil']):.4f}",
-                f"{row['albedo']:.4f}", f"{float(defaults['q0']):.4f}",
-                f"{row['RunoffCoefBSoil']:.4f}", f"{row['SoilRDepth']:.4f}",
-                f"{float(defaults['pluiebat']):.4f}", f"{float(defaults['mulchbat']):.4f}",
-                f"{float(defaults['zesx']):.4f}", f"{float(defaults['cfes']):.4f}",
-                f"{float(defaults['z0solnu']):.4f}", f"{row['OrganicC']/row['OrganicNStock']:.4f}",
-                f"{float(defaults['finert']):.5f}", f"{float(defaults['penterui']):.4f}"
-            ]
-            file_lines.append(" ".join(line1))
-
-            codes = ["codecailloux", "codemacropor", "codefente", "codrainage", "coderemontcap", "codenitrif", "codedenit"]
-            line2 = ["     1  "] + [f"{int(float(defaults[c])):.0f}" for c in codes]
-            file_lines.append(" ".join(line2))             
-            
-            line3 = [
-                "     1  ",
-                f"{float(defaults['profimper']):.4f}", f"{float(defaults['ecartdrain']):.4f}",
-                f"{float(defaults['ksol']):.4f}", f"{float(defaults['profdrain']):.4f}",
-                f"{float(defaults['capiljour']):.4f}", f"{float(defaults['humcapil']):.4f}",
-                f"{int(float(defaults['profdenit'])):.0f}", f"{float(defaults['vpotdenit']):.4f}"
-            ]
-            file_lines.append(" ".join(line3))            
-            sql = f"""Select * From SoilLayers where idsoil = '{row['IdSoil']}' Order by NumLayer"""
-            DA2 = pd.read_sql_query(sql, master_input_connection)
-            rows = DA2.to_dict(orient='records')
-            for i in range(5):
-                if row["SoilOption"] == "simple":
-                    #fileContent += "     1   "
-                    file_lines.append("     1  ")
-                    if i == 0:
-                        #fileContent += format(row["SoilTotalDepth"], ".2f") + " "
-                        depth = f"{row['SoilTotalDepth']:.2f} "
-                    else:
-                        #fileContent += "0.00 "  
-                        depth = "0.00" 
-                    values = [
-                        depth,
-                        f"{row['Wfc']/row['bd']:.2f}",
-                        f"{row['Wwp']/row['bd']:.2f}",
-                        f"{row['bd']:.2f}",
-                        f"{row['cf']:.2f}",
-                        f"{int(defaults['typecailloux'])}",
-                        f"{int(float(defaults['infil']))}",
-                        f"{int(defaults['epd'])}"
-                    ]
-                    file_lines[-1] += " " + " ".join(values)
-                else:
-                    if i < len(rows):
-                        values = ["     1  ",
-                            f"{rows[i]['Ldown'] - rows[i]['Lup']:.2f}",
-                            f"{rows[i]['Wfc']/rows[i]['bd']:.2f}",
-                            f"{rows[i]['Wwp']/rows[i]['bd']:.2f}",
-                            f"{rows[i]['bd']:.2f}",
-                            f"{row['cf']:.2f}",
-                            f"{int(defaults['typecailloux'])}",
-                            f"{int(float(defaults['infil']))}",
-                            f"{int(defaults['epd'])}"
-                        ]
-                        
-                    else:
-                        values = ["     1  ","0.00","0.00","0.00","0.00",f"{row['cf']:.2f}",
-                            f"{int(defaults['typecailloux'])}",
-                            f"{int(float(defaults['infil']))}",
-                            f"{int(defaults['epd'])}"
-                        ]
-                    file_lines.append(" ".join(values))
+        if snapshot is None:
+            layers = lambda idsoil: fetch_all(master_input_connection, "soil.layers", idsoil.lower())
+        else:
+            layers = snapshot.layers
+        fileContent = render(rows, layers, defaults)
         try:
-            #self.write_file(usmdir, file_name, fileContent) 
-            self.write_file(usmdir, file_name, "\n".join(file_lines))
+            self.write_file(usmdir, file_name, fileContent)
         except Exception as e:
             traceback.print_exc()
             print(f"Error during writing file : {e}")
-        return   "\n".join(file_lines)      #fileContent
+        return fileContent
             
 
@@ -0,0 +1,130 @@
+"""
+Summary rows of STICS mod_rapport reports, gathered per chunk.
+
+Each report used to become a one-row DataFrame: the file was rewritten to drop the trailing
+semicolon of its last line, read with ``pd.read_csv``, renamed, widened with ``insert`` calls
+and finally concatenated with tens of thousands of others in growing batches.
+
+``SummaryAccumulator`` reads each report once, handles the trailing semicolon and repeated
+headers in memory, and appends the values to per-column lists. ``frame`` builds a single
+DataFrame for the whole chunk, with the columns and dtypes the old per-report frames had.
+"""
+
+import pandas as pd
+
+# mod_rapport columns -> SummaryOutput names (cep2: v11 reports of mixed crops)
+SUMMARY_NAMES = {
+    "iplts": "Planting", "ilevs": "Emergence", "iflos": "Ant", "imats": "Mat", "masec(n)": "Biom_ma",
+    "mafruit": "Yield", "chargefruit": "GNumber", "laimax": "MaxLai", "Qles": "Nleac", "QNapp": "SoilN",
+    "QNplante": "CroN_ma", "ces": "CumE", "cep": "Transp", "cep2": "Transp",
+}
+# Header of the rap.mod variables, for reports STICS wrote without one (successive seasons)
+REPORT_HEADER = (
+    "P_usm;wlieu;ansemis;P_iwater;ancours;ifin;nbdays;P_ichsl;group;"
+    "P_codeplante;stade;nomversion;masec(n);mafruit;chargefruit;iplts;"
+    "ilevs;iflos;imats;irecs;laimax;QNplante;Qles;QNapp;ces;cep"
+)
+
+
+def _fields(line):
+    # skipinitialspace, and no empty last field for the trailing semicolon
+    fields = [field.lstrip() for field in line.rstrip("\r\n").split(";")]
+    if len(fields) > 1 and fields[-1] == "":
+        fields.pop()
+    return fields
+
+
+def _number(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class SummaryAccumulator:
+    """Summary rows of the reports of one chunk, kept as columns until ``frame``."""
+
+    def __init__(self):
+        self._columns = {}
+        self._report_columns = set()  # parsed as numbers where they can be
+        self._rows = 0
+
+    def __len__(self):
+        return self._rows
+
+    def _column(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = [None] * self._rows
+        return column
+
+    def add(self, report_path, idsim, plant_role="", coordinates=None, season_order=None):
+        """Append the result rows of one report; returns how many it held.
+
+        ``coordinates`` ({'lon', 'lat'}) adds the lon/lat columns of dt 1 runs.
+        """
+        with open(report_path, "r") as stream:
+            lines = [line for line in stream if line.strip()]
+        if not lines:
+            return 0
+        header = _fields(lines[0])
+        if "ansemis" in header:
+            lines = lines[1:]
+        else:
+            header = REPORT_HEADER.split(";")
+        header = [SUMMARY_NAMES.get(name.strip(), name.strip()) for name in header]
+        ansemis = header.index("ansemis")
+
+        rows = []
+        for position, line in enumerate(lines):
+            fields = _fields(line)
+            # STICS may leave repeated report headers when a working directory is reused:
+            # keep only actual result rows so rerunning the same idsim remains idempotent.
+            year = _number(fields[ansemis]) if ansemis < len(fields) else None
+            if year is None or year != year:
+                continue
+            rows.append((position, fields, int(year)))
+        if not rows:
+            return 0
+
+        fixed = [("Model", "Stics"), ("Idsim", idsim), ("Texte", plant_role)]
+        if season_order is not None:
+            fixed.append(("SeasonOrder", int(season_order)))
+        for name, value in fixed:
+            self._column(name).extend([value] * len(rows))
+        self._column("index").extend(position for position, _, _ in rows)
+        for number, name in enumerate(header):
+            if name in header[:number]:
+                continue  # cep and cep2 both name Transp: keep the first
+            self._report_columns.add(name)
+            self._column(name).extend(
+                (fields[number] or None) if number < len(fields) else None for _, fields, _ in rows
+            )
+        self._column("time").extend(year for _, _, year in rows)
+        if coordinates is not None:
+            self._column("lon").extend([coordinates["lon"]] * len(rows))
+            self._column("lat").extend([coordinates["lat"]] * len(rows))
+
+        self._rows += len(rows)
+        for column in self._columns.values():
+            if len(column) < self._rows:
+                column.extend([None] * (self._rows - len(column)))
+        return len(rows)
+
+    def frame(self):
+        """One DataFrame of every row added; report values are numeric where they parse."""
+        data = {}
+        for name, values in self._columns.items():
+            if name not in self._report_columns:
+                data[name] = pd.Series(values)
+                continue
+            try:
+                data[name] = pd.to_numeric(pd.Series(values))
+            except (ValueError, TypeError):
+                data[name] = pd.Series(values)
+        return pd.DataFrame(data)
+
+    def clear(self):
+        self._columns = {}
+        self._report_columns = set()
+        self._rows = 0
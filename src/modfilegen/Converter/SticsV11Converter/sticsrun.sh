@@ -7,6 +7,8 @@ USM_DIR="$1"
 input_dir="$2"
 dt=$(echo "$3" | awk '{print int($1)}')
 dailyoutput=$(echo "${4:-0}" | awk '{print int($1)}')
+# name of the copied outputs; a reused workspace slot is not named after its simulation
+base="${5:-$(basename "$USM_DIR")}"
 
 cd -- "$USM_DIR"
 
@@ -14,7 +16,6 @@ sed -i -z 's/codeseprapport\n1/codeseprapport\n2/g' -- tempopar.sti
 
 /opt/sticsv11/bin/stics_modulo > /dev/null
 
-base=$(basename "$USM_DIR")
 if [ -f "mod_rapport.sti" ]; then
     cp -- mod_rapport.sti "$input_dir/mod_rapport_$base.sti"
 fi
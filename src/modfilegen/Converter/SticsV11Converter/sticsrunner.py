@@ -0,0 +1,64 @@
+"""
+Runs stics_modulo in a USM directory.
+
+The drivers used to go through sticsrun.sh. That wrapper started bash, two awk, a ``sed -i``
+on tempopar.sti, the model and one ``cp`` per report, and a background ``rm -rf`` of the
+directory.
+
+Now:
+- tempopar.sti is generated with the report separator already set;
+- the model is started directly, with the USM directory as its working directory;
+- callers read the mod_rapport*/mod_s*/mod_profil* outputs where STICS wrote them;
+- the workspace manager cleans the directory.
+
+The model runs in its own process group, so a timeout kills everything it started.
+"""
+
+import os
+import signal
+import subprocess
+from pathlib import Path
+
+STICS_EXECUTABLE = "/opt/sticsv11/bin/stics_modulo"
+TIMEOUT = 180  # seconds
+REPORT_FILES = ("mod_rapport.sti", "mod_rapportA.sti", "mod_rapportP.sti")
+
+
+def clear_outputs(usmdir, dailyoutput=0):
+    """Remove the reports (and daily/profile outputs) of a previous run of ``usmdir``."""
+    for report_name in REPORT_FILES:
+        report = Path(usmdir) / report_name
+        if report.exists():
+            report.unlink()
+    if int(dailyoutput) == 1:
+        for output in (*daily_outputs(usmdir), *profile_outputs(usmdir)):
+            output.unlink()
+
+
+def run(usmdir, timeout=TIMEOUT, executable=STICS_EXECUTABLE):
+    """Run STICS in ``usmdir``; raises like ``subprocess.run(..., check=True)``."""
+    args = [executable]
+    with subprocess.Popen(args, cwd=usmdir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          text=True, start_new_session=True) as process:
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            process.communicate()
+            raise
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args, output="", stderr=stderr)
+    return subprocess.CompletedProcess(args, process.returncode, "", stderr)
+
+
+def daily_outputs(usmdir):
+    """mod_s files written by the last run of ``usmdir``, sorted by name."""
+    return sorted(Path(usmdir).glob("mod_s*.sti"))
+
+
+def profile_outputs(usmdir):
+    """mod_profil files written by the last run of ``usmdir``, sorted by name."""
+    return sorted(Path(usmdir).glob("mod_profil*.sti"))
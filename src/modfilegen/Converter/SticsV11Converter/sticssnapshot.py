@@ -0,0 +1,342 @@
+"""Chunk-level snapshot of the MasterInput rows used by STICS v11 converters.
+
+A worker loads every SimUnitList, Soil, CropManagement, fertilization,
+tillage and initial-condition row needed by its chunk with a few set-based
+queries.  Converters then ask the snapshot for the same records they would
+otherwise fetch with one SQL join per simulation and per file.
+"""
+
+from collections import defaultdict
+
+from modfilegen import queries
+
+
+# Keep IN lists below the historical SQLITE_MAX_VARIABLE_NUMBER of 999.
+IN_CLAUSE_BATCH = 500
+
+# Soil rows with their runoff coefficient; HasRunoffType tells the rows an INNER JOIN would keep.
+SOIL_QUERY = """SELECT Soil.IdSoil, Soil.SoilOption, Soil.OrganicC, Soil.OrganicNStock,
+    Soil.SoilRDepth, Soil.SoilTotalDepth, Soil.SoilTextureType, Soil.Wwp,
+    Soil.Wfc, Soil.bd, Soil.albedo, Soil.Ph AS "pH", Soil.cf,
+    RunoffTypes.RunoffCoefBSoil AS "RunoffCoefBSoil", Soil.Clay AS "Clay",
+    RunoffTypes.RunoffType IS NOT NULL AS "HasRunoffType"
+    FROM Soil LEFT JOIN RunoffTypes ON RunoffTypes.RunoffType = Soil.RunoffType"""
+
+# Set-based queries of SticsInputSnapshot.load; ``{keys}`` becomes one placeholder per key.
+SNAPSHOT_QUERIES = {
+    "soils": SOIL_QUERY + " WHERE Lower(Soil.IdSoil) IN ({keys})",
+    "soil_layers": "SELECT * FROM SoilLayers WHERE Lower(idsoil) IN ({keys}) ORDER BY NumLayer",
+    "initial_conditions": "SELECT * FROM InitialConditions WHERE idIni IN ({keys})",
+    "options": """SELECT IdOptions AS "IdOptions", StressW_YN, StressN_YN, StressP_YN, StressK_YN
+    FROM SimulationOptions WHERE IdOptions IN ({keys})""",
+    "coordinates": """SELECT idPoint AS "idPoint", altitude AS "altitude",
+    latitudeDD AS "latitudeDD" FROM Coordinates WHERE idPoint IN ({keys})""",
+    "crop_managements": """SELECT CropManagement.*, ListCultivars.IdCultivar AS "CultivarKey",
+    ListCultivars.SpeciesName AS "SpeciesName",
+    ListCultivars.idcultivarStics AS "idcultivarStics",
+    ListCultivars.CodePSpecies AS "CodePSpecies"
+    FROM CropManagement LEFT JOIN ListCultivars
+    ON ListCultivars.IdCultivar = CropManagement.Idcultivar
+    WHERE CropManagement.idMangt IN ({keys})
+    ORDER BY CropManagement.PlantOrder""",
+    "cult_options": "SELECT CodePSpecies, FicPlt FROM ListCultOption WHERE CodePSpecies IN ({keys})",
+    "tillage": """SELECT SoilTillPolicy.SoilTillPolicyCode AS "SoilTillPolicyCode", SoilTillageOperations.STNumber,
+    SoilTillPolicy.NumTillOperations, SoilTillageOperations.DepthResUp,
+    SoilTillageOperations.DepthResLow, SoilTillageOperations.DSTill
+    FROM SoilTillPolicy INNER JOIN SoilTillageOperations
+    ON SoilTillPolicy.SoilTillPolicyCode = SoilTillageOperations.SoilTillPolicyCode
+    WHERE SoilTillPolicy.SoilTillPolicyCode IN ({keys})""",
+    "organic": """SELECT OrganicFOperations.OFertiPolicyCode AS "OFertiPolicyCode", OrganicFOperations.Dferti,
+    OrganicFOperations.OFNumber, OrganicFOperations.CNferti, OrganicFOperations.NFerti,
+    OrganicFOperations.Qmanure, OrganicFOperations.TypeResidues, ListResidues.idresidueStics
+    FROM ListResidues INNER JOIN (OrganicFertilizationPolicy INNER JOIN OrganicFOperations
+    ON OrganicFertilizationPolicy.OFertiPolicyCode = OrganicFOperations.OFertiPolicyCode)
+    ON ListResidues.TypeResidues = OrganicFOperations.TypeResidues
+    WHERE OrganicFertilizationPolicy.OFertiPolicyCode IN ({keys})
+    ORDER BY OrganicFOperations.OFNumber""",
+    "mineral": """SELECT InorganicFertilizationPolicy.InorgFertiPolicyCode AS "InorgFertiPolicyCode",
+    InorganicFOperations.N,
+    InorganicFOperations.Dferti, InorganicFertilizationPolicy.NumInorganicFerti
+    FROM InorganicFertilizationPolicy INNER JOIN InorganicFOperations
+    ON InorganicFertilizationPolicy.InorgFertiPolicyCode = InorganicFOperations.InorgFertiPolicyCode
+    WHERE InorganicFertilizationPolicy.InorgFertiPolicyCode IN ({keys})""",
+}
+queries.register_batch_statements("stics.snapshot", SNAPSHOT_QUERIES)
+
+
+def _key(value):
+    return None if value is None else str(value)
+
+
+def _records(cursor):
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, values)) for values in cursor.fetchall()]
+
+
+def select_in(connection, query, keys):
+    """Run ``query`` once per batch of keys, replacing ``{keys}`` with placeholders."""
+    keys = list(dict.fromkeys(key for key in keys if key is not None))
+    rows = []
+    for start in range(0, len(keys), IN_CLAUSE_BATCH):
+        batch = keys[start:start + IN_CLAUSE_BATCH]
+        placeholders = ", ".join("?" * len(batch))
+        rows.extend(_records(connection.execute(query.format(keys=placeholders), batch)))
+    return rows
+
+
+def _group(rows, column, transform=_key):
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[transform(row[column])].append(row)
+    return dict(grouped)
+
+
+def _lower(value):
+    return None if value is None else str(value).lower()
+
+
+class SticsInputSnapshot:
+    """In-memory, indexed copy of the MasterInput rows needed by a set of idsims."""
+
+    def __init__(self):
+        self.simulations = {}
+        self.soils = {}
+        self.soil_layers = {}
+        self.initial_conditions = {}
+        self.options = {}
+        self.coordinates = {}
+        self.crop_managements = {}
+        self.cult_options = {}
+        self.tillage = {}
+        self.organic = {}
+        self.mineral = {}
+        self.has_season_order = False
+
+    @classmethod
+    def load(cls, connection, simulations):
+        """Build the snapshot for ``simulations`` (SimUnitList rows as dicts)."""
+        snapshot = cls()
+        snapshot.simulations = {str(row["idsim"]): dict(row) for row in simulations}
+        sims = list(snapshot.simulations.values())
+
+        snapshot.soils = _group(
+            select_in(
+                connection,
+                SNAPSHOT_QUERIES["soils"],
+                [_lower(row["idsoil"]) for row in sims],
+            ),
+            "IdSoil",
+            _lower,
+        )
+        snapshot.soil_layers = _group(
+            select_in(
+                connection,
+                SNAPSHOT_QUERIES["soil_layers"],
+                list(snapshot.soils),
+            ),
+            "idsoil",
+            _lower,
+        )
+        snapshot.initial_conditions = _group(
+            select_in(
+                connection,
+                SNAPSHOT_QUERIES["initial_conditions"],
+                [_key(row["idIni"]) for row in sims],
+            ),
+            "idIni",
+        )
+        snapshot.options = _group(
+            select_in(
+                connection,
+                SNAPSHOT_QUERIES["options"],
+                [_key(row["idOption"]) for row in sims],
+            ),
+            "IdOptions",
+        )
+        snapshot.coordinates = _group(
+            select_in(
+                connection,
+                SNAPSHOT_QUERIES["coordinates"],
+                [_key(row["idPoint"]) for row in sims],
+            ),
+            "idPoint",
+        )
+
+        crop_columns = {row[1] for row in connection.execute("PRAGMA table_info(CropManagement)")}
+        snapshot.has_season_order = "SeasonOrder" in crop_columns
+        crop_rows = select_in(
+            connection,
+            SNAPSHOT_QUERIES["crop_managements"],
+            [_key(row["idMangt"]) for row in sims],
+        )
+        snapshot.crop_managements = _group(crop_rows, "idMangt")
+        snapshot.cult_options = _group(
+            select_in(
+                connection,
+                SNAPSHOT_QUERIES["cult_options"],
+                [_key(row["CodePSpecies"]) for row in crop_rows],
+            ),
+            "CodePSpecies",
+        )
+        snapshot.tillage = _group(
+            select_in(
+                connection,
+                SNAPSHOT_QUERIES["tillage"],
+                [_key(row["SoilTillPolicyCode"]) for row in crop_rows],
+            ),
+            "SoilTillPolicyCode",
+        )
+        snapshot.organic = _group(
+            select_in(
+                connection,
+                SNAPSHOT_QUERIES["organic"],
+                [_key(row["OFertiPolicyCode"]) for row in crop_rows],
+            ),
+            "OFertiPolicyCode",
+        )
+        snapshot.mineral = _group(
+            select_in(
+                connection,
+                SNAPSHOT_QUERIES["mineral"],
+                [_key(row["InoFertiPolicyCode"]) for row in crop_rows],
+            ),
+            "InorgFertiPolicyCode",
+        )
+        return snapshot
+
+    def __contains__(self, idsim):
+        return str(idsim) in self.simulations
+
+    def simulation(self, idsim):
+        return self.simulations[str(idsim)]
+
+    def soil(self, idsim):
+        """Soil rows joined case-insensitively on SimUnitList.idsoil."""
+        return self.soils.get(_lower(self.simulation(idsim)["idsoil"]), [])
+
+    def layers(self, idsoil):
+        return self.soil_layers.get(_lower(idsoil), [])
+
+    def plants(self, idsim, season_order=None):
+        """CropManagement rows of one simulation ordered by PlantOrder."""
+        rows = self.crop_managements.get(_key(self.simulation(idsim)["idMangt"]), [])
+        if season_order is not None and self.has_season_order:
+            rows = [row for row in rows if int(row["SeasonOrder"]) == int(season_order)]
+        return rows
+
+    def max_plant_order(self, idsim, season_order=None):
+        orders = [row["PlantOrder"] for row in self.plants(idsim, season_order)]
+        return max(orders) if orders else None
+
+    def cultivated_plants(self, idsim, season_order=None):
+        return [row for row in self.plants(idsim, season_order) if row["CultivarKey"] is not None]
+
+    # Records shaped like the per-simulation queries of each converter.
+
+    def param_sol_rows(self, idsim):
+        return [soil for soil in self.soil(idsim) if soil["HasRunoffType"]]
+
+    def ficini_rows(self, idsim):
+        simulation = self.simulation(idsim)
+        rows = []
+        for ini in self.initial_conditions.get(_key(simulation["idIni"]), []):
+            for soil in self.soil(idsim):
+                rows.append({
+                    "idIni": simulation["idIni"],
+                    "IdSoil": soil["IdSoil"],
+                    "SoilOption": soil["SoilOption"],
+                    "Wwp": soil["Wwp"],
+                    "Wfc": soil["Wfc"],
+                    "bd": soil["bd"],
+                    "WStockinit": ini["WStockinit"],
+                    "Ninit": ini["Ninit"],
+                })
+        return rows
+
+    def tempopar_rows(self, idsim):
+        simulation = self.simulation(idsim)
+        return [
+            dict(option, idsim=simulation["idsim"])
+            for option in self.options.get(_key(simulation["idOption"]), [])
+        ]
+
+    def station_rows(self, idsim):
+        simulation = self.simulation(idsim)
+        return [
+            {
+                "idsim": simulation["idsim"],
+                "altitude": coordinate["altitude"],
+                "latitudeDD": coordinate["latitudeDD"],
+            }
+            for coordinate in self.coordinates.get(_key(simulation["idPoint"]), [])
+        ]
+
+    def newtravail_rows(self, idsim, season_order=None):
+        simulation = self.simulation(idsim)
+        if _key(simulation["idIni"]) not in self.initial_conditions:
+            return []
+        rows = []
+        for coordinate in self.coordinates.get(_key(simulation["idPoint"]), []):
+            for plant in self.cultivated_plants(idsim, season_order):
+                row = dict(simulation)
+                row["LatitudeDD"] = coordinate["latitudeDD"]
+                row["sowingdate"] = plant["sowingdate"]
+                row["SpeciesName"] = plant["SpeciesName"]
+                rows.append(row)
+        return rows
+
+    def fictec_rows(self, idsim, season_order=None):
+        simulation = self.simulation(idsim)
+        rows = []
+        for plant in self.cultivated_plants(idsim, season_order):
+            for soil in self.soil(idsim):
+                rows.append({
+                    "idsim": simulation["idsim"],
+                    "idMangt": simulation["idMangt"],
+                    "SoilTotalDepth": soil["SoilTotalDepth"],
+                    "idcultivarStics": plant["idcultivarStics"],
+                    "sdens": plant["sdens"],
+                    "sowingdate": plant["sowingdate"],
+                    "SoilTillPolicyCode": plant["SoilTillPolicyCode"],
+                })
+        return rows
+
+    def tillage_rows(self, policy_code):
+        return self.tillage.get(_key(policy_code), [])
+
+    def organic_rows(self, idsim, plant_order, season_order=None):
+        simulation = self.simulation(idsim)
+        rows = []
+        for plant in self.plants(idsim, season_order):
+            if int(plant["PlantOrder"]) != int(plant_order):
+                continue
+            for operation in self.organic.get(_key(plant["OFertiPolicyCode"]), []):
+                row = dict(operation, idsim=simulation["idsim"])
+                row["sowingdate"] = plant["sowingdate"]
+                row["SoilTillPolicyCode"] = plant["SoilTillPolicyCode"]
+                rows.append(row)
+        return sorted(rows, key=lambda row: row["OFNumber"])
+
+    def mineral_rows(self, idsim, plant_order, season_order=None):
+        simulation = self.simulation(idsim)
+        rows = []
+        for plant in self.plants(idsim, season_order):
+            if int(plant["PlantOrder"]) != int(plant_order):
+                continue
+            for operation in self.mineral.get(_key(plant["InoFertiPolicyCode"]), []):
+                rows.append({
+                    "idsim": simulation["idsim"],
+                    "N": operation["N"],
+                    "sowingdate": plant["sowingdate"],
+                    "Dferti": operation["Dferti"],
+                    "NumInorganicFerti": operation["NumInorganicFerti"],
+                })
+        return rows
+
+    def ficplt_rows(self, idsim, season_order=None):
+        simulation = self.simulation(idsim)
+        rows = []
+        for plant in self.cultivated_plants(idsim, season_order):
+            for option in self.cult_options.get(_key(plant["CodePSpecies"]), []):
+                rows.append({"idsim": simulation["idsim"], "fic": option["FicPlt"]})
+        return rows
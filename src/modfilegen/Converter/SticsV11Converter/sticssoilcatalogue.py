@@ -0,0 +1,120 @@
+"""
+param.sol of every soil of a run, rendered once and shared by all workers on disk.
+
+param.sol only depends on the soil (Soil, RunoffTypes and SoilLayers rows) and on the
+ModelDictionary defaults, yet every worker used to render it again for each soil it met.
+``build`` reads the Soil and SoilLayers rows of every soil referenced by SimUnitList in two
+queries, grouped by lower-case idsoil with the layers ordered by NumLayer, and writes one file
+per soil. Workers ``open_catalogue`` the directory and read the file of their soil.
+"""
+
+import hashlib
+import os
+import shutil
+import traceback
+import uuid
+
+from modfilegen import queries
+from modfilegen.modeldefaults import model_defaults
+
+from . import sticsparamsolconverter
+from .sticssnapshot import SOIL_QUERY, _group, _lower, _records
+
+CATALOGUE_DIRECTORY = "soil_catalogue"
+REFERENCED_SOILS = "SELECT Lower(idsoil) FROM SimUnitList"
+
+
+def catalogue_directory(base):
+    """Directory holding the soil catalogue of a run whose working directory is ``base``."""
+    return os.path.join(base, CATALOGUE_DIRECTORY)
+
+
+def soil_file(idsoil):
+    """File name of a soil; soil ids are matched case-insensitively, as in the SQL joins."""
+    return hashlib.sha1(_lower(idsoil).encode()).hexdigest() + ".sol"
+
+
+def build(master_input, model_dictionary, directory, verbose=True):
+    """Render the param.sol of every referenced soil into ``directory`` and return the catalogue."""
+    master = queries.connect_readonly(master_input)
+    dictionary = queries.connect_readonly(model_dictionary)
+    try:
+        defaults = model_defaults(dictionary).table("sticsv11", "paramsol")
+        soils = _group(
+            _records(master.execute(f"{SOIL_QUERY} WHERE Lower(Soil.IdSoil) IN ({REFERENCED_SOILS})")),
+            "IdSoil", _lower,
+        )
+        layers = _group(
+            _records(master.execute(
+                f"SELECT * FROM SoilLayers WHERE Lower(idsoil) IN ({REFERENCED_SOILS}) ORDER BY NumLayer")),
+            "idsoil", _lower,
+        )
+    finally:
+        master.close()
+        dictionary.close()
+
+    staging = f"{directory}.{uuid.uuid4().hex}"
+    os.makedirs(staging)
+    rendered = 0
+    try:
+        for idsoil, rows in soils.items():
+            try:
+                content = sticsparamsolconverter.render(
+                    [row for row in rows if row["HasRunoffType"]],
+                    lambda IdSoil: layers.get(_lower(IdSoil), []),
+                    defaults,
+                )
+            except Exception:
+                continue  # left to the converter, which reports the error for each simulation
+            with open(os.path.join(staging, soil_file(idsoil)), "w") as stream:
+                stream.write(content)
+            rendered += 1
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.replace(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if verbose:
+        print(f"Soil catalogue: param.sol of {rendered}/{len(soils)} soils in {directory}", flush=True)
+    return SoilCatalogue(directory)
+
+
+class SoilCatalogue:
+    """Read-only view over a built soil catalogue."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def param_sol(self, idsoil):
+        """param.sol of ``idsoil``, or None when the catalogue does not hold it."""
+        if idsoil is None:
+            return None
+        try:
+            with open(os.path.join(self.directory, soil_file(idsoil))) as stream:
+                return stream.read()
+        except FileNotFoundError:
+            return None
+
+
+def prepare(master_input, model_dictionary, base):
+    """Build the run's soil catalogue under ``base``; None when it cannot be built.
+
+    A catalogue that cannot be rebuilt is removed, so workers do not read stale soils.
+    """
+    directory = catalogue_directory(base)
+    try:
+        return build(master_input, model_dictionary, directory)
+    except Exception as e:
+        print(f"Soil catalogue not built, param.sol will be rendered per simulation: {e}")
+        traceback.print_exc()
+        shutil.rmtree(directory, ignore_errors=True)
+        return None
+
+
+def open_catalogue(directory):
+    """The soil catalogue built in ``directory``, or None when there is none."""
+    if not os.path.isdir(directory):
+        return None
+    return SoilCatalogue(directory)
@@ -1,27 +1,24 @@
 from modfilegen.converter import Converter
+from modfilegen.modeldefaults import model_defaults
+from modfilegen.queries import fetch_all, fetch_season
 from sqlite3 import Connection
 import os
-import pandas as pd
 
 class SticsStationConverter(Converter):
     def __init__(self):
         super().__init__()
 
-    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, rap, var, prof, usmdir, season_order=None):
+    def export(self, directory_path, ModelDictionary_Connection, master_input_connection, rap, var, prof, usmdir, season_order=None, snapshot=None):
         file_name = "station.txt"
         fileContent = ""
         ST = directory_path.split(os.sep)
-        T = "Select  Champ, Default_Value_Datamill, defaultValueOtherSource, IFNULL([defaultValueOtherSource],  [Default_Value_Datamill]) As dv From Variables Where ((model = 'sticsv11') And ([Table] = 'station'));"
-        DT = pd.read_sql_query(T,ModelDictionary_Connection)
-        fetchAllQuery = """SELECT SimUnitList.idsim, Coordinates.altitude, Coordinates.latitudeDD FROM Coordinates INNER JOIN SimUnitList ON Coordinates.idPoint = SimUnitList.idPoint Where idsim ='%s';"""%(ST[-3])
-        DA = pd.read_sql_query(fetchAllQuery, master_input_connection)
-        rows = DA.to_dict(orient='records')
-        
-        sql = """SELECT Max(CropManagement.PlantOrder) AS MaxDePlantOrder FROM CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt WHERE SimUnitList.idsim = '%s'"""%(ST[-3])
-        if season_order is not None:
-            sql += " AND CropManagement.SeasonOrder = %d" % int(season_order)
-        DA2 = pd.read_sql_query(sql, master_input_connection)
-        rows2 = DA2.to_dict(orient='records')
+        DT = model_defaults(ModelDictionary_Connection).table("sticsv11", "station")
+        if snapshot is None:
+            rows = fetch_all(master_input_connection, "stics.station", ST[-3])
+            rows2 = fetch_season(master_input_connection, "stics.max_plant_order", season_order, ST[-3])
+        else:
+            rows = snapshot.station_rows(ST[-3])
+            rows2 = [{"MaxDePlantOrder": snapshot.max_plant_order(ST[-3], season_order)}]
         nbplantes = rows2[0]["MaxDePlantOrder"] or 1
             
         for row in rows:
@@ -130,8 +127,7 @@ class SticsStationConverter(Converter):
         if fieldIt != 0:
             champ = champ + str(fieldIt) 
         # Fetch data
-        rw = row[row['Champ'] == champ]
-        data = rw["dv"].values[0]
+        data = row[champ]
         res = ""
         # If type is string or int
         if isinstance(data, str) or isinstance(data, int):
@@ -6,25 +6,29 @@ PlantOrder.  PlantOrder therefore remains local to a season and can represent
 mixed crops without being confused with the temporal sequence.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+from functools import partial
 from pathlib import Path
 from time import time
+import atexit
 import os
 import shutil
-import sqlite3
-import subprocess
 import traceback
 import uuid
 
 import pandas as pd
 
-from modfilegen import GlobalVariables
+from modfilegen import GlobalVariables, climatestore, filestore, queries, resultsink
 from . import sticsclimatconverter
 from . import sticsficiniconverter
 from . import sticsficplt1converter
 from . import sticsfictec1converter
 from . import sticsnewtravailconverter
 from . import sticsparamsolconverter
+from . import sticssoilcatalogue
+from . import sticsreports
+from . import sticsrunner
 from . import sticsstationconverter
 from . import sticstempoparconverter
 from .sticsconverter import (
@@ -33,12 +37,14 @@ from .sticsconverter import (
     common_tempopar,
     common_tempoparv6,
     common_var,
-    collect_daily_outputs,
-    collect_profile_outputs,
-    create_df_summary,
     export as prepare_sqlite_indexes,
     fetch_data_from_sqlite,
+    get_coord,
+    read_daily_outputs,
+    read_profile_outputs,
+    summary_output_rows,
     write_file,
+    write_outputs,
 )
 
 
@@ -51,11 +57,6 @@ REQUIRED_CROP_COLUMNS = {
     "sowingdate",
     "DHarvest",
 }
-REPORT_HEADER = (
-    "P_usm;wlieu;ansemis;P_iwater;ancours;ifin;nbdays;P_ichsl;group;"
-    "P_codeplante;stade;nomversion;masec(n);mafruit;chargefruit;iplts;"
-    "ilevs;iflos;imats;irecs;laimax;QNplante;Qles;QNapp;ces;cep"
-)
 
 
 def julian_date(year, day):
@@ -88,13 +89,7 @@ def fetch_rotation_seasons(connection, simulation):
         )
 
     dataframe = pd.read_sql_query(
-        """
-        SELECT cm.*, lc.SpeciesName
-        FROM CropManagement AS cm
-        LEFT JOIN ListCultivars AS lc ON lc.IdCultivar = cm.Idcultivar
-        WHERE cm.idMangt = ?
-        ORDER BY cm.SeasonOrder, cm.PlantOrder
-        """,
+        queries.statement("stics.rotation"),
         connection,
         params=(str(simulation["idMangt"]),),
     )
@@ -174,17 +169,24 @@ def build_season_row(simulation, season):
 
 
 def set_usm_parameter(usm_file, parameter, value):
+    set_usm_parameters(usm_file, {parameter: value})
+
+
+def set_usm_parameters(usm_file, parameters):
+    """Replace the values of several new_travail.usm parameters with one read and one write."""
     path = Path(usm_file)
     lines = path.read_text().splitlines()
-    marker = f":{parameter}"
-    for index, line in enumerate(lines):
-        if line.strip().lower() == marker.lower():
-            if index + 1 >= len(lines):
-                raise ValueError(f"Missing value after {marker} in {path}")
-            lines[index + 1] = str(value)
-            path.write_text("\n".join(lines) + "\n")
-            return
-    raise ValueError(f"{marker} not found in {path}")
+    markers = [line.strip().lower() for line in lines]
+    for parameter, value in parameters.items():
+        marker = f":{parameter}"
+        try:
+            index = markers.index(marker.lower())
+        except ValueError:
+            raise ValueError(f"{marker} not found in {path}") from None
+        if index + 1 >= len(lines):
+            raise ValueError(f"Missing value after {marker} in {path}")
+        lines[index + 1] = str(value)
+    path.write_text("\n".join(lines) + "\n")
 
 
 def is_leap_year(year):
@@ -199,24 +201,26 @@ def stics_datefin(start_year, end_year, end_day):
     return total
 
 
-def adapt_usm_calendar(usmdir, row):
-    usm_file = Path(usmdir) / "new_travail.usm"
+def season_calendar(row):
+    """new_travail.usm calendar of a season: datefin counts the days of every year it spans."""
     number_of_years = int(row["EndYear"]) - int(row["StartYear"]) + 1
-    set_usm_parameter(usm_file, "datedebut", int(row["StartDay"]))
-    set_usm_parameter(
-        usm_file,
-        "datefin",
-        stics_datefin(row["StartYear"], row["EndYear"], row["EndDay"]),
-    )
-    set_usm_parameter(usm_file, "fclim1", f"cli{row['idPoint']}j.{row['StartYear']}")
     second_climate_year = (
         int(row["StartYear"])
         if int(row["StartYear"]) == int(row["EndYear"])
         else int(row["StartYear"]) + 1
     )
-    set_usm_parameter(usm_file, "fclim2", f"cli{row['idPoint']}j.{second_climate_year}")
-    set_usm_parameter(usm_file, "nbans", number_of_years)
-    set_usm_parameter(usm_file, "culturean", number_of_years)
+    return {
+        "datedebut": int(row["StartDay"]),
+        "datefin": stics_datefin(row["StartYear"], row["EndYear"], row["EndDay"]),
+        "fclim1": f"cli{row['idPoint']}j.{row['StartYear']}",
+        "fclim2": f"cli{row['idPoint']}j.{second_climate_year}",
+        "nbans": number_of_years,
+        "culturean": number_of_years,
+    }
+
+
+def adapt_usm_calendar(usmdir, row):
+    set_usm_parameters(Path(usmdir) / "new_travail.usm", season_calendar(row))
 
 
 def normalize_successive_recup(usmdir):
@@ -253,8 +257,17 @@ def load_static_stics_files(package):
     return tuple((parameters / name).read_text() for name in ("rap.mod", "var.mod", "prof.mod"))
 
 
+# Contexts created in this process, by run and configuration: a loky worker keeps its
+# context across every rotation of a run it is given instead of rebuilding it per simulation.
+_worker_contexts = {}
+
+
 def create_context(mi, md, directory_path, temp_dir, pltfolder, package):
     rap, var, prof = load_static_stics_files(package)
+    tempopar = common_tempopar(md)
+    # the SeasonPipeline thread renders the inputs; one thread uses the connections at a time
+    master = queries.connect_readonly(mi, check_same_thread=False)
+    dictionary = queries.copy_to_memory(md, check_same_thread=False)
     return {
         "directory_path": directory_path,
         "temp_dir": temp_dir,
@@ -262,37 +275,103 @@ def create_context(mi, md, directory_path, temp_dir, pltfolder, package):
         "rap": rap,
         "var": var,
         "prof": prof,
-        "tempopar": common_tempopar(md),
+        "tempopar": tempopar,
+        "tempopar_variants": sticstempoparconverter.tempopar_variants(master, tempopar),
         "tempoparv6": common_tempoparv6(md),
-        "master": sqlite3.connect(mi),
-        "dictionary": sqlite3.connect(md),
+        "master": master,
+        "dictionary": dictionary,
+        "newtravail_template": sticsnewtravailconverter.NewTravailTemplate.from_connection(dictionary),
+        "fictec_templates": sticsfictec1converter.FictecTemplates(dictionary),
+        "climate": climatestore.open_store(climatestore.store_directory(temp_dir)),
+        "soils": sticssoilcatalogue.open_catalogue(sticssoilcatalogue.catalogue_directory(temp_dir)),
+        "files": filestore.open_store(filestore.store_directory(temp_dir)),
     }
 
 
-def generate_season_inputs(simulation, season, context):
+def close_context(context):
+    context["master"].close()
+    context["dictionary"].close()
+
+
+def worker_context(mi, md, directory_path, temp_dir, pltfolder, package, run=None):
+    """Context of this worker for the given run and configuration, created on first use.
+
+    ``run`` identifies the run; the stats of both databases catch files edited in place.
+    """
+    master = os.stat(mi)
+    dictionary = os.stat(md)
+    key = (run, mi, master.st_mtime_ns, master.st_size, md, dictionary.st_mtime_ns, dictionary.st_size,
+           directory_path, temp_dir, pltfolder, package)
+    context = _worker_contexts.get(key)
+    if context is None:
+        close_worker_contexts()  # a new run or configuration replaces the previous one
+        context = _worker_contexts[key] = create_context(
+            mi, md, directory_path, temp_dir, pltfolder, package
+        )
+    return context
+
+
+def close_worker_contexts():
+    """Close the connections of every context created in this process."""
+    while _worker_contexts:
+        _, context = _worker_contexts.popitem()
+        close_context(context)
+
+
+atexit.register(close_worker_contexts)
+
+
+def end_worker_contexts():
+    """Tear down the contexts of a finished run, here and in the loky workers.
+
+    A worker keeps its context for every task of a run. The workers are stopped once the run
+    is over, which releases their connections: atexit handlers are not a reliable teardown in
+    loky workers.
+    """
+    from joblib.externals.loky import get_reusable_executor
+
+    close_worker_contexts()
+    get_reusable_executor().shutdown(wait=True)
+
+
+def season_directory(simulation, season, context):
+    """(key, USM directory) of a rotation's season."""
+    season_key = f"{simulation['idsim']}__season_{season['SeasonOrder']:03d}"
+    return season_key, Path(context["temp_dir"]) / season_key
+
+
+def generate_season_inputs(simulation, season, context, codesuite=None):
     row = build_season_row(simulation, season)
-    season_key = f"{row['idsim']}__season_{season['SeasonOrder']:03d}"
-    usmdir = Path(context["temp_dir"]) / season_key
+    season_key, usmdir = season_directory(simulation, season, context)
     usmdir.mkdir(parents=True, exist_ok=True)
     sim_path = os.path.join(
         context["directory_path"], str(row["idsim"]), str(row["idPoint"]), str(row["StartYear"])
     )
     season_order = season["SeasonOrder"]
 
-    write_file(str(usmdir), "tempoparv6.sti", context["tempoparv6"])
-    sticstempoparconverter.SticsTempoparConverter().export(
-        sim_path, context["master"], context["tempopar"], str(usmdir)
-    )
-    sticsparamsolconverter.SticsParamSolConverter().export(
-        sim_path, context["dictionary"], context["master"], str(usmdir)
-    )
+    write_file(str(usmdir), "tempoparv6.sti", context["tempoparv6"], context["files"])
+    tempopar = None if row.get("idOption") is None else context["tempopar_variants"].get(str(row["idOption"]))
+    if tempopar is not None:
+        write_file(str(usmdir), "tempopar.sti", tempopar, context["files"])
+    else:
+        sticstempoparconverter.SticsTempoparConverter().export(
+            sim_path, context["master"], context["tempopar"], str(usmdir)
+        )
+    param_sol = context["soils"].param_sol(row["idsoil"]) if context["soils"] is not None else None
+    if param_sol is not None:
+        write_file(str(usmdir), "param.sol", param_sol, context["files"])
+    else:
+        sticsparamsolconverter.SticsParamSolConverter().export(
+            sim_path, context["dictionary"], context["master"], str(usmdir)
+        )
     sticsstationconverter.SticsStationConverter().export(
         sim_path, context["dictionary"], context["master"], context["rap"],
         context["var"], context["prof"], str(usmdir), season_order=season_order,
     )
     sticsnewtravailconverter.SticsNewTravailConverter().export(
         sim_path, context["dictionary"], context["master"], str(usmdir),
-        season_order=season_order,
+        season_order=season_order, template=context["newtravail_template"],
+        fields=season_calendar(row), codesuite=codesuite,
     )
     sticsficiniconverter.SticsFicIniConverter().export(
         sim_path, context["dictionary"], context["master"], str(usmdir),
@@ -305,10 +384,11 @@ def generate_season_inputs(simulation, season, context):
         str(usmdir),
         start_year=row["StartYear"],
         end_year=row["EndYear"],
+        climate=context["climate"],
     )
     sticsfictec1converter.SticsFictec1Converter().export(
         sim_path, context["dictionary"], context["master"], str(usmdir),
-        season_order=season_order,
+        season_order=season_order, templates=context["fictec_templates"],
         date_offset=(
             date(season["Plants"][0]["SowingDate"].year, 1, 1)
             - date(row["StartYear"], 1, 1)
@@ -318,103 +398,111 @@ def generate_season_inputs(simulation, season, context):
         sim_path, context["master"], context["pltfolder"], str(usmdir),
         season_order=season_order,
     )
-    adapt_usm_calendar(str(usmdir), row)
     return row, str(usmdir), season_key
 
 
-def run_stics(usmdir, output_dir, dailyoutput=0):
+class SeasonPipeline:
+    """Inputs of a rotation's seasons, rendered in order by one background thread.
+
+    A season's inputs do not depend on the previous run, only its state files do: the
+    seasons are all queued at once and rendered while STICS runs the earlier ones, so the
+    rotation waits for input generation only for its first season.
+    """
+
+    def __init__(self, renders):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="season-inputs")
+        self._futures = [self._executor.submit(render) for render in renders]
+
+    def inputs(self, index):
+        """What the ``index``-th render returned, once it is done; raises what it raised."""
+        return self._futures[index].result()
+
+    def close(self):
+        """Wait for the render in progress and drop the ones not started."""
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+
+def run_stics(usmdir, dailyoutput=0):
     # Reusing a seasonal directory must not append results from a previous run.
-    for report_name in ("mod_rapport.sti", "mod_rapportA.sti", "mod_rapportP.sti"):
-        report = Path(usmdir) / report_name
-        if report.exists():
-            report.unlink()
-    if int(dailyoutput) == 1:
-        for daily_file in Path(usmdir).glob("mod_s*.sti"):
-            daily_file.unlink()
-        for profile_file in Path(usmdir).glob("mod_profil*.sti"):
-            profile_file.unlink()
-    script = Path(__file__).with_name("sticsrun.sh")
-    return subprocess.run(
-        ["bash", str(script), usmdir, output_dir, "0", str(int(dailyoutput))],
-        capture_output=True,
-        check=True,
-        text=True,
-        timeout=180,
-    )
+    sticsrunner.clear_outputs(usmdir, dailyoutput)
+    return sticsrunner.run(usmdir)
 
 
-def collect_reports(simulation, season, season_key, directory_path, dt):
+def collect_reports(simulation, season, usmdir, dt, summaries):
+    """Add the season's report rows to ``summaries``; reports without a header get rap.mod's."""
     if season["IsMixedCrop"]:
-        reports = [("A", f"mod_rapportA_{season_key}.sti"), ("P", f"mod_rapportP_{season_key}.sti")]
+        reports = [("A", "mod_rapportA.sti"), ("P", "mod_rapportP.sti")]
     else:
-        reports = [("", f"mod_rapport_{season_key}.sti")]
+        reports = [("", "mod_rapport.sti")]
 
-    dataframes = []
+    idsim = str(simulation["idsim"])
     for plant_role, filename in reports:
-        report = Path(directory_path) / filename
+        report = Path(usmdir) / filename
         if not report.exists():
             print(f"Warning: {report} does not exist", flush=True)
             continue
-        lines = report.read_text().splitlines()
-        if lines and "ansemis" not in lines[0]:
-            report.write_text(REPORT_HEADER + "\n" + "\n".join(lines) + "\n")
-        dataframe = create_df_summary(str(report), dt, str(simulation["idsim"]), plant_role)
-        dataframe.insert(3, "SeasonOrder", season["SeasonOrder"])
-        dataframes.append(dataframe)
-        report.unlink()
-    return dataframes
+        summaries.add(report, idsim, plant_role, coordinates=get_coord(idsim) if dt == 1 else None,
+                      season_order=season["SeasonOrder"])
 
 
 def process_simulation(
     simulation, mi, md, directory_path, temp_dir, pltfolder, package, dt,
-    dailyoutput=0,
+    dailyoutput=0, sink=None, run=None,
 ):
-    context = create_context(mi, md, directory_path, temp_dir, pltfolder, package)
-    usm_dirs = []
-    dataframes = []
+    """Run every season of a rotation; returns (summary, daily, profile) frames.
+
+    With an output ``sink`` the daily and profile rows are appended to it after each season
+    and the returned daily and profile frames are empty. ``run`` identifies the run the
+    worker context is kept for.
+    """
+    context = worker_context(mi, md, directory_path, temp_dir, pltfolder, package, run)
+    summaries = sticsreports.SummaryAccumulator()
     daily_dataframes = []
     profile_dataframes = []
     previous_usmdir = None
+    pipeline = None
+    seasons = []
     try:
         seasons = fetch_rotation_seasons(context["master"], simulation)
+        # codesuite: the first season starts fresh, the next ones resume from recup.tmp
+        pipeline = SeasonPipeline(
+            partial(generate_season_inputs, simulation, season, context, codesuite=0 if index == 0 else 1)
+            for index, season in enumerate(seasons)
+        )
         for season_index, season in enumerate(seasons):
             print(
                 f"Successive iteration {season_index}/{len(seasons) - 1}: ",
                 flush=True,
             )
-            _, usmdir, season_key = generate_season_inputs(simulation, season, context)
-            usm_dirs.append(usmdir)
-            usm_file = Path(usmdir) / "new_travail.usm"
-            if previous_usmdir is None:
-                set_usm_parameter(usm_file, "codesuite", 0)
-            else:
+            _, usmdir, season_key = pipeline.inputs(season_index)
+            # the only input waiting for the previous run
+            if previous_usmdir is not None:
                 copy_successive_state(previous_usmdir, usmdir)
-                set_usm_parameter(usm_file, "codesuite", 1)
 
-            run_stics(usmdir, directory_path, dailyoutput)
+            run_stics(usmdir, dailyoutput)
             for state_file in STATE_FILES:
                 if not (Path(usmdir) / state_file).exists():
                     raise FileNotFoundError(
                         f"STICS did not create {state_file} for season {season['SeasonOrder']}"
                     )
             normalize_successive_recup(usmdir)
-            dataframes.extend(
-                collect_reports(simulation, season, season_key, directory_path, dt)
-            )
-            if int(dailyoutput) == 1:
+            collect_reports(simulation, season, usmdir, dt, summaries)
+            if int(dailyoutput) == 1 and sink is not None:
+                write_outputs(sink, usmdir, simulation["idsim"], season["SeasonOrder"], season["IsMixedCrop"])
+            elif int(dailyoutput) == 1:
                 daily_dataframes.extend(
-                    collect_daily_outputs(
-                        directory_path,
-                        season_key,
+                    read_daily_outputs(
+                        usmdir,
                         simulation["idsim"],
                         season["SeasonOrder"],
                         season["IsMixedCrop"],
                     )
                 )
                 profile_dataframes.extend(
-                    collect_profile_outputs(
-                        directory_path,
-                        season_key,
+                    read_profile_outputs(
+                        usmdir,
                         simulation["idsim"],
                         season["SeasonOrder"],
                         season["IsMixedCrop"],
@@ -422,13 +510,15 @@ def process_simulation(
                 )
             previous_usmdir = usmdir
     finally:
-        context["master"].close()
-        context["dictionary"].close()
-        if dt == 1:
-            for usmdir in usm_dirs:
-                shutil.rmtree(usmdir, ignore_errors=True)
-
-    summary = pd.concat(dataframes, ignore_index=True) if dataframes else pd.DataFrame()
+        if pipeline is not None:
+            # the context's connections go back to this thread before the next rotation
+            pipeline.close()
+        if dt == 1 and seasons:
+            # failed renders too may have created their directory
+            for season in seasons:
+                shutil.rmtree(season_directory(simulation, season, context)[1], ignore_errors=True)
+
+    summary = summaries.frame() if summaries else pd.DataFrame()
     daily = (
         pd.concat(daily_dataframes, ignore_index=True)
         if daily_dataframes else pd.DataFrame()
@@ -462,29 +552,40 @@ def main(simulations=None):
 
     started = time()
     prepare_sqlite_indexes(mi, md)
+    # the worker contexts open what is in temp_dir: build it from this MasterInput
+    climatestore.prepare(mi, temp_dir)
+    sticssoilcatalogue.prepare(mi, md, temp_dir)
     if simulations is None:
         simulations = fetch_data_from_sqlite(mi)
     if not simulations:
         print("No simulation to process.", flush=True)
         return None
 
-    results = Parallel(n_jobs=nthreads, backend="loky")(
-        delayed(process_simulation)(
-            simulation, mi, md, directory_path, temp_dir, pltfolder, package, dt,
-            dailyoutput,
-        )
-        for simulation in simulations
+    run = uuid.uuid4().hex
+    result_path = Path(directory_path) / f"{uuid.uuid4()}_stics_successive.csv"
+    sinks = resultsink.ResultSinks(
+        str(result_path), resultsink.configured_sinks(GlobalVariables.get("resultSinks", "csv")),
+        database=mi, model="Stics", summarize=summary_output_rows, staging=temp_dir,
     )
-    frames = [
-        result[0] for result in results
-        if result is not None and result[0] is not None and not result[0].empty
-    ]
-    if not frames:
+    try:
+        results = Parallel(n_jobs=nthreads, backend="loky", return_as="generator")(
+            delayed(process_simulation)(
+                simulation, mi, md, directory_path, temp_dir, pltfolder, package, dt,
+                dailyoutput, run=run,
+            )
+            for simulation in simulations
+        )
+        for result in results:
+            if result is not None:
+                sinks.write(result[0])
+        sinks.close()
+    finally:
+        sinks.discard()  # a failed run keeps the previous SummaryOutput rows
+        end_worker_contexts()
+    if sinks.rows == 0:
         print("No STICS reports produced.", flush=True)
         return None
 
-    result_path = Path(directory_path) / f"{uuid.uuid4()}_stics_successive.csv"
-    pd.concat(frames, ignore_index=True).to_csv(result_path, index=False)
     print(f"Results saved to {result_path}", flush=True)
     print(f"STICS successive total time: {time() - started:.2f}s", flush=True)
     return str(result_path)
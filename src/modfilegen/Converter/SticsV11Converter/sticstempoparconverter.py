@@ -1,34 +1,56 @@
 from modfilegen.converter import Converter
+from modfilegen.queries import fetch_all
 from sqlite3 import Connection
 import os
-import pandas as pd
+
+# STICS runs write their reports with separator 2 (codeseprapport)
+REPORT_SEPARATOR = ("codeseprapport\n1", "codeseprapport\n2")
+
+
+def render(option, tempoparfix):
+    """tempopar.sti of one SimulationOptions row: the stress flags in front of the common body."""
+    fileContent = ""
+    fileContent += "codeinnact\n"
+    if option["StressN_YN"]:
+        fileContent += "1\n"
+    else:
+        fileContent += "2\n"
+    fileContent += "codeh2oact\n"
+    if option["StressW_YN"]:
+        fileContent += "1\n"
+    else:
+        fileContent += "2\n"
+    fileContent += tempoparfix
+    return fileContent.replace(*REPORT_SEPARATOR)
+
+
+def tempopar_variants(master_input_connection, tempoparfix):
+    """tempopar.sti of every SimulationOptions row, by option id as text (first row wins)."""
+    variants = {}
+    cursor = master_input_connection.execute(
+        "SELECT IdOptions, StressW_YN, StressN_YN FROM SimulationOptions ORDER BY rowid"
+    )
+    for idOptions, stressW, stressN in cursor:
+        if idOptions is not None:
+            variants.setdefault(str(idOptions), render({"StressW_YN": stressW, "StressN_YN": stressN}, tempoparfix))
+    return variants
+
 
 class SticsTempoparConverter(Converter):
     def __init__(self):
         super().__init__()
 
-    def export(self, directory_path, master_input_connection, tempoparfix, usmdir):
+    def export(self, directory_path, master_input_connection, tempoparfix, usmdir, snapshot=None):
         file_name = "tempopar.sti"
-        fileContent = ""
         # split directory_path in ST
         ST = directory_path.split(os.sep)
         output_path = os.path.join(*ST[:-2])
-        fetchAllQuery = """SELECT SimUnitList.idsim, SimulationOptions.StressW_YN, SimulationOptions.StressN_YN, SimulationOptions.StressP_YN, SimulationOptions.StressK_YN
-         FROM SimUnitList INNER JOIN SimulationOptions ON SimUnitList.IdOption = SimulationOptions.IdOptions Where idsim ='%s';"""%(ST[-3])
-        DA = pd.read_sql_query(fetchAllQuery, master_input_connection)
-        rows = DA.to_dict(orient='records')
-        row = rows[0]
-        fileContent += "codeinnact\n"
-        if row["StressN_YN"]:
-            fileContent += "1\n"
-        else:
-            fileContent += "2\n"
-        fileContent += "codeh2oact\n"
-        if row["StressW_YN"]:
-            fileContent += "1\n"
+        if snapshot is None:
+            rows = fetch_all(master_input_connection, "stics.tempopar", ST[-3])
         else:
-            fileContent += "2\n"
-        fileContent += tempoparfix
+            rows = snapshot.tempopar_rows(ST[-3])
+        row = rows[0]
+        fileContent = render(row, tempoparfix)
         #fileContent += "\n"
         try:
             # Exporter le fichier vers le répertoire spécifié
@@ -36,4 +58,3 @@ class SticsTempoparConverter(Converter):
         except Exception as e:
             print(f"Error during writing file : {e}")
         return fileContent
-
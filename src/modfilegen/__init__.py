@@ -15,5 +15,9 @@ GlobalVariables = {"storeNumMinSimu" : 0,
                     "tempDir": "",
                     "package": "",
                     "thirdyear": 0,
-                    "dailyoutput": 0
+                    "dailyoutput": 0,
+                    "scratch": "disk",  # "tmpfs" puts the USM workspaces in /dev/shm
+                    "scratchBudget": 0,  # MiB of tmpfs a run may hold; 0 for half of the free space
+                    "resultSinks": "csv",  # summary result sinks, comma separated: csv, sqlite, parquet
+                    "simulationFilter": ""
                      }
@@ -0,0 +1,168 @@
+"""
+Bulk loads of model results into SQLite tables.
+
+The result tables (SummaryOutput, the daily and profile tables, Celsius' OutputSynt) used to
+be filled with ``DataFrame.to_sql``: numpy values bound row by row through pandas' generic
+SQL layer, lookup indexes updated on every insert, and one implicit transaction per call.
+
+``BulkLoader`` does one load in one explicit transaction (table creation, deletion of the
+replaced rows, inserts and index builds included, so a failed load leaves the table as it was):
+
+- the connection is tuned for the load: ``synchronous`` OFF (the rollback journal still
+  protects against a crash of the process), a large page cache, temporary b-trees in memory;
+- columns are converted once to Python ints, floats and strings and inserted with
+  ``executemany``; missing columns are added to the table;
+- when the load is large compared to what the table keeps, the table's indexes are dropped
+  first and rebuilt once at the end, which is much cheaper than maintaining them row by row;
+- the load reports its rows per second.
+"""
+
+import sqlite3
+from time import time
+
+import numpy as np
+
+INDEX_REBUILD_ROWS = 50_000  # smaller loads keep the indexes live
+CACHE_KIB = 262_144  # page cache of a loading connection
+
+
+def quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sql_type(series):
+    """SQLite column type for a pandas column, as ``to_sql`` declared it."""
+    kind = series.dtype.kind
+    if kind in "iub":
+        return "INTEGER"
+    if kind == "f":
+        return "REAL"
+    return "TEXT"
+
+
+def table_columns(connection, table):
+    """[(name, declared type)] of ``table``; empty when it does not exist."""
+    return [(row[1], row[2]) for row in connection.execute(f"PRAGMA table_info({quote(table)})")]
+
+
+def _values(series):
+    """Column values as Python objects sqlite3 binds directly; NaN and NA become NULL."""
+    if series.dtype.kind in "iub" and not series.hasnans:
+        return series.tolist()
+    values = series.to_numpy(dtype=object)
+    missing = series.isna().to_numpy()
+    if missing.any():
+        values = values.copy()
+        values[missing] = None
+    if series.dtype.kind in "iubf":
+        return values.tolist()
+    return [value if value is None or isinstance(value, (str, int, float, bytes)) else
+            value.item() if isinstance(value, np.generic) else str(value) for value in values]
+
+
+class BulkLoader:
+    """One load into ``table`` of ``database``; use as a context manager.
+
+    ``delete_where`` removes the rows the load replaces, ``replace`` drops the table first.
+    ``indexes`` [(name, columns)] are created at the end if missing. ``rows`` is the expected
+    size of the load (None: unknown, treated as large).
+    """
+
+    def __init__(self, database, table, delete_where=None, replace=False, indexes=(), rows=None):
+        self.database = database
+        self.table = table
+        self.delete_where = delete_where
+        self.replace = replace
+        self.indexes = list(indexes)
+        self.expected_rows = rows
+        self.rows = 0
+        self._connection = None
+        self._columns = []
+        self._dropped = []  # CREATE INDEX statements to run again at the end
+
+    def __enter__(self):
+        self._started = time()
+        self._connection = sqlite3.connect(self.database, isolation_level=None)
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
+        self._connection.execute("PRAGMA temp_store = MEMORY")
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._prepare()
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            self._connection.close()
+            raise
+        return self
+
+    def _prepare(self):
+        if self.replace:
+            self._connection.execute(f"DROP TABLE IF EXISTS {quote(self.table)}")
+        self._columns = [name for name, _ in table_columns(self._connection, self.table)]
+        if not self._columns:
+            return
+        if self.delete_where:
+            self._connection.execute(f"DELETE FROM {quote(self.table)} WHERE {self.delete_where}")
+        if self.expected_rows is not None and self.expected_rows < INDEX_REBUILD_ROWS:
+            return
+        if self.expected_rows is not None:
+            kept = self._connection.execute(f"SELECT count(*) FROM {quote(self.table)}").fetchone()[0]
+            if self.expected_rows < kept:
+                return
+        indexes = self._connection.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (self.table,),
+        ).fetchall()
+        for name, sql in indexes:
+            self._connection.execute(f"DROP INDEX {quote(name)}")
+            self._dropped.append(sql)
+
+    def _add_columns(self, columns):
+        """Create the table, or add the columns it lacks; ``columns`` is [(name, type)]."""
+        missing = [(name, column_type) for name, column_type in columns if name not in self._columns]
+        if not missing:
+            return
+        if not self._columns:
+            definitions = ", ".join(f"{quote(name)} {column_type}" for name, column_type in missing)
+            self._connection.execute(f"CREATE TABLE {quote(self.table)} ({definitions})")
+        else:
+            for name, column_type in missing:
+                self._connection.execute(f"ALTER TABLE {quote(self.table)} ADD COLUMN {quote(name)} {column_type}")
+        self._columns.extend(name for name, _ in missing)
+
+    def append_rows(self, columns, rows):
+        """Insert ``rows`` (tuples) of ``columns`` [(name, type)]; returns how many were inserted."""
+        self._add_columns(columns)
+        names = ", ".join(quote(name) for name, _ in columns)
+        cursor = self._connection.executemany(
+            f"INSERT INTO {quote(self.table)} ({names}) VALUES ({', '.join('?' * len(columns))})", rows)
+        count = cursor.rowcount if cursor.rowcount >= 0 else 0
+        self.rows += count
+        return count
+
+    def append(self, frame):
+        """Insert the rows of a DataFrame; returns how many were inserted."""
+        if frame is None or frame.empty:
+            return 0
+        columns = [(name, sql_type(frame[name])) for name in frame.columns]
+        values = [_values(frame[name]) for name in frame.columns]
+        return self.append_rows(columns, zip(*values))
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is not None:
+                self._connection.execute("ROLLBACK")
+                return False
+            for sql in self._dropped:
+                self._connection.execute(sql)
+            if self._columns:
+                for name, columns in self.indexes:
+                    self._connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {quote(name)} ON {quote(self.table)} "
+                        f"({', '.join(quote(column) for column in columns)})")
+            self._connection.execute("COMMIT")
+        finally:
+            self._connection.close()
+        elapsed = max(time() - self._started, 1e-9)
+        print(f"✅ {self.rows} rows inserted into {self.table} ({self.rows / elapsed:,.0f} rows/s).", flush=True)
+        return False
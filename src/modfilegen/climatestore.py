@@ -0,0 +1,314 @@
+"""
+Memory-mapped columnar copy of the MasterInput daily climate table.
+
+Every weather converter used to run its own ``SELECT * FROM RaClimateD WHERE idPoint = ? ...``
+per simulation, in every worker. ``build`` reads RaClimateD once per run, sorted by
+(idPoint, year, w_date), and writes one ``.npy`` file per column next to an
+(idPoint, year) -> row-range index. Workers ``open_store`` the directory and slice the
+memory-mapped columns: the pages are shared by every process through the OS page cache.
+
+``ClimateStore.frame`` returns the same DataFrame ``pd.read_sql_query`` would (same columns,
+dtypes and null handling), so converters can switch between the store and SQL freely.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import traceback
+import uuid
+
+import numpy as np
+import pandas as pd
+
+CLIMATE_TABLE = "RaClimateD"
+STORE_DIRECTORY = "climate_store"
+INDEX_FILE = "index.json"
+FETCH_SIZE = 100_000
+
+
+def store_directory(base):
+    """Directory holding the climate store of a run whose working directory is ``base``."""
+    return os.path.join(base, STORE_DIRECTORY)
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _fingerprint(connection):
+    """Cheap identity of the climate table: schema, row count and last rowid."""
+    schema = connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE",
+        (CLIMATE_TABLE,),
+    ).fetchone()
+    if schema is None:
+        raise ValueError(f"No {CLIMATE_TABLE} table in this MasterInput")
+    count, last = connection.execute(f"SELECT count(*), max(rowid) FROM {CLIMATE_TABLE}").fetchone()
+    return {"schema": schema[0], "rows": count, "last_rowid": last}
+
+
+def _file_stamps(database):
+    """mtime and size of the database file and its WAL: in-place updates change them."""
+    stamps = {}
+    for path in (database, database + "-wal"):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            stamps[os.path.basename(path)] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def _column_kinds(connection, columns):
+    """Storage kind and text width of every column, from the SQLite value types actually stored."""
+    selects = []
+    for column in columns:
+        quoted = _quote(column)
+        selects.append(f"group_concat(DISTINCT typeof({quoted}))")
+        selects.append(f"max(CASE WHEN typeof({quoted}) = 'text' THEN length({quoted}) END)")
+    stats = connection.execute(f"SELECT {', '.join(selects)} FROM {CLIMATE_TABLE}").fetchone()
+    kinds = {}
+    for position, column in enumerate(columns):
+        types = set((stats[2 * position] or "null").split(",")) - {"null"}
+        if not types:
+            kinds[column] = ("null", 0)
+        elif types == {"integer"}:
+            kinds[column] = ("integer", 0)
+        elif types == {"real"}:
+            kinds[column] = ("real", 0)
+        elif types == {"integer", "real"}:
+            kinds[column] = ("numeric", 0)
+        elif types == {"text"}:
+            kinds[column] = ("text", max(int(stats[2 * position + 1] or 1), 1))
+        else:
+            raise ValueError(f"{CLIMATE_TABLE}.{column} mixes {sorted(types)} values")
+    return kinds
+
+
+def _column_dtype(kind, width):
+    if kind == "integer":
+        return np.dtype(np.int64)
+    if kind == "text":
+        return np.dtype(f"<U{width}")
+    return np.dtype(np.float64)
+
+
+def _fill(kind, values):
+    """Replace NULLs by a placeholder the column dtype can hold."""
+    if kind == "text":
+        return ["" if value is None else value for value in values]
+    if kind == "integer":
+        return [0 if value is None else value for value in values]
+    return [np.nan if value is None else value for value in values]
+
+
+def build(database, directory, verbose=True):
+    """Write the climate store of ``database`` into ``directory``; reuse it when it is current.
+
+    Returns the opened ``ClimateStore``.
+    """
+    database = os.path.abspath(database)
+    stamps = _file_stamps(database)  # before reading: a write during the build makes the next run rebuild
+    with sqlite3.connect(database) as connection:
+        fingerprint = _fingerprint(connection)
+        fingerprint["database"] = database
+        fingerprint["files"] = stamps
+        index_path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path) as stream:
+                if json.load(stream).get("source") == fingerprint:
+                    return ClimateStore(directory)
+
+        cursor = connection.execute(f"SELECT * FROM {CLIMATE_TABLE} ORDER BY idPoint, year, w_date")
+        columns = [description[0] for description in cursor.description]
+        kinds = _column_kinds(connection, columns)
+        total = fingerprint["rows"]
+
+        staging = f"{directory}.{uuid.uuid4().hex}"
+        os.makedirs(staging)
+        try:
+            values = {}
+            nulls = {}
+            integral = {}
+            for position, column in enumerate(columns):
+                kind, width = kinds[column]
+                values[column] = np.lib.format.open_memmap(
+                    os.path.join(staging, f"{position}.npy"), mode="w+",
+                    dtype=_column_dtype(kind, width), shape=(total,))
+                nulls[column] = np.lib.format.open_memmap(
+                    os.path.join(staging, f"{position}.null.npy"), mode="w+",
+                    dtype=np.bool_, shape=(total,))
+                if kind == "numeric":
+                    integral[column] = np.lib.format.open_memmap(
+                        os.path.join(staging, f"{position}.int.npy"), mode="w+",
+                        dtype=np.bool_, shape=(total,))
+
+            start = 0
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                stop = start + len(rows)
+                for column, column_values in zip(columns, zip(*rows)):
+                    kind = kinds[column][0]
+                    nulls[column][start:stop] = [value is None for value in column_values]
+                    values[column][start:stop] = _fill(kind, column_values)
+                    if kind == "numeric":
+                        integral[column][start:stop] = [isinstance(value, int) for value in column_values]
+                start = stop
+
+            index = _row_ranges(columns, values, nulls, start)
+            for array in (*values.values(), *nulls.values(), *integral.values()):
+                array.flush()
+            del values, nulls, integral
+
+            with open(os.path.join(staging, INDEX_FILE), "w") as stream:
+                json.dump({
+                    "source": fingerprint,
+                    "rows": start,
+                    "columns": [[column, *kinds[column]] for column in columns],
+                    "points": index,
+                }, stream)
+            if os.path.exists(directory):
+                shutil.rmtree(directory)
+            os.replace(staging, directory)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    if verbose:
+        print(f"Climate store: {start} {CLIMATE_TABLE} rows for {len(index)} points in {directory}", flush=True)
+    return ClimateStore(directory)
+
+
+def _row_ranges(columns, values, nulls, total):
+    """{idPoint: {year: [start, stop]}} over the sorted rows."""
+    by_name = {column.lower(): column for column in columns}
+    points, years = by_name["idpoint"], by_name["year"]
+    if total == 0:
+        return {}
+    point_values, year_values = values[points][:total], values[years][:total]
+    changes = np.flatnonzero(
+        (point_values[1:] != point_values[:-1]) | (year_values[1:] != year_values[:-1])
+    ) + 1
+    starts = np.concatenate(([0], changes))
+    stops = np.concatenate((changes, [total]))
+    index = {}
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        if nulls[points][start] or nulls[years][start]:
+            continue  # never matched by idPoint = ? / year = ?
+        year = int(float(year_values[start]))
+        index.setdefault(str(point_values[start]), {})[str(year)] = [start, stop]
+    return index
+
+
+class ClimateStore:
+    """Read-only view over a built climate store; opening it maps the column files lazily."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as stream:
+            index = json.load(stream)
+        self.columns = [column for column, _, _ in index["columns"]]
+        self._kinds = {column: kind for column, kind, _ in index["columns"]}
+        self._names = {column.lower(): column for column in self.columns}
+        self._positions = {column: position for position, column in enumerate(self.columns)}
+        self._points = {
+            point: {int(year): tuple(rows) for year, rows in years.items()}
+            for point, years in index["points"].items()
+        }
+        self._arrays = {}
+
+    def __contains__(self, idPoint):
+        return str(idPoint) in self._points
+
+    def _array(self, column, suffix=""):
+        key = (column, suffix)
+        if key not in self._arrays:
+            path = os.path.join(self.directory, f"{self._positions[column]}{suffix}.npy")
+            self._arrays[key] = np.load(path, mmap_mode="r")
+        return self._arrays[key]
+
+    def rows(self, idPoint, first_year=None, last_year=None):
+        """(start, stop) of the rows of ``idPoint`` between the two years, both included."""
+        years = self._points.get(str(idPoint), {})
+        ranges = [
+            rows for year, rows in years.items()
+            if (first_year is None or year >= int(first_year))
+            and (last_year is None or year <= int(last_year))
+        ]
+        if not ranges:
+            return 0, 0
+        return min(start for start, _ in ranges), max(stop for _, stop in ranges)
+
+    def column(self, column, start, stop):
+        """Values of one column over rows [start, stop), typed like ``pd.read_sql_query``."""
+        kind = self._kinds[column]
+        nulls = self._array(column, ".null")[start:stop]
+        if kind == "null" or nulls.all():  # also empty slices, as pandas does
+            return np.full(stop - start, None, dtype=object)
+        values = self._array(column)[start:stop]
+        if kind == "text":
+            values = values.astype(object)
+            values[nulls] = None
+            return values
+        if kind == "numeric" and not nulls.any() and self._array(column, ".int")[start:stop].all():
+            return values.astype(np.int64)
+        if kind == "integer" and nulls.any():
+            values = values.astype(np.float64)
+            values[nulls] = np.nan
+        return values
+
+    def frame(self, idPoint, first_year=None, last_year=None, columns=None):
+        """Rows of ``idPoint`` between the two years, ordered by w_date.
+
+        ``columns`` are matched case-insensitively, as in a SELECT list, and keep the given spelling.
+        """
+        start, stop = self.rows(idPoint, first_year, last_year)
+        return pd.DataFrame({
+            column: self.column(self._names[column.lower()], start, stop)
+            for column in (columns or self.columns)
+        })
+
+    def batches(self, idPoints, columns=None, size=FETCH_SIZE):
+        """Every row of the given points, as DataFrames of whole points holding about ``size`` rows."""
+        frames, rows, found = [], 0, False
+        for idPoint in idPoints:
+            frame = self.frame(idPoint, columns=columns)
+            if frame.empty:
+                continue
+            frames.append(frame)
+            rows += len(frame)
+            found = True
+            if rows >= size:
+                yield pd.concat(frames, ignore_index=True)
+                frames, rows = [], 0
+        if frames:
+            yield pd.concat(frames, ignore_index=True)
+        elif not found:
+            yield self.frame(None, columns=columns)  # like pd.read_sql(chunksize=...) on no rows
+
+
+def prepare(database, base):
+    """Build the run's climate store under ``base``; None when it cannot be built.
+
+    A store that cannot be rebuilt is removed, so workers do not slice stale climate data.
+    """
+    directory = store_directory(base)
+    try:
+        return build(database, directory)
+    except Exception as e:
+        print(f"Climate store not built, weather converters will query {CLIMATE_TABLE}: {e}")
+        traceback.print_exc()
+        shutil.rmtree(directory, ignore_errors=True)
+        return None
+
+
+def open_store(directory):
+    """The climate store built in ``directory``, or None when there is none (query SQL instead)."""
+    if not os.path.exists(os.path.join(directory, INDEX_FILE)):
+        return None
+    try:
+        return ClimateStore(directory)
+    except Exception as e:
+        print(f"Ignoring climate store {directory}: {e}")
+        return None
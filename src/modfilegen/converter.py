@@ -3,6 +3,8 @@ import os
 import datetime
 from pathlib import Path
 
+from modfilegen import filestore
+
 class Converter:
     def __init__(self):
         self.usmString = ""
@@ -35,6 +37,7 @@ class Converter:
             Path(DirectoryPath).mkdir(parents=True, exist_ok=True)
             #os.makedirs(DirectoryPath)
         
+        filestore.unshare(os.path.join(DirectoryPath, FileName))  # never rewrite a stored file in place
         with open(os.path.join(DirectoryPath, FileName), "w") as outfile:
             outfile.write(FileContent)
 
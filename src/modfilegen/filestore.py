@@ -0,0 +1,138 @@
+"""
+Content-addressed store of the input files the drivers write into USM directories.
+
+Most of what a USM directory holds is shared by many simulations: tempoparv6.sti, the
+tempopar.sti of an option, the climat.txt of a point and year, the param.sol of a soil...
+The drivers cached those contents but still wrote a full copy of each into every USM
+directory. ``FileStore.place`` writes a content once under its hash, then hard-links it
+into the USM directory, so a simulation costs one directory entry per shared file.
+
+A hard link shares the file with the store and with every other USM holding the same
+content: a file placed this way must be replaced, never rewritten in place. ``place``
+replaces the target itself, and ``unshare`` lets plain writers drop a linked file before
+they open it for writing. When linking is not possible (another file system, no hard
+links, too many links to one file) the content is written as a plain copy, as before.
+"""
+
+import errno
+import hashlib
+import os
+import uuid
+
+STORE_DIRECTORY = "file_store"
+
+
+def store_directory(base):
+    """Directory holding the file store of a run whose working directory is ``base``."""
+    return os.path.join(base, STORE_DIRECTORY)
+
+
+def unshare(path):
+    """Remove ``path`` when it is a link into the store, so it can be rewritten safely."""
+    try:
+        if os.path.islink(path) or os.stat(path).st_nlink > 1:
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _write(path, content):
+    with open(path, "w") as stream:
+        stream.write(content)
+
+
+class FileStore:
+    """Contents written once under ``directory`` and hard-linked wherever they are placed."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._digests = {}  # id(content) -> (content, digest) of the contents placed lately
+        self._blobs = {}  # digest -> (path, identity) of the stored files known to exist
+        self._linking = True
+        self.written = 0  # bytes of the stored files this process wrote
+
+    def _digest(self, content):
+        known = self._digests.get(id(content))
+        if known is not None and known[0] is content:
+            return known[1]
+        digest = hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest()
+        if len(self._digests) > 4096:
+            self._digests.clear()
+        self._digests[id(content)] = (content, digest)
+        return digest
+
+    def _blob(self, digest, content, renew=False):
+        """(path, (st_dev, st_ino)) of the stored file of ``content``, written first when it is missing."""
+        known = self._blobs.get(digest)
+        if known is not None and not renew:
+            return known
+        path = os.path.join(self.directory, digest[:2], digest)
+        if renew or not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            staging = f"{path}.{uuid.uuid4().hex}"
+            try:
+                _write(staging, content)
+                os.replace(staging, path)  # concurrent workers write the same bytes
+                self.written += len(content)
+            except BaseException:
+                if os.path.exists(staging):
+                    os.remove(staging)
+                raise
+        stat = os.stat(path)
+        if len(self._blobs) > 4096:
+            self._blobs.clear()
+        known = self._blobs[digest] = (path, (stat.st_dev, stat.st_ino))
+        return known
+
+    def place(self, directory, filename, content):
+        """Make ``directory/filename`` hold ``content``; returns the path of the file."""
+        target = os.path.join(directory, filename)
+        if self._linking:
+            try:
+                digest = self._digest(content)
+                try:
+                    blob, identity = self._blob(digest, content)
+                except BaseException:
+                    unshare(target)  # never leave a reused workspace with the previous content
+                    raise
+                try:
+                    stat = os.lstat(target)
+                except FileNotFoundError:
+                    pass
+                else:
+                    if (stat.st_dev, stat.st_ino) == identity:
+                        return target  # a reused workspace already links this content
+                    os.unlink(target)
+                try:
+                    os.link(blob, target)
+                except OSError as e:
+                    if e.errno != errno.EMLINK:
+                        raise
+                    # the stored file reached the link limit: later USMs link a fresh copy
+                    os.link(self._blob(digest, content, renew=True)[0], target)
+                return target
+            except OSError as e:
+                if e.errno in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP):
+                    print(f"File store {self.directory}: hard links unavailable ({e}), writing copies")
+                    self._linking = False
+                elif isinstance(e, FileNotFoundError):
+                    self._blobs.clear()  # the store was removed under this worker: write it again
+                else:
+                    raise
+        unshare(target)
+        _write(target, content)
+        return target
+
+
+# Stores opened in this process, by directory.
+_stores = {}
+
+
+def open_store(directory):
+    """The file store of ``directory`` for this process; created on first placement."""
+    store = _stores.get(directory)
+    if store is None:
+        if len(_stores) >= 4:
+            _stores.clear()  # a worker reused by later runs drops the previous runs' stores
+        store = _stores[directory] = FileStore(directory)
+    return store
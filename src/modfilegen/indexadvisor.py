@@ -0,0 +1,281 @@
+"""
+Query-plan-driven index advisor for the MasterInput database.
+
+``converter_queries`` lists the statements the converters actually run (the named
+``queries.STATEMENTS`` and the set-based ``queries.BATCH_STATEMENTS``). ``advise_indexes``
+runs ``EXPLAIN QUERY PLAN`` on each of them, creates the candidate indexes of every table
+that is read with a full scan, then extends the indexes that are searched but still need a
+table lookup with the columns the queries read (covering indexes). It plans again and
+prints what is still scanned or looked up, so a missing index shows up before thousands of
+simulations pay for it.
+"""
+import re
+import sqlite3
+
+from modfilegen.masterinput import KEY_INDEXES
+from modfilegen.queries import BATCH_STATEMENTS, STATEMENTS
+
+# table -> advised indexes. Each entry lists alternatives (name, indexed columns) for the same
+# need; the first one the schema accepts is created (older MasterInputs lack SeasonOrder).
+CANDIDATE_INDEXES = {
+    "SimUnitList": [[("idx_idsim", "idsim")]],
+    "CropManagement": [[
+        ("idx_cropmngt_season_plant", "idMangt, SeasonOrder, PlantOrder"),
+        ("idx_cropmngt_plant", "idMangt, PlantOrder"),
+    ]],
+    "OrganicFOperations": [[("idx_orgaop_policy", "OFertiPolicyCode, OFNumber")]],
+    "OrganicFertilizationPolicy": [[("idx_orga_policy", "OFertiPolicyCode")]],
+    "InorganicFOperations": [[("idx_inorgaop_policy", "InorgFertiPolicyCode")]],
+    "InorganicFertilizationPolicy": [[("idx_inorga_policy", "InorgFertiPolicyCode")]],
+    "SoilTillageOperations": [[("idx_tillop_policy", "SoilTillPolicyCode, STNumber")]],
+    "SoilTillPolicy": [[("idx_till_policy", "SoilTillPolicyCode")]],
+    "Coordinates": [[("idx_idCoord", "idPoint")]],
+    "ListCultivars": [[("idx_cultivars", "idCultivar")]],
+    "ListCultOption": [[("idx_cultoptspec", "CodePSpecies")]],
+    "ListResidues": [[("idx_res", "TypeResidues")]],
+    "SimulationOptions": [[("idx_idoption", "idOptions")]],
+    "RaClimateD": [[("idx_idPoint_year", "idPoint, year")]],
+    "RaSoilProfile": [[("idx_rasoil_point_layer", "idPoint, layer_number")]],
+}
+for _name, _table, _expression in KEY_INDEXES:
+    CANDIDATE_INDEXES.setdefault(_table, []).append([(_name, _expression)])
+
+MODELS = ("stics", "dssat", "apsim")
+
+# Widest covering index the advisor creates: key columns plus the looked-up columns.
+COVERING_COLUMNS = 12
+COVER_SUFFIX = "_cover"
+
+
+def converter_queries():
+    """
+    model -> {query name: SQL} of the statements the converters run.
+
+    Built from queries.STATEMENTS (``<model>.<name>``; unprefixed statements such as
+    ``soil.layers`` are shared by every model) and from the set-based BATCH_STATEMENTS the
+    converter modules imported so far registered, with one ``?`` in each ``IN`` list.
+    """
+    registry = {model: {} for model in MODELS}
+    for name, sql in STATEMENTS.items():
+        model, _, short = name.partition(".")
+        if model in registry:
+            registry[model][short] = sql
+        else:
+            for model_queries in registry.values():
+                model_queries[name] = sql
+    for name, sql in BATCH_STATEMENTS.items():
+        model, _, short = name.partition(".")
+        registry.setdefault(model, {})[short] = sql.format(keys="?")
+    return registry
+
+_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?(.*)$")
+_TABLE = re.compile(r"^(?:SCAN|SEARCH) (\w+)(?: AS (\w+))?")
+# An index search that still reads the table row; covering searches say "USING COVERING INDEX".
+_LOOKUP = re.compile(r"^SEARCH (\w+)(?: AS (\w+))? USING INDEX (\w+)")
+_LITERAL = re.compile(r"'[^']*'|\"[^\"]*\"")
+_QUALIFIED = re.compile(r"\b(\w+)\.(\w+|\*)")
+_STAR = re.compile(r"\bSELECT\s+(?:DISTINCT\s+)?\*", re.IGNORECASE)
+_WORD = re.compile(r"\b[A-Za-z_]\w*\b")
+_INDEX_KEYS = re.compile(r"\bON\s+\w+\s*\((.*)\)\s*$", re.IGNORECASE | re.DOTALL)
+
+
+def query_plan(connection, sql):
+    """``EXPLAIN QUERY PLAN`` details of ``sql``, with every placeholder bound to NULL."""
+    params = (None,) * sql.count("?")
+    return [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def full_scans(plan):
+    """Tables read without any index in a query plan."""
+    scans = []
+    for detail in plan:
+        match = _SCAN.match(detail)
+        if match and "INDEX" not in match.group(2):
+            scans.append(match.group(1))
+    return scans
+
+
+def index_lookups(plan):
+    """(table, alias, index) of the plan rows that search an index and then read the table."""
+    return [match.groups() for match in map(_LOOKUP.match, plan) if match]
+
+
+def table_columns(connection, table):
+    return [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+
+
+def referenced_columns(connection, sql, plan, table, alias=None):
+    """
+    Columns of ``table`` read by ``sql``, or None when it selects all of them (``*``).
+
+    Qualified references (``Table.column`` or ``alias.column``) are attributed to their table;
+    an unqualified name only when no other table of the plan has a column of that name.
+    """
+    text = _LITERAL.sub(" ", sql)
+    columns = {column.lower(): column for column in table_columns(connection, table)}
+    names = {table.lower(), (alias or table).lower()}
+    used = set()
+    for qualifier, column in _QUALIFIED.findall(text):
+        if qualifier.lower() in names:
+            if column == "*":
+                return None
+            used.add(column.lower())
+    unqualified = _QUALIFIED.sub(" ", text)
+    if _STAR.search(unqualified):
+        return None
+    others = set()
+    for match in map(_TABLE.match, plan):
+        if match and match.group(1).lower() != table.lower():
+            others.update(column.lower() for column in table_columns(connection, match.group(1)))
+    used.update(word.lower() for word in _WORD.findall(unqualified) if word.lower() not in others)
+    return sorted(columns[column] for column in used if column in columns)
+
+
+def create_covering_index(connection, table, index, columns):
+    """
+    Create ``<index>_cover``: the keys of ``index`` followed by the other ``columns``.
+
+    Returns its name, or None when ``index`` is partial or built by a constraint, when it is
+    already a covering index of an earlier run (it is not extended again), when every column is
+    already a key, or when the index would be wider than COVERING_COLUMNS or hold every column
+    of the table (a second copy of it).
+    """
+    if index.endswith(COVER_SUFFIX):
+        return None
+    row = connection.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (index,)).fetchone()
+    match = _INDEX_KEYS.search(row[0]) if row and row[0] else None
+    if match is None or re.search(r"\bWHERE\b", match.group(1), re.IGNORECASE):
+        return None
+    keys = [info[2] for info in connection.execute(f"PRAGMA index_info({index})")]
+    indexed = {key.lower() for key in keys if key}
+    extra = [column for column in columns if column.lower() not in indexed]
+    copies_table = indexed.union(column.lower() for column in extra) >= {
+        column.lower() for column in table_columns(connection, table)}
+    if not extra or copies_table or len(keys) + len(extra) > COVERING_COLUMNS:
+        return None
+    name = index + COVER_SUFFIX
+    connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({match.group(1)}, {', '.join(extra)});")
+    return name
+
+
+def create_candidate_indexes(connection, table):
+    """Create the advised indexes of ``table``; returns the names of the new ones."""
+    created = []
+    existing = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    table = {name.lower(): name for name in CANDIDATE_INDEXES}.get(table.lower(), table)
+    for alternatives in CANDIDATE_INDEXES.get(table, []):
+        for name, columns in alternatives:
+            if name in existing:
+                break
+            try:
+                connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns});")
+            except sqlite3.OperationalError:
+                continue
+            created.append(name)
+            break
+    return created
+
+
+def advise_indexes(connection, models=None, verbose=True):
+    """
+    Plan every registered query, index the tables they scan and report the remaining scans.
+
+    Args:
+        connection: Connection to the MasterInput database.
+        models (iterable): Models of ``converter_queries`` to check (all models by default).
+        verbose (bool): Print the report.
+
+    Returns:
+        dict: {"created": [index names], "scans": {query: [tables]},
+        "lookups": {query: [tables]}, "skipped": {query: error}}
+    """
+    registry = converter_queries()
+    queries = {
+        f"{model}.{name}": sql
+        for model in (models or registry)
+        for name, sql in registry[model].items()
+    }
+    report = {"created": [], "scans": {}, "lookups": {}, "skipped": {}}
+    indexed = set()
+    while True:
+        # Indexing one table can move the scan to another table of the same join: plan again
+        # until no new table is worth indexing.
+        scans = _plan_queries(connection, queries, report)
+        tables = {table.lower(): table for found in scans.values() for table in found}
+        new_tables = [table for key, table in tables.items() if key not in indexed]
+        if not new_tables:
+            break
+        for table in new_tables:
+            indexed.add(table.lower())
+            report["created"].extend(create_candidate_indexes(connection, table))
+    report["scans"] = scans
+    report["created"].extend(_cover_lookups(connection, queries))
+    report["lookups"] = {
+        query: [table for table, _, _ in found]
+        for query, found in _plan_lookups(connection, queries).items()
+    }
+    connection.commit()
+    if verbose:
+        print_report(report)
+    return report
+
+
+def _plan_queries(connection, queries, report):
+    scans = {}
+    for query, sql in queries.items():
+        try:
+            found = full_scans(query_plan(connection, sql))
+        except sqlite3.Error as e:
+            report["skipped"][query] = str(e)
+            continue
+        if found:
+            scans[query] = found
+    return scans
+
+
+def _plan_lookups(connection, queries):
+    lookups = {}
+    for query, sql in queries.items():
+        try:
+            found = index_lookups(query_plan(connection, sql))
+        except sqlite3.Error:
+            continue
+        if found:
+            lookups[query] = found
+    return lookups
+
+
+def _cover_lookups(connection, queries):
+    """Extend the indexes searched by the queries with the columns the queries read from them."""
+    needed = {}
+    for sql in queries.values():
+        try:
+            plan = query_plan(connection, sql)
+        except sqlite3.Error:
+            continue
+        for table, alias, index in index_lookups(plan):
+            columns = referenced_columns(connection, sql, plan, table, alias)
+            if columns is not None:
+                needed.setdefault((table, index), {}).update(dict.fromkeys(columns))
+    existing = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    created = []
+    for (table, index), columns in needed.items():
+        name = create_covering_index(connection, table, index, list(columns))
+        if name and name not in existing:
+            existing.add(name)
+            created.append(name)
+    return created
+
+
+def print_report(report):
+    print("Index advisor:")
+    if report["created"]:
+        print(f"  created indexes: {', '.join(dict.fromkeys(report['created']))}")
+    for query, tables in report["scans"].items():
+        print(f"  full table scan in {query}: {', '.join(tables)}")
+    for query, tables in report.get("lookups", {}).items():
+        print(f"  table lookups in {query}: {', '.join(tables)}")
+    for query, error in report["skipped"].items():
+        print(f"  skipped {query}: {error}")
+    if not report["scans"]:
+        print("  no full table scan left in the converter queries")
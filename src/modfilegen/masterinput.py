@@ -0,0 +1,34 @@
+"""
+MasterInput preparation shared by the converters' ``export()`` step.
+
+Soil identifiers are matched case-insensitively (``Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil)``).
+SQLite can only serve such predicates from an index built on the very same expression, so
+``normalize_keys`` creates expression indexes for every case-insensitive key, plus the plain
+indexes the soil queries join through. Converter queries must keep writing ``Lower(<column>)``
+for the planner to pick them up.
+"""
+
+import sqlite3
+
+# (index name, table, indexed expression)
+KEY_INDEXES = (
+    ("idx_idsoill", "Soil", "Lower(IdSoil)"),
+    ("idx_simunit_idsoill", "SimUnitList", "Lower(idsoil)"),
+    ("idx_soillayers_idsoill", "SoilLayers", "Lower(idsoil), NumLayer"),
+    ("idx_idsoiltl", "SoilTypes", "Lower(SoilTextureType)"),
+    ("idx_runofftype", "RunoffTypes", "RunoffType"),
+    ("idx_idini", "InitialConditions", "idIni"),
+)
+
+
+def normalize_keys(connection):
+    """Create the case-insensitive key indexes; tables missing from this MasterInput are skipped."""
+    created = []
+    for name, table, expression in KEY_INDEXES:
+        try:
+            connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({expression});")
+            created.append(name)
+        except sqlite3.OperationalError as e:
+            print(f"Skipping index {name}: {e}")
+    connection.commit()
+    return created
@@ -0,0 +1,125 @@
+"""
+Process-wide registry of ModelsDictionary default values.
+
+Converters used to run ``Select Champ, ... From Variables Where model=... And [Table]=...``
+for every simulation and then scan the resulting DataFrame with
+``DT[DT["Champ"] == "..."]["dv"].values[0]``. The registry reads the Variables table once
+per process and per dictionary database, and serves the same values from frozen dicts keyed
+by (model, table, champ).
+"""
+
+import os
+from types import MappingProxyType
+
+DEFAULTS_QUERY = ("Select model, [Table], Champ, "
+                  "IFNULL([defaultValueOtherSource], [Default_Value_Datamill]) As dv "
+                  "From Variables Order By rowid;")
+
+_registries = {}
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ModelDefaults:
+    """Frozen (model, table, champ) -> default value mapping."""
+
+    def __init__(self, rows):
+        tables = {}
+        for model, table, champ, dv in rows:
+            # The first row wins, as with DT[DT["Champ"] == champ]["dv"].values[0].
+            tables.setdefault((model, table), {}).setdefault(champ, dv)
+        self._rows = tuple(rows)
+        self._tables = {key: MappingProxyType(champs) for key, champs in tables.items()}
+        self._values = MappingProxyType({
+            (model, table, champ): dv
+            for (model, table), champs in tables.items()
+            for champ, dv in champs.items()
+        })
+        self._numbers = MappingProxyType({
+            key: number for key, number in
+            ((key, _to_number(dv)) for key, dv in self._values.items())
+            if number is not None
+        })
+        self._merged = {}
+
+    @classmethod
+    def from_connection(cls, connection):
+        """Read every default of the Variables table through an open connection."""
+        return cls(connection.execute(DEFAULTS_QUERY).fetchall())
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def get(self, model, table, champ, default=None):
+        return self._values.get((model, table, champ), default)
+
+    def value(self, model, table, champ):
+        """Raw default value, as returned by the SQL query (text or None)."""
+        return self._values[(model, table, champ)]
+
+    def number(self, model, table, champ):
+        """Default value converted to float; raises KeyError when it is not numeric."""
+        return self._numbers[(model, table, champ)]
+
+    def table(self, model, table):
+        """Read-only champ -> default value mapping of one dictionary table."""
+        return self._tables.get((model, table), MappingProxyType({}))
+
+    def tables(self, model, *tables):
+        """Mapping for ``[Table] = a or [Table] = b ...``, first row in table order wins."""
+        key = (model, "=", tables)
+        if key not in self._merged:
+            self._merged[key] = self._merge(model, lambda table: table in tables)
+        return self._merged[key]
+
+    def tables_like(self, model, prefix):
+        """Mapping for ``[Table] like '<prefix>%'``, merging every matching table."""
+        key = (model, "like", prefix.lower())
+        if key not in self._merged:
+            self._merged[key] = self._merge(
+                model, lambda table: table is not None and table.lower().startswith(key[2]))
+        return self._merged[key]
+
+    def _merge(self, model, matches):
+        champs = {}
+        for row_model, table, champ, dv in self._rows:
+            if row_model == model and matches(table):
+                champs.setdefault(champ, dv)
+        return MappingProxyType(champs)
+
+
+def _database_key(connection):
+    # In-memory copies (queries.copy_to_memory) are keyed by the file they were copied from.
+    source = getattr(connection, "source", None)
+    if source:
+        stat = os.stat(source)
+        return (source, stat.st_mtime_ns, stat.st_size)
+    for _, name, path in connection.execute("PRAGMA database_list").fetchall():
+        if name == "main" and path:
+            stat = os.stat(path)
+            return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    return None
+
+
+def model_defaults(connection):
+    """Return the registry for the dictionary behind ``connection``, loading it once per process."""
+    key = _database_key(connection)
+    if key is None:
+        return ModelDefaults.from_connection(connection)
+    registry = _registries.get(key)
+    if registry is None:
+        registry = ModelDefaults.from_connection(connection)
+        _registries.clear()
+        _registries[key] = registry
+    return registry
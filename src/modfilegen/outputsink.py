@@ -0,0 +1,210 @@
+"""
+Per-worker SQLite shards for the daily and profile outputs of a run.
+
+With ``dailyoutput`` 1 the STICS workers used to return every mod_s and mod_profil file of
+their chunk as DataFrames; ``main`` kept all of them until one ``pd.concat`` and ``to_sql``
+at the end, so memory grew with the whole run. Workers now append each simulation's rows to
+their own shard (``tempDir/output_shards/<host>_<pid>.db``) as soon as they are read, and
+``merge`` bulk-loads the shards into the MasterInput tables in fetch-sized batches once the
+workers are done. Memory stays bounded by a simulation's outputs and a fetch batch.
+
+A shard grows new columns when a file brings some (mod_s files drop their empty columns);
+``merge`` adds the union of the shard columns to the target table.
+
+Categorical columns (the Model/Idsim/Texte/variable strings repeated on every profile row)
+are stored in a shard as integer codes, with one ``<table>:<column>`` dictionary table per
+column; ``merge`` decodes them, so the MasterInput tables keep their text columns.
+"""
+
+import glob
+import os
+import shutil
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from modfilegen.bulkload import BulkLoader, quote, sql_type, table_columns
+from modfilegen.scratch import worker_key
+
+SHARD_DIRECTORY = "output_shards"
+COMMIT_ROWS = 200_000  # rows a shard buffers in its transaction before committing
+FETCH_SIZE = 100_000
+
+
+def shard_directory(base):
+    """Directory holding the output shards of a run whose working directory is ``base``."""
+    return os.path.join(base, SHARD_DIRECTORY)
+
+
+def dictionary_table(table, column):
+    """Table of the codes a shard stores for the categorical ``column`` of ``table``."""
+    return f"{table}:{column}"
+
+
+def _encoded_columns(connection, table):
+    """Columns of ``table`` a shard stores as dictionary codes."""
+    prefix = dictionary_table(table, "")
+    names = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    return [name[len(prefix):] for name, in names if name.startswith(prefix)]
+
+
+class OutputShard:
+    """SQLite file one worker appends its output rows to."""
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        # a shard is rebuilt by rerunning its simulations: no need to survive a crash
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._tables = {}  # table -> its column names
+        self._dictionaries = {}  # table -> {encoded column: {value: code}}
+        self._pending = 0
+
+    def _load(self, table):
+        columns = self._tables[table] = [name for name, _ in table_columns(self._connection, table)]
+        self._dictionaries[table] = {
+            column: dict(self._connection.execute(f"SELECT value, code FROM {quote(dictionary_table(table, column))}"))
+            for column in _encoded_columns(self._connection, table)
+        }
+        return columns
+
+    def _encode(self, table, column, series):
+        """Shard codes of ``series``, adding its new values to the column's dictionary."""
+        dictionary = self._dictionaries[table][column]
+        categorical = series.astype("category")
+        new = [value for value in categorical.cat.categories if value not in dictionary]
+        if new:
+            start = len(dictionary)
+            rows = [(start + offset, value) for offset, value in enumerate(new)]
+            self._connection.executemany(
+                f"INSERT INTO {quote(dictionary_table(table, column))} (code, value) VALUES (?, ?)", rows)
+            dictionary.update((value, code) for code, value in rows)
+        mapping = np.array([dictionary[value] for value in categorical.cat.categories] + [-1], dtype=np.int64)
+        codes = mapping[categorical.cat.codes.to_numpy()]  # NaN (code -1) picks the trailing -1
+        values = codes.astype(object)
+        values[codes < 0] = None
+        return values
+
+    def append(self, table, frame):
+        """Append the rows of ``frame`` to ``table``; returns how many were written."""
+        if frame is None or frame.empty:
+            return 0
+        columns = self._tables.get(table)
+        if columns is None:
+            columns = self._load(table)
+        encoded = self._dictionaries[table]
+        for name in frame.columns:
+            if name in columns:
+                continue
+            if isinstance(frame[name].dtype, pd.CategoricalDtype):
+                self._connection.execute(
+                    f"CREATE TABLE {quote(dictionary_table(table, name))} (code INTEGER PRIMARY KEY, value)")
+                encoded[name] = {}
+                column_type = "INTEGER"
+            else:
+                column_type = sql_type(frame[name])
+            if columns:
+                self._connection.execute(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(name)} {column_type}")
+            else:
+                self._connection.execute(f"CREATE TABLE {quote(table)} ({quote(name)} {column_type})")
+            columns.append(name)
+        values = frame.astype(object).where(frame.notna(), None)
+        for name in frame.columns:
+            if name in encoded:
+                values[name] = self._encode(table, name, frame[name])
+        names = ", ".join(quote(name) for name in frame.columns)
+        self._connection.executemany(
+            f"INSERT INTO {quote(table)} ({names}) VALUES ({', '.join('?' * len(frame.columns))})",
+            values.itertuples(index=False, name=None),
+        )
+        self._pending += len(frame)
+        if self._pending >= COMMIT_ROWS:
+            self.commit()
+        return len(frame)
+
+    def commit(self):
+        """Make the appended rows visible to ``merge``."""
+        self._connection.commit()
+        self._pending = 0
+
+    def close(self):
+        self._connection.commit()
+        self._connection.close()
+
+
+# Shard of this process, by path
+_shards = {}
+
+
+def worker_shard(base):
+    """The output shard of this worker for the run working in ``base``."""
+    path = os.path.join(shard_directory(base), f"{worker_key()}.db")
+    shard = _shards.get(path)
+    if shard is not None and not os.path.exists(path):  # removed by the end of a previous run
+        shard.close()
+        shard = None
+    if shard is None:
+        shard = _shards[path] = OutputShard(path)
+    return shard
+
+
+def prepare(base):
+    """Create an empty shard directory for the run working in ``base``."""
+    directory = shard_directory(base)
+    shutil.rmtree(directory, ignore_errors=True)  # left by an interrupted run
+    os.makedirs(directory)
+    return directory
+
+
+def remove_shards(base):
+    """Remove the shards of the run once they are merged."""
+    shutil.rmtree(shard_directory(base), ignore_errors=True)
+
+
+def merge(base, database, table, delete_where=None, index=None):
+    """Copy the rows every worker wrote for ``table`` into ``database``; returns the row count.
+
+    ``delete_where`` removes the rows the run replaces first; ``index`` is
+    (name, columns), created once the rows are in.
+    """
+    shards = sorted(glob.glob(os.path.join(shard_directory(base), "*.db")))
+    sources = []
+    for path in shards:
+        source = sqlite3.connect(path)
+        encoded = set(_encoded_columns(source, table))
+        columns = [(name, "TEXT" if name in encoded else column_type)
+                   for name, column_type in table_columns(source, table)]
+        if columns:
+            sources.append((source, columns, encoded))
+        else:
+            source.close()
+    if not sources:
+        return 0
+
+    expected = sum(source.execute(f"SELECT count(*) FROM {quote(table)}").fetchone()[0] for source, _, _ in sources)
+    try:
+        with BulkLoader(database, table, delete_where=delete_where,
+                        indexes=[index] if index is not None else (), rows=expected) as loader:
+            for source, columns, encoded in sources:
+                selected, joins = [], []
+                for position, (name, _) in enumerate(columns):
+                    if name in encoded:
+                        alias = f"d{position}"
+                        selected.append(f"{alias}.value")
+                        joins.append(f"LEFT JOIN {quote(dictionary_table(table, name))} AS {alias} "
+                                     f"ON {alias}.code = t.{quote(name)}")
+                    else:
+                        selected.append(f"t.{quote(name)}")
+                cursor = source.execute(
+                    f"SELECT {', '.join(selected)} FROM {quote(table)} AS t {' '.join(joins)} ORDER BY t.rowid")
+                while True:
+                    batch = cursor.fetchmany(FETCH_SIZE)
+                    if not batch:
+                        break
+                    loader.append_rows(columns, batch)
+        return loader.rows
+    finally:
+        for source, _, _ in sources:
+            source.close()
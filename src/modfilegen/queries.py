@@ -0,0 +1,311 @@
+"""
+Named, parameterized MasterInput statements shared by the converters.
+
+Converters used to build their SQL with ``'%s' % id_sim``, so every simulation produced a new
+statement text and SQLite prepared it again. The statements below are constant text with
+``?`` placeholders: each is prepared once per connection and then served from the statement
+cache of the connection (``cached_statements``). ``fetch_all``/``fetch_one`` run them through
+one reusable cursor per connection and return ``sqlite3.Row`` records: lightweight tuples,
+indexable by position or by column name (case-insensitively) like the
+``to_dict(orient='records')`` dicts they replace.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+# Larger than the number of statements below plus the ad-hoc ones of a worker.
+CACHED_STATEMENTS = 256
+
+# Worker profile of read-only connections: 256 MiB memory map, 64 MiB page cache and
+# temporary b-trees (ORDER BY, DISTINCT) kept in memory.
+READ_ONLY_PRAGMAS = (
+    ("mmap_size", 268435456),
+    ("cache_size", -65536),
+    ("temp_store", "MEMORY"),
+)
+
+SEASON_FILTER = " AND CropManagement.SeasonOrder = ?"
+
+
+def _seasonal(statements, name, sql, order_by=""):
+    """Register ``name`` and its ``name.season`` variant, filtered on CropManagement.SeasonOrder."""
+    statements[name] = sql + order_by
+    statements[name + ".season"] = sql + SEASON_FILTER + order_by
+
+
+STATEMENTS = {
+    "soil.layers": "Select * From SoilLayers where Lower(idsoil) = ? Order by NumLayer",
+    "stics.paramsol": """SELECT Soil.IdSoil,Soil.SoilOption, Soil.OrganicC,Soil.OrganicNStock as "OrganicNStock", Soil.SoilRDepth, Soil.SoilTotalDepth, Soil.SoilTextureType, Soil.Wwp, Soil.Wfc, Soil.bd, Soil.albedo, Soil.Ph as "pH", Soil.cf, RunoffTypes.RunoffCoefBSoil as "RunoffCoefBSoil", Soil.Clay as "Clay"
+        FROM RunoffTypes INNER JOIN (Soil INNER JOIN SimUnitList ON Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil)) ON RunoffTypes.RunoffType = Soil.RunoffType
+        where idSim = ?""",
+    "stics.ficini": """SELECT SimUnitList.idIni, Soil.IdSoil, Soil.SoilOption, Soil.Wwp, Soil.Wfc, Soil.bd, InitialConditions.WStockinit, InitialConditions.Ninit
+        FROM InitialConditions INNER JOIN (Soil INNER JOIN SimUnitList ON Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil)) ON InitialConditions.idIni = SimUnitList.idIni
+        where idSim = ?""",
+    "stics.station": """SELECT SimUnitList.idsim, Coordinates.altitude, Coordinates.latitudeDD FROM Coordinates
+        INNER JOIN SimUnitList ON Coordinates.idPoint = SimUnitList.idPoint Where idsim = ?""",
+    "stics.tempopar": """SELECT SimUnitList.idsim, SimulationOptions.StressW_YN, SimulationOptions.StressN_YN, SimulationOptions.StressP_YN, SimulationOptions.StressK_YN
+        FROM SimUnitList INNER JOIN SimulationOptions ON SimUnitList.IdOption = SimulationOptions.IdOptions Where idsim = ?""",
+    "stics.tillage": """SELECT SoilTillPolicy.SoilTillPolicyCode, SoilTillageOperations.STNumber, SoilTillPolicy.NumTillOperations, SoilTillageOperations.DepthResUp, SoilTillageOperations.DepthResLow, SoilTillageOperations.DSTill
+        FROM SoilTillPolicy INNER JOIN SoilTillageOperations ON SoilTillPolicy.SoilTillPolicyCode = SoilTillageOperations.SoilTillPolicyCode
+        where SoilTillPolicy.SoilTillPolicyCode = ?""",
+    "dssat.soil.site": """SELECT DISTINCT Coordinates.*, RunoffTypes.CurveNumber, Soil.albedo
+        From Coordinates INNER Join ((RunoffTypes INNER Join Soil On RunoffTypes.RunoffType = Soil.RunoffType)
+        INNER Join SimUnitList On Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil)) ON Coordinates.idPoint = SimUnitList.idPoint
+        where SimUnitList.IdSim = ?""",
+    "dssat.weather.coordinates": "select * from Coordinates where idPoint = ?",
+    "dssat.weather.days": "select * from RaClimateD where idPoint = ? and year = ? ORDER BY w_date",
+    "apsim.weather.days": "SELECT * FROM RaClimateD WHERE idPoint = ? AND (Year = ? OR Year = ?) ORDER BY w_date",
+    "apsim.soil.profile": "SELECT * FROM RaSoilProfile WHERE idPoint = ? ORDER BY layer_number",
+    "apsim.init": """SELECT SimUnitList.idIni, SimUnitList.idsoil, SimUnitList.idPoint,
+        Soil.IdSoil, Soil.SoilOption, Soil.Wwp, Soil.Wfc, Soil.bd,
+        InitialConditions.WStockinit, InitialConditions.Ninit,
+        InitialConditions.NH4init, InitialConditions.residue_mass,
+        InitialConditions.residue_type, InitialConditions.residue_cnr
+        FROM InitialConditions
+        INNER JOIN (Soil INNER JOIN SimUnitList ON LOWER(Soil.IdSoil) = LOWER(SimUnitList.idsoil))
+        ON InitialConditions.idIni = SimUnitList.idIni
+        WHERE SimUnitList.idSim = ?""",
+    "stics.climat": "SELECT * FROM RaClimateD WHERE idPoint = ? AND Year BETWEEN ? AND ? ORDER BY w_date",
+    "stics.rotation": """SELECT cm.*, lc.SpeciesName
+        FROM CropManagement AS cm
+        LEFT JOIN ListCultivars AS lc ON lc.IdCultivar = cm.Idcultivar
+        WHERE cm.idMangt = ?
+        ORDER BY cm.SeasonOrder, cm.PlantOrder""",
+    "dssat.x.treatment": """Select SimUnitList.idsim, SoilTillPolicy.SoilTillPolicyCode, OrganicFertilizationPolicy.OFertiPolicyCode, CropManagement.IrrigationPolicyCode, CropManagement.InoFertiPolicyCode
+        From OrganicFertilizationPolicy INNER Join (SoilTillPolicy INNER Join (CropManagement INNER Join SimUnitList
+        On CropManagement.idMangt = SimUnitList.idMangt) ON SoilTillPolicy.SoilTillPolicyCode = CropManagement.SoilTillPolicyCode)
+        ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode Where IdSim = ?""",
+    "dssat.x.cultivar": """SELECT CropManagement.idMangt, ListCultivars.CodCultivar, ListCultivars.IdcultivarDssat, ListCultOption.CG From ListCultOption INNER JOIN (ListCultivars INNER Join CropManagement On ListCultivars.IdCultivar = CropManagement.Idcultivar) On ListCultOption.CodePSpecies = ListCultivars.CodePSpecies Where Idmangt = ?""",
+    "dssat.x.initial": """Select SimUnitList.idsim, SimUnitList.StartYear, SimUnitList.StartDay,CropManagement.SowingDate, ListCultOption.PRCROP FROM (ListCultOption INNER JOIN (ListCultivars INNER JOIN CropManagement ON ListCultivars.IdCultivar = CropManagement.Idcultivar) ON ListCultOption.CodePSpecies = ListCultivars.CodePSpecies) INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt Where IdSim = ?""",
+    "dssat.x.initial_layers": """SELECT DISTINCT Soil.Wwp AS 'Soil.Wwp', Soil.Wfc AS 'Soil.Wfc', Soil.bd as 'soil.bd', Soil.*,
+        SoilLayers.Wwp AS 'SoilLayers.Wwp', SoilLayers.Wfc AS 'SoilLayers.Wfc', SoilLayers.*,
+        InitialConditions.* FROM InitialConditions INNER JOIN
+        ((Soil INNER JOIN SimUnitList ON Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil)) LEFT JOIN SoilLayers ON Lower(Soil.IdSoil) = Lower(SoilLayers.idsoil))
+        ON InitialConditions.idIni = SimUnitList.idIni Where IdSim = ? Order by NumLayer""",
+    "dssat.x.planting": """SELECT SimUnitList.idsim,  SimUnitList.StartYear, CropManagement.sdens, CropManagement.sowingdate FROM CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt Where IdSim = ?""",
+    "dssat.x.fertilizer": """SELECT SimUnitList.idsim, SimUnitList.StartYear, CropManagement.Sowingdate, InorganicFOperations.IFNumber,
+        InorganicFOperations.N, InorganicFOperations.P, InorganicFOperations.Dferti FROM (InorganicFertilizationPolicy INNER JOIN
+        (CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt) ON InorganicFertilizationPolicy.InorgFertiPolicyCode
+        = CropManagement.InoFertiPolicyCode) INNER JOIN InorganicFOperations ON InorganicFertilizationPolicy.InorgFertiPolicyCode =
+        InorganicFOperations.InorgFertiPolicyCode Where Idsim = ? Order by InorganicFOperations.IFNumber""",
+    "dssat.x.residues": """SELECT SimUnitList.idsim, SimUnitList.StartYear, CropManagement.sowingdate, ListResidues.idresidueDssat,
+        OrganicFOperations.In_OnManure, OrganicFOperations.Qmanure, OrganicFOperations.Dferti, OrganicFOperations.NFerti,
+        OrganicFOperations.PFerti, SoilTillageOperations.STNumber, SoilTillageOperations.DepthResLow, OrganicFOperations.OFNumber
+        FROM ((SoilTillageOperations INNER JOIN CropManagement ON SoilTillageOperations.SoilTillPolicyCode = CropManagement.SoilTillPolicyCode)
+        INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt) INNER JOIN (ListResidues INNER JOIN OrganicFOperations ON
+        ListResidues.TypeResidues = OrganicFOperations.TypeResidues) ON CropManagement.OFertiPolicyCode = OrganicFOperations.OFertiPolicyCode
+        Where Idsim = ? Order by Ofnumber""",
+    "dssat.x.tillage": """SELECT SimUnitList.idsim, SimUnitList.StartYear, CropManagement.sowingdate, OrganicFOperations.Qmanure, OrganicFOperations.Dferti, OrganicFOperations.NFerti, OrganicFOperations.PFerti, SoilTillageOperations.STNumber, SoilTillageOperations.DStill, SoilTillageOperations.DepthResLow
+        FROM SoilTillageOperations INNER JOIN ((OrganicFertilizationPolicy INNER JOIN (CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt)
+        ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode) INNER JOIN OrganicFOperations ON OrganicFertilizationPolicy.OFertiPolicyCode =
+        OrganicFOperations.OFertiPolicyCode) ON SoilTillageOperations.SoilTillPolicyCode = CropManagement.SoilTillPolicyCode Where Idsim = ?""",
+    "dssat.x.harvest": """SELECT SimUnitList.idsim,  SimUnitList.StartYear, SimUnitList.EndYear,SimUnitList.EndDay, CropManagement.Sowingdate,
+        CropManagement.DHarvest FROM CropManagement JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt WHERE SimUnitList.idsim = ?""",
+    "dssat.x.general": """SELECT SimUnitList.idsim, SimUnitList.StartYear,SimUnitList.StartDay, CropManagement.Sowingdate FROM CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt WHERE Idsim = ?""",
+    "dssat.x.options": """SELECT SimUnitList.idsim, SimulationOptions.StressW_YN, SimulationOptions.StressN_YN, SimulationOptions.StressP_YN, SimulationOptions.StressK_YN
+        FROM SimUnitList INNER JOIN SimulationOptions ON SimUnitList.IdOption = SimulationOptions.IdOptions Where idsim = ?""",
+    "dssat.x.years": """SELECT SimUnitList.idsim, SimUnitList.StartYear, SimUnitList.EndYear FROM SimUnitList  Where Idsim = ?""",
+    "dssat.x.end": """SELECT SimUnitList.idsim, SimUnitList.EndYear,SimUnitList.EndDay FROM SimUnitList  Where Idsim = ?""",
+    "dssat.soil.profile": """Select Soil.Wwp AS 'Soil.Wwp', Soil.Wfc AS 'Soil.Wfc', Soil.bd AS 'Soil.bd', Soil.OrganicC AS 'Soil.OrganicC',
+        Soil.Cf AS 'Soil.Cf', Soil.pH AS 'Soil.pH', Soil.extp AS 'Soil.extp', Soil.totp AS 'Soil.totp',
+        Soil.sand AS 'Soil.sand', Soil.clay AS 'Soil.clay', Soil.silt AS 'Soil.silt',
+        Soil.SoilOption AS 'SoilOption', Soil.OrganicNStock AS 'OrganicNStock',
+        Soil.SoilTotalDepth AS 'SoilTotalDepth',
+        SoilLayers.Wwp AS 'SoilLayers.Wwp', SoilLayers.Wfc AS 'SoilLayers.Wfc',
+        SoilLayers.bd AS 'SoilLayers.bd', SoilLayers.OrganicC AS 'SoilLayers.OrganicC',
+        SoilLayers.Clay AS 'SoilLayers.Clay', SoilLayers.Silt AS 'SoilLayers.Silt',
+        SoilLayers.Cf AS 'SoilLayers.Cf', SoilLayers.pH AS 'SoilLayers.pH',
+        SoilLayers.Ldown AS 'Ldown', SoilLayers.TotalN AS 'TotalN' FROM SOIL LEFT JOIN SoilLayers On Lower(Soil.IdSoil) = Lower(SoilLayers.idsoil) where Lower(Soil.IdSoil) = ? Order by SoilLayers.NumLayer""",
+    "dssat.successive.flags": """Select SimUnitList.idsim, SoilTillPolicy.NumTillOperations,
+        OrganicFertilizationPolicy.NumOrganicFerti,
+        CropManagement.IrrigationPolicyCode, CropManagement.InoFertiPolicyCode
+        From OrganicFertilizationPolicy
+        Inner Join (SoilTillPolicy Inner Join (CropManagement Inner Join SimUnitList
+        On CropManagement.idMangt = SimUnitList.idMangt)
+        On SoilTillPolicy.SoilTillPolicyCode = CropManagement.SoilTillPolicyCode)
+        On OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode
+        Where IdSim = ?""",
+    "apsim.management": """SELECT
+        SimUnitList.idsim,
+        SimUnitList.idMangt,
+        ListCultivars.idcultivarStics as cultivar,
+        ListCultivars.SpeciesName as crop,
+        CropManagement.sdens as population,
+        CropManagement.sowingdate,
+        CropManagement.SoilTillPolicyCode,
+        CropManagement.OFertiPolicyCode,
+        CropManagement.InoFertiPolicyCode
+        FROM ListCultivars
+        INNER JOIN (CropManagement
+        INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt)
+        ON ListCultivars.IdCultivar = CropManagement.Idcultivar
+        WHERE idSim = ?""",
+    "apsim.management.organic": """SELECT
+        CropManagement.sowingdate,
+        OrganicFOperations.Dferti,
+        OrganicFOperations.OFNumber,
+        OrganicFOperations.CNferti,
+        OrganicFOperations.NFerti,
+        OrganicFOperations.Qmanure,
+        OrganicFOperations.TypeResidues
+        FROM OrganicFertilizationPolicy
+        INNER JOIN (CropManagement
+        INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt)
+        ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode
+        INNER JOIN OrganicFOperations ON OrganicFertilizationPolicy.OFertiPolicyCode = OrganicFOperations.OFertiPolicyCode
+        WHERE idSim = ?
+        ORDER BY OFNumber""",
+    "apsim.management.inorganic": """SELECT
+        SimUnitList.idsim,
+        InorganicFOperations.N,
+        CropManagement.sowingdate,
+        InorganicFOperations.Dferti,
+        InorganicFertilizationPolicy.NumInorganicFerti
+        FROM (InorganicFertilizationPolicy
+        INNER JOIN InorganicFOperations ON InorganicFertilizationPolicy.InorgFertiPolicyCode = InorganicFOperations.InorgFertiPolicyCode)
+        INNER JOIN (CropManagement
+        INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt)
+        ON InorganicFertilizationPolicy.InorgFertiPolicyCode = CropManagement.InoFertiPolicyCode
+        WHERE idSim = ?""",
+    "apsim.management.tillage": """SELECT
+        SoilTillPolicy.SoilTillPolicyCode,
+        SoilTillageOperations.STNumber,
+        SoilTillPolicy.NumTillOperations,
+        SoilTillageOperations.DepthResUp,
+        SoilTillageOperations.DepthResLow,
+        SoilTillageOperations.DSTill
+        FROM SoilTillPolicy
+        INNER JOIN SoilTillageOperations ON SoilTillPolicy.SoilTillPolicyCode = SoilTillageOperations.SoilTillPolicyCode
+        WHERE SoilTillPolicy.SoilTillPolicyCode = ?""",
+}
+_seasonal(
+    STATEMENTS, "stics.max_plant_order",
+    """SELECT Max(CropManagement.PlantOrder) AS MaxDePlantOrder FROM CropManagement
+    INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt WHERE SimUnitList.idsim = ?""",
+)
+_seasonal(
+    STATEMENTS, "stics.newtravail",
+    """SELECT SimUnitList.idsim, SimUnitList.idPoint as idPoint, SimUnitList.StartYear,SimUnitList.StartDay,SimUnitList.EndDay,SimUnitList.Endyear, SimUnitList.idsoil, SimUnitList.idMangt, SimUnitList.idIni, Coordinates.LatitudeDD, CropManagement.sowingdate,
+    ListCultivars.SpeciesName FROM InitialConditions INNER JOIN ((ListCultivars INNER JOIN CropManagement ON ListCultivars.IdCultivar = CropManagement.Idcultivar) INNER JOIN (Coordinates INNER
+    Join SimUnitList ON Coordinates.idPoint = SimUnitList.idPoint) ON CropManagement.idMangt = SimUnitList.idMangt) ON InitialConditions.idIni = SimUnitList.idIni Where idsim = ?""",
+    " ORDER BY CropManagement.PlantOrder",
+)
+_seasonal(
+    STATEMENTS, "stics.fictec",
+    """SELECT SimUnitList.idsim, SimUnitList.idMangt, Soil.SoilTotalDepth, ListCultivars.idcultivarStics, CropManagement.sdens,
+    CropManagement.sowingdate, CropManagement.SoilTillPolicyCode FROM Soil INNER JOIN (ListCultivars INNER JOIN (CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt)
+    ON ListCultivars.IdCultivar = CropManagement.Idcultivar) ON Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil) where idSim = ?""",
+    " ORDER BY CropManagement.PlantOrder",
+)
+_seasonal(
+    STATEMENTS, "stics.organic",
+    """SELECT SimUnitList.idsim, CropManagement.sowingdate, OrganicFOperations.Dferti, OrganicFOperations.OFNumber, OrganicFOperations.CNferti,
+    OrganicFOperations.NFerti, OrganicFOperations.Qmanure, OrganicFOperations.TypeResidues, ListResidues.idresidueStics, CropManagement.SoilTillPolicyCode
+    FROM ListResidues INNER JOIN ((OrganicFertilizationPolicy INNER JOIN (CropManagement INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt)
+    ON OrganicFertilizationPolicy.OFertiPolicyCode = CropManagement.OFertiPolicyCode) INNER JOIN OrganicFOperations ON OrganicFertilizationPolicy.OFertiPolicyCode
+    = OrganicFOperations.OFertiPolicyCode) ON ListResidues.TypeResidues = OrganicFOperations.TypeResidues where idSim = ? and CropManagement.PlantOrder = ?""",
+    " Order by OFNumber",
+)
+_seasonal(
+    STATEMENTS, "stics.mineral",
+    """Select SimUnitList.idsim, InorganicFOperations.N, CropManagement.sowingdate, InorganicFOperations.Dferti, InorganicFertilizationPolicy.NumInorganicFerti
+    FROM(InorganicFertilizationPolicy INNER JOIN InorganicFOperations On InorganicFertilizationPolicy.InorgFertiPolicyCode = InorganicFOperations.InorgFertiPolicyCode)
+    INNER JOIN (CropManagement INNER JOIN SimUnitList On CropManagement.idMangt = SimUnitList.idMangt) On InorganicFertilizationPolicy.InorgFertiPolicyCode =
+    CropManagement.InoFertiPolicyCode where idSim = ? and CropManagement.PlantOrder = ?""",
+)
+_seasonal(
+    STATEMENTS, "stics.ficplt",
+    """SELECT SimUnitList.idsim as idsim, ListCultOption.FicPlt as fic
+    FROM (ListCultOption INNER JOIN (ListCultivars INNER JOIN CropManagement ON ListCultivars.IdCultivar = CropManagement.Idcultivar) ON ListCultOption.CodePSpecies = ListCultivars.CodePSpecies) INNER JOIN SimUnitList ON CropManagement.idMangt = SimUnitList.idMangt where idSim = ?""",
+    " ORDER BY CropManagement.PlantOrder",
+)
+
+# Set-based statements of the converter modules (``{keys}`` stands for the list of an IN clause),
+# registered by the modules that run them: <model>.<module>.<name> -> SQL.
+BATCH_STATEMENTS = {}
+
+
+def register_batch_statements(prefix, statements):
+    """Register the set-based ``statements`` of a converter module under ``<prefix>.<name>``."""
+    for name, sql in statements.items():
+        BATCH_STATEMENTS[f"{prefix}.{name}"] = sql
+
+
+class QueryConnection(sqlite3.Connection):
+    """sqlite3 connection keeping one cursor for the named statements of its worker."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._query_cursor = None
+        # Database file an in-memory copy was made from (see copy_to_memory).
+        self.source = None
+
+    def query_cursor(self):
+        if self._query_cursor is None:
+            self._query_cursor = self.cursor()
+            self._query_cursor.row_factory = sqlite3.Row
+        return self._query_cursor
+
+
+def connect(database, **kwargs):
+    """Open ``database`` as a QueryConnection with a statement cache sized for the converters."""
+    kwargs.setdefault("cached_statements", CACHED_STATEMENTS)
+    return sqlite3.connect(database, factory=QueryConnection, **kwargs)
+
+
+def connect_readonly(database, immutable=False, **kwargs):
+    """
+    Open ``database`` read-only (``mode=ro`` URI) with the READ_ONLY_PRAGMAS.
+
+    ``immutable=True`` also tells SQLite the file cannot change, which skips locking and
+    change detection. Only use it when no process writes the database during the run and
+    its WAL has been checkpointed: an immutable connection does not read the ``-wal`` file.
+    """
+    uri = Path(os.path.abspath(database)).as_uri() + "?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    connection = connect(uri, uri=True, **kwargs)
+    for pragma, value in READ_ONLY_PRAGMAS:
+        connection.execute(f"PRAGMA {pragma} = {value}")
+    return connection
+
+
+def copy_to_memory(database, **kwargs):
+    """Copy a small database (the ModelsDictionary) into a private ``:memory:`` connection."""
+    source = connect_readonly(database)
+    try:
+        memory = connect(":memory:", **kwargs)
+        source.backup(memory)
+    finally:
+        source.close()
+    memory.source = os.path.abspath(database)
+    return memory
+
+
+def _cursor(connection):
+    if isinstance(connection, QueryConnection):
+        return connection.query_cursor()
+    cursor = connection.cursor()
+    cursor.row_factory = sqlite3.Row
+    return cursor
+
+
+def statement(name):
+    """SQL text of a named statement, for callers that need a DataFrame (``pd.read_sql_query``)."""
+    return STATEMENTS[name]
+
+def fetch_all(connection, name, *params):
+    """Rows of the named statement, as ``sqlite3.Row`` records."""
+    return _cursor(connection).execute(STATEMENTS[name], params).fetchall()
+
+def fetch_one(connection, name, *params):
+    """First row of the named statement, or None."""
+    return _cursor(connection).execute(STATEMENTS[name], params).fetchone()
+
+
+def fetch_season(connection, name, season_order, *params):
+    """``fetch_all`` of ``name``, or of its ``.season`` variant when ``season_order`` is given."""
+    if season_order is None:
+        return fetch_all(connection, name, *params)
+    return fetch_all(connection, name + ".season", *params, int(season_order))
@@ -0,0 +1,207 @@
+"""
+Summary results of a run, streamed to their sinks as the chunks complete.
+
+The drivers used to concatenate every chunk's summary rows, write ``<uuid>_<model>.csv`` and,
+for ``dt`` 0, read the whole CSV back to fill SummaryOutput: the result set was held in
+memory and then parsed again, with dtypes re-inferred from text. ``ResultSinks`` takes each
+chunk's frame once and hands it to every configured sink:
+
+- "csv": the result CSV, appended chunk by chunk;
+- "sqlite": SummaryOutput rows of the model, through the model's ``summarize`` function
+  (always on with ``dt`` 0, as before). The rows are staged in an output shard and replace
+  the model's rows in one transaction at ``close``: a run that fails keeps the previous ones;
+- "parquet": a Parquet file next to the CSV (needs pyarrow).
+
+The run's columns are the union of the chunks' columns, in order of appearance, as
+``pd.concat`` gave them: a chunk without a column leaves it empty, a chunk bringing a new
+one extends the CSV (its earlier rows are rewritten with the column empty). The Parquet
+schema cannot grow: a new column there is an error. Integer columns stay integers when a
+later chunk brings missing values.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from modfilegen import outputsink
+
+SINKS = ("csv", "sqlite", "parquet")
+
+
+def configured_sinks(setting, dt=1):
+    """Sink names from the ``resultSinks`` setting ("csv,parquet"...); ``dt`` 0 adds "sqlite"."""
+    names = [name.strip().lower() for name in str(setting or "csv").split(",") if name.strip()]
+    for name in names:
+        if name not in SINKS:
+            raise ValueError(f"Unknown result sink {name!r}; expected some of {SINKS}")
+    if int(dt) == 0 and "sqlite" not in names:
+        names.append("sqlite")
+    return names
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self._header = True
+
+    def extend(self, columns):
+        """Rewrite the rows written so far with the run's new ``columns``."""
+        if self._header:
+            return
+        staging = f"{self.path}.{os.getpid()}.tmp"
+        mode = "w"
+        # as text: the rows are copied as they were written
+        for rows in pd.read_csv(self.path, dtype=str, keep_default_na=False, chunksize=100_000):
+            rows.reindex(columns=columns, fill_value="").to_csv(staging, mode=mode, header=mode == "w", index=False)
+            mode = "a"
+        os.replace(staging, self.path)
+
+    def write(self, frame):
+        frame.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        pass
+
+    def discard(self):
+        pass
+
+
+class SqliteSink:
+    """SummaryOutput rows of ``model``, staged in ``staging`` and swapped in at ``close``."""
+
+    def __init__(self, database, model, summarize, staging=None):
+        self.database = database
+        self.model = model
+        self.summarize = summarize
+        if staging:
+            os.makedirs(staging, exist_ok=True)
+        self.base = tempfile.mkdtemp(prefix="summary_output_", dir=staging)
+        outputsink.prepare(self.base)
+        self._shard = outputsink.OutputShard(os.path.join(outputsink.shard_directory(self.base), "summary.db"))
+
+    def extend(self, columns):
+        pass  # the shard adds the columns it is given
+
+    def write(self, frame):
+        self._shard.append("SummaryOutput", self.summarize(frame))
+
+    def close(self):
+        """Replace the model's rows by the staged ones, in one transaction."""
+        if self._shard is None:
+            return
+        self._shard.close()
+        self._shard = None
+        try:
+            outputsink.merge(self.base, self.database, "SummaryOutput", delete_where=f"Model = '{self.model}'")
+        finally:
+            shutil.rmtree(self.base, ignore_errors=True)
+
+    def discard(self):
+        """Drop the staged rows; SummaryOutput keeps the previous run's."""
+        if self._shard is None:
+            return
+        self._shard.close()
+        self._shard = None
+        shutil.rmtree(self.base, ignore_errors=True)
+
+
+class ParquetSink:
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("The parquet result sink needs pyarrow (pip install pyarrow)") from e
+        self._pyarrow = pyarrow
+        self._parquet = pyarrow.parquet
+        self.path = path
+        self._writer = None
+
+    def extend(self, columns):
+        if self._writer is not None:
+            raise ValueError(f"Result columns {columns} change after the first chunk: "
+                             f"the schema of {self.path} cannot grow")
+
+    def write(self, frame):
+        if self._writer is None:
+            schema = self._pyarrow.Schema.from_pandas(frame, preserve_index=False)
+            self._writer = self._parquet.ParquetWriter(self.path, schema)
+        table = self._pyarrow.Table.from_pandas(frame, schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def discard(self):
+        self.close()
+
+
+class ResultSinks:
+    """Every sink of a run's summary results; ``write`` one chunk at a time, then ``close``.
+
+    ``summarize`` turns result rows into SummaryOutput rows for the "sqlite" sink, which
+    stages them in ``staging`` (a temporary directory by default). A run that fails calls
+    ``discard`` instead of ``close``.
+    """
+
+    def __init__(self, result_path, names=("csv",), database=None, model=None, summarize=None, staging=None):
+        self.result_path = result_path
+        self.rows = 0
+        self._columns = None
+        self._dtypes = None
+        self.sinks = []
+        for name in names:
+            if name == "csv":
+                self.sinks.append(CsvSink(result_path))
+            elif name == "sqlite":
+                self.sinks.append(SqliteSink(database, model, summarize, staging))
+            elif name == "parquet":
+                self.sinks.append(ParquetSink(os.path.splitext(result_path)[0] + ".parquet"))
+
+    def _conform(self, frame):
+        if self._columns is None:
+            self._columns = list(frame.columns)
+            self._dtypes = frame.dtypes.to_dict()
+            return frame
+        new = [column for column in frame.columns if column not in self._columns]
+        if new:
+            self._columns.extend(new)
+            self._dtypes.update(frame[new].dtypes.to_dict())
+            for sink in self.sinks:
+                sink.extend(self._columns)
+        frame = frame.reindex(columns=self._columns)
+        for column, dtype in self._dtypes.items():
+            kind = frame[column].dtype.kind
+            if dtype.kind in "iu" and kind == "f":
+                try:
+                    frame[column] = frame[column].astype("Int64")  # missing values, same integers
+                except (TypeError, ValueError):
+                    pass  # values that are not integers: keep them
+            elif dtype.kind == "f" and kind in "iu":
+                frame[column] = frame[column].astype(dtype)
+        return frame
+
+    def write(self, frame):
+        """Send one chunk's rows to every sink; returns how many rows it held."""
+        if frame is None or frame.empty:
+            return 0
+        frame = self._conform(frame)
+        for sink in self.sinks:
+            sink.write(frame)
+        self.rows += len(frame)
+        return len(frame)
+
+    def close(self):
+        """Complete every sink: the run succeeded."""
+        for sink in self.sinks:
+            sink.close()
+
+    def discard(self):
+        """Leave the database as it was before the run; does nothing once closed."""
+        for sink in self.sinks:
+            sink.discard()
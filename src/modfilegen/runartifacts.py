@@ -0,0 +1,58 @@
+"""
+Static run artifacts published once for every worker of a run.
+
+The drivers used to put the STICS templates (tempoparv6.sti, tempopar.sti, rap/var/prof.mod)
+into the argument tuple of every task, so joblib pickled them again for each chunk.
+``RunArtifacts.publish`` pickles them once to a file of the run's temporary directory; the
+handle itself pickles as that path only. A worker loads the file on first use and keeps the
+artifacts for every later task of the run.
+"""
+
+import os
+import pickle
+import uuid
+
+# Artifacts loaded in this process, by file path.
+_loaded = {}
+
+
+class RunArtifacts:
+    """Handle to a published set of artifacts, read like a dict."""
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def publish(cls, directory, **artifacts):
+        """Write ``artifacts`` to a new file of ``directory`` and return its handle."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"run_artifacts_{uuid.uuid4().hex}.pkl")
+        with open(path, "wb") as stream:
+            pickle.dump(artifacts, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        _loaded[path] = artifacts
+        return cls(path)
+
+    def load(self):
+        """The artifacts, read from the file on first use in this process."""
+        artifacts = _loaded.get(self.path)
+        if artifacts is None:
+            with open(self.path, "rb") as stream:
+                artifacts = pickle.load(stream)
+            _loaded.clear()  # a worker reused by a later run drops the previous run's artifacts
+            _loaded[self.path] = artifacts
+        return artifacts
+
+    def __getitem__(self, name):
+        return self.load()[name]
+
+    def remove(self):
+        """Delete the file once the run is over."""
+        _loaded.pop(self.path, None)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.remove()
@@ -0,0 +1,144 @@
+"""
+RAM-backed scratch space for the USM workspaces of a run.
+
+Model input and output files live on the run's ``tempDir`` on disk. With the ``scratch``
+setting at "tmpfs", ``prepare`` creates a scratch directory in /dev/shm for the run: the
+workspace slots of the STICS and DSSAT workers, the file store they link from and the
+Celsius chunk databases then live in RAM.
+
+``scratchBudget`` (MiB; 0 takes half of the free tmpfs space) bounds what the run holds
+there. Workers charge the bytes they keep in a ledger shared through the scratch directory;
+a worker whose next USM would exceed the budget spills it to disk instead. Workers reserve a
+little headroom so they do not lock the ledger for every USM. The ledger keeps the peak usage
+(reservations included), which ``Scratch.finish`` reports at the end of the run.
+
+Workers find the scratch directory from ``tempDir`` (``open_scratch``), as they do for the
+climate store; without one they use the disk as before.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import socket
+from contextlib import contextmanager
+
+TMPFS_ROOT = "/dev/shm"
+LEDGER_FILE = "ledger.json"
+SCRATCH_MODES = ("disk", "tmpfs")
+MIB = 1024 * 1024
+
+
+def scratch_root(base):
+    """tmpfs directory of the run whose working directory is ``base``."""
+    digest = hashlib.sha1(os.path.abspath(base).encode()).hexdigest()[:12]
+    return os.path.join(TMPFS_ROOT, f"modfilegen_{digest}")
+
+
+def worker_key():
+    """Name of this worker process in the ledger."""
+    return f"{socket.gethostname()}_{os.getpid()}"
+
+
+def used_bytes(directory):
+    """Bytes held by the files of ``directory`` that are not links into a file store."""
+    total = 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += used_bytes(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_nlink == 1:
+                        total += stat.st_size
+    except FileNotFoundError:
+        pass
+    return total
+
+
+class Scratch:
+    """tmpfs scratch directory of a run and the ledger of the bytes its workers hold there."""
+
+    def __init__(self, root):
+        self.root = root
+        self._ledger_path = os.path.join(root, LEDGER_FILE)
+
+    @contextmanager
+    def _ledger(self):
+        with open(self._ledger_path, "r+") as stream:
+            fcntl.flock(stream, fcntl.LOCK_EX)  # released when the file is closed
+            ledger = json.load(stream)
+            yield ledger
+            stream.seek(0)
+            stream.truncate()
+            json.dump(ledger, stream)
+
+    def charge(self, worker, nbytes, force=False):
+        """Record that ``worker`` holds ``nbytes``; False (nothing recorded) when over budget.
+
+        ``force`` records the bytes anyway: they are already written.
+        """
+        with self._ledger() as ledger:
+            workers = ledger["workers"]
+            others = sum(held for name, held in workers.items() if name != worker)
+            if not force and ledger["budget"] > 0 and others + nbytes > ledger["budget"]:
+                ledger["spills"] += 1
+                return False
+            workers[worker] = int(nbytes)
+            ledger["peak"] = max(ledger["peak"], others + int(nbytes))
+            return True
+
+    def usage(self):
+        """{"in_use", "peak", "budget", "spills"} of the run, in bytes."""
+        with self._ledger() as ledger:
+            return {
+                "in_use": sum(ledger["workers"].values()),
+                "peak": ledger["peak"],
+                "budget": ledger["budget"],
+                "spills": ledger["spills"],
+            }
+
+    def finish(self):
+        """Report the peak usage and remove the scratch directory."""
+        try:
+            usage = self.usage()
+            print(f"Scratch {self.root}: peak {usage['peak'] / MIB:.1f} MiB of "
+                  f"{usage['budget'] / MIB:.1f} MiB budget, {usage['spills']} USMs spilled to disk", flush=True)
+        except Exception as e:
+            print(f"Scratch {self.root}: no usage report ({e})")
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def prepare(base, mode="disk", budget=0):
+    """Create the run's tmpfs scratch directory; None when the run works on disk.
+
+    ``budget`` is in MiB; 0 takes half of the free tmpfs space.
+    """
+    if mode not in SCRATCH_MODES:
+        raise ValueError(f"Unknown scratch mode {mode!r}; expected one of {SCRATCH_MODES}")
+    root = scratch_root(base)
+    shutil.rmtree(root, ignore_errors=True)  # left by an interrupted run
+    if mode == "disk":
+        return None
+    if not os.path.isdir(TMPFS_ROOT):
+        print(f"No {TMPFS_ROOT} on this node, USM workspaces stay on disk")
+        return None
+    budget = int(float(budget or 0) * MIB)
+    if budget <= 0:
+        stats = os.statvfs(TMPFS_ROOT)
+        budget = stats.f_bavail * stats.f_frsize // 2
+    os.makedirs(root)
+    with open(os.path.join(root, LEDGER_FILE), "w") as stream:
+        json.dump({"budget": budget, "peak": 0, "spills": 0, "workers": {}}, stream)
+    print(f"Scratch {root}: {budget / MIB:.1f} MiB budget", flush=True)
+    return Scratch(root)
+
+
+def open_scratch(base):
+    """The tmpfs scratch of the run working in ``base``, or None when it works on disk."""
+    root = scratch_root(base)
+    if not os.path.exists(os.path.join(root, LEDGER_FILE)):
+        return None
+    return Scratch(root)
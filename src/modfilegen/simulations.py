@@ -0,0 +1,191 @@
+"""
+Streaming SimUnitList source for the model drivers.
+
+``fetch_data_from_sqlite`` used to read the whole SimUnitList through pandas and turn it into
+one dict per simulation before ``chunk_data`` sliced that list for the workers. A
+``SimulationSource`` instead pages through SimUnitList in key (rowid) order and yields
+``SimulationRecord`` objects: read-only mappings sharing one column index, so a record costs a
+tuple of values rather than a dict. ``chunks`` cuts the same balanced slices as ``chunk_data``
+lazily, so the scheduler pulls the next chunk only when a worker is ready for it. ``partitions``
+and ``subset`` go one step further and hand the workers narrowed sources - a rowid range or a
+list of rowids - that they read themselves, so a task pickles a few numbers, not the rows.
+``select`` lets a driver plan its chunks from a few columns computed by SQLite (keys, weights)
+without reading the rows at all.
+
+Simulations can be restricted to a range of simulation numbers (SimUnitList rowids, as set by
+``storeNumMinSimu`` / ``storeNumMaxSimu``; 0 leaves a bound open) and to an SQL predicate on
+SimUnitList (``simulationFilter``).
+"""
+
+import json
+import re
+import sqlite3
+from collections.abc import Mapping
+
+SIMULATION_QUERY = "SELECT SimUnitList.* FROM SimUnitList"
+FETCH_SIZE = 10_000
+
+
+class SimulationRecord(Mapping):
+    """One SimUnitList row, read like the dicts of ``df.to_dict(orient='records')``."""
+
+    __slots__ = ("_index", "_values", "key")
+
+    def __init__(self, index, values, key=None):
+        self._index = index
+        self._values = values
+        self.key = key  # SimUnitList rowid
+
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        return f"SimulationRecord({dict(self)!r})"
+
+    def __getstate__(self):
+        return self._index, self._values, self.key
+
+    def __setstate__(self, state):
+        self._index, self._values, self.key = state
+
+
+class SimulationSource:
+    """Filtered SimUnitList simulations, streamed in key order.
+
+    ``query``, ``where`` and the SQL given to ``filtered`` and ``select`` are pasted into the
+    statements as they are: pass only literals from the code or the run's settings, and bind
+    values through ``params``.
+    """
+
+    def __init__(self, database, query=SIMULATION_QUERY, first=0, last=0, where="", params=(), keys=None):
+        self.database = database
+        self.query = query
+        self.first = int(first or 0)
+        self.last = int(last or 0)
+        self.where = where or ""
+        self.params = tuple(params)
+        self.keys = None if keys is None else [int(key) for key in keys]
+
+    @classmethod
+    def from_globals(cls, database, query=SIMULATION_QUERY):
+        """Source restricted by the storeNumMinSimu, storeNumMaxSimu and simulationFilter settings."""
+        from modfilegen import GlobalVariables
+
+        return cls(
+            database,
+            query,
+            first=GlobalVariables.get("storeNumMinSimu", 0),
+            last=GlobalVariables.get("storeNumMaxSimu", 0),
+            where=GlobalVariables.get("simulationFilter", ""),
+        )
+
+    def _filter(self):
+        clauses, params = [], []
+        if self.first > 0:
+            clauses.append("SimUnitList.rowid >= ?")
+            params.append(self.first)
+        if self.last > 0:
+            clauses.append("SimUnitList.rowid <= ?")
+            params.append(self.last)
+        if self.where:
+            clauses.append(f"({self.where})")
+            params.extend(self.params)
+        if self.keys is not None:
+            clauses.append("SimUnitList.rowid IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(self.keys))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self):
+        """Number of simulations the source yields."""
+        where, params = self._filter()
+        connection = sqlite3.connect(self.database)
+        try:
+            return connection.execute(f"SELECT count(*) FROM SimUnitList{where}", params).fetchone()[0]
+        finally:
+            connection.close()
+
+    def _pages(self, sizes, query=None):
+        """Read one page per size, resuming after the last key so no cursor stays open in between."""
+        where, params = self._filter()
+        query = re.sub(r"^\s*SELECT\s", "SELECT SimUnitList.rowid, ", query or self.query,
+                       count=1, flags=re.IGNORECASE)
+        index, after = None, None
+        for size in sizes:
+            page_where, page_params = where, list(params)
+            if after is not None:
+                page_where += (" AND " if where else " WHERE ") + "SimUnitList.rowid > ?"
+                page_params.append(after)
+            connection = sqlite3.connect(self.database)
+            try:
+                cursor = connection.execute(
+                    f"{query}{page_where} ORDER BY SimUnitList.rowid LIMIT ?", [*page_params, size])
+                if index is None:
+                    index = {description[0]: position
+                             for position, description in enumerate(cursor.description[1:])}
+                rows = cursor.fetchall()
+            finally:
+                connection.close()
+            if not rows:
+                return
+            after = rows[-1][0]
+            yield [SimulationRecord(index, row[1:], row[0]) for row in rows]
+
+    def __iter__(self):
+        pages = self._pages(iter(lambda: FETCH_SIZE, None))
+        if self.keys is None:
+            for page in pages:
+                yield from page
+            return
+        records = {record.key: record for page in pages for record in page}
+        for key in self.keys:  # keep the order the keys were given in
+            if key in records:
+                yield records[key]
+
+    def chunks(self, number_of_chunks, total=None):
+        """Lazily yield the non-empty slices ``chunk_data`` would cut into ``number_of_chunks`` parts."""
+        total = self.count() if total is None else total
+        k, m = divmod(total, number_of_chunks)
+        sizes = (k + (1 if position < m else 0) for position in range(min(total, number_of_chunks)))
+        return self._pages(sizes)
+
+    def _narrowed(self, **changes):
+        settings = dict(database=self.database, query=self.query, first=self.first, last=self.last,
+                        where=self.where, params=self.params, keys=self.keys)
+        settings.update(changes)
+        return SimulationSource(**settings)
+
+    def partitions(self, number_of_chunks, total=None):
+        """Like ``chunks``, but yield each chunk as a source bounded to its rowid range."""
+        total = self.count() if total is None else total
+        k, m = divmod(total, number_of_chunks)
+        sizes = (k + (1 if position < m else 0) for position in range(min(total, number_of_chunks)))
+        for page in self._pages(sizes, "SELECT NULL FROM SimUnitList"):
+            yield self._narrowed(first=page[0].key, last=page[-1].key)
+
+    def subset(self, keys):
+        """Source of the given SimUnitList rowids, yielded in that order."""
+        return self._narrowed(keys=keys)
+
+    def filtered(self, where, params=()):
+        """Source further restricted by an SQL predicate on SimUnitList (trusted SQL, values in ``params``)."""
+        if self.where:
+            where = f"({self.where}) AND ({where})"
+        return self._narrowed(where=where, params=(*self.params, *params))
+
+    def select(self, columns, order_by="SimUnitList.rowid"):
+        """Yield the ``columns`` of the simulations as plain tuples, for set-based planning in SQL.
+
+        ``columns`` and ``order_by`` are SQL expressions from the code, never user input.
+        """
+        where, params = self._filter()
+        connection = sqlite3.connect(self.database)
+        try:
+            yield from connection.execute(f"SELECT {columns} FROM SimUnitList{where} ORDER BY {order_by}", params)
+        finally:
+            connection.close()
@@ -0,0 +1,156 @@
+"""
+Reusable USM directories for the model drivers.
+
+The drivers used to create ``tempDir/<idsim>`` for every simulation and have the run script
+delete it in the background when ``dt`` is 1: one mkdir, one recursive delete and one extra
+process per simulation. ``Workspaces`` gives each worker a fixed set of slot directories
+instead. Acquiring a slot for the next simulation removes what the previous one left behind
+(model outputs, files only some simulations write) but keeps the links of the file store
+among the input files every simulation rewrites: placing the next content replaces them, or
+leaves them alone when they already are the right link. Plain copies are removed with the
+rest, so a write that fails leaves the file missing rather than the previous simulation's.
+
+With ``dt`` 0 (debug runs) every simulation keeps its own ``tempDir/<idsim>`` directory, as before.
+With a tmpfs scratch (see ``modfilegen.scratch``) the slots live in RAM while the run's budget
+allows; ``Workspaces.store`` then gives the file store on the same file system as the slot.
+"""
+
+import os
+import shutil
+import socket
+
+from modfilegen import filestore
+from modfilegen.scratch import MIB, used_bytes, worker_key
+
+WORKSPACE_DIRECTORY = "workspaces"
+LEDGER_SYNC_BYTES = 8 * MIB  # headroom a worker reserves so the ledger is not locked for every USM
+
+
+def workspace_directory(base):
+    """Directory holding the slot directories of a run whose working directory is ``base``."""
+    return os.path.join(base, WORKSPACE_DIRECTORY)
+
+
+class Workspaces:
+    """USM directories of one worker process.
+
+    ``refreshed`` names the files every simulation writes again; their file store links
+    survive the cleaning of a slot. ``keep`` gives every simulation its own directory, kept after the run.
+    With a tmpfs ``scratch``, slots live there while the run's budget allows it.
+    """
+
+    def __init__(self, base, keep=False, slots=1, refreshed=(), scratch=None):
+        self.base = base
+        self.keep = keep
+        self.slots = max(int(slots), 1)
+        self.refreshed = frozenset(refreshed)
+        self.scratch = None if keep else scratch  # kept USMs are for inspection: on disk
+        self.root = base  # where the last acquired directory lives
+        self._next = 0
+        self._estimate = 0  # bytes of the largest USM seen in scratch
+        self._held = [0] * self.slots  # scratch bytes charged for each slot, None when on disk
+        self._charged = 0  # bytes this worker holds in the shared ledger
+
+    def _slot(self, root, position):
+        # host and pid: workers of several nodes may share one tempDir
+        return os.path.join(workspace_directory(root),
+                            f"{socket.gethostname()}_{os.getpid()}_{position}")
+
+    def _clean(self, directory):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+            return
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if (entry.name in self.refreshed and entry.is_file(follow_symlinks=False)
+                        and entry.stat(follow_symlinks=False).st_nlink > 1):
+                    continue  # a store link: FileStore.place replaces or keeps it
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.unlink(entry.path)
+
+    def _charge(self, position):
+        """Root of the next slot: the scratch while its budget holds one more USM, else the disk.
+
+        Only the reused slot is measured; the other slots stay charged with the estimate
+        they were acquired with. The usage is kept here: the shared ledger is only updated when
+        it outgrows what this worker holds there, reserving ``LEDGER_SYNC_BYTES`` more, or falls
+        that far below it.
+        """
+        slot = self._slot(self.scratch.root, position)
+        in_scratch = self._held[position] is not None
+        if in_scratch:
+            self._estimate = max(self._estimate, used_bytes(slot))  # left by the previous USM
+        self._held[position] = 0
+        kept = sum(held for held in self._held if held)
+        kept += filestore.open_store(filestore.store_directory(self.scratch.root)).written
+        needed = kept + self._estimate
+        if needed > self._charged:
+            if not self.scratch.charge(worker_key(), needed + LEDGER_SYNC_BYTES):
+                self._held[position] = None
+                if in_scratch:
+                    self._clean(slot)  # the USM goes to disk: free what the previous one left in RAM
+                self._sync(kept)
+                return self.base
+            self._charged = needed + LEDGER_SYNC_BYTES
+        elif self._charged - needed > LEDGER_SYNC_BYTES:
+            self._sync(needed)
+        self._held[position] = self._estimate
+        return self.scratch.root
+
+    def _sync(self, nbytes):
+        self.scratch.charge(worker_key(), nbytes, force=True)
+        self._charged = nbytes
+
+    def acquire(self, name):
+        """Directory for the simulation ``name``, empty but for the refreshed input files."""
+        if self.keep:
+            directory = os.path.join(self.base, name)
+            os.makedirs(directory, exist_ok=True)
+            return directory
+        position = self._next
+        self._next = (self._next + 1) % self.slots
+        self.root = self.base
+        if self.scratch is not None:
+            try:
+                self.root = self._charge(position)
+            except (OSError, ValueError) as e:
+                print(f"Scratch {self.scratch.root} unavailable, USM on disk: {e}")
+        directory = self._slot(self.root, position)
+        self._clean(directory)
+        return directory
+
+    def store(self):
+        """File store on the file system of the last acquired directory, so its files can be linked."""
+        return filestore.open_store(filestore.store_directory(self.root))
+
+    def release(self):
+        """Remove the slot directories of this worker."""
+        if self.keep:
+            return
+        roots = [self.base] if self.scratch is None else [self.base, self.scratch.root]
+        for root in roots:
+            for position in range(self.slots):
+                shutil.rmtree(self._slot(root, position), ignore_errors=True)
+        if self.scratch is not None:
+            self._sync(0)
+            self._held = [0] * self.slots
+
+
+# Workspaces of this process, by (base, keep, refreshed, scratch directory).
+_workspaces = {}
+
+
+def worker_workspaces(base, keep=False, refreshed=(), scratch=None):
+    """The workspaces of this worker; a worker keeps its slots across the chunks of a run."""
+    key = (base, bool(keep), frozenset(refreshed), None if scratch is None else scratch.root)
+    workspaces = _workspaces.get(key)
+    if workspaces is None:
+        workspaces = _workspaces[key] = Workspaces(base, keep=keep, refreshed=refreshed, scratch=scratch)
+    return workspaces
+
+
+def remove_workspaces(base):
+    """Remove every slot directory of the run once its workers are done."""
+    shutil.rmtree(workspace_directory(base), ignore_errors=True)
@@ -0,0 +1,29 @@
+"""Fixtures shared by the unit tests: the small STICS v11 databases of ``tests.sticsv11_data``."""
+
+import os
+
+import pytest
+
+from tests.sticsv11_data import create_master_input, create_models_dictionary
+
+
+@pytest.fixture
+def master_input(tmp_path):
+    """Connection to a MasterInput built in ``tmp_path``; see ``master_input_path``."""
+    connection = create_master_input(os.path.join(tmp_path, "MasterInput.db"))
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def master_input_path(master_input, tmp_path):
+    """Path of the ``master_input`` database."""
+    return os.path.join(tmp_path, "MasterInput.db")
+
+
+@pytest.fixture
+def models_dictionary(tmp_path):
+    """Connection to a ModelsDictionary built in ``tmp_path``."""
+    connection = create_models_dictionary(os.path.join(tmp_path, "ModelsDictionary.db"))
+    yield connection
+    connection.close()
@@ -0,0 +1,188 @@
+"""Small MasterInput and ModelsDictionary databases for STICS v11 unit tests."""
+
+import sqlite3
+
+
+MASTER_INPUT_SCHEMA = """
+CREATE TABLE SimUnitList (idsim TEXT, StartYear INTEGER, StartDay INTEGER, EndYear INTEGER,
+    EndDay INTEGER, idPoint TEXT, idMangt TEXT, idsoil TEXT, idIni TEXT, idOption INTEGER);
+CREATE TABLE Coordinates (altitude INTEGER, latitudeDD REAL, longitudeDD REAL, idPoint TEXT);
+CREATE TABLE Soil (IdSoil TEXT, SoilOption TEXT, OrganicC REAL, OrganicNStock REAL,
+    SoilRDepth REAL, SoilTotalDepth REAL, SoilTextureType TEXT, Wwp REAL, Wfc REAL, bd REAL,
+    albedo REAL, pH REAL, cf REAL, clay REAL, RunoffType INTEGER);
+CREATE TABLE SoilLayers (idsoil TEXT, NumLayer INTEGER, Lup INTEGER, Ldown INTEGER, bd REAL,
+    Wwp REAL, Wfc REAL);
+CREATE TABLE RunoffTypes (RunoffType TEXT, RunoffCoefBSoil REAL);
+CREATE TABLE InitialConditions (idIni TEXT, WStockinit REAL, Ninit REAL);
+CREATE TABLE SimulationOptions (IdOptions INTEGER, StressW_YN INTEGER, StressN_YN INTEGER,
+    StressP_YN INTEGER, StressK_YN INTEGER);
+CREATE TABLE CropManagement (idMangt TEXT, Idcultivar TEXT, sdens REAL, OFertiPolicyCode TEXT,
+    InoFertiPolicyCode TEXT, SoilTillPolicyCode TEXT, sowingdate INTEGER, DHarvest INTEGER,
+    PlantOrder INTEGER);
+CREATE TABLE ListCultivars (CodePSpecies TEXT, SpeciesName TEXT, IdCultivar TEXT,
+    idcultivarStics TEXT);
+CREATE TABLE ListCultOption (CodePSpecies TEXT, FicPlt TEXT);
+CREATE TABLE SoilTillPolicy (SoilTillPolicyCode TEXT, NumTillOperations INTEGER);
+CREATE TABLE SoilTillageOperations (SoilTillPolicyCode TEXT, STNumber INTEGER, DSTill INTEGER,
+    DepthResUp INTEGER, DepthResLow INTEGER);
+CREATE TABLE OrganicFertilizationPolicy (OFertiPolicyCode TEXT, NumOrganicFerti INTEGER);
+CREATE TABLE OrganicFOperations (OFertiPolicyCode TEXT, OFNumber INTEGER, Dferti INTEGER,
+    CNferti REAL, NFerti REAL, Qmanure REAL, TypeResidues TEXT);
+CREATE TABLE ListResidues (TypeResidues TEXT, idresidueStics TEXT);
+CREATE TABLE InorganicFertilizationPolicy (InorgFertiPolicyCode TEXT, NumInorganicFerti INTEGER);
+CREATE TABLE InorganicFOperations (InorgFertiPolicyCode TEXT, Dferti INTEGER, N REAL);
+CREATE TABLE RaClimateD (idPoint TEXT, w_date TEXT, year INTEGER, DOY INTEGER, Nmonth INTEGER,
+    NdayM INTEGER, srad REAL, tmax REAL, tmin REAL, rain REAL, wind REAL, Etppm REAL);
+"""
+
+SIMULATIONS = [
+    ("1.0_2.0_2000_M1_1", 2000, 100, 2000, 300, "1.0_2.0", "M1", "SoilA", "1", 1),
+    ("1.0_2.0_2001_M2_1", 2001, 100, 2002, 50, "1.0_2.0", "M2", "soilb", "1", 2),
+]
+
+DEFAULTS = {
+    "paramsol": [
+        "calc", "capiljour", "cfes", "concseuil", "ecartdrain", "epd", "finert", "humcapil",
+        "infil", "ksol", "mulchbat", "penterui", "pluiebat", "profdenit", "profdrain",
+        "profhum", "profimper", "q0", "typecailloux", "vpotdenit", "z0solnu", "zesx",
+        "codecailloux", "codemacropor", "codefente", "codrainage", "coderemontcap",
+        "codenitrif", "codedenit",
+    ],
+    "ficini": [
+        "NH4initf", "QNperenne0", "QNperenne0_2", "QNplante0", "QNplante0_2", "QNplantenp0",
+        "QNplantenp0_2", "code_acti_reserve", "code_acti_reserve_2", "densinitial",
+        "densinitial_2", "lai0", "lai0_2", "magrain0", "maperenne0", "maperenne0_2", "masec0",
+        "masec0_2", "masecnp0", "masecnp0_2", "restemp0", "restemp0_2", "stade0", "stade0_2",
+        "zrac0", "zrac0_2",
+    ],
+    "station": [
+        "DKmax", "E", "Kmin", "NH3ref", "Pns", "SWrf", "Tmf", "aangst", "aclim", "aks",
+        "albveg", "alphapt", "altinversion", "altistation", "bangst", "bks", "cielclair",
+        "codadret", "codaltitude", "codecaltemp", "codeclichange", "codeetp", "codemodlsnow",
+        "codernet", "coefdevil", "coefrnet", "concrr", "corecTrosee", "cvent", "gradtn",
+        "gradtninv", "gradtx", "ombragetx", "patm", "phiv0", "prof", "ra", "tmaxseuil",
+        "tminseuil", "trmax", "tsmax", "zr",
+    ],
+    "new_travail": ["codesimul", "codesuite", "codoptim", "flai1", "flai2", "nbplantes"],
+    "climat": ["co2", "vapeurp"],
+}
+DEFAULTS["fictec1"] = [
+    "CNgrainrec", "Qtot_N", "albedomulchplastique", "biorognem", "cadencerec", "codabri",
+    "codcaleffeuil", "codcalrogne", "codceuille", "codeDST", "codeDSTnbcouche", "codeDSTtass",
+    "code_auto_profres", "code_strip", "codeaumin", "codecalirrig", "codeclaircie",
+    "codedate_irrigauto", "codedateappH2O", "codedateappN", "codedecirecolte", "codedecisemis",
+    "codefauche", "codeffeuil", "codefracappN", "codemodfauche", "codepaillage",
+    "codepalissage", "coderecolteassoc", "codestade", "codetaille", "codetradtec",
+    "codhauteff", "codlocferti", "codlocirrig", "codrecolte", "codrognage", "concirr",
+    "couvermulchplastique", "dachisel", "dalabour", "darecolte", "dasemis",
+    "datedeb_irrigauto", "datefin_irrigauto", "doseirrigmin", "dosimx", "eau_mini_decisemis",
+    "effeuil", "effirr", "engrais", "h2ograinmax", "h2ograinmin", "hautcoupedefaut",
+    "hautmaxtec", "hautrogne", "huilerec", "humirac_decisemis", "iamf", "idrp", "iflo",
+    "ilan", "ilax", "ilev", "imat", "interrang", "irec", "isen", "juleffeuil", "julouvre2",
+    "julouvre3", "julrogne", "jultaille", "laidebeff", "laieffeuil", "largrogne", "largtec",
+    "locferti", "locirrig", "margerogne", "nbceuille", "nbj_pr_apres_semis",
+    "nbjmaxapresrecolte", "nbjmaxapressemis", "nbjseuiltempref", "nrow", "orientrang",
+    "profhumrecolteuse", "profhumsemoir", "profsem", "ratiol", "resk", "ressuite", "resz",
+    "rugochisel", "rugolabour", "stadecoupedf", "stage_end_irrigauto",
+    "stage_start_irrigauto", "sucrerec", "supply of organic residus.eaures", "surfouvre1",
+    "surfouvre2", "surfouvre3", "transplastic",
+]
+DEFAULTS["fictec2"] = DEFAULTS["fictec1"]
+
+
+def create_master_input(path):
+    """Two simulations: a simple sole crop and a layered mixed crop."""
+    connection = sqlite3.connect(path)
+    connection.executescript(MASTER_INPUT_SCHEMA)
+    connection.executemany("INSERT INTO SimUnitList VALUES (?,?,?,?,?,?,?,?,?,?)", SIMULATIONS)
+    connection.execute("INSERT INTO Coordinates VALUES (120, 2.0, 1.0, '1.0_2.0')")
+    connection.executemany(
+        "INSERT INTO Soil VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+        [
+            ("soila", "simple", 1.2, 0.1, 120.0, 150.0, "loam", 0.12, 0.3, 1.4, 0.2, 6.5, 0.0, 25.0, 1),
+            ("SoilB", "layered", 1.0, 0.08, 90.0, 100.0, "clay", 0.15, 0.35, 1.3, 0.2, 7.0, 5.0, 40.0, 2),
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO SoilLayers VALUES (?,?,?,?,?,?,?)",
+        [
+            ("SOILB", 2, 30, 100, 1.4, 0.16, 0.36),
+            ("soilB", 1, 0, 30, 1.2, 0.14, 0.34),
+        ],
+    )
+    connection.executemany("INSERT INTO RunoffTypes VALUES (?,?)", [("1", 0.5), ("2", 0.7)])
+    connection.execute("INSERT INTO InitialConditions VALUES ('1', 50.0, 30.0)")
+    connection.executemany(
+        "INSERT INTO SimulationOptions VALUES (?,?,?,?,?)", [(1, 1, 1, 0, 0), (2, 0, 1, 0, 0)]
+    )
+    connection.executemany(
+        "INSERT INTO CropManagement VALUES (?,?,?,?,?,?,?,?,?)",
+        [
+            ("M1", "maize1", 7.5, "OF1", "IF1", "T1", 120, 150, 1),
+            ("M2", "maize1", 5.0, "OF1", "IF1", "T1", 130, 140, 1),
+            ("M2", "bean1", 10.0, "OF2", "IF2", "T1", 135, 100, 2),
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO ListCultivars VALUES (?,?,?,?)",
+        [("MZ", "maize", "maize1", "plt_maize"), ("BN", "bean", "bean1", "plt_bean")],
+    )
+    connection.executemany(
+        "INSERT INTO ListCultOption VALUES (?,?)", [("MZ", "maize.txt"), ("BN", "bean.txt")]
+    )
+    connection.execute("INSERT INTO SoilTillPolicy VALUES ('T1', 2)")
+    connection.executemany(
+        "INSERT INTO SoilTillageOperations VALUES (?,?,?,?,?)",
+        [("T1", 1, -10, 0, 20), ("T1", 2, -2, 0, 10)],
+    )
+    connection.executemany(
+        "INSERT INTO OrganicFertilizationPolicy VALUES (?,?)", [("OF1", 2), ("OF2", 1)]
+    )
+    connection.executemany(
+        "INSERT INTO OrganicFOperations VALUES (?,?,?,?,?,?,?)",
+        [
+            ("OF1", 2, 10, 12.0, 2.0, 3000.0, "manure"),
+            ("OF1", 1, -5, 15.0, 1.5, 2000.0, "manure"),
+            ("OF2", 1, 0, 20.0, 1.0, 1000.0, "straw"),
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO ListResidues VALUES (?,?)", [("manure", "2"), ("straw", "1")]
+    )
+    connection.executemany(
+        "INSERT INTO InorganicFertilizationPolicy VALUES (?,?)", [("IF1", 2), ("IF2", 0)]
+    )
+    connection.executemany(
+        "INSERT INTO InorganicFOperations VALUES (?,?,?)",
+        [("IF1", 20, 40.0), ("IF1", 45, 30.5)],
+    )
+    climate = []
+    for year in (2000, 2001, 2002):
+        for doy in range(1, 366 if year % 4 else 367):
+            climate.append((
+                "1.0_2.0", f"{year}-{doy:03d}", year, doy, 1 + (doy - 1) // 31,
+                1 + (doy - 1) % 31, 10.0 + doy % 7 * 1.25, 25.0 + doy % 5 * 0.35,
+                doy % 9 - 2.04, (doy * 3) % 11 * 0.5, 2.0 + doy % 3 * 0.05,
+                None if doy % 13 == 0 else 3.0 + doy % 4 * 0.25,
+            ))
+    connection.executemany(
+        "INSERT INTO RaClimateD VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", climate
+    )
+    connection.commit()
+    return connection
+
+
+def create_models_dictionary(path):
+    """ModelsDictionary with a default of "1" for every STICS v11 parameter used above."""
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE Variables (model TEXT, [Table] TEXT, Champ TEXT, "
+        "Default_Value_Datamill TEXT, defaultValueOtherSource TEXT)"
+    )
+    rows = []
+    for table, champs in DEFAULTS.items():
+        for champ in champs:
+            rows.append(("sticsv11", table, champ, "1", None))
+    connection.executemany("INSERT INTO Variables VALUES (?,?,?,?,?)", rows)
+    connection.commit()
+    return connection
@@ -5,11 +5,14 @@ from datetime import timedelta
 from pathlib import Path
 
 from modfilegen.Converter.SticsV11Converter.sticsconverter import (
+    SIMULATION_QUERY,
     build_balanced_simulation_chunks,
     fetch_data_from_sqlite,
     get_simulation_weights,
     partition_simulations,
+    simulation_weights,
 )
+from modfilegen.simulations import SimulationSource
 from modfilegen.Converter.SticsV11Converter.sticssuccessiveconverter import (
     adapt_usm_calendar,
     build_season_row,
@@ -32,19 +35,19 @@ def load_example():
 
 class TestSticsSuccessiveConverter(unittest.TestCase):
     def test_all_simulations_are_balanced_by_number_of_seasons(self):
-        database = DATA_DIR / "MasterInput.db"
-        simulations = fetch_data_from_sqlite(database)
-        weights = get_simulation_weights(database, simulations)
+        source = SimulationSource(DATA_DIR / "MasterInput.db", SIMULATION_QUERY)
+        weights = list(simulation_weights(source))
+        seasons = {key: count for key, _, count in weights}
 
-        chunks = build_balanced_simulation_chunks(simulations, weights, 2)
-        loads = [sum(weights[str(row["idsim"])] for row in chunk) for chunk in chunks]
+        chunks = build_balanced_simulation_chunks(weights, 2, source.count())
 
-        self.assertEqual(len(simulations), 4)
-        self.assertEqual(loads, [3, 3])
+        self.assertEqual(len(weights), 4)
+        self.assertEqual([chunk["load"] for chunk in chunks], [3, 3])
         self.assertEqual(
-            [[weights[str(row["idsim"])] for row in chunk] for chunk in chunks],
+            [[seasons[key] for key in chunk["keys"]] for chunk in chunks],
             [[3], [1, 1, 1]],
         )
+        self.assertEqual([chunk["successive"] for chunk in chunks], [{IDSIM}, set()])
 
     def test_climate_files_follow_season_start_and_end_years(self):
         template = """:datedebut
@@ -99,6 +102,7 @@ unset
         self.assertEqual(len(standard), 3)
         self.assertTrue(all(row["idMangt"] == "Mgt1M0_135" for row in standard))
         self.assertEqual([row["idsim"] for row in successive], [IDSIM])
+        self.assertEqual(get_simulation_weights(database, successive), {IDSIM: 3})
 
     def test_three_year_rotation_is_expanded_from_one_simulation(self):
         connection, simulation = load_example()
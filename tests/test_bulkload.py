@@ -0,0 +1,81 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modfilegen import bulkload
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = os.path.join(tmp_path, "MasterInput.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute('CREATE TABLE SummaryOutput ("Model" TEXT, "Idsim" TEXT, "Yield" REAL)')
+        connection.execute('CREATE INDEX idx_summary ON SummaryOutput ("Idsim")')
+        connection.executemany("INSERT INTO SummaryOutput VALUES (?, ?, ?)",
+                               [("Stics", "old", 1.0), ("Dssat", "d1", 2.0)])
+    return path
+
+
+def query(database, sql):
+    connection = sqlite3.connect(database)
+    try:
+        return connection.execute(sql).fetchall()
+    finally:
+        connection.close()
+
+
+def indexes(loader):
+    # what the load's own transaction sees
+    return loader._connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+
+
+def frame():
+    return pd.DataFrame({"Model": ["Stics", "Stics"], "Idsim": ["s1", "s2"], "Yield": [9.5, np.nan],
+                         "SeasonOrder": np.array([1, 2], dtype=np.int64)})
+
+
+def test_replaced_rows_typed_values_and_new_columns(database):
+    with bulkload.BulkLoader(database, "SummaryOutput", delete_where="Model = 'Stics'", rows=2) as loader:
+        assert loader.append(frame()) == 2
+    assert loader.rows == 2
+    assert query(database, "SELECT Idsim, Yield, SeasonOrder, typeof(SeasonOrder) FROM SummaryOutput "
+                           "ORDER BY rowid") == [
+        ("d1", 2.0, None, "null"), ("s1", 9.5, 1, "integer"), ("s2", None, 2, "integer")]
+    assert ("SeasonOrder", "INTEGER") in bulkload.table_columns(sqlite3.connect(database), "SummaryOutput")
+
+
+def test_large_loads_rebuild_the_indexes(database, monkeypatch):
+    monkeypatch.setattr(bulkload, "INDEX_REBUILD_ROWS", 1)
+    with bulkload.BulkLoader(database, "SummaryOutput", rows=2,
+                             indexes=[("idx_summary_model", ("Model", "Idsim"))]) as loader:
+        assert indexes(loader) == []
+        loader.append(frame())
+    assert sorted(query(database, "SELECT name FROM sqlite_master WHERE type = 'index'")) == [
+        ("idx_summary",), ("idx_summary_model",)]
+
+
+def test_small_loads_keep_the_indexes(database):
+    with bulkload.BulkLoader(database, "SummaryOutput", rows=2) as loader:
+        assert indexes(loader) == [("idx_summary",)]
+        loader.append(frame())
+
+
+def test_failed_load_leaves_the_table_as_it_was(database, monkeypatch):
+    monkeypatch.setattr(bulkload, "INDEX_REBUILD_ROWS", 1)
+    with pytest.raises(RuntimeError):
+        with bulkload.BulkLoader(database, "SummaryOutput", delete_where="Model = 'Stics'") as loader:
+            loader.append(frame())
+            raise RuntimeError("worker failed")
+    assert query(database, "SELECT Idsim FROM SummaryOutput ORDER BY rowid") == [("old",), ("d1",)]
+    assert query(database, "SELECT name FROM sqlite_master WHERE type = 'index'") == [("idx_summary",)]
+
+
+def test_replace_creates_the_table_from_the_frame(database):
+    with bulkload.BulkLoader(database, "SummaryOutput", replace=True) as loader:
+        loader.append(frame())
+    assert bulkload.table_columns(sqlite3.connect(database), "SummaryOutput") == [
+        ("Model", "TEXT"), ("Idsim", "TEXT"), ("Yield", "REAL"), ("SeasonOrder", "INTEGER")]
+    assert query(database, "SELECT count(*) FROM SummaryOutput") == [(2,)]
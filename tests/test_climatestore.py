@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modfilegen import climatestore
+from modfilegen.Converter.SticsV11Converter.sticsclimatconverter import SticsClimatConverter
+from tests.sticsv11_data import SIMULATIONS
+
+
+@pytest.fixture
+def climate_input(master_input):
+    # A second point with integer/real mixes, NULL years of data and text values.
+    master_input.execute("ALTER TABLE RaClimateD ADD COLUMN rhum TEXT")
+    master_input.executemany(
+        "INSERT INTO RaClimateD VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+        [("0.5_1.5", f"2001-{doy:03d}", 2001, doy, 1, doy, None if doy < 3 else 12.0,
+          25.0, 10, 1.5 if doy % 2 else 2, None, None, None if doy == 1 else "61")
+         for doy in range(1, 6)],
+    )
+    master_input.commit()
+    return master_input
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return climatestore.store_directory(str(tmp_path))
+
+
+def sql_frame(connection, idPoint, first_year, last_year):
+    return pd.read_sql_query(
+        "SELECT * FROM RaClimateD WHERE idPoint = ? AND Year BETWEEN ? AND ? ORDER BY w_date",
+        connection, params=(idPoint, first_year, last_year),
+    )
+
+
+@pytest.mark.parametrize("idPoint, first_year, last_year", [
+    ("1.0_2.0", 2000, 2001), ("1.0_2.0", 2002, 2002), ("1.0_2.0", 1999, 2000),
+    ("0.5_1.5", 2001, 2001), ("0.5_1.5", 2000, 2000), ("missing", 2000, 2001),
+])
+def test_frames_match_sql(idPoint, first_year, last_year, climate_input, master_input_path, store_path):
+    store = climatestore.build(master_input_path, store_path, verbose=False)
+    pd.testing.assert_frame_equal(
+        store.frame(idPoint, first_year, last_year),
+        sql_frame(climate_input, idPoint, first_year, last_year),
+    )
+
+
+def test_columns_are_memory_mapped(climate_input, master_input_path, store_path):
+    store = climatestore.build(master_input_path, store_path, verbose=False)
+    start, stop = store.rows("1.0_2.0", 2001, 2001)
+    assert stop - start == 365
+    assert isinstance(store._array("tmax"), np.memmap)
+
+
+def test_current_store_is_reused(climate_input, master_input_path, store_path):
+    climatestore.build(master_input_path, store_path, verbose=False)
+    index = os.path.join(store_path, climatestore.INDEX_FILE)
+    built = os.stat(index).st_mtime_ns
+    climatestore.build(master_input_path, store_path, verbose=False)
+    assert os.stat(index).st_mtime_ns == built
+
+    climate_input.execute("DELETE FROM RaClimateD WHERE year = 2002")
+    climate_input.commit()
+    store = climatestore.build(master_input_path, store_path, verbose=False)
+    assert store.rows("1.0_2.0", 2002, 2002) == (0, 0)
+
+
+def test_values_updated_in_place_rebuild_the_store(climate_input, master_input_path, store_path):
+    climatestore.build(master_input_path, store_path, verbose=False)
+    # same schema, row count and last rowid: only the file stamps change
+    climate_input.execute("UPDATE RaClimateD SET tmax = tmax + 100 WHERE idPoint = '0.5_1.5'")
+    climate_input.commit()
+    store = climatestore.build(master_input_path, store_path, verbose=False)
+    pd.testing.assert_frame_equal(store.frame("0.5_1.5", 2001, 2001),
+                                  sql_frame(climate_input, "0.5_1.5", 2001, 2001))
+
+
+def test_climat_file_is_unchanged(climate_input, master_input_path, models_dictionary, store_path, tmp_path):
+    store = climatestore.build(master_input_path, store_path, verbose=False)
+    idsim = SIMULATIONS[0][0]
+    sim_path = os.path.join(tmp_path, idsim, "1.0_2.0", "2000")
+    usmdir = os.path.join(tmp_path, idsim)
+    contents = [
+        SticsClimatConverter().export(sim_path, models_dictionary, climate_input, usmdir,
+                                      start_year=2000, end_year=2001, climate=climate)
+        for climate in (None, store)
+    ]
+    assert contents[0]
+    assert contents[0] == contents[1]
+
+
+def test_open_store_without_build(store_path):
+    assert climatestore.open_store(store_path) is None
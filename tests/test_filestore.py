@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from modfilegen import filestore
+from modfilegen.Converter.SticsV11Converter.sticsconverter import write_file
+from modfilegen.converter import Converter
+
+
+@pytest.fixture
+def store(tmp_path):
+    return filestore.FileStore(filestore.store_directory(str(tmp_path)))
+
+
+@pytest.fixture
+def usms(tmp_path):
+    directories = [os.path.join(tmp_path, name) for name in ("usm1", "usm2")]
+    for usm in directories:
+        os.makedirs(usm)
+    return directories
+
+
+def read(path):
+    with open(path) as stream:
+        return stream.read()
+
+
+def test_same_content_is_linked(store, usms):
+    paths = [store.place(usm, "climat.txt", "a b c\n") for usm in usms]
+    assert [read(path) for path in paths] == ["a b c\n"] * 2
+    assert os.path.samefile(*paths)
+    other = store.place(usms[0], "param.sol", "soil\n")
+    assert not os.path.samefile(paths[0], other)
+
+
+def test_placing_replaces_the_previous_file(store, usms):
+    first = store.place(usms[0], "climat.txt", "first\n")
+    store.place(usms[1], "climat.txt", "first\n")
+    store.place(usms[0], "climat.txt", "second\n")
+    assert read(first) == "second\n"
+    assert read(os.path.join(usms[1], "climat.txt")) == "first\n"
+
+
+def test_plain_writers_do_not_rewrite_stored_files(store, usms, tmp_path):
+    for usm in usms:
+        store.place(usm, "station.txt", "shared\n")
+    write_file(usms[0], "station.txt", "stics\n")
+    Converter().write_file(usms[1], "station.txt", "converter\n")
+    assert read(os.path.join(usms[0], "station.txt")) == "stics\n"
+    assert read(os.path.join(usms[1], "station.txt")) == "converter\n"
+    third = store.place(str(tmp_path), "station.txt", "shared\n")
+    assert read(third) == "shared\n"
+
+
+def test_failed_placement_removes_the_previous_link(store, usms):
+    path = store.place(usms[0], "climat.txt", "first\n")
+
+    def full(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    store._blob = full
+    with pytest.raises(OSError):
+        store.place(usms[0], "climat.txt", "second\n")
+    assert not os.path.exists(path)
+
+
+def test_copies_when_links_are_unavailable(store, usms):
+    store._linking = False
+    paths = [store.place(usm, "var.mod", "var\n") for usm in usms]
+    assert [read(path) for path in paths] == ["var\n"] * 2
+    assert not os.path.samefile(*paths)
+
+
+def test_write_file_with_store(store, usms):
+    write_file(usms[0], "tempoparv6.sti", "v6\n", store)
+    write_file(usms[1], "tempoparv6.sti", "v6\n", store)
+    assert os.path.samefile(*(os.path.join(usm, "tempoparv6.sti") for usm in usms))
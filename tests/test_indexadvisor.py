@@ -0,0 +1,78 @@
+from modfilegen.Converter.SticsV11Converter.sticssnapshot import SNAPSHOT_QUERIES
+from modfilegen.indexadvisor import (
+    advise_indexes, converter_queries, full_scans, index_lookups, query_plan, referenced_columns,
+)
+from modfilegen.queries import STATEMENTS
+
+CONVERTER_QUERIES = converter_queries()  # with the STICS snapshot statements registered above
+
+
+def test_full_scans():
+    plan = [
+        "SCAN SoilTillageOperations",
+        "SCAN cm USING INDEX idx_cropmngt_plant",
+        "SEARCH SimUnitList USING INDEX idx_idsim (idsim=?)",
+        "SCAN Soil AS s",
+    ]
+    assert full_scans(plan) == ["SoilTillageOperations", "Soil"]
+
+
+def test_registry_is_built_from_the_converter_statements():
+    for name, sql in STATEMENTS.items():
+        model, _, short = name.partition(".")
+        if model in CONVERTER_QUERIES:
+            assert CONVERTER_QUERIES[model][short] == sql
+        else:
+            assert all(queries[name] == sql for queries in CONVERTER_QUERIES.values())
+    for name, sql in SNAPSHOT_QUERIES.items():
+        assert CONVERTER_QUERIES["stics"]["snapshot." + name] == sql.format(keys="?")
+
+
+def test_scanned_tables_get_indexed(master_input):
+    query = CONVERTER_QUERIES["stics"]["tillage"]
+    assert full_scans(query_plan(master_input, query))
+
+    report = advise_indexes(master_input, models=["stics"], verbose=False)
+
+    assert "idx_tillop_policy" in report["created"]
+    assert "idx_cropmngt_plant" in report["created"]  # no SeasonOrder column here
+    assert full_scans(query_plan(master_input, query)) == []
+    assert "stics.tillage" not in report["scans"]
+    assert "stics.max_plant_order.season" in report["skipped"]
+
+
+def test_referenced_columns(master_input):
+    query = CONVERTER_QUERIES["stics"]["tillage"]
+    plan = query_plan(master_input, query)
+    assert referenced_columns(master_input, query, plan, "SoilTillageOperations") == [
+        "DSTill", "DepthResLow", "DepthResUp", "STNumber", "SoilTillPolicyCode"]
+    layers = CONVERTER_QUERIES["stics"]["soil.layers"]
+    assert referenced_columns(master_input, layers, query_plan(master_input, layers), "SoilLayers") is None
+
+
+def test_searched_indexes_become_covering(master_input):
+    master_input.execute("ALTER TABLE SoilTillageOperations ADD COLUMN Comment TEXT")
+    query = CONVERTER_QUERIES["stics"]["tillage"]
+
+    report = advise_indexes(master_input, models=["stics"], verbose=False)
+
+    assert "idx_tillop_policy_cover" in report["created"]
+    plan = query_plan(master_input, query)
+    assert "SoilTillageOperations" in " ".join(detail for detail in plan if "COVERING INDEX" in detail)
+    assert "SoilTillageOperations" not in [table for table, _, _ in index_lookups(plan)]
+    # A covering index holding every column would be a second copy of the table.
+    assert "idx_till_policy_cover" not in report["created"]
+
+
+def test_covering_indexes_are_not_extended_again(master_input):
+    master_input.execute("ALTER TABLE SoilTillageOperations ADD COLUMN Comment TEXT")
+    master_input.execute("CREATE INDEX idx_tillop_policy_cover ON SoilTillageOperations (SoilTillPolicyCode)")
+    report = advise_indexes(master_input, models=["stics"], verbose=False)
+    assert not [name for name in report["created"] if name.endswith("_cover_cover")]
+
+
+def test_is_idempotent(master_input):
+    first = advise_indexes(master_input, verbose=False)
+    second = advise_indexes(master_input, verbose=False)
+    assert first["scans"] == second["scans"]
+    assert second["created"] == []
@@ -0,0 +1,34 @@
+from modfilegen.masterinput import normalize_keys
+
+
+def query_plan(connection, query, params=()):
+    return " | ".join(row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + query, params))
+
+
+def test_case_insensitive_soil_lookups_use_indexes(master_input):
+    created = normalize_keys(master_input)
+
+    assert "idx_soillayers_idsoill" in created
+    assert "idx_idsoiltl" not in created  # no SoilTypes table in this MasterInput
+    plan = query_plan(
+        master_input,
+        "SELECT Soil.IdSoil FROM Soil INNER JOIN SimUnitList "
+        "ON Lower(Soil.IdSoil) = Lower(SimUnitList.idsoil) WHERE Lower(SimUnitList.idsoil) = ?",
+        ("soilb",),
+    )
+    assert "idx_idsoill" in plan
+    plan = query_plan(
+        master_input,
+        "Select * From SoilLayers where Lower(idsoil) = ? Order by NumLayer",
+        ("soilb",),
+    )
+    assert "idx_soillayers_idsoill" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_layers_match_whatever_the_case(master_input):
+    normalize_keys(master_input)
+    layers = master_input.execute(
+        "Select NumLayer From SoilLayers where Lower(idsoil) = ? Order by NumLayer", ("soilb",)
+    ).fetchall()
+    assert layers == [(1,), (2,)]
@@ -0,0 +1,74 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from modfilegen.modeldefaults import ModelDefaults, model_defaults
+
+
+@pytest.fixture
+def dictionary_path(tmp_path):
+    return os.path.join(tmp_path, "ModelsDictionary.db")
+
+
+@pytest.fixture
+def dictionary(dictionary_path):
+    connection = sqlite3.connect(dictionary_path)
+    connection.execute(
+        "CREATE TABLE Variables (model TEXT, [Table] TEXT, Champ TEXT, "
+        "Default_Value_Datamill TEXT, defaultValueOtherSource TEXT)"
+    )
+    connection.executemany("INSERT INTO Variables VALUES (?, ?, ?, ?, ?)", [
+        ("dssat", "dssat_soil_site", "scom", "BN", None),
+        ("dssat", "dssat_soil_data", "slhb", "-99", "7.5"),
+        ("dssat", "dssat_soil_data", "scom", "XX", None),
+        ("dssat", "dssat_x_general", "PEOPLE", None, None),
+        ("Dssat", "dssat_soil_site", "scom", "other model", None),
+    ])
+    connection.commit()
+    yield connection
+    connection.close()
+
+
+def test_values_match_the_per_table_queries(dictionary):
+    defaults = model_defaults(dictionary)
+    query = ("Select Champ, IFNULL([defaultValueOtherSource], [Default_Value_Datamill]) As dv "
+             "From Variables Where ((model = 'dssat') And ([Table] like 'dssat_soil_%'));")
+    DT = pd.read_sql_query(query, dictionary)
+
+    merged = defaults.tables_like("dssat", "dssat_soil_")
+    for champ in ("scom", "slhb"):
+        assert merged[champ] == DT[DT["Champ"] == champ]["dv"].values[0]
+    assert defaults.value("dssat", "dssat_soil_data", "slhb") == "7.5"
+    assert defaults.number("dssat", "dssat_soil_data", "slhb") == 7.5
+    assert defaults.value("dssat", "dssat_x_general", "PEOPLE") is None
+    assert defaults.table("Dssat", "dssat_soil_site")["scom"] == "other model"
+    assert dict(defaults.tables("dssat", "dssat_soil_data", "dssat_soil_site")) == {"scom": "BN", "slhb": "7.5"}
+    assert len(defaults.table("dssat", "missing")) == 0
+
+
+def test_registry_is_frozen(dictionary):
+    table = model_defaults(dictionary).table("dssat", "dssat_soil_site")
+    with pytest.raises(TypeError):
+        table["scom"] = "changed"
+
+
+def test_registry_is_loaded_once_per_database(dictionary, dictionary_path):
+    first = model_defaults(dictionary)
+    other = sqlite3.connect(dictionary_path)
+    try:
+        assert model_defaults(other) is first
+        other.execute("UPDATE Variables SET Default_Value_Datamill = 'CL' WHERE Champ = 'scom'")
+        other.commit()
+        os.utime(dictionary_path, ns=(0, 0))
+        reloaded = model_defaults(other)
+    finally:
+        other.close()
+    assert reloaded is not first
+    assert reloaded.value("dssat", "dssat_soil_site", "scom") == "CL"
+
+
+def test_loads_the_stics_dictionary_fixture(models_dictionary):
+    defaults = ModelDefaults.from_connection(models_dictionary)
+    assert defaults.number("sticsv11", "climat", "co2") == 1.0
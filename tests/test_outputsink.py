@@ -0,0 +1,77 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modfilegen import outputsink
+
+
+@pytest.fixture
+def base(tmp_path):
+    return str(tmp_path)
+
+
+@pytest.fixture
+def database(base):
+    return os.path.join(base, "MasterInput.db")
+
+
+def daily(idsim, days, **columns):
+    frame = pd.DataFrame({"Model": "Stics", "Idsim": idsim, "SeasonOrder": 1, "jul": days})
+    for name, values in columns.items():
+        frame[name] = values
+    return frame
+
+
+def test_shards_are_merged_into_the_table(base, database):
+    outputsink.prepare(base)
+    first = outputsink.OutputShard(os.path.join(outputsink.shard_directory(base), "a.db"))
+    second = outputsink.OutputShard(os.path.join(outputsink.shard_directory(base), "b.db"))
+    first.append("Daily", daily("sim1", [1, 2], lai=[0.5, np.nan]))
+    first.append("Daily", daily("sim2", [1], lai=[0.7], swc=[12.0]))  # a column more
+    second.append("Daily", daily("sim3", [1, 2, 3], lai=[0.1, 0.2, 0.3]))
+    first.close()
+    second.commit()
+
+    with sqlite3.connect(database) as connection:
+        connection.execute('CREATE TABLE Daily ("Model" TEXT, "Idsim" TEXT, "jul" INTEGER)')
+        connection.executemany("INSERT INTO Daily VALUES (?, ?, ?)", [("Stics", "old", 1), ("Dssat", "d1", 1)])
+    rows = outputsink.merge(base, database, "Daily", delete_where="Model = 'Stics'",
+                            index=("idx_Daily_idsim_season_jul", ("Idsim", "SeasonOrder", "jul")))
+    assert rows == 6
+
+    connection = sqlite3.connect(database)
+    try:
+        merged = pd.read_sql_query("SELECT * FROM Daily ORDER BY Model, Idsim, jul", connection)
+        indexes = [row[1] for row in connection.execute("PRAGMA index_list(Daily)")]
+    finally:
+        connection.close()
+    assert list(merged.columns) == ["Model", "Idsim", "jul", "SeasonOrder", "lai", "swc"]
+    assert merged["Idsim"].tolist() == ["d1", "sim1", "sim1", "sim2", "sim3", "sim3", "sim3"]
+    assert pd.isna(merged["lai"].iloc[2])
+    assert merged["swc"].iloc[3] == 12.0
+    assert "idx_Daily_idsim_season_jul" in indexes
+    second.close()
+
+
+def test_nothing_to_merge(base, database):
+    outputsink.prepare(base)
+    assert outputsink.merge(base, database, "Daily") == 0
+    assert not os.path.exists(database)
+
+
+def test_worker_shard_follows_the_run_directory(base, database):
+    outputsink.prepare(base)
+    shard = outputsink.worker_shard(base)
+    assert outputsink.worker_shard(base) is shard
+    shard.append("Daily", daily("sim1", [1]))
+    shard.commit()
+    outputsink.remove_shards(base)
+    outputsink.prepare(base)  # next run in the same tempDir
+    fresh = outputsink.worker_shard(base)
+    assert fresh is not shard
+    fresh.append("Daily", daily("sim2", [1, 2]))
+    fresh.close()
+    assert outputsink.merge(base, database, "Daily") == 2
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+
+import pytest
+
+from modfilegen import queries
+from modfilegen.modeldefaults import model_defaults
+from tests.sticsv11_data import SIMULATIONS, create_master_input, create_models_dictionary
+
+
+@pytest.fixture
+def connection(master_input_path):
+    connection = queries.connect(master_input_path)
+    yield connection
+    connection.close()
+
+
+# The test MasterInput has no successive-simulation columns (SeasonOrder).
+@pytest.mark.parametrize("name", [name for name, sql in queries.STATEMENTS.items()
+                                  if name.startswith("stics.") and "SeasonOrder" not in sql])
+def test_stics_statements_prepare(name, connection):
+    sql = queries.STATEMENTS[name]
+    connection.execute("EXPLAIN " + sql, (None,) * sql.count("?"))
+
+
+def test_rows_are_indexable_by_position_and_column(connection):
+    idsim = SIMULATIONS[0][0]
+    row = queries.fetch_one(connection, "stics.tempopar", idsim)
+    assert isinstance(row, sqlite3.Row)
+    assert row["IDSIM"] == row["idsim"]
+    assert row[0] == idsim
+    assert queries.fetch_one(connection, "stics.tempopar", "missing") is None
+
+
+def test_connection_reuses_one_cursor(connection):
+    cursor = connection.query_cursor()
+    queries.fetch_all(connection, "stics.station", SIMULATIONS[0][0])
+    assert connection.query_cursor() is cursor
+
+
+def test_plain_connections_are_accepted(master_input_path):
+    connection = sqlite3.connect(master_input_path)
+    try:
+        rows = queries.fetch_season(connection, "stics.max_plant_order", None, SIMULATIONS[0][0])
+    finally:
+        connection.close()
+    assert len(rows) == 1
+
+
+def test_season_variant_adds_the_filter():
+    assert queries.statement("stics.organic.season") == queries.statement("stics.organic").replace(
+        " Order by OFNumber", queries.SEASON_FILTER + " Order by OFNumber")
+
+
+def test_master_input_is_read_only(tmp_path):
+    path = os.path.join(tmp_path, "Master Input.db")
+    create_master_input(path).close()
+    connection = queries.connect_readonly(path)
+    try:
+        assert connection.execute("PRAGMA mmap_size").fetchone()[0] == 268435456
+        assert queries.fetch_all(connection, "stics.station", SIMULATIONS[0][0])
+        with pytest.raises(sqlite3.OperationalError):
+            connection.execute("DELETE FROM SimUnitList")
+    finally:
+        connection.close()
+
+
+def test_dictionary_copies_share_the_defaults_registry(tmp_path):
+    path = os.path.join(tmp_path, "ModelsDictionary.db")
+    create_models_dictionary(path).close()
+    first = queries.copy_to_memory(path)
+    second = queries.copy_to_memory(path)
+    try:
+        assert model_defaults(first) is model_defaults(second)
+        assert model_defaults(first).number("sticsv11", "climat", "co2") == 1.0
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,95 @@
+import importlib.util
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modfilegen import resultsink
+
+
+def summarize(frame):
+    return frame[["Model", "Idsim", "Yield"]]
+
+
+@pytest.fixture
+def result_path(tmp_path):
+    return os.path.join(tmp_path, "run_stics.csv")
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = os.path.join(tmp_path, "MasterInput.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute('CREATE TABLE SummaryOutput ("Model" TEXT, "Idsim" TEXT, "Yield" REAL)')
+        connection.executemany("INSERT INTO SummaryOutput VALUES (?, ?, ?)",
+                               [("Stics", "old", 1.0), ("Dssat", "d1", 2.0)])
+    return path
+
+
+def chunk(idsims, yields, season_order):
+    return pd.DataFrame({"Model": "Stics", "Idsim": idsims, "Yield": yields, "SeasonOrder": season_order})
+
+
+def rows(database):
+    with sqlite3.connect(database) as connection:
+        return connection.execute("SELECT Model, Idsim, Yield FROM SummaryOutput ORDER BY rowid").fetchall()
+
+
+def test_configured_sinks():
+    assert resultsink.configured_sinks("csv") == ["csv"]
+    assert resultsink.configured_sinks(" CSV, parquet ") == ["csv", "parquet"]
+    assert resultsink.configured_sinks("", dt=0) == ["csv", "sqlite"]
+    with pytest.raises(ValueError):
+        resultsink.configured_sinks("csv,hdf5")
+
+
+def test_chunks_keep_integer_columns(result_path):
+    sinks = resultsink.ResultSinks(result_path)
+    assert sinks.write(chunk(["s1", "s2"], [9.5, 8.0], np.array([1, 2]))) == 2
+    assert sinks.write(pd.DataFrame()) == 0
+    sinks.write(chunk(["s3"], [7], [np.nan]))
+    sinks.close()
+
+    assert sinks.rows == 3
+    with open(result_path) as stream:
+        lines = stream.read().splitlines()
+    assert lines == ["Model,Idsim,Yield,SeasonOrder", "Stics,s1,9.5,1", "Stics,s2,8.0,2", "Stics,s3,7.0,"]
+
+
+def test_columns_are_the_union_of_the_chunks(result_path):
+    sinks = resultsink.ResultSinks(result_path)
+    sinks.write(chunk(["s1"], [9.5], [1]))
+    sinks.write(chunk(["s2"], [8.0], [2]).drop(columns="Yield").assign(Extra="x"))
+    sinks.close()
+    with open(result_path) as stream:
+        lines = stream.read().splitlines()
+    assert lines == ["Model,Idsim,Yield,SeasonOrder,Extra", "Stics,s1,9.5,1,", "Stics,s2,,2,x"]
+
+
+def test_sqlite_sink_replaces_the_model_rows_at_close(result_path, database, tmp_path):
+    sinks = resultsink.ResultSinks(result_path, ["csv", "sqlite"], database=database,
+                                   model="Stics", summarize=summarize, staging=str(tmp_path))
+    sinks.write(chunk(["s1"], [9.5], [1]))
+    sinks.write(chunk(["s2"], [8.0], [1]))
+    assert rows(database) == [("Stics", "old", 1.0), ("Dssat", "d1", 2.0)]
+    sinks.close()
+    sinks.discard()
+    assert rows(database) == [("Dssat", "d1", 2.0), ("Stics", "s1", 9.5), ("Stics", "s2", 8.0)]
+    assert sorted(os.listdir(tmp_path)) == ["MasterInput.db", "run_stics.csv"]
+
+
+def test_failed_run_keeps_the_previous_rows(result_path, database, tmp_path):
+    sinks = resultsink.ResultSinks(result_path, ["sqlite"], database=database,
+                                   model="Stics", summarize=summarize, staging=str(tmp_path))
+    sinks.write(chunk(["s1"], [9.5], [1]))
+    sinks.discard()
+    assert rows(database) == [("Stics", "old", 1.0), ("Dssat", "d1", 2.0)]
+    assert os.listdir(tmp_path) == ["MasterInput.db"]
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pyarrow") is not None, reason="pyarrow is installed")
+def test_parquet_needs_pyarrow(result_path):
+    with pytest.raises(ImportError, match="pyarrow"):
+        resultsink.ResultSinks(result_path, ["parquet"])
@@ -0,0 +1,23 @@
+import os
+import pickle
+
+from modfilegen import runartifacts
+from modfilegen.runartifacts import RunArtifacts
+
+
+def test_handle_pickles_as_a_path(tmp_path):
+    tempopar = "codeinnact 1\\n" * 10_000
+    artifacts = RunArtifacts.publish(str(tmp_path), tempopar=tempopar)
+    payload = pickle.dumps(artifacts)
+    assert len(payload) < 500
+
+    runartifacts._loaded.clear()  # as in a fresh worker
+    worker_copy = pickle.loads(payload)
+    assert worker_copy["tempopar"] == tempopar
+    assert worker_copy.load() is pickle.loads(payload).load()
+
+
+def test_remove(tmp_path):
+    with RunArtifacts.publish(str(tmp_path), rap="rap") as artifacts:
+        assert os.path.exists(artifacts.path)
+    assert not os.path.exists(artifacts.path)
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from modfilegen import scratch, workspaces
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    monkeypatch.setattr(scratch, "TMPFS_ROOT", os.path.join(tmp_path, "shm"))  # stands for /dev/shm
+    os.makedirs(scratch.TMPFS_ROOT)
+    directory = os.path.join(tmp_path, "temp")
+    os.makedirs(directory)
+    return directory
+
+
+def write(directory, name, size):
+    with open(os.path.join(directory, name), "w") as stream:
+        stream.write("x" * size)
+
+
+def test_disk_mode_has_no_scratch(base):
+    os.makedirs(scratch.scratch_root(base))  # left by an interrupted run
+    assert scratch.prepare(base, "disk") is None
+    assert not os.path.exists(scratch.scratch_root(base))
+    assert scratch.open_scratch(base) is None
+    with pytest.raises(ValueError):
+        scratch.prepare(base, "ssd")
+
+
+def test_budget_and_peak(base):
+    space = scratch.prepare(base, "tmpfs", budget=1)
+    assert space.root == scratch.open_scratch(base).root
+    assert space.charge("a", 600_000)
+    assert not space.charge("b", 600_000)
+    assert space.charge("b", 400_000)
+    assert space.charge("a", 0)
+    assert space.charge("b", 2_000_000, force=True)
+    assert space.usage() == {"in_use": 2_000_000, "peak": 2_000_000, "budget": scratch.MIB, "spills": 1}
+    space.finish()
+    assert not os.path.exists(space.root)
+
+
+def test_default_budget_is_half_the_free_space(base):
+    space = scratch.prepare(base, "tmpfs")
+    stats = os.statvfs(scratch.TMPFS_ROOT)
+    assert space.usage()["budget"] == pytest.approx(stats.f_bavail * stats.f_frsize // 2,
+                                                    abs=stats.f_bavail * stats.f_frsize // 100)
+
+
+def test_workspaces_spill_to_disk(base):
+    space = scratch.prepare(base, "tmpfs", budget=1)
+    usms = workspaces.Workspaces(base, refreshed=("climat.txt",), scratch=space)
+    first = usms.acquire("sim1")
+    assert first.startswith(space.root)
+    assert usms.store().directory.startswith(space.root)
+    write(first, "mod_rapport.sti", 2 * scratch.MIB)
+    second = usms.acquire("sim2")  # a USM like the first one would exceed the budget
+    assert second.startswith(workspaces.workspace_directory(base))
+    assert usms.store().directory == os.path.join(base, "file_store")
+    assert os.listdir(first) == []
+    assert space.usage()["spills"] == 1
+    usms.release()
+    assert space.usage()["in_use"] == 0
+
+
+def test_ledger_is_synced_by_threshold(base):
+    space = scratch.prepare(base, "tmpfs", budget=100)
+    charges = []
+    charge = space.charge
+    space.charge = lambda worker, nbytes, force=False: charges.append(nbytes) or charge(worker, nbytes, force)
+    usms = workspaces.Workspaces(base, scratch=space)
+    for i in range(10):
+        write(usms.acquire(f"sim{i}"), "mod_rapport.sti", 1000)
+    assert charges == [1000 + workspaces.LEDGER_SYNC_BYTES]
+    usms.release()
+    assert space.usage()["in_use"] == 0
+
+
+def test_kept_workspaces_stay_on_disk(base):
+    space = scratch.prepare(base, "tmpfs", budget=1)
+    usms = workspaces.Workspaces(base, keep=True, scratch=space)
+    assert usms.acquire("sim1") == os.path.join(base, "sim1")
@@ -0,0 +1,108 @@
+import pickle
+import sqlite3
+
+import pytest
+
+from modfilegen import GlobalVariables
+from modfilegen.Converter.SticsV11Converter.sticsconverter import build_balanced_simulation_chunks, simulation_weights
+from modfilegen.simulations import SimulationRecord, SimulationSource
+from tests.sticsv11_data import SIMULATIONS
+
+
+@pytest.fixture
+def idsims(master_input):
+    return [row[0] for row in master_input.execute("SELECT idsim FROM SimUnitList ORDER BY rowid")]
+
+
+@pytest.fixture
+def seasons(master_input):
+    """Give M2 two seasons and add two single-season simulations."""
+    master_input.execute("ALTER TABLE CropManagement ADD COLUMN SeasonOrder INTEGER DEFAULT 1")
+    master_input.execute("UPDATE CropManagement SET SeasonOrder = PlantOrder WHERE idMangt = 'M2'")
+    master_input.execute("INSERT INTO SimUnitList (idsim, idMangt) VALUES ('third', 'M1'), ('fourth', 'M1')")
+    master_input.commit()
+
+
+def test_records_read_like_dicts(master_input_path, idsims):
+    records = list(SimulationSource(master_input_path))
+    assert [record["idsim"] for record in records] == idsims
+    record = records[0]
+    assert isinstance(record, SimulationRecord)
+    assert dict(record)["idsim"] == SIMULATIONS[0][0]
+    assert record.get("missing") is None
+    assert dict(pickle.loads(pickle.dumps(record))) == dict(record)
+
+
+def test_chunks_match_chunk_data(master_input_path, idsims):
+    source = SimulationSource(master_input_path)
+    chunks = list(source.chunks(2))
+    total = len(idsims)
+    k, m = divmod(total, 2)
+    expected = [idsims[i * k + min(i, m):(i + 1) * k + min(i + 1, m)] for i in range(2)]
+    assert [[record["idsim"] for record in chunk] for chunk in chunks] == expected
+    assert len(list(source.chunks(total + 3))) == total
+
+
+def test_partitions_match_chunks(master_input_path):
+    source = SimulationSource(master_input_path)
+    partitions = list(source.partitions(2))
+    assert [[record["idsim"] for record in partition] for partition in partitions] == [
+        [record["idsim"] for record in chunk] for chunk in source.chunks(2)]
+    assert (partitions[0].first, partitions[0].last) == (1, 1)
+
+
+def test_subset_keeps_key_order(master_input_path, idsims):
+    source = SimulationSource(master_input_path)
+    keys = [record.key for record in source][::-1]
+    assert [record["idsim"] for record in source.subset(keys)] == idsims[::-1]
+
+
+def test_ranges_and_filters(master_input_path, idsims):
+    source = SimulationSource(master_input_path, first=2, last=2)
+    assert source.count() == 1
+    assert [record["idsim"] for record in source] == idsims[1:2]
+
+    source = SimulationSource(master_input_path, where="idsim = ?", params=(idsims[-1],))
+    assert [record["idsim"] for record in source] == idsims[-1:]
+
+
+def test_filtered_sources_select_columns(master_input_path, idsims):
+    source = SimulationSource(master_input_path, where="idsim <> ?", params=(idsims[0],))
+    narrowed = source.filtered("SimUnitList.StartYear >= ?", (2001,))
+    assert narrowed.count() == 1
+    assert list(narrowed.select("SimUnitList.rowid, idsim")) == [(2, idsims[1])]
+    assert list(source.filtered("0").select("idsim")) == []
+
+
+def test_from_globals(master_input_path, idsims, monkeypatch):
+    monkeypatch.setitem(GlobalVariables, "storeNumMinSimu", 2)
+    monkeypatch.setitem(GlobalVariables, "storeNumMaxSimu", 0)
+    monkeypatch.setitem(GlobalVariables, "simulationFilter", "")
+    source = SimulationSource.from_globals(master_input_path)
+    assert source.count() == len(idsims) - 1
+
+
+def test_weights_without_seasons(master_input_path):
+    source = SimulationSource(master_input_path)
+    assert list(simulation_weights(source)) == [(1, SIMULATIONS[0][0], 1), (2, SIMULATIONS[1][0], 1)]
+
+
+def test_weights_are_season_counts(master_input_path, seasons):
+    source = SimulationSource(master_input_path)
+    assert list(simulation_weights(source)) == [
+        (2, SIMULATIONS[1][0], 2), (1, SIMULATIONS[0][0], 1), (3, "third", 1), (4, "fourth", 1)]
+
+
+def test_chunks_are_balanced_by_seasons(master_input_path, seasons):
+    source = SimulationSource(master_input_path)
+    chunks = build_balanced_simulation_chunks(simulation_weights(source), 2, source.count())
+    assert chunks == [{"keys": [2, 4], "successive": {SIMULATIONS[1][0]}, "load": 3},
+                      {"keys": [1, 3], "successive": set(), "load": 2}]
+    assert len(build_balanced_simulation_chunks(simulation_weights(source), 8, 4)) == 4
+
+
+def test_management_without_crops_is_an_error(master_input_path, seasons):
+    with sqlite3.connect(master_input_path) as connection:
+        connection.execute("INSERT INTO SimUnitList (idsim, idMangt) VALUES ('orphan', 'M9')")
+    with pytest.raises(ValueError, match="M9"):
+        list(simulation_weights(SimulationSource(master_input_path)))
@@ -0,0 +1,104 @@
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from modfilegen import climatestore
+from modfilegen.Converter.SticsV11Converter.sticsclimatconverter import SticsClimatConverter, format_fixed
+from tests.sticsv11_data import create_master_input, create_models_dictionary
+
+DATA_DIR = Path(__file__).parent / "data"
+GOLDEN_DIR = DATA_DIR / "golden"
+
+
+def create_tie_climate(path):
+    """MasterInput whose climate values sit on .x5 ties, around zero, or are missing."""
+    connection = create_master_input(path)
+    connection.execute("DELETE FROM RaClimateD")
+    rows = []
+    for doy in range(1, 367):
+        value = (doy - 183) * 0.05
+        rows.append((
+            "tie", f"2004-{doy:03d}", 2004, doy, 1 + (doy - 1) // 31, 1 + (doy - 1) % 31,
+            None if doy % 50 == 0 else value / 3, value, -value + 0.01 * (doy % 3),
+            abs(value) * 7.35, None if doy % 7 == 0 else 1e5 + value, value * 1.15,
+        ))
+    connection.executemany("INSERT INTO RaClimateD VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+    connection.commit()
+    return connection
+
+
+# (golden file, MasterInput factory or file, ModelsDictionary factory or file, idPoint, years)
+CASES = [
+    ("climat_arise_2000_2001.txt", DATA_DIR / "MasterInput.db", create_models_dictionary,
+     "5.925_6.025", 2000, 2001),
+    ("climat_fixture_2000_2002.txt", create_master_input, create_models_dictionary, "1.0_2.0", 2000, 2002),
+    ("climat_ties_2004.txt", create_tie_climate, create_models_dictionary, "tie", 2004, 2004),
+]
+
+
+@pytest.fixture
+def open_case(tmp_path):
+    """Open (MasterInput, ModelsDictionary) connections of a case, built or copied under ``tmp_path``."""
+    connections = []
+
+    def open_case(master, dictionary, name="case"):
+        directory = os.path.join(tmp_path, name)
+        os.makedirs(directory, exist_ok=True)
+        opened = []
+        for source, file_name in ((master, "MasterInput.db"), (dictionary, "ModelsDictionary.db")):
+            path = os.path.join(directory, file_name)
+            if callable(source):
+                source(path).close()
+            else:
+                shutil.copy(source, path)
+            opened.append(sqlite3.connect(path))
+        connections.extend(opened)
+        return opened
+
+    yield open_case
+    for connection in connections:
+        connection.close()
+
+
+def test_format_fixed_matches_python():
+    values = np.array([0.05, 0.15, 0.25, 0.35, -0.04, -0.0, 0.0, 2.675, -1.25, 1e5 + 0.05,
+                       -999.9, 123456789.05, np.nan, np.inf, -np.inf, 7])
+    digits, exact = format_fixed(values, 8)
+    for row, value, is_exact in zip(digits, values, exact):
+        if is_exact:
+            assert row.tobytes().decode() == format(value, ".1f").rjust(8)
+    assert np.flatnonzero(~exact).tolist() == [11, 12, 13, 14]  # overflowing, nan, inf
+
+    values = np.random.default_rng(0).normal(0, 100, 10_000)
+    values = np.concatenate([values, np.round(values, 2), np.arange(-2000, 2000) / 20])
+    digits, exact = format_fixed(values, 7)
+    assert exact.all()
+    assert [row.tobytes().decode() for row in digits[exact]] == [
+        format(value, ".1f").rjust(7) for value in values[exact]]
+
+
+@pytest.mark.parametrize("golden, master, dictionary, idPoint, first_year, last_year", CASES,
+                         ids=[case[0] for case in CASES])
+def test_golden_files(golden, master, dictionary, idPoint, first_year, last_year, open_case, tmp_path):
+    mi, md = open_case(master, dictionary, golden)
+    sim_path = os.path.join(tmp_path, "sim", idPoint, str(first_year))
+    content = SticsClimatConverter().export(
+        sim_path, md, mi, os.path.join(tmp_path, golden), start_year=first_year, end_year=last_year,
+    )
+    batch = SticsClimatConverter.render_many([(idPoint, first_year, last_year), ("missing", 2000, 2000)], md, mi)
+    expected = (GOLDEN_DIR / golden).read_bytes()
+    assert content.encode() == expected
+    assert batch == {(idPoint, first_year, last_year): expected.decode()}
+
+
+def test_climate_store_batch(open_case, tmp_path):
+    mi, md = open_case(create_master_input, create_models_dictionary)
+    store = climatestore.build(os.path.join(tmp_path, "case", "MasterInput.db"),
+                               os.path.join(tmp_path, "climate"), verbose=False)
+    keys = [("1.0_2.0", 2000, 2002), ("1.0_2.0", 2001, 2001)]
+    assert SticsClimatConverter.render_many(keys, md, mi, climate=store) == SticsClimatConverter.render_many(
+        keys, md, mi)
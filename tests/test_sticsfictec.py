@@ -0,0 +1,33 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from modfilegen.Converter.SticsV11Converter import sticsfictec1converter
+from modfilegen.Converter.SticsV11Converter.sticsconverter import fictec_cache
+from modfilegen.Converter.SticsV11Converter.sticssnapshot import SticsInputSnapshot
+from modfilegen.simulations import SimulationSource
+from tests.sticsv11_data import SIMULATIONS
+
+
+@pytest.mark.parametrize("idsim", [simulation[0] for simulation in SIMULATIONS])
+def test_batch_render_matches_export(idsim, master_input, master_input_path, models_dictionary, tmp_path):
+    snapshot = SticsInputSnapshot.load(master_input, list(SimulationSource(master_input_path)))
+    templates = sticsfictec1converter.FictecTemplates(models_dictionary)
+    converter = sticsfictec1converter.SticsFictec1Converter()
+    usmdir = os.path.join(tmp_path, idsim)
+    exported = converter.export(os.path.join(tmp_path, idsim, "1.0_2.0", "2000"),
+                                models_dictionary, master_input, usmdir, date_offset=365)
+    rendered = converter.render(idsim, models_dictionary, master_input, date_offset=365,
+                                snapshot=snapshot, templates=templates)
+    assert rendered == (exported if isinstance(exported, list) else [exported])
+    for name, content in zip(("fictec1.txt", "fictec2.txt"), rendered):
+        assert (Path(usmdir) / name).read_text() == content
+
+
+def test_worker_cache_lasts_one_run():
+    first = fictec_cache("run-1")
+    first["M1.soila"] = "fictec"
+    assert fictec_cache("run-1") is first
+    assert fictec_cache("run-2") == {}
+    assert fictec_cache("run-1") == {}
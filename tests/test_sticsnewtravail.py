@@ -0,0 +1,50 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from modfilegen.Converter.SticsV11Converter import sticsnewtravailconverter
+from modfilegen.Converter.SticsV11Converter.sticssuccessiveconverter import (
+    adapt_usm_calendar,
+    season_calendar,
+    set_usm_parameter,
+)
+from tests.sticsv11_data import SIMULATIONS
+
+IDSIMS = [simulation[0] for simulation in SIMULATIONS]
+
+
+@pytest.fixture
+def export(master_input, models_dictionary, tmp_path):
+    def export(idsim, usmdir, **options):
+        sim_path = os.path.join(tmp_path, idsim, "1.0_2.0", "2000")
+        return sticsnewtravailconverter.SticsNewTravailConverter().export(
+            sim_path, models_dictionary, master_input, usmdir, **options)
+
+    return export
+
+
+@pytest.fixture
+def template(models_dictionary):
+    return sticsnewtravailconverter.NewTravailTemplate.from_connection(models_dictionary)
+
+
+@pytest.mark.parametrize("idsim", IDSIMS)
+def test_template_matches_compiling_per_simulation(idsim, export, template, tmp_path):
+    usmdir = os.path.join(tmp_path, idsim)
+    content = export(idsim, usmdir)
+    assert export(idsim, usmdir, template=template) == content
+    assert (Path(usmdir) / "new_travail.usm").read_text() == content
+
+
+@pytest.mark.parametrize("idsim", IDSIMS)
+def test_season_is_rendered_like_the_rewritten_file(idsim, export, template, tmp_path):
+    season = {"StartYear": 2000, "StartDay": 300, "EndYear": 2002, "EndDay": 40, "idPoint": "1.0_2.0"}
+    rewritten = os.path.join(tmp_path, "rewritten", idsim)
+    export(idsim, rewritten)
+    adapt_usm_calendar(rewritten, season)
+    set_usm_parameter(Path(rewritten) / "new_travail.usm", "codesuite", 1)
+
+    rendered = os.path.join(tmp_path, "rendered", idsim)
+    export(idsim, rendered, template=template, fields=season_calendar(season), codesuite=1)
+    assert (Path(rendered) / "new_travail.usm").read_text() == (Path(rewritten) / "new_travail.usm").read_text()
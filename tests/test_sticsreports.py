@@ -0,0 +1,114 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from modfilegen import outputsink
+from modfilegen.Converter.SticsV11Converter import sticsconverter, sticsreports
+
+HEADER = ("P_usm;wlieu;ansemis;P_iwater;ancours;ifin;nbdays;P_ichsl;group;P_codeplante;stade;nomversion;"
+          "masec(n);mafruit;chargefruit;iplts;ilevs;iflos;imats;irecs;laimax;QNplante;Qles;QNapp;ces;{cep}")
+ROW = ("maize     ;      cli5; {year};  120; {year};  273;  154;    1;    1;mai;rec   ;v11.0.0   ;"
+       "    13.431;     9.264;  4000.000;   150.000;   154.000;   193.000;   241.000;   273.000;     3.782;"
+       "    37.274;    15.395;    22.726;   233.417;   199.823")
+
+
+@pytest.fixture
+def report(tmp_path):
+    def report(name, text):
+        path = os.path.join(tmp_path, name)
+        with open(path, "w") as stream:
+            stream.write(text)
+        return path
+
+    return report
+
+
+@pytest.fixture
+def profile_path(report):
+    return report("mod_profilA_tsol.sti", " tsol\n cm          120        130\n    1   27.60000   27.41836\n"
+                                          "    2   27.50000   27.43526\n    3   27.40000   27.45084\n")
+
+
+def test_trailing_semicolon_is_not_rewritten(report):
+    text = HEADER.format(cep="cep") + "\n" + ROW.format(year=2000) + ";\n"
+    path = report("mod_rapport.sti", text)
+    summaries = sticsreports.SummaryAccumulator()
+    assert summaries.add(path, "5.925_6.025_2000_M", coordinates={"lon": 6.025, "lat": 5.925}) == 1
+    with open(path) as stream:
+        assert stream.read() == text
+
+    frame = summaries.frame()
+    assert list(frame.columns[:5]) == ["Model", "Idsim", "Texte", "index", "P_usm"]
+    assert list(frame.columns[-3:]) == ["time", "lon", "lat"]
+    row = frame.iloc[0]
+    assert row["Model"] == "Stics"
+    assert row["P_usm"] == "maize     "
+    assert row["Yield"] == 9.264
+    assert row["Transp"] == 199.823
+    assert row["time"] == 2000
+    assert frame["ansemis"].dtype == "int64"
+    assert frame["Planting"].dtype == "float64"
+
+
+def test_chunk_rows_share_one_frame(report):
+    repeated = HEADER.format(cep="cep2") + "\n" + ROW.format(year=2001) + "\n"
+    summaries = sticsreports.SummaryAccumulator()
+    summaries.add(report("a.sti", repeated + repeated), "sim1", "A")  # header left by a reused directory
+    summaries.add(report("b.sti", ROW.format(year=2002) + "\n"), "sim2", season_order=2)  # no header
+    summaries.add(report("c.sti", ""), "sim3")
+
+    frame = summaries.frame()
+    assert len(summaries) == 3
+    assert frame["Idsim"].tolist() == ["sim1", "sim1", "sim2"]
+    assert frame["Texte"].tolist() == ["A", "A", ""]
+    assert frame["index"].tolist() == [0, 2, 0]
+    assert frame["time"].tolist() == [2001, 2001, 2002]
+    assert frame["Transp"].tolist() == [199.823] * 3
+    assert pd.isna(frame["SeasonOrder"].iloc[0])
+    assert frame["SeasonOrder"].iloc[2] == 2
+
+    summaries.clear()
+    assert len(summaries) == 0
+    assert summaries.frame().empty
+
+
+def test_long_form_is_ordered_by_day_then_depth(profile_path):
+    profile = sticsconverter.create_df_profile(profile_path, "sim1", 2, "A")
+    assert list(profile.columns) == ["Model", "Idsim", "SeasonOrder", "Texte", "variable", "depth_cm", "jul", "value"]
+    assert profile["jul"].tolist() == [120, 120, 120, 130, 130, 130]
+    assert profile["depth_cm"].tolist() == [1, 2, 3, 1, 2, 3]
+    assert profile["value"].tolist() == [27.6, 27.5, 27.4, 27.41836, 27.43526, 27.45084]
+    assert profile["depth_cm"].dtype == "int64"
+    assert profile["variable"].dtype == "category"
+    assert set(profile["Idsim"]) == {"sim1"}
+
+
+def test_shards_store_codes_and_merge_text(profile_path, tmp_path):
+    base = str(tmp_path)
+    database = os.path.join(base, "MasterInput.db")
+    outputsink.prepare(base)
+    shard = outputsink.OutputShard(os.path.join(outputsink.shard_directory(base), "a.db"))
+    shard.append("SticsProfile", sticsconverter.create_df_profile(profile_path, "sim1", 1, "A"))
+    shard.append("SticsProfile", sticsconverter.create_df_profile(profile_path, "sim2", 1, ""))
+    shard.close()
+
+    connection = sqlite3.connect(shard.path)
+    try:
+        assert connection.execute('SELECT DISTINCT typeof(Idsim) FROM SticsProfile').fetchall() == [("integer",)]
+        assert connection.execute('SELECT value FROM "SticsProfile:Idsim" ORDER BY code').fetchall() == [
+            ("sim1",), ("sim2",)]
+    finally:
+        connection.close()
+
+    assert outputsink.merge(base, database, "SticsProfile") == 12
+    connection = sqlite3.connect(database)
+    try:
+        merged = pd.read_sql_query("SELECT * FROM SticsProfile", connection)
+    finally:
+        connection.close()
+    assert merged["Idsim"].tolist() == ["sim1"] * 6 + ["sim2"] * 6
+    assert merged["Texte"].tolist() == ["A"] * 6 + [""] * 6
+    assert set(merged["variable"]) == {"tsol"}
+    assert merged["value"].iloc[3] == 27.41836
@@ -0,0 +1,76 @@
+import os
+import stat
+import subprocess
+import time
+
+import pytest
+
+from modfilegen.Converter.SticsV11Converter import sticsrunner, sticstempoparconverter
+
+
+def alive(pid):
+    """Whether ``pid`` still runs; a killed process nobody reaped yet is a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat") as stream:
+            return stream.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.fixture
+def usmdir(tmp_path):
+    directory = os.path.join(tmp_path, "usm")
+    os.makedirs(directory)
+    return directory
+
+
+@pytest.fixture
+def executable(tmp_path):
+    def executable(body):
+        path = os.path.join(tmp_path, "stics_modulo")
+        with open(path, "w") as stream:
+            stream.write("#!/bin/sh\n" + body + "\n")
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+        return path
+
+    return executable
+
+
+def test_runs_in_the_usm_directory(usmdir, executable):
+    result = sticsrunner.run(usmdir, executable=executable(
+        "echo report > mod_rapport.sti; echo day > mod_sA.sti; echo noise"))
+    assert result.returncode == 0
+    with open(os.path.join(usmdir, "mod_rapport.sti")) as stream:
+        assert stream.read() == "report\n"
+    assert [path.name for path in sticsrunner.daily_outputs(usmdir)] == ["mod_sA.sti"]
+
+    sticsrunner.clear_outputs(usmdir)
+    assert sorted(os.listdir(usmdir)) == ["mod_sA.sti"]
+    sticsrunner.clear_outputs(usmdir, dailyoutput=1)
+    assert os.listdir(usmdir) == []
+
+
+def test_failure_raises_with_stderr(usmdir, executable):
+    with pytest.raises(subprocess.CalledProcessError) as caught:
+        sticsrunner.run(usmdir, executable=executable("echo broken >&2; exit 3"))
+    assert caught.value.returncode == 3
+    assert caught.value.stderr == "broken\n"
+
+
+def test_timeout_kills_the_process_group(usmdir, executable, tmp_path):
+    marker = os.path.join(tmp_path, "child.pid")
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        sticsrunner.run(usmdir, timeout=0.5, executable=executable(f"sleep 30 & echo $! > {marker}; wait"))
+    assert time.monotonic() - start < 10
+    with open(marker) as stream:
+        child = int(stream.read())
+    time.sleep(0.1)
+    assert not alive(child)
+
+
+def test_tempopar_sets_the_report_separator():
+    content = sticstempoparconverter.render({"StressN_YN": 1, "StressW_YN": 0},
+                                            "codeseprapport\n1\ncodesensibilite\n1\n")
+    assert "codeseprapport\n2\n" in content
+    assert "codesensibilite\n1\n" in content
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from modfilegen.Converter.SticsV11Converter import sticsparamsolconverter, sticssoilcatalogue
+from tests.sticsv11_data import SIMULATIONS
+
+
+@pytest.fixture
+def models_dictionary_path(models_dictionary, tmp_path):
+    return os.path.join(tmp_path, "ModelsDictionary.db")
+
+
+@pytest.mark.parametrize("idsim", [simulation[0] for simulation in SIMULATIONS])
+def test_catalogue_matches_export(idsim, master_input, master_input_path, models_dictionary,
+                                  models_dictionary_path, tmp_path):
+    catalogue = sticssoilcatalogue.prepare(master_input_path, models_dictionary_path, str(tmp_path))
+    assert catalogue is not None
+    idsoil = master_input.execute("SELECT idsoil FROM SimUnitList WHERE idsim = ?", (idsim,)).fetchone()[0]
+    exported = sticsparamsolconverter.SticsParamSolConverter().export(
+        os.path.join(tmp_path, idsim, "1.0_2.0", "2000"),
+        models_dictionary, master_input, os.path.join(tmp_path, idsim))
+    assert exported
+    assert catalogue.param_sol(idsoil) == exported
+    assert catalogue.param_sol(idsoil.upper()) == exported
+    assert catalogue.param_sol("missing") is None
+
+
+def test_failed_build_removes_the_catalogue(master_input, master_input_path, models_dictionary_path, tmp_path):
+    directory = sticssoilcatalogue.catalogue_directory(str(tmp_path))
+    sticssoilcatalogue.prepare(master_input_path, models_dictionary_path, str(tmp_path))
+    master_input.execute("DROP TABLE SoilLayers")
+    master_input.commit()
+    assert sticssoilcatalogue.prepare(master_input_path, models_dictionary_path, str(tmp_path)) is None
+    assert sticssoilcatalogue.open_catalogue(directory) is None
@@ -0,0 +1,139 @@
+import os
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+from joblib import Parallel, delayed
+
+from modfilegen.Converter.SticsV11Converter import sticssuccessiveconverter
+
+MODELS_DICTIONARY = str(Path(__file__).parent / "successive" / "ModelsDictionaryArise.db")
+
+
+def context_identity(mi, md, directory, temp_dir, run):
+    context = sticssuccessiveconverter.worker_context(mi, md, directory, temp_dir, directory, directory, run)
+    return os.getpid(), id(context)
+
+
+@pytest.fixture
+def context(master_input_path, tmp_path):
+    """Worker context of a rotation run in ``tmp_path``, for a ``temp_dir`` and a run key."""
+    md = shutil.copy(MODELS_DICTIONARY, tmp_path)
+
+    def context(temp_dir=os.path.join(tmp_path, "temp"), run=None):
+        return sticssuccessiveconverter.worker_context(
+            master_input_path, md, str(tmp_path), temp_dir, str(tmp_path), str(tmp_path), run)
+
+    context.md = md
+    yield context
+    sticssuccessiveconverter.close_worker_contexts()
+
+
+def test_context_is_reused_across_rotations(context):
+    first = context()
+    assert context() is first
+    assert first["tempopar"]
+
+
+def test_new_configuration_closes_the_previous_context(context, tmp_path):
+    first = context()
+    second = context(os.path.join(tmp_path, "other"))
+    assert second is not first
+    with pytest.raises(sqlite3.ProgrammingError):
+        first["master"].execute("SELECT 1")
+
+
+def test_new_run_or_edited_master_input_rebuild_the_context(context, master_input):
+    first = context(run="run1")
+    second = context(run="run2")
+    assert second is not first
+    master_input.execute("CREATE TABLE edited (x)")  # SimulationOptions edited between runs
+    master_input.commit()
+    assert context(run="run2") is not second
+
+
+def test_explicit_teardown(context):
+    first = context()
+    sticssuccessiveconverter.close_worker_contexts()
+    with pytest.raises(sqlite3.ProgrammingError):
+        first["dictionary"].execute("SELECT 1")
+    assert context() is not first
+
+
+def test_workers_keep_their_context_until_the_run_ends(context, master_input_path, tmp_path):
+    def run_tasks():
+        return set(Parallel(n_jobs=2, backend="loky")(
+            delayed(context_identity)(master_input_path, context.md, str(tmp_path),
+                                      os.path.join(tmp_path, "temp"), "run1")
+            for _ in range(6)
+        ))
+
+    first = run_tasks()
+    assert len(first) == len({pid for pid, _ in first})  # one context per worker
+    sticssuccessiveconverter.end_worker_contexts()
+    second = run_tasks()
+    sticssuccessiveconverter.end_worker_contexts()
+    assert not {pid for pid, _ in first} & {pid for pid, _ in second}  # workers were stopped
+
+
+def test_rendering_thread_can_use_the_connections(context):
+    worker = context()
+    pipeline = sticssuccessiveconverter.SeasonPipeline([lambda: worker["master"].execute("SELECT 1").fetchone()])
+    assert pipeline.inputs(0) == (1,)
+    pipeline.close()
+
+
+def test_next_seasons_render_while_one_runs():
+    running = threading.Event()
+    rendered = []
+
+    def render(index):
+        if index == 1:
+            running.wait(5)  # only proceeds if season 0 is "running" in the caller
+        rendered.append(index)
+        return index
+
+    pipeline = sticssuccessiveconverter.SeasonPipeline([lambda i=i: render(i) for i in range(3)])
+    assert pipeline.inputs(0) == 0
+    running.set()
+    assert [pipeline.inputs(1), pipeline.inputs(2)] == [1, 2]
+    pipeline.close()
+    assert rendered == [0, 1, 2]
+
+
+def test_close_drops_the_renders_not_started():
+    started = threading.Event()
+    release = threading.Event()
+    rendered = []
+
+    def render(index):
+        started.set()
+        release.wait(5)
+        rendered.append(index)
+
+    pipeline = sticssuccessiveconverter.SeasonPipeline([lambda i=i: render(i) for i in range(3)])
+    started.wait(5)
+    threading.Timer(0.1, release.set).start()
+    pipeline.close()  # season 0 is rendering: close waits for it and cancels the others
+    assert rendered == [0]
+
+
+def test_failed_render_stops_the_rotation():
+    def fail():
+        raise FileNotFoundError("missing soil")
+
+    pipeline = sticssuccessiveconverter.SeasonPipeline([lambda: "s0", fail, lambda: "s2"])
+    assert pipeline.inputs(0) == "s0"
+    with pytest.raises(FileNotFoundError):
+        pipeline.inputs(1)
+    pipeline.close()
+
+
+def test_season_directories_are_known_before_rendering():
+    key, usmdir = sticssuccessiveconverter.season_directory(
+        {"idsim": "sim1"}, {"SeasonOrder": 2}, {"temp_dir": "/tmp/run"}
+    )
+    assert key == "sim1__season_002"
+    assert str(usmdir) == "/tmp/run/sim1__season_002"
@@ -0,0 +1,23 @@
+import os
+
+from modfilegen.Converter.SticsV11Converter import sticstempoparconverter
+from modfilegen.Converter.SticsV11Converter.sticsconverter import common_tempopar_variants
+from tests.sticsv11_data import SIMULATIONS
+
+
+def test_variants_match_export(master_input, tmp_path):
+    variants = sticstempoparconverter.tempopar_variants(master_input, "body\n")
+    assert sorted(variants) == ["1", "2"]
+    for simulation in SIMULATIONS:
+        idsim = simulation[0]
+        idOption = master_input.execute("SELECT idOption FROM SimUnitList WHERE idsim = ?", (idsim,)).fetchone()[0]
+        sim_path = os.path.join(tmp_path, idsim, "1.0_2.0", "2000")
+        exported = sticstempoparconverter.SticsTempoparConverter().export(
+            sim_path, master_input, "body\n", os.path.join(tmp_path, idsim))
+        assert variants[str(idOption)] == exported
+
+
+def test_unreadable_options_fall_back_to_export(master_input, master_input_path):
+    master_input.execute("DROP TABLE SimulationOptions")
+    master_input.commit()
+    assert common_tempopar_variants(master_input_path, "body\n") == {}
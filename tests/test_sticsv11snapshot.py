@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from modfilegen.Converter.SticsV11Converter import (
+    sticsficiniconverter,
+    sticsficplt1converter,
+    sticsfictec1converter,
+    sticsnewtravailconverter,
+    sticsparamsolconverter,
+    sticsstationconverter,
+    sticstempoparconverter,
+)
+from modfilegen.Converter.SticsV11Converter.sticsconverter import fetch_data_from_sqlite
+from modfilegen.Converter.SticsV11Converter.sticssnapshot import SticsInputSnapshot
+from tests.sticsv11_data import SIMULATIONS
+
+
+def render(snapshot, master, dictionary, directory, idsim):
+    """Run every snapshot-aware converter and return the files it wrote."""
+    usmdir = Path(directory) / ("snapshot" if snapshot is not None else "sql")
+    usmdir.mkdir()
+    sim_path = os.path.join(directory, idsim, "1.0_2.0", "2000")
+    pltfolder = Path(directory) / "plt"
+    pltfolder.mkdir(exist_ok=True)
+    for name in ("maize.txt", "bean.txt"):
+        (pltfolder / name).write_text(name)
+
+    sticstempoparconverter.SticsTempoparConverter().export(
+        sim_path, master, "body\n", str(usmdir), snapshot=snapshot)
+    sticsparamsolconverter.SticsParamSolConverter().export(
+        sim_path, dictionary, master, str(usmdir), snapshot=snapshot)
+    sticsstationconverter.SticsStationConverter().export(
+        sim_path, dictionary, master, "rap", "var", "prof", str(usmdir), snapshot=snapshot)
+    sticsnewtravailconverter.SticsNewTravailConverter().export(
+        sim_path, dictionary, master, str(usmdir), snapshot=snapshot)
+    sticsficiniconverter.SticsFicIniConverter().export(
+        sim_path, dictionary, master, str(usmdir), snapshot=snapshot)
+    sticsfictec1converter.SticsFictec1Converter().export(
+        sim_path, dictionary, master, str(usmdir), date_offset=3, snapshot=snapshot)
+    sticsficplt1converter.SticsFicplt1Converter().export(
+        sim_path, master, str(pltfolder), str(usmdir), snapshot=snapshot)
+    return {path.name: path.read_text() for path in sorted(usmdir.iterdir())}
+
+
+@pytest.mark.parametrize("index, idsim", list(enumerate(simulation[0] for simulation in SIMULATIONS)))
+def test_snapshot_renders_the_same_files_as_per_simulation_queries(index, idsim, master_input, master_input_path,
+                                                                    models_dictionary, tmp_path):
+    snapshot = SticsInputSnapshot.load(master_input, fetch_data_from_sqlite(master_input_path))
+    directory = os.path.join(tmp_path, str(index))
+    os.makedirs(directory)
+    expected = render(None, master_input, models_dictionary, directory, idsim)
+    actual = render(snapshot, master_input, models_dictionary, directory, idsim)
+    assert sorted(actual) == sorted(expected)
+    for name, content in expected.items():
+        assert actual[name] == content, name
+
+
+def test_soils_and_layers_are_indexed_case_insensitively(master_input, master_input_path):
+    snapshot = SticsInputSnapshot.load(master_input, fetch_data_from_sqlite(master_input_path))
+
+    assert snapshot.soil(SIMULATIONS[0][0])[0]["IdSoil"] == "soila"
+    assert [layer["NumLayer"] for layer in snapshot.layers("SOILB")] == [1, 2]
+    assert snapshot.max_plant_order(SIMULATIONS[1][0]) == 2
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from modfilegen import filestore, workspaces
+
+
+@pytest.fixture
+def base(tmp_path):
+    return str(tmp_path)
+
+
+def write(directory, name, content=""):
+    with open(os.path.join(directory, name), "w") as stream:
+        stream.write(content)
+
+
+def test_slot_is_reused_and_cleaned(base):
+    usms = workspaces.Workspaces(base, refreshed=("climat.txt", "param.sol"))
+    store = filestore.FileStore(filestore.store_directory(base))
+    first = usms.acquire("sim1")
+    store.place(first, "climat.txt", "climate")
+    write(first, "param.sol", "plain copy")  # a failed write must not find it next time
+    write(first, "mod_rapport.sti")
+    write(first, "fictec2.txt")
+    os.makedirs(os.path.join(first, "nested"))
+    second = usms.acquire("sim2")
+    assert second == first
+    assert os.listdir(second) == ["climat.txt"]
+    assert second.startswith(workspaces.workspace_directory(base))
+
+
+def test_slots_rotate(base):
+    usms = workspaces.Workspaces(base, slots=2)
+    assert len({usms.acquire(f"sim{i}") for i in range(4)}) == 2
+    usms.release()
+    assert os.listdir(workspaces.workspace_directory(base)) == []
+
+
+def test_keep_gives_one_directory_per_simulation(base):
+    usms = workspaces.Workspaces(base, keep=True)
+    directory = usms.acquire("sim1")
+    assert directory == os.path.join(base, "sim1")
+    write(directory, "mod_rapport.sti")
+    assert usms.acquire("sim1") == directory
+    assert os.listdir(directory) == ["mod_rapport.sti"]
+
+
+def test_stored_files_are_kept_linked(base):
+    usms = workspaces.Workspaces(base, refreshed=("param.sol",))
+    store = filestore.FileStore(filestore.store_directory(base))
+    path = store.place(usms.acquire("sim1"), "param.sol", "soil\n")
+    inode = os.stat(path).st_ino
+    assert store.place(usms.acquire("sim2"), "param.sol", "soil\n") == path
+    assert os.stat(path).st_ino == inode
+    store.place(usms.acquire("sim3"), "param.sol", "other soil\n")
+    with open(path) as stream:
+        assert stream.read() == "other soil\n"
+
+
+def test_worker_workspaces_are_shared_and_removed(base):
+    usms = workspaces.worker_workspaces(base, refreshed=("a",))
+    assert workspaces.worker_workspaces(base, refreshed=("a",)) is usms
+    usms.acquire("sim1")
+    workspaces.remove_workspaces(base)
+    assert not os.path.exists(workspaces.workspace_directory(base))
+    assert os.path.isdir(usms.acquire("sim2"))